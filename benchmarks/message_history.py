@@ -0,0 +1,122 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""Benchmark the per-turn cost of keeping the message history of the provider clients.
+
+Runs many turns of a conversation through each client's request preparation, without
+sending anything, and reports the mean time per turn at several history lengths. The
+time should stay flat as the history grows. The "copying" row rebuilds the history list
+every turn, as the clients used to, for comparison.
+
+Usage: python benchmarks/message_history.py [--turns 1000] [--report-every 250]
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+
+from trae_agent.tools.base import ToolCall, ToolResult
+from trae_agent.utils.config import ModelConfig, ModelProvider
+from trae_agent.utils.llm_clients.anthropic_client import AnthropicClient
+from trae_agent.utils.llm_clients.base_client import BaseLLMClient
+from trae_agent.utils.llm_clients.google_client import GoogleClient
+from trae_agent.utils.llm_clients.llm_basics import LLMMessage
+from trae_agent.utils.llm_clients.openai_client import OpenAIClient
+from trae_agent.utils.llm_clients.openrouter_client import OpenRouterClient
+
+
+def make_model_config(provider: str) -> ModelConfig:
+    return ModelConfig(
+        model="benchmark-model",
+        model_provider=ModelProvider(
+            api_key="benchmark-api-key", provider=provider, base_url="http://localhost:1"
+        ),
+        max_tokens=1000,
+        temperature=0.5,
+        top_p=1.0,
+        top_k=0,
+        parallel_tool_calls=False,
+        max_retries=0,
+    )
+
+
+def turn_messages(turn: int) -> list[LLMMessage]:
+    """The messages an agent sends on a turn: the previous tool result and a reminder."""
+    tool_result = ToolResult(
+        call_id=f"call_{turn}", name="bash", success=True, result="line\n" * 40
+    )
+    return [
+        LLMMessage(role="user", tool_result=tool_result),
+        LLMMessage(role="user", content=f"Turn {turn}: continue with the task."),
+    ]
+
+
+def assistant_message(turn: int) -> LLMMessage:
+    tool_call = ToolCall(call_id=f"call_{turn}", name="bash", arguments={"command": "ls"})
+    return LLMMessage(role="assistant", content="Listing files.", tool_call=tool_call)
+
+
+def client_turn(client: BaseLLMClient) -> Callable[[int], None]:
+    """Return a function running the history bookkeeping of one turn of the client."""
+    model_config = make_model_config("benchmark")
+
+    def run(turn: int) -> None:
+        if isinstance(client, GoogleClient):
+            _ = client._prepare_request(turn_messages(turn), model_config, None, True)  # pyright: ignore[reportPrivateUsage]
+        else:
+            _ = client._prepare_request(turn_messages(turn), None, True)  # pyright: ignore[reportPrivateUsage, reportAttributeAccessIssue, reportUnknownMemberType]
+        # Stands in for the assistant message that processing the response appends.
+        client.message_history.append(client.message_history[-1])  # pyright: ignore[reportAttributeAccessIssue, reportUnknownMemberType]
+
+    return run
+
+
+def copying_turn(client: OpenRouterClient) -> Callable[[int], None]:
+    """The bookkeeping of a turn when every turn copies the history into a new list."""
+    history: list[object] = []
+
+    def run(turn: int) -> None:
+        nonlocal history
+        parsed = client.parse_messages(turn_messages(turn) + [assistant_message(turn)])
+        history = history + parsed
+
+    return run
+
+
+def measure(run: Callable[[int], None], turns: int, report_every: int) -> list[float]:
+    """Return the mean time of a turn in microseconds over each window of turns."""
+    means: list[float] = []
+    window_start = time.perf_counter()
+    for turn in range(1, turns + 1):
+        run(turn)
+        if turn % report_every == 0:
+            means.append((time.perf_counter() - window_start) / report_every * 1e6)
+            window_start = time.perf_counter()
+    return means
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    _ = parser.add_argument("--turns", type=int, default=1000)
+    _ = parser.add_argument("--report-every", type=int, default=250)
+    args = parser.parse_args()
+
+    runs: dict[str, Callable[[int], None]] = {
+        "anthropic": client_turn(AnthropicClient(make_model_config("anthropic"))),
+        "openai": client_turn(OpenAIClient(make_model_config("openai"))),
+        "openrouter": client_turn(OpenRouterClient(make_model_config("openrouter"))),
+        "google": client_turn(GoogleClient(make_model_config("google"))),
+        "copying": copying_turn(OpenRouterClient(make_model_config("openrouter"))),
+    }
+
+    windows = range(args.report_every, args.turns + 1, args.report_every)
+    # Every turn adds three messages to the history.
+    header = "".join(f"{f'{turn * 3} msgs':>12}" for turn in windows)
+    print(f"mean time per turn in microseconds, by history length\n{'client':>10}{header}")
+    for name, run in runs.items():
+        means = measure(run, args.turns, args.report_every)
+        print(f"{name:>10}" + "".join(f"{mean:12.1f}" for mean in means))
+
+
+if __name__ == "__main__":
+    main()
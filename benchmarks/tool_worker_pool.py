@@ -0,0 +1,120 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""Benchmark parallel file views and CKG queries with and without a tool worker pool.
+
+Reports the wall time of a batch of parallel calls, and the longest time the event loop
+was blocked meanwhile, which is how late streaming LLM responses and other agents of a
+batch are served. Worker pools only shorten the wall time on machines with several cores.
+
+Usage: python benchmarks/tool_worker_pool.py [--files 64] [--lines 4000] [--rounds 5]
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from trae_agent.tools.base import ToolCall, ToolExecutor
+from trae_agent.tools.ckg_tool import CKGTool
+from trae_agent.tools.edit_tool import TextEditorTool
+from trae_agent.tools.worker_pool import get_tool_worker_pool, shutdown_tool_worker_pools
+
+
+def write_codebase(root: Path, files: int, lines: int) -> None:
+    for i in range(files):
+        body = "\n".join(
+            f"def function_{i}_{j}(value):\n    return value * {j}\n" for j in range(lines // 3)
+        )
+        _ = (root / f"module_{i}.py").write_text(f"class Class{i}:\n    pass\n\n{body}\n")
+
+
+def make_calls(root: Path, files: int) -> list[ToolCall]:
+    calls: list[ToolCall] = []
+    for i in range(files):
+        calls.append(
+            ToolCall(
+                name="str_replace_based_edit_tool",
+                call_id=f"view_{i}",
+                arguments={"command": "view", "path": str(root / f"module_{i}.py")},
+            )
+        )
+        calls.append(
+            ToolCall(
+                name="ckg",
+                call_id=f"ckg_{i}",
+                arguments={
+                    "command": "search_function",
+                    "path": str(root),
+                    "identifier": f"function_{i}_1",
+                    "print_body": True,
+                },
+            )
+        )
+    return calls
+
+
+async def measure_loop_lag(stop: asyncio.Event, interval: float = 0.001) -> float:
+    """Return the longest delay of a timer that should fire every `interval` seconds."""
+    max_lag = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        max_lag = max(max_lag, time.perf_counter() - start - interval)
+    return max_lag
+
+
+async def run_round(pool_kind: str, tools: list, calls: list[ToolCall]) -> tuple[float, float]:
+    """Run the calls in parallel and return the wall time and the longest loop lag."""
+    executor = ToolExecutor(tools, worker_pool=get_tool_worker_pool(pool_kind))
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_loop_lag(stop))
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    results = await executor.parallel_tool_call(calls)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    max_lag = await lag_task
+    failed = [result for result in results if not result.success]
+    if failed:
+        raise RuntimeError(f"{len(failed)} calls failed, e.g. {failed[0].error}")
+    return elapsed, max_lag
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    _ = parser.add_argument("--files", type=int, default=64)
+    _ = parser.add_argument("--lines", type=int, default=4000)
+    _ = parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        write_codebase(root, args.files, args.lines)
+        calls = make_calls(root, args.files)
+        tools = [TextEditorTool(), CKGTool()]
+        # Build the CKG once, so that every round measures queries only.
+        _ = await run_round("none", tools, calls[:2])
+
+        baseline: float | None = None
+        print(f"{len(calls)} parallel calls, median of {args.rounds} rounds")
+        print(f"{'pool':>8}  {'wall time':>10}  {'speedup':>7}  {'max loop lag':>12}")
+        for pool_kind in ["none", "thread", "process"]:
+            # The first round of a process pool pays for starting the workers.
+            _ = await run_round(pool_kind, tools, calls)
+            rounds = [await run_round(pool_kind, tools, calls) for _ in range(args.rounds)]
+            wall_time = statistics.median(elapsed for elapsed, _ in rounds)
+            loop_lag = statistics.median(lag for _, lag in rounds)
+            baseline = baseline or wall_time
+            print(
+                f"{pool_kind:>8}  {wall_time * 1000:7.1f} ms  {baseline / wall_time:6.2f}x"
+                f"  {loop_lag * 1000:9.1f} ms"
+            )
+
+    shutdown_tool_worker_pools()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
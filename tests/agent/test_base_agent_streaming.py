@@ -0,0 +1,139 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import unittest
+from typing import override
+from unittest.mock import patch
+
+from trae_agent.agent.agent_basics import AgentExecution, AgentStep, AgentStepState
+from trae_agent.agent.base_agent import BaseAgent
+from trae_agent.tools.base import (
+    Tool,
+    ToolCall,
+    ToolCallArguments,
+    ToolExecResult,
+    ToolExecutor,
+    ToolParameter,
+)
+from trae_agent.utils.config import AgentConfig, ModelConfig, ModelProvider
+from trae_agent.utils.llm_clients.llm_basics import LLMMessage, LLMResponse, LLMStreamEvent
+
+
+class _ProbeTool(Tool):
+    """Records the calls it executes. Calls with mode "read" are read-only."""
+
+    def __init__(self):
+        super().__init__()
+        self.started = asyncio.Event()
+        self.executed: list[str] = []
+
+    @override
+    def get_name(self) -> str:
+        return "probe"
+
+    @override
+    def get_description(self) -> str:
+        return "Probe tool"
+
+    @override
+    def get_parameters(self) -> list[ToolParameter]:
+        return [ToolParameter(name="mode", type="string", description="read or write")]
+
+    @override
+    async def execute(self, arguments: ToolCallArguments) -> ToolExecResult:
+        self.executed.append(str(arguments["mode"]))
+        self.started.set()
+        return ToolExecResult(output=str(arguments["mode"]))
+
+    @override
+    def is_read_only(self, arguments: ToolCallArguments) -> bool:
+        return arguments.get("mode") == "read"
+
+
+class _Agent(BaseAgent):
+    @override
+    def new_task(self, task, extra_args=None, tool_names=None):
+        pass
+
+    @override
+    async def cleanup_mcp_clients(self) -> None:
+        pass
+
+
+def probe_call(call_id: str, mode: str) -> ToolCall:
+    return ToolCall(name="probe", call_id=call_id, arguments={"mode": mode})
+
+
+class TestEarlyToolExecution(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        model_config = ModelConfig(
+            model="test-model",
+            model_provider=ModelProvider(api_key="test-api-key", provider="anthropic"),
+            max_tokens=1000,
+            temperature=0.5,
+            top_p=1.0,
+            top_k=0,
+            parallel_tool_calls=True,
+            max_retries=0,
+            stream=True,
+        )
+        agent_config = AgentConfig(
+            allow_mcp_servers=[],
+            mcp_servers_config={},
+            max_steps=5,
+            model=model_config,
+            tools=[],
+        )
+        with patch("trae_agent.agent.base_agent.LLMClient"):
+            self.agent = _Agent(agent_config)
+        self.tool = _ProbeTool()
+        self.agent._tool_caller = ToolExecutor([self.tool])
+
+    def set_stream(self, stream):
+        self.agent._llm_client.astream = stream  # pyright: ignore[reportAttributeAccessIssue]
+
+    async def run_step(self) -> AgentStep:
+        step = AgentStep(step_number=1, state=AgentStepState.THINKING)
+        execution = AgentExecution(task="test", steps=[])
+        await self.agent._run_llm_step(step, [LLMMessage(role="user", content="go")], execution)
+        return step
+
+    async def test_read_only_call_starts_before_stream_ends(self):
+        call = probe_call("a", "read")
+
+        async def stream(*args, **kwargs):
+            yield LLMStreamEvent(tool_call=call)
+            # The tool must be running while the model is still generating.
+            await asyncio.wait_for(self.tool.started.wait(), timeout=1)
+            yield LLMStreamEvent(response=LLMResponse(content="", tool_calls=[call]))
+
+        self.set_stream(stream)
+        step = await self.run_step()
+
+        self.assertEqual(self.tool.executed, ["read"])
+        assert step.tool_results is not None
+        self.assertEqual([r.result for r in step.tool_results], ["read"])
+
+    async def test_calls_after_side_effecting_call_wait_for_response(self):
+        calls = [probe_call("a", "read"), probe_call("b", "write"), probe_call("c", "read")]
+
+        async def stream(*args, **kwargs):
+            for call in calls:
+                yield LLMStreamEvent(tool_call=call)
+            await asyncio.sleep(0)
+            # Only the read-only call that precedes the write may have started.
+            self.assertEqual(self.tool.executed, ["read"])
+            yield LLMStreamEvent(response=LLMResponse(content="", tool_calls=calls))
+
+        self.set_stream(stream)
+        step = await self.run_step()
+
+        assert step.tool_results is not None
+        self.assertEqual([r.call_id for r in step.tool_results], ["a", "b", "c"])
+        self.assertEqual(sorted(self.tool.executed), ["read", "read", "write"])
+        self.assertEqual(self.agent._started_tool_calls, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+
+from trae_agent.agent.agent_basics import AgentExecution, AgentState
+from trae_agent.agent.batch_runner import BatchRunner, BatchTask, load_batch_tasks
+from trae_agent.tools.bash_tool import BashTool
+from trae_agent.utils.llm_clients.http_client import get_loop_http_pool
+from trae_agent.utils.llm_clients.llm_basics import LLMUsage
+
+
+class TestLoadBatchTasks(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.tasks_file = os.path.join(self.temp_dir.name, "tasks.jsonl")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_lines(self, *lines: str):
+        with open(self.tasks_file, "w") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def test_loads_tasks_and_defaults_ids_to_line_numbers(self):
+        self.write_lines(
+            json.dumps({"id": "a", "task": "fix a", "working_dir": "/repo/a", "must_patch": True}),
+            "",
+            json.dumps({"task": "fix b", "working_dir": "/repo/b", "base_commit": "abc"}),
+        )
+
+        tasks = load_batch_tasks(self.tasks_file)
+
+        self.assertEqual([task.task_id for task in tasks], ["a", "task_3"])
+        self.assertTrue(tasks[0].must_patch)
+        self.assertEqual(tasks[1].base_commit, "abc")
+
+    def test_rejects_relative_working_dir_and_duplicate_ids(self):
+        self.write_lines(json.dumps({"task": "fix", "working_dir": "repo"}))
+        with self.assertRaisesRegex(ValueError, "absolute"):
+            load_batch_tasks(self.tasks_file)
+
+        self.write_lines(
+            json.dumps({"id": "a", "task": "fix", "working_dir": "/repo"}),
+            json.dumps({"id": "a", "task": "fix", "working_dir": "/repo"}),
+        )
+        with self.assertRaisesRegex(ValueError, "duplicate"):
+            load_batch_tasks(self.tasks_file)
+
+    def test_rejects_ids_that_are_not_plain_file_names(self):
+        for task_id in ["../escape", "a/b", "/abs", "a\\b", "..", "."]:
+            self.write_lines(json.dumps({"id": task_id, "task": "fix", "working_dir": "/repo"}))
+            with self.assertRaisesRegex(ValueError, "plain file name"):
+                load_batch_tasks(self.tasks_file)
+
+
+class TestBatchRunner(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_dir = os.path.join(self.temp_dir.name, "results")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    async def test_runs_tasks_concurrently_and_writes_summary(self):
+        running = 0
+        max_running = 0
+        shared_pools: set[httpx.AsyncClient] = set()
+        created_agents: list[MagicMock] = []
+
+        def make_agent(agent_type, config, trajectory_file):
+            agent = MagicMock()
+            agent.agent.tools = []
+            agent.trajectory_file = trajectory_file
+            # Agents of a batch share the HTTP pool of the batch's event loop.
+            shared_pools.add(get_loop_http_pool("openai", None))
+
+            async def run(task, task_args):
+                nonlocal running, max_running
+                running += 1
+                max_running = max(max_running, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+                if task == "crash":
+                    raise RuntimeError("boom")
+                return AgentExecution(
+                    task=task,
+                    steps=[],
+                    success=task == "ok",
+                    total_tokens=LLMUsage(input_tokens=10, output_tokens=5),
+                    agent_state=AgentState.COMPLETED if task == "ok" else AgentState.ERROR,
+                    final_result=None if task == "ok" else "exceeded max steps",
+                )
+
+            agent.run = run
+            created_agents.append(agent)
+            return agent
+
+        tasks = [
+            BatchTask(task_id=f"t{i}", task=task, working_dir=f"/repo/{i}")
+            for i, task in enumerate(["ok", "ok", "fail", "crash", "ok"])
+        ]
+        finished: list[str] = []
+        runner = BatchRunner(
+            MagicMock(),
+            self.output_dir,
+            concurrency=2,
+            on_task_done=lambda result: finished.append(result.task_id),
+        )
+
+        with patch("trae_agent.agent.batch_runner.Agent", side_effect=make_agent):
+            summary = await runner.run(tasks)
+
+        self.assertEqual(max_running, 2)
+        self.assertEqual(len(shared_pools), 1)
+        self.assertTrue(all(pool.is_closed for pool in shared_pools))
+        self.assertEqual(sorted(finished), [task.task_id for task in tasks])
+        self.assertEqual(len({agent.trajectory_file for agent in created_agents}), len(tasks))
+
+        self.assertEqual((summary.total, summary.succeeded, summary.failed), (5, 3, 2))
+        with open(runner.summary_file) as f:
+            written = json.load(f)
+        self.assertEqual(written["succeeded"], 3)
+        self.assertEqual(written["total_input_tokens"], 40)
+        self.assertEqual(
+            written["failures"],
+            [
+                {"task_id": "t2", "error": "exceeded max steps"},
+                {"task_id": "t3", "error": "RuntimeError: boom"},
+            ],
+        )
+        self.assertEqual(
+            written["results"][0]["patch_file"], os.path.join(self.output_dir, "t0.patch")
+        )
+
+    async def test_rejects_unsafe_ids_and_awaits_bash_sessions_closing(self):
+        runner = BatchRunner(MagicMock(), self.output_dir)
+        with self.assertRaisesRegex(ValueError, "plain file name"):
+            await runner.run([BatchTask(task_id="../x", task="ok", working_dir="/repo")])
+        self.assertFalse(os.path.exists(self.output_dir))
+
+        bash_tool = MagicMock(spec=BashTool)
+        agent = MagicMock()
+        agent.agent.tools = [bash_tool]
+        agent.run = AsyncMock(side_effect=RuntimeError("boom"))
+        with patch("trae_agent.agent.batch_runner.Agent", return_value=agent):
+            await runner.run([BatchTask(task_id="t0", task="ok", working_dir="/repo")])
+
+        bash_tool.aclose.assert_awaited_once()
+        bash_tool.close.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,185 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import os
+import tempfile
+import unittest
+from typing import override
+from unittest.mock import AsyncMock, MagicMock
+
+from trae_agent.agent.agent_basics import AgentState
+from trae_agent.agent.base_agent import BaseAgent
+from trae_agent.agent.checkpoint import AgentCheckpoint
+from trae_agent.tools.base import (
+    Tool,
+    ToolCall,
+    ToolCallArguments,
+    ToolExecResult,
+    ToolExecutor,
+    ToolParameter,
+    ToolResult,
+)
+from trae_agent.utils.config import AgentConfig, ModelConfig, ModelProvider
+from trae_agent.utils.llm_clients.llm_basics import LLMMessage, LLMResponse, LLMUsage
+from trae_agent.utils.trajectory_recorder import TrajectoryRecorder
+
+
+class _EchoTool(Tool):
+    @override
+    def get_name(self) -> str:
+        return "echo"
+
+    @override
+    def get_description(self) -> str:
+        return "Echo the text back"
+
+    @override
+    def get_parameters(self) -> list[ToolParameter]:
+        return [ToolParameter(name="text", type="string", description="Text to echo")]
+
+    @override
+    async def execute(self, arguments: ToolCallArguments) -> ToolExecResult:
+        return ToolExecResult(output=str(arguments["text"]))
+
+    @override
+    def get_session_metadata(self) -> dict[str, object] | None:
+        return {"session_started": True}
+
+
+class _Agent(BaseAgent):
+    @override
+    def new_task(self, task, extra_args=None, tool_names=None):
+        self._task = task
+        self._task_args = dict(extra_args or {})
+        self._tools = [_EchoTool()]
+        self._tool_caller = ToolExecutor(self._tools)
+        self._initial_messages = [
+            LLMMessage(role="system", content="You are an agent."),
+            LLMMessage(role="user", content=task),
+        ]
+
+    @override
+    async def cleanup_mcp_clients(self) -> None:
+        pass
+
+
+def make_agent(checkpoint_file: str) -> tuple[_Agent, AsyncMock]:
+    model_config = ModelConfig(
+        model="test-model",
+        model_provider=ModelProvider(api_key="test-api-key", provider="anthropic"),
+        max_tokens=1000,
+        temperature=0.5,
+        top_p=1.0,
+        top_k=0,
+        parallel_tool_calls=False,
+        max_retries=0,
+    )
+    agent = _Agent(
+        AgentConfig(
+            allow_mcp_servers=[],
+            mcp_servers_config={},
+            max_steps=5,
+            model=model_config,
+            tools=[],
+        )
+    )
+    agent.set_checkpoint_file(checkpoint_file)
+    agent.llm_client.client = MagicMock()
+    agent.llm_client.client.achat = AsyncMock()
+    return agent, agent.llm_client.client.achat
+
+
+def echo_response(call_id: str) -> LLMResponse:
+    return LLMResponse(
+        content="",
+        usage=LLMUsage(input_tokens=100, output_tokens=10),
+        tool_calls=[ToolCall(name="echo", call_id=call_id, arguments={"text": call_id})],
+    )
+
+
+class TestAgentCheckpoint(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.checkpoint_file = os.path.join(self.temp_dir.name, "run.checkpoint.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_round_trip(self):
+        checkpoint = AgentCheckpoint(
+            task="fix it",
+            task_args={"project_path": "/repo"},
+            step_number=3,
+            agent_state="running",
+            history=[
+                LLMMessage(role="user", content="fix it"),
+                LLMMessage(
+                    role="assistant",
+                    tool_call=ToolCall(name="bash", call_id="a", arguments={"command": "ls"}),
+                ),
+            ],
+            pending_messages=[
+                LLMMessage(
+                    role="user",
+                    tool_result=ToolResult(call_id="a", name="bash", success=True, result="x"),
+                )
+            ],
+            total_tokens=LLMUsage(input_tokens=5, output_tokens=2),
+        )
+
+        checkpoint.save(self.checkpoint_file)
+        loaded = AgentCheckpoint.load(self.checkpoint_file)
+
+        self.assertEqual(loaded, checkpoint)
+
+    async def test_resume_continues_without_repeating_llm_calls(self):
+        agent, achat = make_agent(self.checkpoint_file)
+        achat.side_effect = [echo_response("a"), ConnectionError("connection reset")]
+        agent.new_task("fix it", {"project_path": "/repo"})
+
+        execution = await agent.execute_task()
+
+        self.assertEqual(execution.agent_state, AgentState.ERROR)
+        checkpoint = AgentCheckpoint.load(self.checkpoint_file)
+        self.assertEqual(checkpoint.step_number, 1)
+        self.assertEqual(checkpoint.task_args, {"project_path": "/repo"})
+        self.assertEqual(checkpoint.tool_sessions, {"echo": {"session_started": True}})
+        self.assertEqual([m.role for m in checkpoint.history], ["system", "user", "assistant"])
+        self.assertEqual(checkpoint.pending_messages[0].tool_result.result, "a")  # pyright: ignore[reportOptionalMemberAccess]
+
+        resumed, resumed_achat = make_agent(self.checkpoint_file)
+        resumed_achat.return_value = LLMResponse(
+            content="Task completed", usage=LLMUsage(input_tokens=200, output_tokens=5)
+        )
+        resumed.new_task(checkpoint.task, checkpoint.task_args)
+        resumed.restore_checkpoint(checkpoint)
+
+        execution = await resumed.execute_task()
+
+        self.assertTrue(execution.success)
+        resumed_achat.assert_awaited_once()
+        self.assertEqual(resumed_achat.call_args.args[0], checkpoint.pending_messages)
+        resumed.llm_client.client.set_chat_history.assert_called_once_with(checkpoint.history)
+        self.assertEqual([step.step_number for step in execution.steps], [2])
+        assert execution.total_tokens is not None
+        self.assertEqual(execution.total_tokens.input_tokens, 300)
+        self.assertEqual(AgentCheckpoint.load(self.checkpoint_file).agent_state, "completed")
+
+    def test_resumed_trajectory_keeps_earlier_steps(self):
+        trajectory_file = os.path.join(self.temp_dir.name, "trajectory.json")
+        recorder = TrajectoryRecorder(trajectory_file)
+        recorder.start_recording("fix it", "anthropic", "test-model", 5)
+        recorder.record_agent_step(step_number=1, state="completed")
+
+        resumed = TrajectoryRecorder(trajectory_file)
+        resumed.resume_recording()
+        resumed.start_recording("fix it", "anthropic", "test-model", 5)
+        resumed.record_agent_step(step_number=2, state="completed")
+
+        steps = resumed.trajectory_data["agent_steps"]
+        self.assertEqual([step["step_number"] for step in steps], [1, 2])
+        self.assertEqual(len(resumed.trajectory_data["resumed_at"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
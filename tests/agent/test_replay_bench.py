@@ -0,0 +1,144 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import json
+import os
+import tempfile
+import unittest
+
+from click.testing import CliRunner
+
+from trae_agent.agent.replay_bench import replay_trajectory
+from trae_agent.cli import cli
+from trae_agent.tools.base import ToolCall
+from trae_agent.utils.config import Config
+from trae_agent.utils.llm_clients.llm_basics import LLMResponse, LLMUsage
+from trae_agent.utils.llm_clients.replay_client import load_recorded_responses
+from trae_agent.utils.trajectory_recorder import TrajectoryRecorder
+
+CONFIG = """
+agents:
+    trae_agent:
+        enable_lakeview: false
+        model: primary
+        max_steps: 10
+        tools:
+            - bash
+            - task_done
+model_providers:
+    anthropic:
+        api_key: anthropic-key
+        provider: anthropic
+models:
+    primary:
+        model_provider: anthropic
+        model: claude-sonnet-4
+        max_tokens: 4096
+        temperature: 0.5
+        top_p: 1
+        top_k: 0
+        max_retries: 0
+        parallel_tool_calls: true
+"""
+
+
+def record_trajectory(path: str, project_path: str) -> None:
+    """A run that overwrites a file of the project with bash, then finishes."""
+    recorder = TrajectoryRecorder(path)
+    recorder.start_recording("Fix the bug.", "anthropic", "claude-sonnet-4", 10)
+    responses = [
+        LLMResponse(
+            content="Fixing.",
+            usage=LLMUsage(input_tokens=100, output_tokens=10),
+            tool_calls=[
+                ToolCall(
+                    name="bash",
+                    call_id="call_1",
+                    arguments={"command": f"echo fixed > {project_path}/bug.txt"},
+                )
+            ],
+        ),
+        LLMResponse(
+            content="Done.",
+            usage=LLMUsage(input_tokens=120, output_tokens=5),
+            tool_calls=[ToolCall(name="task_done", call_id="call_2")],
+        ),
+    ]
+    for step_number, response in enumerate(responses, start=1):
+        recorder.record_agent_step(
+            step_number=step_number,
+            state="completed",
+            llm_response=response,
+            tool_calls=response.tool_calls,
+        )
+    recorder.finalize_recording(success=True)
+
+
+class TestReplayBench(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.project_path = os.path.join(self.temp_dir.name, "project")
+        os.makedirs(self.project_path)
+        with open(os.path.join(self.project_path, "bug.txt"), "w") as f:
+            _ = f.write("broken\n")
+        self.trajectory_file = os.path.join(self.temp_dir.name, "trajectory.json")
+        record_trajectory(self.trajectory_file, self.project_path)
+        self.config_file = os.path.join(self.temp_dir.name, "trae_config.yaml")
+        with open(self.config_file, "w") as f:
+            _ = f.write(CONFIG)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_recorded_responses_are_loaded(self):
+        with open(self.trajectory_file) as f:
+            responses = load_recorded_responses(json.load(f))
+
+        self.assertEqual([response.content for response in responses], ["Fixing.", "Done."])
+        assert responses[0].tool_calls is not None
+        self.assertEqual(responses[0].tool_calls[0].name, "bash")
+        self.assertEqual(responses[1].usage, LLMUsage(input_tokens=120, output_tokens=5))
+
+    async def test_replay_runs_the_tools_on_a_scratch_copy(self):
+        config = Config.create(config_string=CONFIG)
+        assert config.trae_agent is not None
+
+        report = await replay_trajectory(self.trajectory_file, config.trae_agent, self.project_path)
+
+        self.assertTrue(report.completed)
+        self.assertEqual([step.step_number for step in report.steps], [1, 2])
+        self.assertGreater(report.steps[0].tools, 0)
+        self.assertGreater(report.steps[0].console, 0)
+        self.assertGreater(report.parse_time, 0)
+        for step in report.steps:
+            self.assertGreaterEqual(step.overhead, step.history + step.recording)
+        # The recorded path was rewritten to the scratch copy, which was then removed.
+        with open(os.path.join(self.project_path, "bug.txt")) as f:
+            self.assertEqual(f.read(), "broken\n")
+
+    def test_cli_fails_past_the_overhead_threshold(self):
+        runner = CliRunner()
+        args = [
+            "bench",
+            "replay",
+            self.trajectory_file,
+            "--project",
+            self.project_path,
+            "--config-file",
+            self.config_file,
+            "--no-console",
+        ]
+        report_file = os.path.join(self.temp_dir.name, "report.json")
+
+        passed = runner.invoke(cli, [*args, "--max-overhead", "60000", "-o", report_file])
+        failed = runner.invoke(cli, [*args, "--max-overhead", "0"])
+
+        self.assertEqual(passed.exit_code, 0, passed.output)
+        with open(report_file) as f:
+            self.assertEqual(json.load(f)["replayed_steps"], 2)
+        self.assertEqual(failed.exit_code, 1)
+        self.assertIn("exceeds", failed.output)
+
+
+if __name__ == "__main__":
+    unittest.main()
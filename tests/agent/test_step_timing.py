@@ -0,0 +1,144 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import os
+import tempfile
+import unittest
+from typing import override
+from unittest.mock import AsyncMock, MagicMock
+
+from trae_agent.agent.agent_basics import LatencyStats, percentile
+from trae_agent.agent.base_agent import BaseAgent
+from trae_agent.tools.base import (
+    Tool,
+    ToolCall,
+    ToolCallArguments,
+    ToolExecResult,
+    ToolExecutor,
+    ToolParameter,
+)
+from trae_agent.utils.config import AgentConfig, ModelConfig, ModelProvider
+from trae_agent.utils.llm_clients.llm_basics import LLMMessage, LLMResponse, LLMUsage
+from trae_agent.utils.trajectory_recorder import TrajectoryRecorder
+
+
+class _SleepTool(Tool):
+    """Sleeps for the given number of seconds, failing when asked to."""
+
+    @override
+    def get_name(self) -> str:
+        return "sleep"
+
+    @override
+    def get_description(self) -> str:
+        return "Sleep"
+
+    @override
+    def get_parameters(self) -> list[ToolParameter]:
+        return [ToolParameter(name="seconds", type="number", description="Seconds to sleep")]
+
+    @override
+    async def execute(self, arguments: ToolCallArguments) -> ToolExecResult:
+        await asyncio.sleep(float(arguments["seconds"]))  # pyright: ignore[reportArgumentType]
+        if arguments.get("fail"):
+            return ToolExecResult(error="failed", error_code=1)
+        return ToolExecResult(output="slept")
+
+
+class _Agent(BaseAgent):
+    @override
+    def new_task(self, task, extra_args=None, tool_names=None):
+        self._task = task
+        self._tools = [_SleepTool()]
+        self._tool_caller = ToolExecutor(self._tools)
+        self._initial_messages = [LLMMessage(role="user", content=task)]
+
+    @override
+    async def cleanup_mcp_clients(self) -> None:
+        pass
+
+
+def sleep_call(call_id: str, seconds: float, fail: bool = False) -> ToolCall:
+    return ToolCall(name="sleep", call_id=call_id, arguments={"seconds": seconds, "fail": fail})
+
+
+class TestPercentile(unittest.TestCase):
+    def test_nearest_rank(self):
+        values = [float(v) for v in range(1, 101)]
+        self.assertEqual(percentile(values, 50), 50.0)
+        self.assertEqual(percentile(values, 95), 95.0)
+        self.assertEqual(percentile([3.0], 95), 3.0)
+        self.assertEqual(percentile([], 50), 0.0)
+
+    def test_latency_stats_error_rate(self):
+        stats = LatencyStats.from_samples([0.1, 0.2, 0.3, 0.4], errors=1)
+        self.assertEqual(stats.error_rate, 0.25)
+        self.assertAlmostEqual(stats.total, 1.0)
+
+
+class TestStepTiming(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        model_config = ModelConfig(
+            model="test-model",
+            model_provider=ModelProvider(api_key="test-api-key", provider="anthropic"),
+            max_tokens=1000,
+            temperature=0.5,
+            top_p=1.0,
+            top_k=0,
+            parallel_tool_calls=False,
+            max_retries=0,
+        )
+        self.agent = _Agent(
+            AgentConfig(
+                allow_mcp_servers=[],
+                mcp_servers_config={},
+                max_steps=5,
+                model=model_config,
+                tools=[],
+            )
+        )
+        self.recorder = TrajectoryRecorder(os.path.join(self.temp_dir.name, "trajectory.json"))
+        self.agent.set_trajectory_recorder(self.recorder)
+        self.agent.llm_client.client = MagicMock()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    async def test_timings_are_recorded_per_step_and_per_tool(self):
+        async def achat(*args, **kwargs):
+            await asyncio.sleep(0.02)
+            if self.agent.llm_client.client.achat.await_count == 1:
+                return LLMResponse(
+                    content="",
+                    usage=LLMUsage(input_tokens=10, output_tokens=2),
+                    tool_calls=[sleep_call("a", 0.01), sleep_call("b", 0.0, fail=True)],
+                )
+            return LLMResponse(content="Task completed", usage=LLMUsage(10, 2))
+
+        self.agent.llm_client.client.achat = AsyncMock(side_effect=achat)
+        self.agent.new_task("sleep")
+
+        execution = await self.agent.execute_task()
+
+        first_step = execution.steps[0]
+        self.assertGreaterEqual(first_step.timing.llm, 0.02)
+        self.assertGreaterEqual(first_step.timing.tools, 0.01)
+        self.assertGreaterEqual(first_step.timing.total, first_step.timing.llm)
+        self.assertEqual(first_step.llm_usage, LLMUsage(input_tokens=10, output_tokens=2))
+        assert first_step.tool_results is not None
+        self.assertGreaterEqual(first_step.tool_results[0].duration or 0.0, 0.01)
+
+        tool_stats = execution.tool_latencies()["sleep"]
+        self.assertEqual((tool_stats.count, tool_stats.errors), (2, 1))
+        self.assertEqual(execution.llm_latency().count, 2)
+
+        recorded_step = self.recorder.trajectory_data["agent_steps"][0]
+        self.assertEqual(recorded_step["timing"], first_step.timing.to_dict())
+        self.assertEqual(recorded_step["llm_usage"]["input_tokens"], 10)
+        self.assertIsNotNone(recorded_step["tool_results"][0]["duration"])
+
+
+if __name__ == "__main__":
+    unittest.main()
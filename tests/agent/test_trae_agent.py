@@ -73,7 +73,10 @@ class TestTraeAgentExtended(unittest.TestCase):
 
         diff = self.agent.get_git_diff()
         self.assertEqual(diff, "test diff")
-        mock_subprocess.assert_called_with(["git", "--no-pager", "diff"])
+        mock_subprocess.assert_called_with(
+            ["git", "--no-pager", "diff"], cwd=self.test_project_path
+        )
+        mock_chdir.assert_not_called()
 
     def test_patch_filtering(self):
         test_patch = """diff --git a/tests/test_example.py b/tests/test_example.py
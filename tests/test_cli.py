@@ -176,6 +176,51 @@ class TestCli(unittest.TestCase):
             args, _ = mock_agent.run.call_args
             self.assertEqual(args[0], "task.txt")
 
+    @patch("trae_agent.cli.resolve_config_file", return_value="test_config.yaml")
+    @patch("trae_agent.cli.BatchRunner")
+    @patch("trae_agent.cli.asyncio.run")
+    @patch("trae_agent.cli.Config.create")
+    def test_batch_runs_tasks_from_jsonl(
+        self,
+        mock_config_create,
+        mock_asyncio_run,
+        mock_runner_class,
+        mock_resolve_config_file,
+    ):
+        """Test that batch loads the tasks file and hands the tasks to the runner."""
+        mock_config = MagicMock()
+        mock_config_create.return_value.resolve_config_values.return_value = mock_config
+        mock_asyncio_run.return_value = MagicMock(
+            total=2, succeeded=1, failed=1, wall_time=10.0, tasks_per_hour=720.0
+        )
+
+        with self.runner.isolated_filesystem():
+            with open("tasks.jsonl", "w") as f:
+                f.write('{"id": "a", "task": "fix a", "working_dir": "/tmp/a"}\n')
+                f.write('{"id": "b", "task": "fix b", "working_dir": "/tmp/b"}\n')
+
+            result = self.runner.invoke(cli, ["batch", "tasks.jsonl", "-n", "8", "-o", "out"])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        args, kwargs = mock_runner_class.call_args
+        self.assertEqual(args, (mock_config, "out"))
+        self.assertEqual(kwargs["concurrency"], 8)
+        tasks = mock_runner_class.return_value.run.call_args.args[0]
+        self.assertEqual([task.task_id for task in tasks], ["a", "b"])
+        self.assertIn("720.0 tasks/hour", result.output)
+
+    @patch("trae_agent.cli.resolve_config_file", return_value="test_config.yaml")
+    def test_batch_with_invalid_tasks_file(self, mock_resolve_config_file):
+        """Test for a clear error when a task line is missing its working directory."""
+        with self.runner.isolated_filesystem():
+            with open("tasks.jsonl", "w") as f:
+                f.write('{"task": "fix"}\n')
+
+            result = self.runner.invoke(cli, ["batch", "tasks.jsonl"])
+
+        self.assertNotEqual(result.exit_code, 0)
+        self.assertIn("working_dir", result.output)
+
 
 if __name__ == "__main__":
     unittest.main()
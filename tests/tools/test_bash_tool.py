@@ -1,6 +1,9 @@
 # Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import asyncio
+import os
+import tempfile
 import unittest
 
 from trae_agent.tools.base import ToolCallArguments
@@ -63,6 +66,25 @@ class TestBashTool(unittest.IsolatedAsyncioTestCase):
         self.assertIn("no command provided", result.error.lower())
         self.assertEqual(result.error_code, -1)
 
+    async def test_session_starts_in_working_dir(self):
+        with tempfile.TemporaryDirectory() as working_dir:
+            self.tool.set_working_dir(working_dir)
+            result = await self.tool.execute(ToolCallArguments({"command": "pwd"}))
+            self.tool.close()
+
+        self.assertEqual(result.output.strip(), os.path.realpath(working_dir))
+        self.assertIsNone(self.tool._session)
+
+    async def test_aclose_waits_for_the_shell_to_exit(self):
+        _ = await self.tool.execute(ToolCallArguments({"command": "true"}))
+        session = self.tool._session
+        assert session is not None and session._process is not None
+
+        await asyncio.wait_for(self.tool.aclose(), timeout=5)
+
+        self.assertIsNotNone(session._process.returncode)
+        self.assertIsNone(self.tool._session)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -109,6 +109,30 @@ class TestTextEditorTool(unittest.IsolatedAsyncioTestCase):
             )
         self.assertIn("files and directories", result.output)
 
+    async def test_view_directory_on_the_event_loop_runs_find_asynchronously(self):
+        self.mock_file_system(exists=True, is_dir=True)
+        with (
+            patch("trae_agent.tools.edit_tool.run_sync") as mock_run_sync,
+            patch("trae_agent.tools.edit_tool.run", new_callable=AsyncMock) as mock_run,
+        ):
+            mock_run.return_value = (0, "file1\nfile2", "")
+            result = await self.tool.execute(
+                ToolCallArguments({"command": "view", "path": str(self.test_dir)})
+            )
+        mock_run.assert_awaited_once()
+        mock_run_sync.assert_not_called()
+        self.assertIn("file2", result.output)
+
+    def test_view_directory_in_a_worker_runs_find_synchronously(self):
+        self.mock_file_system(exists=True, is_dir=True)
+        with patch("trae_agent.tools.edit_tool.run_sync") as mock_run_sync:
+            mock_run_sync.return_value = (0, "file1\nfile2", "")
+            result = self.tool.execute_blocking(
+                ToolCallArguments({"command": "view", "path": str(self.test_dir)})
+            )
+        mock_run_sync.assert_called_once()
+        self.assertIn("files and directories", result.output)
+
     async def test_view_file(self):
         self.mock_file_system(exists=True, is_dir=False, content="line1\nline2\nline3")
         result = await self.tool.execute(
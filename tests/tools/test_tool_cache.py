@@ -0,0 +1,115 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import os
+import tempfile
+import unittest
+from typing import override
+from unittest.mock import patch
+
+from trae_agent.tools.base import (
+    Tool,
+    ToolCall,
+    ToolCallArguments,
+    ToolExecResult,
+    ToolExecutor,
+    ToolParameter,
+)
+from trae_agent.tools.edit_tool import TextEditorTool
+from trae_agent.tools.tool_cache import ToolResultCache
+
+
+class _ShellTool(Tool):
+    """Side-effecting tool that does not say which files it touches, like bash."""
+
+    @override
+    def get_name(self) -> str:
+        return "shell"
+
+    @override
+    def get_description(self) -> str:
+        return "Run a command"
+
+    @override
+    def get_parameters(self) -> list[ToolParameter]:
+        return []
+
+    @override
+    async def execute(self, arguments: ToolCallArguments) -> ToolExecResult:
+        return ToolExecResult(output="ok")
+
+
+class TestToolResultCache(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, "module.py")
+        with open(self.file_path, "w") as f:
+            f.write("print('hello')\n")
+        self.edit_tool = TextEditorTool()
+        self.cache = ToolResultCache()
+        self.executor = ToolExecutor([self.edit_tool, _ShellTool()], self.cache)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def view_call(self, call_id: str) -> ToolCall:
+        return ToolCall(
+            name="str_replace_based_edit_tool",
+            call_id=call_id,
+            arguments={"command": "view", "path": self.file_path, "view_range": None},
+        )
+
+    async def view_twice(self) -> int:
+        """View the file twice and return how many times the tool actually ran."""
+        with patch.object(self.edit_tool, "execute", wraps=self.edit_tool.execute) as execute:
+            await self.executor.execute_tool_call(self.view_call("a"))
+            result = await self.executor.execute_tool_call(self.view_call("b"))
+        self.assertEqual(result.call_id, "b")
+        self.assertIn("print('hello')", result.result or "")
+        return execute.await_count
+
+    async def test_repeated_view_is_served_from_cache(self):
+        self.assertEqual(await self.view_twice(), 1)
+        self.assertEqual((self.cache.stats.hits, self.cache.stats.misses), (1, 1))
+        self.assertEqual(self.cache.stats.hit_rate, 0.5)
+
+    async def test_external_change_to_file_is_detected(self):
+        await self.executor.execute_tool_call(self.view_call("a"))
+        with open(self.file_path, "a") as f:
+            f.write("print('world')\n")
+
+        result = await self.executor.execute_tool_call(self.view_call("b"))
+
+        self.assertIn("print('world')", result.result or "")
+        self.assertEqual(self.cache.stats.hits, 0)
+
+    async def test_edit_invalidates_entries_for_its_path(self):
+        await self.executor.execute_tool_call(self.view_call("a"))
+        await self.executor.execute_tool_call(
+            ToolCall(
+                name="str_replace_based_edit_tool",
+                call_id="edit",
+                arguments={
+                    "command": "str_replace",
+                    "path": self.file_path,
+                    "old_str": "hello",
+                    "new_str": "hi",
+                },
+            )
+        )
+
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.stats.invalidations, 1)
+        result = await self.executor.execute_tool_call(self.view_call("b"))
+        self.assertIn("print('hi')", result.result or "")
+
+    async def test_tool_with_unknown_side_effects_invalidates_everything(self):
+        await self.executor.execute_tool_call(self.view_call("a"))
+        await self.executor.execute_tool_call(ToolCall(name="shell", call_id="s"))
+
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(await self.view_twice(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
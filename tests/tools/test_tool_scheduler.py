@@ -0,0 +1,166 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import unittest
+from typing import override
+
+from trae_agent.tools.base import (
+    ResourceFootprint,
+    Tool,
+    ToolCall,
+    ToolCallArguments,
+    ToolExecResult,
+    ToolExecutor,
+    ToolParameter,
+)
+from trae_agent.tools.bash_tool import BashTool
+
+
+class _FileTool(Tool):
+    """Reads or writes a path, tracking how many calls run at once."""
+
+    def __init__(self):
+        super().__init__()
+        self.running = 0
+        self.max_running = 0
+        self.events: list[str] = []
+
+    @override
+    def get_name(self) -> str:
+        return "file"
+
+    @override
+    def get_description(self) -> str:
+        return "File tool"
+
+    @override
+    def get_parameters(self) -> list[ToolParameter]:
+        return [
+            ToolParameter(name="mode", type="string", description="read or write"),
+            ToolParameter(name="path", type="string", description="path"),
+        ]
+
+    @override
+    async def execute(self, arguments: ToolCallArguments) -> ToolExecResult:
+        label = f"{arguments['mode']}:{arguments['path']}"
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        self.events.append("start " + label)
+        # Later calls finish first unless the scheduler orders them.
+        await asyncio.sleep(0.05 if arguments["mode"] == "write" else 0.01)
+        self.events.append("end " + label)
+        self.running -= 1
+        return ToolExecResult(output=label)
+
+    @override
+    def is_read_only(self, arguments: ToolCallArguments) -> bool:
+        return arguments["mode"] == "read"
+
+    @override
+    def get_accessed_paths(self, arguments: ToolCallArguments) -> list[str] | None:
+        return [str(arguments["path"])]
+
+
+def file_call(call_id: str, mode: str, path: str) -> ToolCall:
+    return ToolCall(name="file", call_id=call_id, arguments={"mode": mode, "path": path})
+
+
+class TestResourceFootprint(unittest.TestCase):
+    def test_reads_do_not_conflict(self):
+        a = ResourceFootprint(reads=frozenset({"/repo/a.py"}))
+        self.assertFalse(a.conflicts_with(ResourceFootprint(reads=frozenset({"/repo/a.py"}))))
+        self.assertFalse(a.conflicts_with(ResourceFootprint(reads_all=True)))
+
+    def test_writes_conflict_with_overlapping_paths(self):
+        write = ResourceFootprint(writes=frozenset({"/repo/src/a.py"}))
+        self.assertTrue(write.conflicts_with(ResourceFootprint(reads=frozenset({"/repo/src"}))))
+        self.assertTrue(ResourceFootprint(reads=frozenset({"/repo/src"})).conflicts_with(write))
+        self.assertTrue(write.conflicts_with(ResourceFootprint(reads_all=True)))
+        self.assertFalse(write.conflicts_with(ResourceFootprint(writes=frozenset({"/repo/srcs"}))))
+
+    def test_sessions_and_writes_all_conflict(self):
+        shell = ResourceFootprint(sessions=frozenset({"bash_session"}))
+        self.assertTrue(shell.conflicts_with(shell))
+        self.assertTrue(ResourceFootprint(writes_all=True).conflicts_with(ResourceFootprint()))
+
+    def test_default_footprint_from_tool(self):
+        tool = _FileTool()
+        self.assertEqual(
+            tool.get_resource_footprint({"mode": "read", "path": "/repo/./a.py"}),
+            ResourceFootprint(reads=frozenset({"/repo/a.py"})),
+        )
+        self.assertEqual(
+            tool.get_resource_footprint({"mode": "write", "path": "/repo/a.py"}),
+            ResourceFootprint(writes=frozenset({"/repo/a.py"})),
+        )
+        footprint = BashTool().get_resource_footprint({"command": "ls"})
+        self.assertTrue(footprint.writes_all)
+        self.assertEqual(footprint.sessions, frozenset({"bash_session"}))
+
+
+class TestParallelToolCall(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tool = _FileTool()
+        self.executor = ToolExecutor([self.tool])
+
+    async def test_independent_calls_run_concurrently(self):
+        calls = [
+            file_call("1", "read", "/repo/a.py"),
+            file_call("2", "read", "/repo/a.py"),
+            file_call("3", "write", "/repo/b.py"),
+        ]
+        results = await self.executor.parallel_tool_call(calls)
+
+        self.assertEqual(self.tool.max_running, 3)
+        self.assertEqual([result.call_id for result in results], ["1", "2", "3"])
+
+    async def test_conflicting_calls_run_in_order(self):
+        calls = [
+            file_call("1", "write", "/repo/a.py"),
+            file_call("2", "read", "/repo/a.py"),
+            file_call("3", "write", "/repo/a.py"),
+            file_call("4", "read", "/repo/other.py"),
+        ]
+        results = await self.executor.parallel_tool_call(calls)
+
+        events = self.tool.events
+        self.assertLess(events.index("end write:/repo/a.py"), events.index("start read:/repo/a.py"))
+        self.assertLess(
+            events.index("end read:/repo/a.py"), events.index("start write:/repo/a.py", 2)
+        )
+        # The unrelated read is not held back by the writes.
+        self.assertEqual(events[1], "start read:/repo/other.py")
+        self.assertEqual(
+            [result.result for result in results],
+            ["write:/repo/a.py", "read:/repo/a.py", "write:/repo/a.py", "read:/repo/other.py"],
+        )
+
+    async def test_unknown_tool_is_serialized(self):
+        calls = [
+            file_call("1", "write", "/repo/a.py"),
+            ToolCall(name="missing", call_id="2", arguments={}),
+            file_call("3", "read", "/repo/b.py"),
+        ]
+        results = await self.executor.parallel_tool_call(calls)
+
+        self.assertEqual(self.tool.max_running, 1)
+        self.assertEqual([result.success for result in results], [True, False, True])
+
+    async def test_started_calls_are_awaited_not_rerun(self):
+        first = file_call("1", "read", "/repo/a.py")
+        started = {"1": asyncio.create_task(self.executor.execute_tool_call(first))}
+        results = await self.executor.parallel_tool_call(
+            [first, file_call("2", "write", "/repo/a.py")], started
+        )
+
+        self.assertEqual(self.tool.events.count("start read:/repo/a.py"), 1)
+        self.assertLess(
+            self.tool.events.index("end read:/repo/a.py"),
+            self.tool.events.index("start write:/repo/a.py"),
+        )
+        self.assertEqual([result.call_id for result in results], ["1", "2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import pickle
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from typing import override
+
+from trae_agent.tools.base import (
+    BlockingTool,
+    ToolCall,
+    ToolCallArguments,
+    ToolExecResult,
+    ToolExecutor,
+    ToolParameter,
+)
+from trae_agent.tools.ckg_tool import CKGTool
+from trae_agent.tools.worker_pool import get_tool_worker_pool
+
+
+class _SleepTool(BlockingTool):
+    """Blocks for a while and reports the thread it ran on."""
+
+    @override
+    def get_name(self) -> str:
+        return "sleep"
+
+    @override
+    def get_description(self) -> str:
+        return "Sleep tool"
+
+    @override
+    def get_parameters(self) -> list[ToolParameter]:
+        return [ToolParameter(name="path", type="string", description="path")]
+
+    @override
+    def execute_blocking(self, arguments: ToolCallArguments) -> ToolExecResult:
+        time.sleep(0.1)
+        return ToolExecResult(output=str(threading.get_ident()))
+
+    @override
+    def is_read_only(self, arguments: ToolCallArguments) -> bool:
+        return True
+
+    @override
+    def get_accessed_paths(self, arguments: ToolCallArguments) -> list[str] | None:
+        return [str(arguments["path"])]
+
+
+def sleep_calls(count: int) -> list[ToolCall]:
+    return [
+        ToolCall(name="sleep", call_id=str(i), arguments={"path": f"/repo/{i}.py"})
+        for i in range(count)
+    ]
+
+
+class TestToolWorkerPool(unittest.IsolatedAsyncioTestCase):
+    @override
+    def setUp(self):
+        self.pool = ThreadPoolExecutor(max_workers=4)
+        self.addCleanup(self.pool.shutdown)
+
+    async def test_blocking_calls_overlap_on_pool(self):
+        executor = ToolExecutor([_SleepTool()], worker_pool=self.pool)
+
+        start = time.perf_counter()
+        results = await executor.parallel_tool_call(sleep_calls(4))
+        elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 0.3)
+        self.assertTrue(all(result.success for result in results))
+        self.assertNotIn(str(threading.get_ident()), [result.result for result in results])
+
+    async def test_blocking_calls_run_inline_without_pool(self):
+        executor = ToolExecutor([_SleepTool()])
+
+        results = await executor.parallel_tool_call(sleep_calls(2))
+
+        self.assertEqual([result.result for result in results], [str(threading.get_ident())] * 2)
+
+    def test_shared_pools(self):
+        self.assertIs(get_tool_worker_pool("thread", 3), get_tool_worker_pool("thread", 3))
+        self.assertIsNone(get_tool_worker_pool("none"))
+        with self.assertRaises(ValueError):
+            _ = get_tool_worker_pool("fiber")
+
+    def test_ckg_tool_is_picklable(self):
+        tool = CKGTool()
+        tool._ckg_databases[object()] = object()  # pyright: ignore[reportArgumentType]
+
+        copy = pickle.loads(pickle.dumps(tool))
+
+        self.assertEqual(copy._ckg_databases, {})
+        self.assertIsNotNone(copy._ckg_databases_lock)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""Helpers shared by the LLM client tests."""
+
+import uuid
+from typing import Any
+
+from trae_agent.utils.config import ApiEndpoint, ModelConfig, ModelProvider
+
+# A base URL nothing listens on, for clients that need one but must not reach a server.
+LOCAL_BASE_URL = "http://localhost:1/v1"
+
+
+def make_model_config(
+    provider: str = "anthropic",
+    *,
+    api_key: str = "test-api-key",
+    base_url: str | None = None,
+    endpoints: list[ApiEndpoint] | None = None,
+    unique_model: bool = False,
+    **overrides: Any,
+) -> ModelConfig:
+    """Return a model config of the provider, with the given fields overridden.
+
+    With unique_model, the model gets a name of its own, so that the test does not share
+    the state the process keeps per model, such as rate limiters and latency trackers.
+    """
+    fields: dict[str, Any] = {
+        "model": f"test-model-{uuid.uuid4()}" if unique_model else "test-model",
+        "model_provider": ModelProvider(
+            api_key=api_key, provider=provider, base_url=base_url, endpoints=endpoints
+        ),
+        "max_tokens": 1000,
+        "temperature": 0.5,
+        "top_p": 1.0,
+        "top_k": 0,
+        "parallel_tool_calls": False,
+        "max_retries": 0,
+    }
+    return ModelConfig(**(fields | overrides))
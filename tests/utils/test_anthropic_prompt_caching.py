@@ -0,0 +1,111 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from anthropic.types import Message
+from llm_test_helpers import make_model_config
+
+from trae_agent.tools.base import ToolResult
+from trae_agent.tools.task_done_tool import TaskDoneTool
+from trae_agent.utils.llm_clients.anthropic_client import AnthropicClient
+from trae_agent.utils.llm_clients.llm_basics import LLMMessage, LLMUsage
+
+
+def make_message(tool_call_id: str) -> Message:
+    return Message.model_validate(
+        {
+            "id": "msg_1",
+            "type": "message",
+            "role": "assistant",
+            "model": "test-model",
+            "stop_reason": "tool_use",
+            "content": [{"type": "tool_use", "id": tool_call_id, "name": "task_done", "input": {}}],
+            "usage": {
+                "input_tokens": 10,
+                "output_tokens": 5,
+                "cache_read_input_tokens": 60,
+                "cache_creation_input_tokens": 30,
+            },
+        }
+    )
+
+
+def tool_result_message(call_id: str) -> LLMMessage:
+    return LLMMessage(
+        role="user",
+        tool_result=ToolResult(call_id=call_id, name="task_done", success=True, result="ok"),
+    )
+
+
+def breakpoints(kwargs: dict) -> list[int]:
+    """Indexes of the messages that carry a cache breakpoint."""
+    return [
+        index
+        for index, message in enumerate(kwargs["messages"])
+        if not isinstance(message["content"], str)
+        and any(
+            isinstance(block, dict) and "cache_control" in block for block in message["content"]
+        )
+    ]
+
+
+class TestAnthropicPromptCaching(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.client = AnthropicClient(make_model_config(prompt_caching=True))
+        self.client.async_client = MagicMock()
+        self.create = AsyncMock(side_effect=[make_message("call_1"), make_message("call_2")])
+        self.client.async_client.messages.create = self.create
+
+    async def test_breakpoints_on_system_tools_and_history(self):
+        model_config = make_model_config(prompt_caching=True)
+        messages = [
+            LLMMessage(role="system", content="You are a helpful agent."),
+            LLMMessage(role="user", content="Fix the bug."),
+        ]
+        response = await self.client.achat(messages, model_config, tools=[TaskDoneTool()])
+
+        kwargs = self.create.await_args.kwargs
+        self.assertEqual(kwargs["system"][0]["cache_control"], {"type": "ephemeral"})
+        self.assertEqual(kwargs["tools"][-1]["cache_control"], {"type": "ephemeral"})
+        self.assertEqual(breakpoints(kwargs), [0])
+        assert response.usage is not None
+        self.assertAlmostEqual(response.usage.cache_hit_ratio, 0.6)
+
+        _ = await self.client.achat(
+            [tool_result_message("call_1")], model_config, tools=[TaskDoneTool()]
+        )
+
+        # The previous breakpoint stays, and a new one is added at the end of the history.
+        kwargs = self.create.await_args.kwargs
+        self.assertEqual(breakpoints(kwargs), [0, 2])
+        # The stored history is never modified.
+        self.assertEqual(breakpoints({"messages": self.client.message_history}), [])
+
+    async def test_no_breakpoints_when_disabled(self):
+        model_config = make_model_config()
+        _ = await self.client.achat(
+            [
+                LLMMessage(role="system", content="You are a helpful agent."),
+                LLMMessage(role="user", content="Fix the bug."),
+            ],
+            model_config,
+            tools=[TaskDoneTool()],
+        )
+
+        kwargs = self.create.await_args.kwargs
+        self.assertEqual(kwargs["system"], "You are a helpful agent.")
+        self.assertNotIn("cache_control", kwargs["tools"][-1])
+        self.assertEqual(breakpoints(kwargs), [])
+
+
+class TestCacheHitRatio(unittest.TestCase):
+    def test_cache_hit_ratio(self):
+        self.assertEqual(LLMUsage(input_tokens=0, output_tokens=0).cache_hit_ratio, 0.0)
+        usage = LLMUsage(input_tokens=10, output_tokens=1, cache_read_input_tokens=90)
+        self.assertAlmostEqual(usage.cache_hit_ratio, 0.9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,6 +7,7 @@ from unittest.mock import patch
 from trae_agent.utils.config import Config, ModelConfig, ModelProvider
 from trae_agent.utils.legacy_config import LegacyConfig
 from trae_agent.utils.llm_clients.anthropic_client import AnthropicClient
+from trae_agent.utils.llm_clients.http_client import get_http_client
 from trae_agent.utils.llm_clients.openai_client import OpenAIClient
 
 
@@ -89,7 +90,10 @@ class TestConfigBaseURL(unittest.TestCase):
         client = OpenAIClient(model_config)
 
         mock_openai.assert_called_once_with(
-            api_key="test-api-key", base_url="https://custom-openai.example.com/v1"
+            api_key="test-api-key",
+            base_url="https://custom-openai.example.com/v1",
+            http_client=get_http_client("openai", "https://custom-openai.example.com/v1"),
+            max_retries=0,
         )
         self.assertEqual(client.base_url, "https://custom-openai.example.com/v1")
 
@@ -134,7 +138,10 @@ class TestConfigBaseURL(unittest.TestCase):
         client = AnthropicClient(model_config)
 
         mock_anthropic.assert_called_once_with(
-            api_key="test-api-key", base_url="https://custom-anthropic.example.com"
+            api_key="test-api-key",
+            base_url="https://custom-anthropic.example.com",
+            http_client=get_http_client("anthropic", "https://custom-anthropic.example.com"),
+            max_retries=0,
         )
         self.assertEqual(client.base_url, "https://custom-anthropic.example.com")
 
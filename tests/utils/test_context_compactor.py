@@ -0,0 +1,197 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import unittest
+from unittest.mock import MagicMock
+
+from llm_test_helpers import LOCAL_BASE_URL, make_model_config
+
+from trae_agent.tools.base import ToolCall, ToolResult
+from trae_agent.utils.config import ContextCompactionConfig
+from trae_agent.utils.llm_clients.context_compactor import (
+    ToolOutputElisionCompactor,
+    estimate_tokens,
+)
+from trae_agent.utils.llm_clients.doubao_client import DoubaoClient
+from trae_agent.utils.llm_clients.llm_basics import LLMMessage, LLMResponse
+from trae_agent.utils.llm_clients.llm_client import LLMClient
+
+
+def make_history(num_tool_calls: int, output_chars: int) -> list[LLMMessage]:
+    history = [
+        LLMMessage(role="system", content="You are a helpful agent."),
+        LLMMessage(role="user", content="Fix the bug. " * 50),
+    ]
+    for i in range(num_tool_calls):
+        tool_call = ToolCall(name="bash", call_id=f"call_{i}", arguments={"command": "ls"})
+        history.append(LLMMessage(role="assistant", tool_call=tool_call))
+        history.append(
+            LLMMessage(
+                role="user",
+                tool_result=ToolResult(
+                    call_id=f"call_{i}", name="bash", success=True, result="x" * output_chars
+                ),
+            )
+        )
+    return history
+
+
+class TestToolOutputElisionCompactor(unittest.TestCase):
+    def test_no_compaction_under_budget(self):
+        history = make_history(num_tool_calls=2, output_chars=100)
+        compactor = ToolOutputElisionCompactor(ContextCompactionConfig(token_budget=100_000))
+
+        self.assertIsNone(compactor.compact(history, []))
+
+    def test_elides_oldest_tool_results_first(self):
+        history = make_history(num_tool_calls=6, output_chars=4000)
+        compactor = ToolOutputElisionCompactor(
+            ContextCompactionConfig(token_budget=4000, keep_recent_tool_results=2, target_ratio=1.0)
+        )
+
+        result = compactor.compact(history, [LLMMessage(role="user", content="continue")])
+
+        assert result is not None
+        self.assertLess(result.tokens_after, result.tokens_before)
+        self.assertLessEqual(result.tokens_after, 4000)
+        self.assertEqual([item.call_id for item in result.elided], ["call_0", "call_1", "call_2"])
+        self.assertTrue(all(item.kind == "tool_result" for item in result.elided))
+        # Pinned messages and the most recent tool results are kept verbatim.
+        self.assertEqual(result.messages[:2], history[:2])
+        self.assertEqual(result.messages[-4:], history[-4:])
+        # The conversation keeps its shape, so every tool call still has a result.
+        self.assertEqual(len(result.messages), len(history))
+        elided_result = result.messages[3].tool_result
+        assert elided_result is not None
+        self.assertIn("Output elided", elided_result.result or "")
+        # The original history is not mutated.
+        self.assertEqual(history[3].tool_result.result, "x" * 4000)  # pyright: ignore[reportOptionalMemberAccess]
+
+    def test_elided_results_are_not_elided_again(self):
+        history = make_history(num_tool_calls=4, output_chars=4000)
+        compactor = ToolOutputElisionCompactor(
+            ContextCompactionConfig(token_budget=1000, keep_recent_tool_results=1)
+        )
+        first = compactor.compact(history, [])
+        assert first is not None
+
+        second = compactor.compact(first.messages, [])
+
+        # Nothing is left to elide, and the elided messages are kept as they are.
+        self.assertIsNone(second)
+        self.assertEqual(len(first.elided), 3)
+
+    def test_results_that_would_grow_are_kept(self):
+        history = make_history(num_tool_calls=3, output_chars=250)
+        compactor = ToolOutputElisionCompactor(
+            ContextCompactionConfig(token_budget=10, keep_recent_tool_results=0)
+        )
+
+        self.assertIsNone(compactor.compact(history, []))
+
+    def test_elides_large_tool_call_arguments(self):
+        history = make_history(num_tool_calls=0, output_chars=0)
+        tool_call = ToolCall(
+            name="str_replace_based_edit_tool",
+            call_id="call_edit",
+            arguments={"command": "create", "path": "/tmp/a.py", "file_text": "y" * 20000},
+        )
+        history.append(LLMMessage(role="assistant", tool_call=tool_call))
+        history.append(
+            LLMMessage(
+                role="user",
+                tool_result=ToolResult(call_id="call_edit", name="edit", success=True, result="ok"),
+            )
+        )
+        compactor = ToolOutputElisionCompactor(
+            ContextCompactionConfig(token_budget=1000, keep_recent_tool_results=0)
+        )
+
+        result = compactor.compact(history, [])
+
+        assert result is not None
+        self.assertEqual([item.kind for item in result.elided], ["tool_call_arguments"])
+        compacted_call = result.messages[2].tool_call
+        assert compacted_call is not None
+        self.assertEqual(compacted_call.arguments["path"], "/tmp/a.py")
+        self.assertIn("elided", str(compacted_call.arguments["file_text"]))
+
+
+class TestLLMClientCompaction(unittest.TestCase):
+    def test_chat_compacts_history_and_records_it(self):
+        llm_client = LLMClient(make_model_config("doubao", base_url=LOCAL_BASE_URL))
+        llm_client.client = MagicMock()
+        llm_client.client.chat.return_value = LLMResponse(content="working on it")
+        recorder = MagicMock()
+        llm_client.set_trajectory_recorder(recorder)
+        llm_client.set_context_compactor(
+            ToolOutputElisionCompactor(
+                ContextCompactionConfig(token_budget=3000, keep_recent_tool_results=1)
+            )
+        )
+        history = make_history(num_tool_calls=4, output_chars=4000)
+        llm_client.set_chat_history(history)
+
+        next_message = LLMMessage(role="user", content="continue")
+        llm_client.chat([next_message], make_model_config("doubao", base_url=LOCAL_BASE_URL))
+
+        llm_client.client.set_chat_history.assert_called()
+        compacted = llm_client.client.set_chat_history.call_args.args[0]
+        self.assertLessEqual(estimate_tokens(compacted), 3000)
+        recorder.record_context_compaction.assert_called_once()
+        self.assertEqual(llm_client.history[-2], next_message)
+        self.assertEqual(llm_client.history[-1].content, "working on it")
+
+    def test_compaction_leaves_headroom_for_the_next_turns(self):
+        llm_client = LLMClient(make_model_config("doubao", base_url=LOCAL_BASE_URL))
+        llm_client.client = MagicMock()
+        llm_client.client.chat.return_value = LLMResponse(content="working on it")
+        recorder = MagicMock()
+        llm_client.set_trajectory_recorder(recorder)
+        llm_client.set_context_compactor(
+            ToolOutputElisionCompactor(
+                ContextCompactionConfig(token_budget=3000, keep_recent_tool_results=1)
+            )
+        )
+        llm_client.set_chat_history(make_history(num_tool_calls=4, output_chars=4000))
+
+        llm_client.chat(
+            [LLMMessage(role="user", content="continue")],
+            make_model_config("doubao", base_url=LOCAL_BASE_URL),
+        )
+        compacted_tokens = estimate_tokens(llm_client.history)
+        # A new tool result that would take a history compacted just to the budget over it
+        tool_result = ToolResult(call_id="call_9", name="bash", success=True, result="z" * 3000)
+        llm_client.chat(
+            [LLMMessage(role="user", tool_result=tool_result)],
+            make_model_config("doubao", base_url=LOCAL_BASE_URL),
+        )
+
+        self.assertLessEqual(compacted_tokens, 3000 * 0.75)
+        recorder.record_context_compaction.assert_called_once()
+
+
+class TestOpenAICompatibleToolCallEncoding(unittest.TestCase):
+    def test_tool_calls_are_merged_into_assistant_message(self):
+        messages = [
+            LLMMessage(role="assistant", content="Let me look."),
+            LLMMessage(role="assistant", tool_call=ToolCall(name="bash", call_id="a")),
+            LLMMessage(role="assistant", tool_call=ToolCall(name="bash", call_id="b")),
+            LLMMessage(
+                role="user",
+                tool_result=ToolResult(call_id="a", name="bash", success=True, result="ok"),
+            ),
+        ]
+
+        parsed = DoubaoClient(make_model_config("doubao", base_url=LOCAL_BASE_URL)).parse_messages(
+            messages
+        )
+
+        self.assertEqual(len(parsed), 2)
+        self.assertEqual(parsed[0]["role"], "assistant")
+        self.assertEqual([tc["id"] for tc in parsed[0]["tool_calls"]], ["a", "b"])  # pyright: ignore[reportTypedDictNotRequiredAccess]
+        self.assertEqual(parsed[1]["role"], "tool")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from llm_test_helpers import LOCAL_BASE_URL, make_model_config
+
+from trae_agent.tools.base import ToolCall, ToolResult
+from trae_agent.utils.llm_clients.anthropic_client import AnthropicClient
+from trae_agent.utils.llm_clients.conversation import Conversation
+from trae_agent.utils.llm_clients.doubao_client import DoubaoClient
+from trae_agent.utils.llm_clients.llm_basics import LLMMessage, LLMResponse
+from trae_agent.utils.llm_clients.llm_client import LLMClient
+
+
+def make_turn() -> list[LLMMessage]:
+    return [
+        LLMMessage(role="system", content="You are a helpful agent."),
+        LLMMessage(role="user", content="Fix the bug."),
+        LLMMessage(role="assistant", content="Let me look."),
+        LLMMessage(role="assistant", tool_call=ToolCall(name="bash", call_id="a")),
+        LLMMessage(role="assistant", tool_call=ToolCall(name="bash", call_id="b")),
+        LLMMessage(
+            role="user",
+            tool_result=ToolResult(call_id="a", name="bash", success=True, result="ok"),
+        ),
+    ]
+
+
+class TestConversation(unittest.TestCase):
+    def test_forks_share_messages_until_they_diverge(self):
+        conversation = Conversation(make_turn())
+        fork = conversation.fork()
+
+        conversation.append(LLMMessage(role="assistant", content="original"))
+        fork.append(LLMMessage(role="assistant", content="fork"))
+
+        self.assertEqual(len(conversation), 7)
+        self.assertEqual(len(fork), 7)
+        self.assertEqual(conversation[-1].content, "original")
+        self.assertEqual(fork[-1].content, "fork")
+        self.assertIs(conversation[1], fork[1])
+        self.assertIs(conversation.encodings, fork.encodings)
+
+    def test_messages_are_encoded_once_per_encoder(self):
+        messages = make_turn()
+        client = DoubaoClient(make_model_config("doubao", base_url=LOCAL_BASE_URL))
+
+        first = client.parse_messages(messages)
+        misses = client.encoding_cache.misses
+        second = client.parse_messages(messages)
+
+        self.assertEqual(second, first)
+        self.assertEqual(client.encoding_cache.misses, misses)
+        self.assertEqual(client.encoding_cache.hits, len(messages))
+        # Merging the tool calls into one assistant message left the shared encodings alone.
+        self.assertEqual([tc["id"] for tc in first[2]["tool_calls"]], ["a", "b"])  # pyright: ignore[reportTypedDictNotRequiredAccess]
+        tool_call_encoding = client.encode_message(messages[3], lambda _: None)
+        self.assertEqual(len(tool_call_encoding["tool_calls"]), 1)  # pyright: ignore[reportOptionalSubscript, reportTypedDictNotRequiredAccess]
+
+    def test_anthropic_turn_is_one_assistant_message(self):
+        client = AnthropicClient(make_model_config(base_url=LOCAL_BASE_URL))
+
+        parsed = client.parse_messages(make_turn())
+
+        self.assertEqual([message["role"] for message in parsed], ["user", "assistant", "user"])
+        blocks = list(parsed[1]["content"])
+        self.assertEqual([block["type"] for block in blocks], ["text", "tool_use", "tool_use"])  # pyright: ignore[reportIndexIssue, reportTypedDictNotRequiredAccess]
+
+
+class TestLLMClientFork(unittest.IsolatedAsyncioTestCase):
+    async def test_fork_continues_the_conversation_independently(self):
+        model_config = make_model_config("doubao", base_url=LOCAL_BASE_URL)
+        llm_client = LLMClient(model_config)
+        llm_client.set_chat_history(make_turn())
+        misses = llm_client.client.encoding_cache.misses
+
+        fork = llm_client.fork()
+        fork_history = fork.client.message_history  # pyright: ignore[reportAttributeAccessIssue]
+        fork.client = MagicMock(wraps=fork.client)
+        fork.client.achat = AsyncMock(return_value=LLMResponse(content="fork"))
+        next_message = LLMMessage(role="user", content="Try the other file.")
+        _ = await fork.achat([next_message], model_config)
+
+        # The fork's provider history was rebuilt from the parent's encodings.
+        self.assertEqual(len(fork_history), 4)
+        self.assertEqual(llm_client.client.encoding_cache.misses, misses)
+        self.assertEqual(fork.history[-2:], [next_message, LLMMessage("assistant", "fork")])
+        self.assertEqual(len(llm_client.history), 6)
+
+    async def test_fresh_histories_drop_the_encodings_of_earlier_ones(self):
+        model_config = make_model_config("doubao", base_url=LOCAL_BASE_URL)
+        llm_client = LLMClient(model_config)
+        llm_client.client.achat = AsyncMock(return_value=LLMResponse(content="Done."))  # pyright: ignore[reportAttributeAccessIssue]
+        encodings = llm_client.client.encoding_cache
+
+        sizes: list[int] = []
+        for i in range(3):
+            messages = make_turn() + [LLMMessage(role="user", content=f"Step {i}")]
+            _ = await llm_client.achat(messages, model_config, reuse_history=False)
+            _ = llm_client.client.parse_messages(messages)
+            sizes.append(len(encodings))
+
+        self.assertEqual(sizes, [sizes[0]] * 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
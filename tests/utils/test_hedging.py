@@ -0,0 +1,135 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import unittest
+from unittest.mock import MagicMock, patch
+
+from llm_test_helpers import make_model_config
+
+from trae_agent.utils.config import RateLimitConfig
+from trae_agent.utils.llm_clients.hedging import LatencyTracker, get_latency_tracker
+from trae_agent.utils.llm_clients.llm_basics import LLMMessage, LLMResponse, LLMUsage
+from trae_agent.utils.llm_clients.llm_client import LLMClient
+from trae_agent.utils.llm_clients.rate_limiter import get_rate_limiter
+
+
+def slow_client(delay: float, content: str) -> MagicMock:
+    """A provider client whose calls answer after the delay, noting if they were cancelled."""
+    client = MagicMock()
+    client.cancelled = False
+
+    async def achat(*args, **kwargs):
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            client.cancelled = True
+            raise
+        return LLMResponse(content=content, usage=LLMUsage(input_tokens=100, output_tokens=50))
+
+    client.achat = achat
+    return client
+
+
+class TestLatencyTracker(unittest.TestCase):
+    def test_hedge_delay_needs_enough_samples(self):
+        tracker = LatencyTracker(window=100, min_samples=10)
+        for latency in range(1, 10):
+            tracker.record(latency)
+        self.assertIsNone(tracker.hedge_delay(95))
+
+        tracker.record(10)
+        self.assertEqual(tracker.hedge_delay(90), 9)
+        self.assertEqual(tracker.hedge_delay(50), 5)
+
+
+class TestHedgedChat(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        # Quotas small enough for the refill during a test not to matter.
+        self.model_config = make_model_config(
+            "openai",
+            unique_model=True,
+            hedge_percentile=95,
+            rate_limit=RateLimitConfig(
+                requests_per_minute=6, input_tokens_per_minute=600, output_tokens_per_minute=600
+            ),
+        )
+        self.tracker = get_latency_tracker("openai", self.model_config.model)
+        for _ in range(self.tracker.min_samples):
+            self.tracker.record(0.05)
+        self.llm_client = LLMClient(self.model_config)
+
+    async def chat(self, hedge_client: MagicMock) -> LLMResponse:
+        with patch(
+            "trae_agent.utils.llm_clients.llm_client.create_provider_client",
+            return_value=hedge_client,
+        ):
+            return await self.llm_client.achat(
+                [LLMMessage(role="user", content="Hi.")], self.model_config
+            )
+
+    async def test_fast_call_is_not_hedged(self):
+        self.llm_client.client = slow_client(0, "primary")
+        hedge_client = slow_client(0, "hedge")
+
+        response = await self.chat(hedge_client)
+
+        self.assertEqual(response.content, "primary")
+        self.assertFalse(response.hedged)
+        self.assertEqual(self.tracker.hedges_fired, 0)
+
+    async def test_hedge_wins_and_primary_is_cancelled(self):
+        primary = self.llm_client.client = slow_client(10, "primary")
+        hedge_client = slow_client(0, "hedge")
+
+        response = await self.chat(hedge_client)
+
+        self.assertEqual(response.content, "hedge")
+        self.assertTrue(response.hedged and response.hedge_won)
+        self.assertTrue(primary.cancelled)
+        self.assertIs(self.llm_client.client, hedge_client)
+        hedge_client.set_chat_history.assert_called_once_with([])
+        self.assertEqual((self.tracker.hedges_fired, self.tracker.hedges_won), (1, 1))
+        self.assertEqual(self.llm_client.history[-1], LLMMessage("assistant", "hedge"))
+
+    async def test_primary_wins_after_hedge_fired(self):
+        primary = self.llm_client.client = slow_client(0.1, "primary")
+        hedge_client = slow_client(10, "hedge")
+
+        response = await self.chat(hedge_client)
+
+        self.assertEqual(response.content, "primary")
+        self.assertTrue(response.hedged)
+        self.assertFalse(response.hedge_won)
+        self.assertTrue(hedge_client.cancelled)
+        self.assertIs(self.llm_client.client, primary)
+        self.assertEqual((self.tracker.hedges_fired, self.tracker.hedges_won), (1, 0))
+
+    def quota_used(self) -> dict[str, float]:
+        buckets = get_rate_limiter(self.model_config)._buckets  # pyright: ignore[reportPrivateUsage]
+        return {name: bucket.capacity - bucket.level for name, bucket in buckets.items()}
+
+    def assert_quota_used(self, requests: int, input_tokens: int, output_tokens: int):
+        used = self.quota_used()
+        self.assertAlmostEqual(used["requests"], requests, delta=0.1)
+        self.assertAlmostEqual(used["input_tokens"], input_tokens, delta=5)
+        self.assertAlmostEqual(used["output_tokens"], output_tokens, delta=5)
+
+    async def test_quota_of_a_winning_hedge_is_settled_and_the_primary_given_back(self):
+        self.llm_client.client = slow_client(10, "primary")
+
+        _ = await self.chat(slow_client(0, "hedge"))
+
+        self.assert_quota_used(requests=1, input_tokens=100, output_tokens=50)
+
+    async def test_quota_of_a_losing_hedge_is_given_back(self):
+        self.llm_client.client = slow_client(0.1, "primary")
+
+        _ = await self.chat(slow_client(10, "hedge"))
+
+        self.assert_quota_used(requests=1, input_tokens=100, output_tokens=50)
+        self.assertIsNone(self.llm_client._hedge_reservation)  # pyright: ignore[reportPrivateUsage]
+
+
+if __name__ == "__main__":
+    unittest.main()
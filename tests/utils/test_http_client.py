@@ -0,0 +1,123 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import threading
+import unittest
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from trae_agent.utils.config import Config, HttpPoolConfig
+from trae_agent.utils.llm_clients.http_client import (
+    closing_http_pools,
+    configure_http_pool,
+    get_async_http_client,
+    get_http_client,
+    get_loop_http_pool,
+    http_pool_stats,
+)
+
+CONFIG = """
+agents:
+    trae_agent:
+        enable_lakeview: false
+        model: primary
+        max_steps: 10
+model_providers:
+    anthropic:
+        api_key: anthropic-key
+        provider: anthropic
+        http_pool:
+            max_connections: 50
+            http2: true
+models:
+    primary:
+        model_provider: anthropic
+        model: claude-sonnet-4
+        max_tokens: 4096
+        temperature: 0.5
+        top_p: 1
+        top_k: 0
+        max_retries: 0
+        parallel_tool_calls: true
+"""
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        _ = self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def unique_provider() -> str:
+    """A provider name of its own, so that tests do not share a pool."""
+    return f"test-{uuid.uuid4()}"
+
+
+class TestHttpPoolConfig(unittest.TestCase):
+    def test_http_pool_is_parsed(self):
+        config = Config.create(config_string=CONFIG)
+
+        assert config.model_providers is not None
+        self.assertEqual(
+            config.model_providers["anthropic"].http_pool,
+            HttpPoolConfig(max_connections=50, http2=True),
+        )
+
+    def test_sync_clients_are_shared_and_configured(self):
+        provider = unique_provider()
+        configure_http_pool(provider, "https://a.example.com", HttpPoolConfig(max_connections=7))
+
+        client = get_http_client(provider, "https://a.example.com")
+
+        self.assertIs(get_http_client(provider, "https://a.example.com"), client)
+        self.assertIsNot(get_http_client(provider, "https://b.example.com"), client)
+        self.assertEqual(client._transport._pool._max_connections, 7)  # pyright: ignore[reportAttributeAccessIssue, reportUnknownMemberType]
+
+
+class TestSharedAsyncPool(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    async def test_clients_reuse_the_connections_of_the_loop(self):
+        provider = unique_provider()
+        observed: list[int] = []
+
+        async def observe(response: httpx.Response) -> None:
+            observed.append(response.status_code)
+
+        async with closing_http_pools():
+            first = get_async_http_client(provider, self.base_url)
+            second = get_async_http_client(provider, self.base_url, response_hooks=[observe])
+            for client in (first, second, first):
+                response = await client.get(f"{self.base_url}/v1/models")
+                self.assertEqual(response.text, "ok")
+
+            self.assertIs(get_async_http_client(provider, self.base_url), first)
+            stats = http_pool_stats()[f"{provider}@{self.base_url}"]
+            self.assertEqual(stats["requests"], 3)
+            self.assertEqual(stats["connections"], 1)
+            self.assertEqual(observed, [200])
+            pool = get_loop_http_pool(provider, self.base_url)
+
+        self.assertTrue(pool.is_closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
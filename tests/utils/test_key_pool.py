@@ -0,0 +1,233 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import unittest
+from functools import partial
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import openai
+from llm_test_helpers import make_model_config
+
+from trae_agent.utils.config import ApiEndpoint, Config
+from trae_agent.utils.llm_clients.key_pool import (
+    EndpointPool,
+    EndpointUsage,
+    collect_endpoint_usage,
+    get_endpoint_pool,
+)
+from trae_agent.utils.llm_clients.llm_basics import LLMUsage
+from trae_agent.utils.llm_clients.openai_compatible_base import OpenAICompatibleClient
+from trae_agent.utils.llm_clients.openrouter_client import OpenRouterClient
+
+CONFIG = """
+agents:
+    trae_agent:
+        enable_lakeview: false
+        model: primary
+        max_steps: 10
+model_providers:
+    openai:
+        api_key: first-key
+        provider: openai
+        endpoints:
+            - api_key: second-key
+            - api_key: third-key
+              base_url: https://proxy.example.com/v1
+models:
+    primary:
+        model_provider: openai
+        model: gpt-4o
+        max_tokens: 4096
+        temperature: 0.5
+        top_p: 1
+        top_k: 0
+        max_retries: 0
+        parallel_tool_calls: true
+"""
+
+
+def rate_limit_error(headers: dict[str, str]) -> openai.RateLimitError:
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(429, request=request, headers=headers)
+    return openai.RateLimitError("rate limited", response=response, body=None)
+
+
+# The pools of these tests are those of the primary key and its extra endpoints.
+make_openrouter_config = partial(
+    make_model_config,
+    "openrouter",
+    api_key="primary-key",
+    base_url="https://openrouter.ai/api/v1",
+)
+
+
+class TestEndpointPool(unittest.TestCase):
+    def test_spreads_requests_by_outstanding_requests(self):
+        pool = EndpointPool([("key-a", None), ("key-b", None)])
+
+        first = pool.acquire()
+        second = pool.acquire()
+
+        self.assertIsNot(first, second)
+        pool.release(first)
+        self.assertIs(pool.acquire(), first)
+
+    def test_prefers_endpoint_with_more_remaining_quota(self):
+        pool = EndpointPool([("key-a", None), ("key-b", None)])
+        low, high = pool.endpoints
+        low.observe_headers({"x-ratelimit-remaining-tokens": "1000"})
+        high.observe_headers({"anthropic-ratelimit-tokens-remaining": "90000"})
+
+        for _ in range(3):
+            endpoint = pool.acquire()
+            self.assertIs(endpoint, high)
+            pool.release(endpoint)
+
+    def test_rate_limited_endpoint_is_drained(self):
+        pool = EndpointPool([("key-a", None), ("key-b", None)])
+        limited = pool.acquire()
+
+        pool.release(limited, rate_limit_error({"retry-after": "60"}))
+
+        for _ in range(3):
+            endpoint = pool.acquire()
+            self.assertIsNot(endpoint, limited)
+            pool.release(endpoint)
+        self.assertEqual(limited.rate_limited, 1)
+
+    def test_drained_endpoints_are_used_when_all_are_drained(self):
+        pool = EndpointPool([("key-a", None)])
+        endpoint = pool.acquire()
+        pool.release(endpoint, rate_limit_error({"retry-after": "60"}))
+
+        self.assertIs(pool.acquire(), endpoint)
+
+    def test_usage_stats(self):
+        pool = EndpointPool([("sk-test-12345678", None)])
+        endpoint = pool.acquire()
+        pool.release(endpoint)
+        pool.record_usage(endpoint, LLMUsage(input_tokens=100, output_tokens=20))
+
+        self.assertEqual(
+            pool.stats(),
+            [
+                {
+                    "endpoint": "...5678",
+                    "requests": 1,
+                    "rate_limited": 0,
+                    "errors": 0,
+                    "input_tokens": 100,
+                    "output_tokens": 20,
+                    "remaining_requests": None,
+                    "remaining_tokens": None,
+                }
+            ],
+        )
+
+
+class TestEndpointConfig(unittest.TestCase):
+    def test_endpoints_are_parsed(self):
+        config = Config.create(config_string=CONFIG)
+
+        assert config.model_providers is not None
+        self.assertEqual(
+            config.model_providers["openai"].endpoints,
+            [
+                ApiEndpoint(api_key="second-key"),
+                ApiEndpoint(api_key="third-key", base_url="https://proxy.example.com/v1"),
+            ],
+        )
+
+    def test_pool_is_shared_and_optional(self):
+        self.assertIsNone(get_endpoint_pool(make_openrouter_config().model_provider))
+
+        model_config = make_openrouter_config(endpoints=[ApiEndpoint(api_key="secondary-key")])
+        pool = get_endpoint_pool(model_config.model_provider)
+
+        assert pool is not None
+        self.assertIs(
+            get_endpoint_pool(
+                make_openrouter_config(
+                    endpoints=model_config.model_provider.endpoints
+                ).model_provider
+            ),
+            pool,
+        )
+        self.assertEqual(
+            [(endpoint.api_key, endpoint.base_url) for endpoint in pool.endpoints],
+            [
+                ("primary-key", "https://openrouter.ai/api/v1"),
+                ("secondary-key", "https://openrouter.ai/api/v1"),
+            ],
+        )
+
+
+class TestPooledClient(unittest.IsolatedAsyncioTestCase):
+    async def test_requests_are_sent_through_endpoint_clients(self):
+        client: OpenAICompatibleClient = OpenRouterClient(
+            make_openrouter_config(endpoints=[ApiEndpoint(api_key="pooled-key")])
+        )
+        assert client.endpoint_pool is not None
+        sdk_client = MagicMock()
+        sdk_client.with_options.side_effect = lambda **options: MagicMock(options=options)
+        used_keys: list[str] = []
+
+        for _ in range(2):
+            async with client.pooled_client(sdk_client) as pooled:
+                used_keys.append(pooled.options["api_key"])
+            client.record_endpoint_usage(LLMUsage(input_tokens=10, output_tokens=1))
+
+        self.assertEqual(sorted(used_keys), ["pooled-key", "primary-key"])
+        self.assertEqual(
+            sum(endpoint.input_tokens for endpoint in client.endpoint_pool.endpoints), 20
+        )
+        self.assertTrue(
+            all(endpoint.outstanding == 0 for endpoint in client.endpoint_pool.endpoints)
+        )
+
+    async def test_rate_limit_is_reported_to_the_pool(self):
+        client = OpenRouterClient(
+            make_openrouter_config(endpoints=[ApiEndpoint(api_key="limited-key")])
+        )
+        assert client.endpoint_pool is not None
+        sdk_client = MagicMock()
+        request = AsyncMock(side_effect=rate_limit_error({"retry-after": "60"}))
+
+        with self.assertRaises(openai.RateLimitError):
+            async with client.pooled_client(sdk_client):
+                _ = await request()
+
+        self.assertEqual(
+            sum(endpoint.rate_limited for endpoint in client.endpoint_pool.endpoints), 1
+        )
+
+    async def test_endpoint_usage_is_collected_per_task(self):
+        async def task(requests: int) -> EndpointUsage:
+            # The agents of the tasks share the process-wide pool of their keys.
+            client = OpenRouterClient(
+                make_openrouter_config(endpoints=[ApiEndpoint(api_key="task-key")])
+            )
+            with collect_endpoint_usage() as usage:
+                for _ in range(requests):
+                    async with client.pooled_client(MagicMock()):
+                        await asyncio.sleep(0)
+                    client.record_endpoint_usage(LLMUsage(input_tokens=10, output_tokens=1))
+            return usage
+
+        first, second = await asyncio.gather(task(1), task(3))
+
+        def totals(usage: EndpointUsage) -> tuple[int, int]:
+            endpoints = usage.stats()["openrouter"]
+            return (
+                sum(int(endpoint["requests"]) for endpoint in endpoints),  # pyright: ignore[reportArgumentType]
+                sum(int(endpoint["input_tokens"]) for endpoint in endpoints),  # pyright: ignore[reportArgumentType]
+            )
+
+        self.assertEqual(totals(first), (1, 10))
+        self.assertEqual(totals(second), (3, 30))
+
+
+if __name__ == "__main__":
+    unittest.main()
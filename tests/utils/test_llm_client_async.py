@@ -0,0 +1,92 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from llm_test_helpers import LOCAL_BASE_URL, make_model_config
+from openai.types.chat import ChatCompletion
+
+from trae_agent.tools.base import Tool
+from trae_agent.utils.config import ModelConfig
+from trae_agent.utils.llm_clients.base_client import BaseLLMClient
+from trae_agent.utils.llm_clients.doubao_client import DoubaoClient
+from trae_agent.utils.llm_clients.llm_basics import LLMMessage, LLMResponse
+
+
+def make_chat_completion(content: str) -> ChatCompletion:
+    return ChatCompletion.model_validate(
+        {
+            "id": "chatcmpl-1",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "test-model",
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": content},
+                }
+            ],
+            "usage": {"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5},
+        }
+    )
+
+
+class _BlockingClient(BaseLLMClient):
+    def set_chat_history(self, messages: list[LLMMessage]) -> None:
+        pass
+
+    def chat(
+        self,
+        messages: list[LLMMessage],
+        model_config: ModelConfig,
+        tools: list[Tool] | None = None,
+        reuse_history: bool = True,
+    ) -> LLMResponse:
+        return LLMResponse(content="blocking")
+
+
+class TestAsyncChat(unittest.IsolatedAsyncioTestCase):
+    async def test_openai_compatible_achat_uses_async_client(self):
+        model_config = make_model_config("doubao", base_url=LOCAL_BASE_URL)
+        client = DoubaoClient(model_config)
+        client.client = MagicMock()
+        client.async_client = MagicMock()
+        client.async_client.chat.completions.create = AsyncMock(
+            return_value=make_chat_completion("hello")
+        )
+
+        response = await client.achat([LLMMessage(role="user", content="hi")], model_config)
+
+        self.assertEqual(response.content, "hello")
+        self.assertEqual(response.usage.input_tokens, 3)
+        client.async_client.chat.completions.create.assert_awaited_once()
+        client.client.chat.completions.create.assert_not_called()
+        self.assertEqual(len(client.message_history), 2)
+        self.assertEqual(client.message_history[-1]["role"], "assistant")
+
+    async def test_default_achat_does_not_block_event_loop(self):
+        client = _BlockingClient(make_model_config("doubao", base_url=LOCAL_BASE_URL))
+        ticks: list[int] = []
+
+        async def ticker():
+            for i in range(3):
+                ticks.append(i)
+                await asyncio.sleep(0)
+
+        response, _ = await asyncio.gather(
+            client.achat(
+                [LLMMessage(role="user", content="hi")],
+                make_model_config("doubao", base_url=LOCAL_BASE_URL),
+            ),
+            ticker(),
+        )
+
+        self.assertEqual(response.content, "blocking")
+        self.assertEqual(ticks, [0, 1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
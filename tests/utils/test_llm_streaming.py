@@ -0,0 +1,153 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from llm_test_helpers import LOCAL_BASE_URL, make_model_config
+from openai.types.chat import ChatCompletionChunk
+
+from trae_agent.utils.llm_clients.doubao_client import DoubaoClient
+from trae_agent.utils.llm_clients.llm_basics import LLMMessage, LLMStreamEvent
+from trae_agent.utils.llm_clients.llm_client import LLMClient
+from trae_agent.utils.llm_clients.retry_utils import async_retry_stream
+
+
+def make_chunk(delta: dict[str, object], finish_reason: str | None = None) -> ChatCompletionChunk:
+    return ChatCompletionChunk.model_validate(
+        {
+            "id": "chatcmpl-1",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "test-model",
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+    )
+
+
+def make_tool_call_delta(index: int, call_id: str | None, name: str | None, arguments: str):
+    function: dict[str, str] = {"arguments": arguments}
+    if name:
+        function["name"] = name
+    tool_call: dict[str, object] = {"index": index, "function": function}
+    if call_id:
+        tool_call["id"] = call_id
+        tool_call["type"] = "function"
+    return {"tool_calls": [tool_call]}
+
+
+class _AsyncStream:
+    def __init__(self, items: list[object]):
+        self._items = iter(items)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._items)
+        except StopIteration:
+            raise StopAsyncIteration from None
+
+
+class TestOpenAICompatibleStreaming(unittest.IsolatedAsyncioTestCase):
+    async def test_astream_yields_deltas_and_assembled_tool_calls(self):
+        model_config = make_model_config(
+            "doubao", base_url=LOCAL_BASE_URL, parallel_tool_calls=True, stream=True
+        )
+        client = DoubaoClient(model_config)
+        client.async_client = MagicMock()
+        usage_chunk = ChatCompletionChunk.model_validate(
+            {
+                "id": "chatcmpl-1",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": "test-model",
+                "choices": [],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 7, "total_tokens": 17},
+            }
+        )
+        client.async_client.chat.completions.create = AsyncMock(
+            return_value=_AsyncStream(
+                [
+                    make_chunk({"role": "assistant", "content": "Let me "}),
+                    make_chunk({"content": "check."}),
+                    make_chunk(make_tool_call_delta(0, "call_a", "bash", '{"comm')),
+                    make_chunk(make_tool_call_delta(0, None, None, 'and": "ls"}')),
+                    make_chunk(make_tool_call_delta(1, "call_b", "bash", '{"command": "pwd"}')),
+                    make_chunk({}, finish_reason="tool_calls"),
+                    usage_chunk,
+                ]
+            )
+        )
+
+        events: list[LLMStreamEvent] = []
+        async for event in client.astream([LLMMessage(role="user", content="hi")], model_config):
+            events.append(event)
+
+        self.assertEqual([e.content_delta for e in events[:2]], ["Let me ", "check."])
+        # The first call is emitted as soon as the second one starts streaming.
+        assert events[2].tool_call is not None
+        self.assertEqual(events[2].tool_call.call_id, "call_a")
+        self.assertEqual(events[2].tool_call.arguments, {"command": "ls"})
+        assert events[3].tool_call is not None
+        self.assertEqual(events[3].tool_call.call_id, "call_b")
+
+        response = events[-1].response
+        assert response is not None
+        self.assertEqual(response.content, "Let me check.")
+        self.assertEqual(response.finish_reason, "tool_calls")
+        self.assertEqual([tc.call_id for tc in response.tool_calls or []], ["call_a", "call_b"])
+        assert response.usage is not None
+        self.assertEqual(response.usage.output_tokens, 7)
+        self.assertEqual(len(client.message_history[-1]["tool_calls"]), 2)  # pyright: ignore[reportTypedDictNotRequiredAccess, reportArgumentType]
+
+        _, kwargs = client.async_client.chat.completions.create.call_args
+        self.assertTrue(kwargs["stream"])
+
+    async def test_llm_client_tracks_streamed_response_in_history(self):
+        model_config = make_model_config(
+            "doubao", base_url=LOCAL_BASE_URL, parallel_tool_calls=True, stream=True
+        )
+        llm_client = LLMClient(model_config)
+        llm_client.client.async_client = MagicMock()  # pyright: ignore[reportAttributeAccessIssue]
+        llm_client.client.async_client.chat.completions.create = AsyncMock(  # pyright: ignore[reportAttributeAccessIssue]
+            return_value=_AsyncStream(
+                [make_chunk({"content": "done"}), make_chunk({}, finish_reason="stop")]
+            )
+        )
+
+        async for _ in llm_client.astream([LLMMessage(role="user", content="hi")], model_config):
+            pass
+
+        self.assertEqual([m.role for m in llm_client.history], ["user", "assistant"])
+        self.assertEqual(llm_client.history[-1].content, "done")
+
+
+class TestAsyncRetryStream(unittest.IsolatedAsyncioTestCase):
+    async def test_retries_only_before_first_item(self):
+        attempts: list[int] = []
+
+        async def flaky_stream():
+            attempts.append(len(attempts))
+            if len(attempts) == 1:
+                raise ConnectionError("connection reset")
+            yield 1
+            if len(attempts) == 2:
+                raise ConnectionError("stream interrupted")
+            yield 2
+
+        items: list[int] = []
+        with (
+            patch("trae_agent.utils.llm_clients.retry_utils.asyncio.sleep", new=AsyncMock()),
+            self.assertRaises(ConnectionError),
+        ):
+            async for item in async_retry_stream(flaky_stream, max_retries=3)():
+                items.append(item)
+
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(items, [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
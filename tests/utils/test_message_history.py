@@ -0,0 +1,82 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import unittest
+from unittest.mock import AsyncMock
+
+from google.genai import types
+from llm_test_helpers import make_model_config
+
+from trae_agent.utils.llm_clients.google_client import GoogleClient
+from trae_agent.utils.llm_clients.llm_basics import LLMMessage
+from trae_agent.utils.llm_clients.message_history import MessageHistory
+
+
+class TestMessageHistory(unittest.TestCase):
+    def test_appends_in_place(self):
+        history = MessageHistory(["a"])
+        sent = history.to_list()
+
+        history.extend(["b", "c"])
+        history.append("d")
+
+        self.assertIs(history.to_list(), sent)
+        self.assertEqual(list(history), ["a", "b", "c", "d"])
+        self.assertEqual(history[1:3], ["b", "c"])
+
+    def test_snapshot_and_restore(self):
+        history = MessageHistory(["a", "b"])
+        snapshot = history.snapshot()
+
+        history.extend(["c", "d"])
+        self.assertEqual(list(snapshot), ["a", "b"])
+        self.assertEqual(snapshot[-1], "b")
+        with self.assertRaises(IndexError):
+            _ = snapshot[2]
+
+        history.restore(snapshot)
+        self.assertEqual(list(history), ["a", "b"])
+
+    def test_reset_keeps_earlier_snapshots(self):
+        history = MessageHistory(["a", "b"])
+        snapshot = history.snapshot()
+
+        history.reset(["x"])
+        self.assertEqual(list(snapshot), ["a", "b"])
+
+        history.restore(snapshot)
+        self.assertEqual(list(history), ["a", "b"])
+
+
+class TestGoogleHistoryRollback(unittest.IsolatedAsyncioTestCase):
+    async def test_failed_turn_leaves_history_unchanged(self):
+        client = GoogleClient(make_model_config("google"))
+        client.set_chat_history([LLMMessage(role="user", content="Hello.")])
+        generate_content = AsyncMock(side_effect=RuntimeError("overloaded"))
+        client.client = AsyncMock()
+        client.client.aio.models.generate_content = generate_content
+
+        with self.assertRaises(RuntimeError):
+            _ = await client.achat(
+                [LLMMessage(role="user", content="Fix it.")], make_model_config("google")
+            )
+        self.assertEqual(len(client.message_history), 1)
+
+        generate_content.side_effect = None
+        generate_content.return_value = types.GenerateContentResponse(
+            candidates=[
+                types.Candidate(content=types.Content(role="model", parts=[types.Part(text="OK")]))
+            ]
+        )
+        response = await client.achat(
+            [LLMMessage(role="user", content="Fix it.")], make_model_config("google")
+        )
+
+        self.assertEqual(response.content, "OK")
+        self.assertEqual(
+            [content.role for content in client.message_history], ["user", "user", "model"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
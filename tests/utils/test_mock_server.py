@@ -0,0 +1,92 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import unittest
+
+import httpx
+from llm_test_helpers import make_model_config
+
+from trae_agent.tools import BashTool, TaskDoneTool
+from trae_agent.tools.base import ToolResult
+from trae_agent.utils.config import ModelConfig
+from trae_agent.utils.llm_clients.llm_basics import LLMMessage
+from trae_agent.utils.llm_clients.llm_client import LLMClient
+from trae_agent.utils.llm_clients.mock_server import (
+    LatencyModel,
+    MockLLMServer,
+    MockScript,
+)
+
+
+class TestLatencyModel(unittest.TestCase):
+    def test_parse(self):
+        self.assertEqual(LatencyModel.parse("fixed:0.5"), LatencyModel("fixed", (0.5,)))
+        self.assertEqual(LatencyModel.parse("uniform:1,2"), LatencyModel("uniform", (1.0, 2.0)))
+        for spec in ("fixed", "uniform:1", "normal:1,2", "lognormal:a,b"):
+            with self.assertRaises(ValueError):
+                _ = LatencyModel.parse(spec)
+
+
+class TestMockLLMServer(unittest.TestCase):
+    def setUp(self):
+        self.server = MockLLMServer(script=MockScript.synthesize(steps=2), port=0, seed=0)
+        self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def run_conversation(self, llm_client: LLMClient, model_config: ModelConfig) -> list[str]:
+        tools = [BashTool(), TaskDoneTool()]
+        messages = [LLMMessage(role="user", content="Fix the bug.")]
+        called: list[str] = []
+        for _ in range(3):
+            response = llm_client.chat(messages, model_config, tools)
+            tool_calls = response.tool_calls or []
+            called.extend(tool_call.name for tool_call in tool_calls)
+            messages = [
+                LLMMessage(
+                    role="user",
+                    tool_result=ToolResult(
+                        call_id=tool_call.call_id, name=tool_call.name, success=True, result="ok"
+                    ),
+                )
+                for tool_call in tool_calls
+            ]
+        return called
+
+    def test_openai_compatible_conversation_follows_the_script(self):
+        model_config = make_model_config(
+            "mock", api_key="mock", base_url=f"{self.server.base_url}/v1", unique_model=True
+        )
+
+        called = self.run_conversation(LLMClient(model_config), model_config)
+
+        # The last turn repeats once the script runs out.
+        self.assertEqual(called, ["bash", "task_done", "task_done"])
+        self.assertEqual(self.server.stats.requests, 3)
+
+    def test_anthropic_conversation_follows_the_script(self):
+        model_config = make_model_config(
+            "anthropic", api_key="mock", base_url=self.server.base_url, unique_model=True
+        )
+
+        called = self.run_conversation(LLMClient(model_config), model_config)
+
+        self.assertEqual(called, ["bash", "task_done", "task_done"])
+
+    def test_injected_rate_limits(self):
+        self.server.rate_limit_rate = 1.0
+        self.server.retry_after = 7
+
+        response = httpx.post(
+            f"{self.server.base_url}/v1/chat/completions",
+            json={"model": "mock", "messages": [{"role": "user", "content": "Hi."}]},
+        )
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers["retry-after"], "7")
+        self.assertEqual(self.server.stats.rate_limited, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import json
+import unittest
+from unittest.mock import MagicMock, patch
+
+import httpx
+import openai
+from llm_test_helpers import make_model_config
+from openai.types.responses import Response
+
+from trae_agent.tools.base import ToolResult
+from trae_agent.utils.llm_clients.llm_basics import LLMMessage
+from trae_agent.utils.llm_clients.openai_client import OpenAIClient
+
+
+def make_response(response_id: str, call_id: str) -> Response:
+    return Response.model_validate(
+        {
+            "id": response_id,
+            "object": "response",
+            "created_at": 0,
+            "model": "test-model",
+            "status": "completed",
+            "parallel_tool_calls": False,
+            "tool_choice": "auto",
+            "tools": [],
+            "output": [
+                {
+                    "type": "function_call",
+                    "id": f"fc_{call_id}",
+                    "call_id": call_id,
+                    "name": "bash",
+                    "arguments": '{"command": "ls"}',
+                    "status": "completed",
+                }
+            ],
+        }
+    )
+
+
+def tool_result_message(call_id: str) -> LLMMessage:
+    return LLMMessage(
+        role="user",
+        tool_result=ToolResult(call_id=call_id, name="bash", success=True, result="README.md"),
+    )
+
+
+def previous_response_not_found() -> openai.NotFoundError:
+    request = httpx.Request("POST", "https://api.openai.com/v1/responses")
+    return openai.NotFoundError(
+        "Previous response with id 'resp_1' not found.",
+        response=httpx.Response(404, request=request),
+        body=None,
+    )
+
+
+class TestResponseChaining(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.client = OpenAIClient(make_model_config("openai", response_chaining=True))
+        self.client.async_client = MagicMock()
+        self.requests: list[dict] = []
+        self.results: list[Response | Exception] = []
+
+        async def create(**kwargs):
+            # The history list keeps growing after the call, so record what was sent.
+            self.requests.append(kwargs | {"input": list(kwargs["input"])})
+            result = self.results.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        self.client.async_client.responses.create = create
+        self.first_turn = [
+            LLMMessage(role="system", content="You are a helpful agent."),
+            LLMMessage(role="user", content="List the files."),
+        ]
+
+    async def test_sends_only_new_items(self):
+        model_config = make_model_config("openai", response_chaining=True)
+        self.results = [make_response("resp_1", "call_1"), make_response("resp_2", "call_2")]
+
+        first = await self.client.achat(self.first_turn, model_config)
+        second = await self.client.achat([tool_result_message("call_1")], model_config)
+
+        first_kwargs, second_kwargs = self.requests
+        self.assertIs(first_kwargs["previous_response_id"], openai.NOT_GIVEN)
+        self.assertEqual(len(first_kwargs["input"]), 2)
+        self.assertEqual(second_kwargs["previous_response_id"], "resp_1")
+        self.assertEqual(
+            [item["type"] for item in second_kwargs["input"]], ["function_call_output"]
+        )
+        self.assertTrue(second_kwargs["store"])
+        assert first.request_bytes is not None and second.request_bytes is not None
+        self.assertLess(second.request_bytes, first.request_bytes)
+        # The full history is still kept for fallbacks and other providers.
+        self.assertEqual(len(self.client.message_history), 5)
+
+    async def test_falls_back_to_full_history_when_id_is_rejected(self):
+        model_config = make_model_config("openai", response_chaining=True)
+        self.results = [
+            make_response("resp_1", "call_1"),
+            previous_response_not_found(),
+            make_response("resp_2", "call_2"),
+        ]
+
+        _ = await self.client.achat(self.first_turn, model_config)
+        response = await self.client.achat([tool_result_message("call_1")], model_config)
+
+        retry_kwargs = self.requests[2]
+        self.assertIs(retry_kwargs["previous_response_id"], openai.NOT_GIVEN)
+        self.assertEqual(len(retry_kwargs["input"]), 4)
+        assert response.tool_calls is not None
+        self.assertEqual(response.tool_calls[0].call_id, "call_2")
+
+    async def test_full_history_without_chaining(self):
+        model_config = make_model_config("openai")
+        self.results = [make_response("resp_1", "call_1"), make_response("resp_2", "call_2")]
+
+        _ = await self.client.achat(self.first_turn, model_config)
+        _ = await self.client.achat([tool_result_message("call_1")], model_config)
+
+        kwargs = self.requests[-1]
+        self.assertIs(kwargs["previous_response_id"], openai.NOT_GIVEN)
+        self.assertEqual(len(kwargs["input"]), 4)
+
+    async def test_request_bytes_serialize_each_item_once(self):
+        model_config = make_model_config("openai")
+        self.results = [make_response("resp_1", "call_1"), make_response("resp_2", "call_2")]
+
+        _ = await self.client.achat(self.first_turn, model_config)
+        with patch(
+            "trae_agent.utils.llm_clients.openai_client.json.dumps", wraps=json.dumps
+        ) as dumps:
+            response = await self.client.achat([tool_result_message("call_1")], model_config)
+
+        sent = self.requests[-1]["input"]
+        # The two messages of the first turn were measured with the first request.
+        self.assertEqual(
+            [call.args[0] for call in dumps.call_args_list if call.args[0] in sent], sent[2:]
+        )
+        self.assertEqual(response.request_bytes, len(json.dumps(sent, default=str).encode()))
+
+
+if __name__ == "__main__":
+    unittest.main()
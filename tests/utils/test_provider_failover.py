@@ -0,0 +1,119 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from llm_test_helpers import make_model_config
+
+from trae_agent.utils.config import Config, ConfigError
+from trae_agent.utils.llm_clients.llm_basics import LLMMessage, LLMResponse
+from trae_agent.utils.llm_clients.llm_client import LLMClient
+
+CONFIG = """
+agents:
+    trae_agent:
+        enable_lakeview: false
+        model: primary
+        max_steps: 10
+model_providers:
+    anthropic:
+        api_key: anthropic-key
+        provider: anthropic
+    openrouter:
+        api_key: openrouter-key
+        provider: openrouter
+models:
+    primary:
+        model_provider: anthropic
+        model: claude-sonnet-4
+        max_tokens: 4096
+        temperature: 0.5
+        top_p: 1
+        top_k: 0
+        max_retries: 0
+        parallel_tool_calls: true
+        fallback_models:
+            - {fallback}
+    backup:
+        model_provider: openrouter
+        model: anthropic/claude-sonnet-4
+        max_tokens: 4096
+        temperature: 0.5
+        top_p: 1
+        top_k: 0
+        max_retries: 0
+        parallel_tool_calls: true
+"""
+
+
+class TestFallbackConfig(unittest.TestCase):
+    def test_fallback_models_are_resolved(self):
+        config = Config.create(config_string=CONFIG.format(fallback="backup"))
+
+        assert config.trae_agent is not None and config.models is not None
+        self.assertEqual(config.trae_agent.model.fallback_models, [config.models["backup"]])
+        self.assertEqual(config.models["backup"].fallback_models, [])
+
+    def test_unknown_fallback_model(self):
+        with self.assertRaises(ConfigError):
+            _ = Config.create(config_string=CONFIG.format(fallback="missing"))
+
+
+class TestProviderFailover(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.fallback_config = make_model_config("openrouter")
+        self.model_config = make_model_config("anthropic", fallback_models=[self.fallback_config])
+        self.llm_client = LLMClient(self.model_config)
+        self.llm_client.client = MagicMock()
+        self.llm_client.client.achat = AsyncMock(side_effect=ConnectionError("outage"))
+        self.recorder = MagicMock()
+        self.llm_client.set_trajectory_recorder(self.recorder)
+        self.fallback = MagicMock()
+        self.fallback.achat = AsyncMock(return_value=LLMResponse(content="done"))
+
+    async def test_fails_over_with_translated_history(self):
+        history = [
+            LLMMessage(role="system", content="You are a helpful agent."),
+            LLMMessage(role="user", content="Fix the bug."),
+            LLMMessage(role="assistant", content="Looking."),
+        ]
+        self.llm_client.set_chat_history(history)
+        message = LLMMessage(role="user", content="Continue.")
+
+        with patch(
+            "trae_agent.utils.llm_clients.llm_client.create_provider_client",
+            return_value=self.fallback,
+        ):
+            response = await self.llm_client.achat([message], self.model_config)
+
+        self.assertEqual(response.content, "done")
+        self.assertEqual(response.provider, "openrouter")
+        self.fallback.set_chat_history.assert_called_once_with(history)
+        self.assertEqual(self.fallback.achat.await_args.args[:2], ([message], self.fallback_config))
+        self.recorder.record_provider_failover.assert_called_once()
+        self.assertEqual(self.llm_client.history[-2:], [message, LLMMessage("assistant", "done")])
+
+        # The fallback keeps serving the conversation.
+        _ = await self.llm_client.achat(
+            [LLMMessage(role="user", content="Go on.")], self.model_config
+        )
+        self.assertEqual(self.fallback.achat.await_count, 2)
+
+    async def test_raises_when_chain_is_exhausted(self):
+        self.fallback.achat.side_effect = ConnectionError("outage")
+
+        with (
+            patch(
+                "trae_agent.utils.llm_clients.llm_client.create_provider_client",
+                return_value=self.fallback,
+            ),
+            self.assertRaises(ConnectionError),
+        ):
+            _ = await self.llm_client.achat(
+                [LLMMessage(role="user", content="Hi.")], self.model_config
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import unittest
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+from llm_test_helpers import make_model_config
+
+from trae_agent.utils.config import ApiEndpoint, ModelConfig, ModelProvider, RateLimitConfig
+from trae_agent.utils.llm_clients.llm_basics import LLMMessage, LLMResponse, LLMUsage
+from trae_agent.utils.llm_clients.llm_client import LLMClient
+from trae_agent.utils.llm_clients.openrouter_client import OpenRouterClient
+from trae_agent.utils.llm_clients.rate_limiter import (
+    RateLimiter,
+    get_rate_limiter,
+    observe_rate_limits,
+    rate_limited,
+)
+from trae_agent.utils.llm_clients.retry_utils import RetryPolicy, async_retry_with
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_requests_past_the_quota_wait_in_turn(self):
+        limiter = RateLimiter(RateLimitConfig(requests_per_minute=60))
+
+        delays = [limiter.reserve(0) for _ in range(62)]
+
+        self.assertEqual(delays[:60], [0.0] * 60)
+        self.assertAlmostEqual(delays[60], 1.0, places=1)
+        self.assertAlmostEqual(delays[61], 2.0, places=1)
+
+    def test_reservation_is_corrected_with_the_tokens_used(self):
+        limiter = RateLimiter(
+            RateLimitConfig(input_tokens_per_minute=600, output_tokens_per_minute=600)
+        )
+
+        self.assertEqual(limiter.reserve(600), 0.0)
+        # The prompt was smaller than estimated, but the output runs the output quota into debt.
+        limiter.settle(reserved_input_tokens=600, input_tokens=300, output_tokens=660)
+
+        self.assertAlmostEqual(limiter.reserve(300), 6.0, places=1)
+
+    def test_headers_size_the_quota_unless_configured(self):
+        limiter = RateLimiter(RateLimitConfig(requests_per_minute=30))
+
+        limiter.observe_headers(
+            {
+                "anthropic-ratelimit-requests-limit": "60",
+                "anthropic-ratelimit-requests-remaining": "0",
+                "anthropic-ratelimit-input-tokens-limit": "6000",
+                "anthropic-ratelimit-input-tokens-remaining": "6000",
+            }
+        )
+
+        # The configured 30 requests per minute are kept; the input quota comes from the headers.
+        self.assertAlmostEqual(limiter.reserve(0), 2.0, places=1)
+        self.assertAlmostEqual(limiter.reserve(7200), 12.0, places=1)
+
+    def test_rate_limit_response_pauses_the_current_call_limiter(self):
+        limiter = RateLimiter()
+        response = httpx.Response(429, headers={"retry-after": "5"})
+
+        observe_rate_limits(response)
+        self.assertEqual(limiter.reserve(0), 0.0)
+        with rate_limited(limiter):
+            observe_rate_limits(response)
+
+        self.assertAlmostEqual(limiter.reserve(0), 5.0, places=1)
+
+    def test_limiter_is_shared_by_model_and_key(self):
+        model_config = make_model_config(unique_model=True)
+        same_key = make_model_config(unique_model=True)
+        same_key.model = model_config.model
+        other_key = make_model_config(unique_model=True)
+        other_key.model = model_config.model
+        other_key.model_provider = ModelProvider(api_key="other-api-key", provider="anthropic")
+
+        self.assertIs(get_rate_limiter(model_config), get_rate_limiter(same_key))
+        self.assertIsNot(get_rate_limiter(model_config), get_rate_limiter(other_key))
+
+
+class TestLLMClientRateLimit(unittest.IsolatedAsyncioTestCase):
+    async def test_calls_wait_for_the_quota_of_earlier_calls(self):
+        model_config = make_model_config(
+            unique_model=True, rate_limit=RateLimitConfig(output_tokens_per_minute=600)
+        )
+        llm_clients: list[LLMClient] = []
+        for _ in range(2):
+            llm_client = LLMClient(model_config)
+            llm_client.client = MagicMock()
+            llm_client.client.achat = AsyncMock(
+                return_value=LLMResponse(
+                    content="Done.", usage=LLMUsage(input_tokens=10, output_tokens=605)
+                )
+            )
+            llm_clients.append(llm_client)
+        messages = [LLMMessage(role="user", content="Hello")]
+
+        first = await llm_clients[0].achat(messages, model_config)
+        second = await llm_clients[1].achat(messages, model_config)
+
+        self.assertEqual(first.retry_wait, 0.0)
+        # The first call overdrew the shared output quota by 5 tokens, half a second's worth.
+        self.assertGreater(second.retry_wait, 0.3)
+        llm_clients[1].client.achat.assert_awaited_once()
+
+    async def test_retries_and_failed_attempts_are_accounted(self):
+        quota = RateLimitConfig(requests_per_minute=6, input_tokens_per_minute=6000)
+        fallback_config = make_model_config(unique_model=True, rate_limit=quota)
+        model_config = make_model_config(
+            unique_model=True, rate_limit=quota, fallback_models=[fallback_config]
+        )
+        llm_client = LLMClient(model_config)
+        llm_client.client = MagicMock()
+        # The primary fails again after its in-client retry, and the call fails over.
+        llm_client.client.achat = async_retry_with(
+            AsyncMock(side_effect=ConnectionError("outage")),
+            provider_name=f"test-{uuid.uuid4()}",
+            policy=RetryPolicy(max_retries=1, base_delay=0),
+        )
+        fallback = MagicMock()
+        fallback.achat = AsyncMock(
+            return_value=LLMResponse(
+                content="Done.", usage=LLMUsage(input_tokens=100, output_tokens=0)
+            )
+        )
+
+        with patch(
+            "trae_agent.utils.llm_clients.llm_client.create_provider_client",
+            return_value=fallback,
+        ):
+            _ = await llm_client.achat([LLMMessage(role="user", content="Hi")], model_config)
+
+        def used(config: ModelConfig, bucket: str) -> float:
+            buckets = get_rate_limiter(config)._buckets  # pyright: ignore[reportPrivateUsage]
+            return buckets[bucket].capacity - buckets[bucket].level
+
+        # Both requests sent to the primary count, but their tokens were given back.
+        self.assertAlmostEqual(used(model_config, "requests"), 2, delta=0.1)
+        self.assertAlmostEqual(used(model_config, "input_tokens"), 0, delta=5)
+        self.assertAlmostEqual(used(fallback_config, "requests"), 1, delta=0.1)
+        self.assertAlmostEqual(used(fallback_config, "input_tokens"), 100, delta=5)
+
+    async def test_each_key_of_a_pool_has_its_own_quota(self):
+        model_config = make_model_config(
+            "openrouter",
+            unique_model=True,
+            endpoints=[ApiEndpoint(api_key="second-key")],
+            rate_limit=RateLimitConfig(requests_per_minute=1),
+        )
+        pooled = OpenRouterClient(model_config)
+
+        async def achat(*args, **kwargs) -> LLMResponse:
+            async with pooled.pooled_client(MagicMock()):
+                return LLMResponse(content="Done.")
+
+        responses: list[LLMResponse] = []
+        for _ in range(2):
+            llm_client = LLMClient(model_config)
+            llm_client.client = MagicMock()
+            llm_client.client.achat = achat
+            responses.append(
+                await llm_client.achat([LLMMessage(role="user", content="Hi")], model_config)
+            )
+
+        # The pool sent the second request with the other key, whose quota was untouched.
+        self.assertEqual([response.retry_wait for response in responses], [0.0, 0.0])
+        for api_key in ("test-api-key", "second-key"):
+            self.assertAlmostEqual(get_rate_limiter(model_config, api_key).reserve(0), 60, delta=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,201 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import os
+import tempfile
+import unittest
+from dataclasses import replace
+from unittest.mock import AsyncMock, MagicMock
+
+from llm_test_helpers import make_model_config
+
+from trae_agent.tools.base import ToolCall, ToolResult
+from trae_agent.utils.config import (
+    Config,
+    ConfigError,
+    ResponseCacheConfig,
+)
+from trae_agent.utils.llm_clients.llm_basics import LLMMessage, LLMResponse, LLMUsage
+from trae_agent.utils.llm_clients.llm_client import LLMClient
+from trae_agent.utils.llm_clients.response_cache import (
+    CacheMode,
+    ResponseCache,
+    ResponseCacheMiss,
+    cache_key,
+)
+from trae_agent.utils.llm_clients.token_estimator import get_token_estimator
+
+CONFIG = """
+agents:
+    trae_agent:
+        enable_lakeview: false
+        model: primary
+        max_steps: 10
+model_providers:
+    anthropic:
+        api_key: anthropic-key
+        provider: anthropic
+models:
+    primary:
+        model_provider: anthropic
+        model: claude-sonnet-4
+        max_tokens: 4096
+        temperature: 0.5
+        top_p: 1
+        top_k: 0
+        max_retries: 0
+        parallel_tool_calls: true
+        response_cache:
+            path: responses.sqlite
+            mode: {mode}
+"""
+
+
+def tool_result_message(result: str, duration: float) -> LLMMessage:
+    return LLMMessage(
+        role="user",
+        tool_result=ToolResult(
+            call_id="call_1", name="bash", success=True, result=result, duration=duration
+        ),
+    )
+
+
+RESPONSE = LLMResponse(
+    content="Listing files.",
+    usage=LLMUsage(input_tokens=10, output_tokens=5),
+    model="test-model",
+    finish_reason="tool_use",
+    tool_calls=[ToolCall(name="bash", call_id="call_2", arguments={"command": "ls"})],
+)
+
+
+class TestResponseCacheConfig(unittest.TestCase):
+    def test_response_cache_is_parsed(self):
+        config = Config.create(config_string=CONFIG.format(mode="replay"))
+
+        assert config.models is not None
+        self.assertEqual(
+            config.models["primary"].response_cache,
+            ResponseCacheConfig(path="responses.sqlite", mode="replay"),
+        )
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ConfigError):
+            _ = Config.create(config_string=CONFIG.format(mode="sometimes"))
+
+
+class TestCacheKey(unittest.TestCase):
+    def test_key_covers_conversation_and_sampling(self):
+        messages = [tool_result_message("a.py", duration=0.1)]
+        key = cache_key(messages, None, make_model_config())
+
+        self.assertEqual(
+            cache_key([tool_result_message("a.py", duration=2.0)], None, make_model_config()), key
+        )
+        self.assertNotEqual(
+            cache_key([tool_result_message("b.py", duration=0.1)], None, make_model_config()), key
+        )
+        self.assertNotEqual(cache_key(messages, None, make_model_config(temperature=0)), key)
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "cache", "responses.sqlite")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_round_trip(self):
+        cache = ResponseCache(self.path)
+        cache.put("key", RESPONSE)
+        cache.close()
+
+        cached = ResponseCache(self.path).get("key")
+
+        assert cached is not None
+        self.assertTrue(cached.cached)
+        self.assertEqual(cached.content, RESPONSE.content)
+        self.assertEqual(cached.usage, RESPONSE.usage)
+        self.assertEqual(cached.tool_calls, RESPONSE.tool_calls)
+
+    def test_modes(self):
+        replay = ResponseCache(self.path, CacheMode.REPLAY)
+        with self.assertRaises(ResponseCacheMiss):
+            _ = replay.get("key")
+        replay.put("key", RESPONSE)
+        self.assertEqual(len(replay), 0)
+
+        passthrough = ResponseCache(self.path, CacheMode.PASSTHROUGH)
+        self.assertIsNone(passthrough.get("key"))
+
+    def test_evicts_least_recently_used(self):
+        cache = ResponseCache(self.path)
+        cache.put("first", RESPONSE)
+        cache.put("second", RESPONSE)
+        cache.max_bytes = 700  # room for two responses of about 320 bytes
+        _ = cache.get("first")
+
+        cache.put("third", RESPONSE)
+
+        self.assertIsNotNone(cache.get("first"))
+        self.assertIsNone(cache.get("second"))
+        self.assertIsNotNone(cache.get("third"))
+
+
+class TestCachedChat(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        path = os.path.join(self.temp_dir.name, "responses.sqlite")
+        self.model_config = make_model_config(response_cache=ResponseCacheConfig(path=path))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def make_client(self) -> LLMClient:
+        llm_client = LLMClient(self.model_config)
+        llm_client.client = MagicMock()
+        llm_client.client.achat = AsyncMock(
+            side_effect=lambda *args, **kwargs: LLMResponse(content="Hello.")
+        )
+        return llm_client
+
+    async def test_repeated_conversation_is_served_from_cache(self):
+        messages = [LLMMessage(role="user", content="Hi.")]
+        recording = self.make_client()
+        recorded = await recording.achat(messages, self.model_config)
+
+        replaying = self.make_client()
+        replayed = await replaying.achat(messages, self.model_config)
+
+        self.assertFalse(recorded.cached)
+        self.assertTrue(replayed.cached)
+        self.assertEqual(replayed.content, "Hello.")
+        replaying.client.achat.assert_not_awaited()
+        self.assertEqual(replaying.history, recording.history)
+
+        # The provider client catches up on the cached turn before its next call.
+        follow_up = [LLMMessage(role="user", content="Go on.")]
+        _ = await replaying.achat(follow_up, self.model_config)
+        replaying.client.set_chat_history.assert_called_once_with(recording.history)
+        replaying.client.achat.assert_awaited_once()
+
+    async def test_key_ignores_the_max_tokens_cap_of_the_context_window(self):
+        model_config = replace(
+            self.model_config, model="cache-window-model", context_window=5000, max_tokens=4000
+        )
+        messages = [LLMMessage(role="user", content="x" * 7000)]
+        recording = self.make_client()
+        _ = await recording.achat(messages, model_config)
+
+        # A recalibrated estimate leaves a different cap for the output on replay.
+        get_token_estimator("anthropic", model_config.model).chars_per_token = 3.0
+        replaying = self.make_client()
+        replayed = await replaying.achat(messages, model_config)
+
+        self.assertTrue(replayed.cached)
+        replaying.client.achat.assert_not_awaited()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,191 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import unittest
+import uuid
+from unittest.mock import AsyncMock, patch
+
+import anthropic
+import httpx
+import openai
+from google.genai import errors as google_errors
+from llm_test_helpers import LOCAL_BASE_URL, make_model_config
+
+from trae_agent.utils.config import ModelProvider
+from trae_agent.utils.llm_clients.llm_client import create_provider_client
+from trae_agent.utils.llm_clients.retry_utils import (
+    ErrorKind,
+    async_retry_with,
+    classify_error,
+    collect_retry_stats,
+    get_circuit_breaker,
+    server_retry_delay,
+)
+
+
+def openai_error(
+    error_class: type[openai.APIStatusError],
+    status: int,
+    headers: dict[str, str] | None = None,
+    body: object = None,
+) -> openai.APIStatusError:
+    request = httpx.Request("POST", "https://api.openai.com/v1/responses")
+    response = httpx.Response(status, request=request, headers=headers)
+    return error_class("failed", response=response, body=body)
+
+
+def unique_provider() -> str:
+    """A provider name of its own, so that tests do not share a circuit breaker."""
+    return f"test-{uuid.uuid4()}"
+
+
+class TestErrorClassification(unittest.TestCase):
+    def test_classify_error(self):
+        cases = [
+            (openai_error(openai.AuthenticationError, 401), ErrorKind.FATAL),
+            (openai_error(openai.BadRequestError, 400), ErrorKind.FATAL),
+            (openai_error(openai.RateLimitError, 429), ErrorKind.RATE_LIMITED),
+            (openai_error(openai.InternalServerError, 503), ErrorKind.TRANSIENT),
+            (
+                openai_error(openai.RateLimitError, 429, body={"code": "insufficient_quota"}),
+                ErrorKind.FATAL,
+            ),
+            (
+                openai_error(openai.InternalServerError, 500, {"x-should-retry": "false"}),
+                ErrorKind.FATAL,
+            ),
+            (
+                google_errors.ClientError(403, {"error": {"status": "PERMISSION_DENIED"}}),
+                ErrorKind.FATAL,
+            ),
+            (
+                google_errors.ClientError(429, {"error": {"status": "RESOURCE_EXHAUSTED"}}),
+                ErrorKind.RATE_LIMITED,
+            ),
+            (ConnectionError("connection reset"), ErrorKind.TRANSIENT),
+        ]
+        for error, kind in cases:
+            with self.subTest(error=repr(error)):
+                self.assertIs(classify_error(error), kind)
+
+    def test_server_retry_delay(self):
+        self.assertEqual(
+            server_retry_delay(openai_error(openai.RateLimitError, 429, {"retry-after": "7"})), 7.0
+        )
+        self.assertEqual(
+            server_retry_delay(
+                openai_error(
+                    openai.RateLimitError, 429, {"retry-after-ms": "1500", "retry-after": "2"}
+                )
+            ),
+            1.5,
+        )
+        self.assertEqual(
+            server_retry_delay(
+                openai_error(openai.RateLimitError, 429, {"x-ratelimit-reset-tokens": "1m30s"})
+            ),
+            90.0,
+        )
+        google_error = google_errors.ClientError(
+            429,
+            {
+                "error": {
+                    "details": [
+                        {"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": "12s"}
+                    ]
+                }
+            },
+        )
+        self.assertEqual(server_retry_delay(google_error), 12.0)
+        self.assertIsNone(server_retry_delay(openai_error(openai.InternalServerError, 500)))
+
+
+class TestAsyncRetry(unittest.IsolatedAsyncioTestCase):
+    async def test_fatal_errors_are_not_retried(self):
+        call = AsyncMock(side_effect=openai_error(openai.AuthenticationError, 401))
+
+        with (
+            patch("trae_agent.utils.llm_clients.retry_utils.asyncio.sleep", new=AsyncMock()),
+            self.assertRaises(openai.AuthenticationError),
+        ):
+            _ = await async_retry_with(call, unique_provider(), max_retries=3)()
+
+        self.assertEqual(call.await_count, 1)
+
+    async def test_honors_retry_after_and_records_stats(self):
+        call = AsyncMock(
+            side_effect=[openai_error(openai.RateLimitError, 429, {"retry-after": "20"}), "ok"]
+        )
+        sleep = AsyncMock()
+
+        with (
+            patch("trae_agent.utils.llm_clients.retry_utils.asyncio.sleep", new=sleep),
+            collect_retry_stats() as stats,
+        ):
+            result = await async_retry_with(call, unique_provider(), max_retries=3)()
+
+        self.assertEqual(result, "ok")
+        self.assertGreaterEqual(sleep.await_args_list[0].args[0], 20)
+        self.assertEqual(stats.retries, 1)
+        self.assertGreaterEqual(stats.wait, 20)
+
+    async def test_circuit_breaker_is_shared(self):
+        provider = unique_provider()
+        breaker = get_circuit_breaker(provider)
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        call = AsyncMock(return_value="ok")
+        sleep = AsyncMock()
+
+        # Another caller of the same provider waits for the breaker before calling.
+        with patch("trae_agent.utils.llm_clients.retry_utils.asyncio.sleep", new=sleep):
+            result = await async_retry_with(call, provider, max_retries=3)()
+
+        self.assertEqual(result, "ok")
+        self.assertAlmostEqual(sleep.await_args_list[0].args[0], breaker.cooldown, delta=1)
+        self.assertIs(get_circuit_breaker(provider), breaker)
+
+    async def test_breaker_is_per_key_and_pools_ignore_rate_limits(self):
+        provider = unique_provider()
+        rate_limited = openai_error(openai.RateLimitError, 429, {"retry-after": "20"})
+        pooled = get_circuit_breaker(provider, None, "key-a", pooled=True)
+
+        for breaker in (get_circuit_breaker(provider, None, "key-a"), pooled):
+            call = AsyncMock(side_effect=[rate_limited, "ok"])
+            with patch("trae_agent.utils.llm_clients.retry_utils.asyncio.sleep", new=AsyncMock()):
+                _ = await async_retry_with(call, provider, circuit_breaker=breaker)()
+
+        # The rate limit paused the callers of key-a, but neither another key nor the pool.
+        self.assertGreater(get_circuit_breaker(provider, None, "key-a").delay(), 15)
+        self.assertEqual(get_circuit_breaker(provider, None, "key-b").delay(), 0)
+        self.assertEqual(pooled.delay(), 0)
+
+
+class TestSDKClients(unittest.TestCase):
+    def test_sdk_clients_leave_retries_to_the_policy(self):
+        model_configs = [
+            make_model_config(provider, base_url=LOCAL_BASE_URL)
+            for provider in ("anthropic", "openai", "doubao", "openrouter", "mock", "ollama")
+        ]
+        model_configs.append(
+            make_model_config(
+                model_provider=ModelProvider(
+                    api_key="test-api-key",
+                    provider="azure",
+                    base_url=LOCAL_BASE_URL,
+                    api_version="2024-10-21",
+                )
+            )
+        )
+
+        for model_config in model_configs:
+            client = create_provider_client(model_config)
+            with self.subTest(provider=model_config.model_provider.provider):
+                self.assertEqual(client.client.max_retries, 0)  # pyright: ignore[reportAttributeAccessIssue]
+                async_client = getattr(client, "async_client", None)
+                if isinstance(async_client, openai.AsyncOpenAI | anthropic.AsyncAnthropic):
+                    self.assertEqual(async_client.max_retries, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
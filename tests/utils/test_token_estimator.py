@@ -0,0 +1,148 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from llm_test_helpers import make_model_config
+
+from trae_agent.tools.base import ToolCall, ToolResult
+from trae_agent.tools.task_done_tool import TaskDoneTool
+from trae_agent.utils.config import ContextCompactionConfig, ModelConfig
+from trae_agent.utils.llm_clients.context_compactor import ToolOutputElisionCompactor
+from trae_agent.utils.llm_clients.llm_basics import LLMMessage, LLMResponse, LLMUsage
+from trae_agent.utils.llm_clients.llm_client import LLMClient
+from trae_agent.utils.llm_clients.token_estimator import (
+    ContextWindowExceeded,
+    TokenEstimator,
+    get_token_estimator,
+    message_chars,
+    prompt_tokens,
+)
+
+
+def make_history(num_tool_calls: int, output_chars: int) -> list[LLMMessage]:
+    history = [
+        LLMMessage(role="system", content="You are a helpful agent."),
+        LLMMessage(role="user", content="Fix the bug."),
+    ]
+    for i in range(num_tool_calls):
+        tool_call = ToolCall(name="bash", call_id=f"call_{i}", arguments={"command": "ls"})
+        history.append(LLMMessage(role="assistant", tool_call=tool_call))
+        history.append(
+            LLMMessage(
+                role="user",
+                tool_result=ToolResult(
+                    call_id=f"call_{i}", name="bash", success=True, result="x" * output_chars
+                ),
+            )
+        )
+    return history
+
+
+class TestTokenEstimator(unittest.TestCase):
+    def test_estimate_counts_messages_and_tool_schemas(self):
+        estimator = TokenEstimator(chars_per_token=4.0)
+        messages = [LLMMessage(role="user", content="x" * 400)]
+
+        without_tools = estimator.estimate(messages)
+        with_tools = estimator.estimate(messages, [TaskDoneTool()])
+
+        self.assertEqual(without_tools, 104)
+        self.assertGreater(with_tools, without_tools)
+
+    def test_calibration_moves_towards_the_provider_count(self):
+        estimator = TokenEstimator(chars_per_token=4.0, smoothing=0.5)
+
+        estimator.calibrate(estimated=100, actual=200)
+
+        self.assertAlmostEqual(estimator.chars_per_token, 3.0)
+
+    def test_anthropic_prompt_includes_cached_tokens(self):
+        usage = LLMUsage(
+            input_tokens=10,
+            output_tokens=5,
+            cache_creation_input_tokens=20,
+            cache_read_input_tokens=70,
+        )
+
+        self.assertEqual(prompt_tokens(usage, "anthropic"), 100)
+        self.assertEqual(prompt_tokens(usage, "openai"), 10)
+
+
+class TestPreflight(unittest.IsolatedAsyncioTestCase):
+    def make_client(self, model_config: ModelConfig) -> LLMClient:
+        llm_client = LLMClient(model_config)
+        llm_client.client = MagicMock()
+        llm_client.client.achat = AsyncMock(
+            return_value=LLMResponse(
+                content="Done.", usage=LLMUsage(input_tokens=3000, output_tokens=10)
+            )
+        )
+        return llm_client
+
+    async def test_max_tokens_is_lowered_to_the_room_left(self):
+        model_config = make_model_config(context_window=5000, max_tokens=4000, unique_model=True)
+        llm_client = self.make_client(model_config)
+        messages = [LLMMessage(role="user", content="x" * 7000)]
+
+        response = await llm_client.achat(messages, model_config)
+
+        sent_config = llm_client.client.achat.call_args.args[1]
+        assert response.estimated_input_tokens is not None
+        self.assertEqual(sent_config.max_tokens, 5000 - response.estimated_input_tokens)
+        # The estimator learns from the provider's count.
+        estimator = get_token_estimator("anthropic", model_config.model)
+        self.assertLess(estimator.chars_per_token, 3.5)
+
+    async def test_oversized_prompt_fails_fast(self):
+        model_config = make_model_config(context_window=2000, max_tokens=4000, unique_model=True)
+        llm_client = self.make_client(model_config)
+
+        with self.assertRaises(ContextWindowExceeded):
+            _ = await llm_client.achat(make_history(4, 2000), model_config)
+        llm_client.client.achat.assert_not_awaited()
+
+    async def test_oversized_prompt_is_compacted(self):
+        model_config = make_model_config(context_window=4000, unique_model=True)
+        llm_client = self.make_client(model_config)
+        # The configured budget is too high to help; the context window forces compaction.
+        llm_client.set_context_compactor(
+            ToolOutputElisionCompactor(
+                ContextCompactionConfig(token_budget=1_000_000, keep_recent_tool_results=1)
+            )
+        )
+        llm_client.set_chat_history(make_history(4, 4000))
+        follow_up = [LLMMessage(role="user", content="Go on.")]
+
+        response = await llm_client.achat(follow_up, model_config)
+
+        assert response.estimated_input_tokens is not None
+        self.assertLessEqual(response.estimated_input_tokens, 3000)
+        llm_client.client.set_chat_history.assert_called()
+        llm_client.client.achat.assert_awaited_once()
+
+    async def test_each_message_is_measured_once(self):
+        model_config = make_model_config(context_window=100_000, unique_model=True)
+        llm_client = self.make_client(model_config)
+        llm_client.set_context_compactor(
+            ToolOutputElisionCompactor(ContextCompactionConfig(token_budget=1_000_000))
+        )
+        history = make_history(4, 100)
+        follow_ups = [[LLMMessage(role="user", content=f"Go on {i}.")] for i in range(3)]
+
+        with patch(
+            "trae_agent.utils.llm_clients.token_estimator.message_chars", wraps=message_chars
+        ) as measure:
+            _ = await llm_client.achat(history, model_config)
+            for follow_up in follow_ups:
+                _ = await llm_client.achat(follow_up, model_config)
+
+        measured = [id(call.args[0]) for call in measure.call_args_list]
+        self.assertEqual(len(measured), len(set(measured)))
+        # The last reply is measured with the next request.
+        self.assertEqual(len(measured), len(llm_client.history) - 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
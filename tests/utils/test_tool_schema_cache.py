@@ -0,0 +1,71 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from anthropic.types import Message
+from llm_test_helpers import make_model_config
+
+from trae_agent.tools.base import Tool
+from trae_agent.tools.sequential_thinking_tool import SequentialThinkingTool
+from trae_agent.tools.task_done_tool import TaskDoneTool
+from trae_agent.utils.llm_clients.anthropic_client import AnthropicClient
+from trae_agent.utils.llm_clients.llm_basics import LLMMessage
+
+
+def make_message() -> Message:
+    return Message.model_validate(
+        {
+            "id": "msg_1",
+            "type": "message",
+            "role": "assistant",
+            "model": "test-model",
+            "stop_reason": "end_turn",
+            "content": [{"type": "text", "text": "Done."}],
+            "usage": {"input_tokens": 10, "output_tokens": 5},
+        }
+    )
+
+
+class TestToolSchemaCache(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.client = AnthropicClient(make_model_config())
+        self.client.async_client = MagicMock()
+        self.create = AsyncMock(return_value=make_message())
+        self.client.async_client.messages.create = self.create
+
+    async def test_schemas_compiled_once_per_tool_set(self):
+        model_config = make_model_config()
+        tools: list[Tool] = [TaskDoneTool()]
+
+        with patch.object(Tool, "get_input_schema", autospec=True, return_value={}) as schema:
+            for _ in range(3):
+                _ = await self.client.achat(
+                    [LLMMessage(role="user", content="Go on.")], model_config, tools=tools
+                )
+            self.assertEqual(schema.call_count, 1)
+
+            # New tools, e.g. found by MCP discovery, recompile the schemas.
+            tools.append(SequentialThinkingTool())
+            _ = await self.client.achat(
+                [LLMMessage(role="user", content="Go on.")], model_config, tools=tools
+            )
+            self.assertEqual(schema.call_count, 3)
+
+        sent_tools = self.create.await_args.kwargs["tools"]
+        self.assertEqual([tool["name"] for tool in sent_tools], ["task_done", "sequentialthinking"])
+
+    def test_cached_schemas_are_not_shared_lists(self):
+        tools: list[Tool] = [TaskDoneTool()]
+        first = self.client.compile_tool_schemas(tools, lambda tool: {"name": tool.name})
+        first.append({"name": "injected"})
+
+        second = self.client.compile_tool_schemas(tools, lambda tool: {"name": tool.name})
+
+        self.assertEqual(second, [{"name": "task_done"}])
+        self.assertIs(first[0], second[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
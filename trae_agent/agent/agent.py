@@ -2,6 +2,7 @@ import asyncio
 import contextlib
 from enum import Enum
 
+from trae_agent.agent.checkpoint import AgentCheckpoint, default_checkpoint_path
 from trae_agent.utils.cli.cli_console import CLIConsole
 from trae_agent.utils.config import AgentConfig, Config
 from trae_agent.utils.trajectory_recorder import TrajectoryRecorder
@@ -18,6 +19,7 @@ class Agent:
         config: Config,
         trajectory_file: str | None = None,
         cli_console: CLIConsole | None = None,
+        checkpoint_file: str | None = None,
     ):
         if isinstance(agent_type, str):
             agent_type = AgentType(agent_type)
@@ -32,6 +34,11 @@ class Agent:
             self.trajectory_recorder = TrajectoryRecorder()
             self.trajectory_file = self.trajectory_recorder.get_trajectory_path()
 
+        # Checkpoints are written next to the trajectory unless a path is given
+        self.checkpoint_file: str = checkpoint_file or default_checkpoint_path(
+            self.trajectory_file
+        )
+
         match self.agent_type:
             case AgentType.TraeAgent:
                 if config.trae_agent is None:
@@ -50,15 +57,22 @@ class Agent:
                 cli_console.set_lakeview(None)
 
         self.agent.set_trajectory_recorder(self.trajectory_recorder)
+        self.agent.set_checkpoint_file(self.checkpoint_file)
 
     async def run(
         self,
         task: str,
         extra_args: dict[str, str] | None = None,
         tool_names: list[str] | None = None,
+        checkpoint: AgentCheckpoint | None = None,
     ):
         ''' 设置基础环境【项目根目录，问题陈述】， 加入系统提示词，user提示词  初始化路径追踪'''
+        if checkpoint:
+            # Keep the steps recorded before the run was interrupted
+            self.trajectory_recorder.resume_recording()
         self.agent.new_task(task, extra_args, tool_names)
+        if checkpoint:
+            self.agent.restore_checkpoint(checkpoint)
 
         if self.agent.allow_mcp_servers:
             if self.agent.cli_console:
@@ -77,6 +91,8 @@ class Agent:
             if extra_args:
                 for key, value in extra_args.items():
                     task_details[key.capitalize()] = value
+            if checkpoint:
+                task_details["Resumed From"] = f"Step {checkpoint.step_number}"
             self.agent.cli_console.print_task_details(task_details)
 
         cli_console_task = (
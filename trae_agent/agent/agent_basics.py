@@ -1,7 +1,8 @@
 # Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
-from dataclasses import dataclass
+import math
+from dataclasses import dataclass, field
 from enum import Enum
 
 from trae_agent.tools.base import ToolCall, ToolResult
@@ -12,6 +13,8 @@ __all__ = [
     "AgentState",
     "AgentStep",
     "AgentExecution",
+    "StepTiming",
+    "LatencyStats",
     "AgentError",
 ]
 
@@ -35,6 +38,78 @@ class AgentState(Enum):
     ERROR = "error"
 
 
+@dataclass
+class StepTiming:
+    """Wall-clock time, in seconds, spent in each phase of an agent step."""
+
+    llm: float = 0.0
+    tools: float = 0.0
+    reflection: float = 0.0
+    recording: float = 0.0  # trajectory and checkpoint writes
+    console: float = 0.0  # console updates
+    total: float = 0.0
+
+    @property
+    def overhead(self) -> float:
+        """Time not spent in the LLM call, tools or reflection."""
+        return max(self.total - self.llm - self.tools - self.reflection, 0.0)
+
+    def to_dict(self) -> dict[str, float]:
+        return {
+            "llm": self.llm,
+            "tools": self.tools,
+            "reflection": self.reflection,
+            "recording": self.recording,
+            "console": self.console,
+            "overhead": self.overhead,
+            "total": self.total,
+        }
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Return the q-th percentile (0-100) of the values, using the nearest-rank method."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(q / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+@dataclass
+class LatencyStats:
+    """Latency distribution of a set of calls, in seconds."""
+
+    count: int = 0
+    errors: int = 0
+    p50: float = 0.0
+    p95: float = 0.0
+    total: float = 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.count if self.count else 0.0
+
+    @classmethod
+    def from_samples(cls, durations: list[float], errors: int = 0) -> "LatencyStats":
+        return cls(
+            count=len(durations),
+            errors=errors,
+            p50=percentile(durations, 50),
+            p95=percentile(durations, 95),
+            total=sum(durations),
+        )
+
+    def to_dict(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "error_rate": self.error_rate,
+            "p50": self.p50,
+            "p95": self.p95,
+            "total": self.total,
+        }
+
+
 @dataclass
 class AgentStep:
     """
@@ -54,6 +129,8 @@ class AgentStep:
     error: str | None = None
     extra: dict[str, object] | None = None
     llm_usage: LLMUsage | None = None
+    time_to_first_token: float | None = None  # seconds, only set when streaming
+    timing: StepTiming = field(default_factory=StepTiming)
 
     def __repr__(self) -> str:
         return (
@@ -83,6 +160,62 @@ class AgentExecution:
     def __repr__(self) -> str:
         return f"<AgentExecution task={self.task!r} steps={len(self.steps)} success={self.success}>"
 
+    def llm_latency(self) -> LatencyStats:
+        """Latency of the LLM calls of all steps that got a response."""
+        return LatencyStats.from_samples(
+            [step.timing.llm for step in self.steps if step.llm_response is not None]
+        )
+
+    def llm_retries(self) -> tuple[int, float]:
+        """Number of retried LLM calls, and the seconds spent waiting before them."""
+        responses = [step.llm_response for step in self.steps if step.llm_response is not None]
+        return (
+            sum(response.retries for response in responses),
+            sum(response.retry_wait for response in responses),
+        )
+
+    def llm_hedges(self) -> tuple[int, int]:
+        """Number of hedged LLM calls, and of those the duplicate request answered first."""
+        responses = [step.llm_response for step in self.steps if step.llm_response is not None]
+        return (
+            sum(response.hedged for response in responses),
+            sum(response.hedge_won for response in responses),
+        )
+
+    def tool_latencies(self) -> dict[str, LatencyStats]:
+        """Latency and error rate of the tool calls, per tool."""
+        durations: dict[str, list[float]] = {}
+        errors: dict[str, int] = {}
+        for step in self.steps:
+            for result in step.tool_results or []:
+                if result.duration is None:
+                    continue
+                durations.setdefault(result.name, []).append(result.duration)
+                errors[result.name] = errors.get(result.name, 0) + (not result.success)
+        return {
+            name: LatencyStats.from_samples(samples, errors[name])
+            for name, samples in sorted(durations.items())
+        }
+
+    def latency_summary(self) -> dict[str, object]:
+        """Latency breakdown of the whole execution, as stored in the trajectory."""
+        retries, retry_wait = self.llm_retries()
+        hedges_fired, hedges_won = self.llm_hedges()
+        return {
+            "llm": self.llm_latency().to_dict(),
+            "llm_retries": {"retries": retries, "wait": retry_wait},
+            "llm_hedges": {"fired": hedges_fired, "won": hedges_won},
+            "tools": {name: stats.to_dict() for name, stats in self.tool_latencies().items()},
+            "step_totals": StepTiming(
+                llm=sum(step.timing.llm for step in self.steps),
+                tools=sum(step.timing.tools for step in self.steps),
+                reflection=sum(step.timing.reflection for step in self.steps),
+                recording=sum(step.timing.recording for step in self.steps),
+                console=sum(step.timing.console for step in self.steps),
+                total=sum(step.timing.total for step in self.steps),
+            ).to_dict(),
+        }
+
 
 class AgentError(Exception):
     """
@@ -3,15 +3,19 @@
 
 """Base Agent class for LLM-based agents."""
 
+import asyncio
 import contextlib
+import time
 from abc import ABC, abstractmethod
 
 from trae_agent.agent.agent_basics import AgentExecution, AgentState, AgentStep, AgentStepState
+from trae_agent.agent.checkpoint import AgentCheckpoint
 from trae_agent.tools import tools_registry
 from trae_agent.tools.base import Tool, ToolCall, ToolExecutor, ToolResult
 from trae_agent.tools.ckg.ckg_database import clear_older_ckg
 from trae_agent.utils.cli import CLIConsole
-from trae_agent.utils.config import AgentConfig, ModelConfig
+from trae_agent.utils.config import AgentConfig, ModelConfig, ToolWorkersConfig
+from trae_agent.utils.llm_clients.context_compactor import ToolOutputElisionCompactor
 from trae_agent.utils.llm_clients.llm_basics import LLMMessage, LLMResponse
 from trae_agent.utils.llm_clients.llm_client import LLMClient
 from trae_agent.utils.trajectory_recorder import TrajectoryRecorder
@@ -27,20 +31,33 @@ class BaseAgent(ABC):
             agent_config: Configuration object containing model parameters and other settings.
         """
         self._llm_client = LLMClient(agent_config.model)
+        if agent_config.context_compaction:
+            self._llm_client.set_context_compactor(
+                ToolOutputElisionCompactor(agent_config.context_compaction)
+            )
         self._model_config = agent_config.model
         self._max_steps = agent_config.max_steps
         self._initial_messages: list[LLMMessage] = []
         self._task: str = ""
+        # Arguments of the current task, kept so that checkpoints can recreate it
+        self._task_args: dict[str, str] = {}
         self._tools: list[Tool] = [
             tools_registry[tool_name](model_provider=self._model_config.model_provider.provider)
             for tool_name in agent_config.tools
         ]
         self._tool_caller: ToolExecutor = ToolExecutor([])
+        self._tool_workers: ToolWorkersConfig = agent_config.tool_workers
+        # Tool calls started while the LLM response was still streaming, keyed by call id
+        self._started_tool_calls: dict[str, asyncio.Task[ToolResult]] = {}
         self._cli_console: CLIConsole | None = None
 
         # Trajectory recorder
         self._trajectory_recorder: TrajectoryRecorder | None = None
 
+        # Checkpoint written after every step, and the one the next run resumes from
+        self._checkpoint_file: str | None = None
+        self._resume_checkpoint: AgentCheckpoint | None = None
+
         # CKG tool-specific: clear the older CKG databases
         clear_older_ckg()
 
@@ -59,6 +76,20 @@ class BaseAgent(ABC):
         # Also set it on the LLM client
         self._llm_client.set_trajectory_recorder(recorder)
 
+    @property
+    def checkpoint_file(self) -> str | None:
+        """Get the file the agent writes a checkpoint to after every step."""
+        return self._checkpoint_file
+
+    def set_checkpoint_file(self, checkpoint_file: str | None) -> None:
+        """Set the file the agent writes a checkpoint to after every step."""
+        self._checkpoint_file = checkpoint_file
+
+    def restore_checkpoint(self, checkpoint: AgentCheckpoint) -> None:
+        """Continue the current task from a checkpoint. Call after `new_task`."""
+        self._llm_client.set_chat_history(checkpoint.history)
+        self._resume_checkpoint = checkpoint
+
     @property
     def cli_console(self) -> CLIConsole | None:
         """Get the CLI console for this agent."""
@@ -110,8 +141,6 @@ class BaseAgent(ABC):
 
     async def execute_task(self) -> AgentExecution:
         """Execute a task using the agent."""
-        import time
-
         start_time = time.time()
         execution = AgentExecution(task=self._task, steps=[])
         step: AgentStep | None = None
@@ -119,15 +148,24 @@ class BaseAgent(ABC):
         try:
             messages = self._initial_messages
             step_number = 1
+            if self._resume_checkpoint:
+                # The LLM client already holds the restored history, so continue with the
+                # messages the interrupted run was about to send.
+                messages = self._resume_checkpoint.pending_messages
+                step_number = self._resume_checkpoint.step_number + 1
+                execution.total_tokens = self._resume_checkpoint.total_tokens
+                self._resume_checkpoint = None
             execution.agent_state = AgentState.RUNNING
 
             while step_number <= self._max_steps:
                 step = AgentStep(step_number=step_number, state=AgentStepState.THINKING)
+                step_start_time = time.perf_counter()
                 try:
                     messages = await self._run_llm_step(step, messages, execution)
                     self._finalize_step(
                         step, messages, execution
                     )  # record trajectory for this step and update the CLI console
+                    self._record_step_timing(step, step_start_time)
                     if execution.agent_state == AgentState.COMPLETED:
                         break
                     step_number += 1
@@ -136,6 +174,7 @@ class BaseAgent(ABC):
                     step.state = AgentStepState.ERROR
                     step.error = str(error)
                     self._finalize_step(step, messages, execution)
+                    self._record_step_timing(step, step_start_time)
                     break
 
             if step_number > self._max_steps and not execution.success:
@@ -161,8 +200,14 @@ class BaseAgent(ABC):
         step.state = AgentStepState.THINKING
         self._update_cli_console(step, execution)
         # Get LLM response
-        llm_response = self._llm_client.chat(messages, self._model_config, self._tools)
+        llm_start_time = time.perf_counter()
+        if self._model_config.stream:
+            llm_response = await self._stream_llm_response(step, messages)
+        else:
+            llm_response = await self._llm_client.achat(messages, self._model_config, self._tools)
+        step.timing.llm = time.perf_counter() - llm_start_time
         step.llm_response = llm_response
+        step.llm_usage = llm_response.usage
 
         # Display step with LLM response
         self._update_cli_console(step, execution)
@@ -172,6 +217,7 @@ class BaseAgent(ABC):
 
         # 回答结果判断
         if self.llm_indicates_task_completed(llm_response):
+            self._cancel_started_tool_calls()
             if self._is_task_completed(llm_response):
                 execution.agent_state = AgentState.COMPLETED
                 execution.final_result = llm_response.content
@@ -184,13 +230,97 @@ class BaseAgent(ABC):
             tool_calls = llm_response.tool_calls
             return await self._tool_call_handler(tool_calls, step)
 
+    async def _stream_llm_response(
+        self, step: AgentStep, messages: list[LLMMessage]
+    ) -> LLMResponse:
+        """Stream the LLM response, rendering text as it arrives and timing the first token."""
+        start_time = time.perf_counter()
+        llm_response: LLMResponse | None = None
+        # Read-only tool calls are started as soon as they are streamed, overlapping their I/O
+        # with the rest of the generation. Once a call with side effects shows up, every later
+        # call waits for the full response so that it still runs after that call.
+        can_start_early = self._model_config.parallel_tool_calls
+        try:
+            async for event in self._llm_client.astream(messages, self._model_config, self._tools):
+                if step.time_to_first_token is None and (event.content_delta or event.tool_call):
+                    step.time_to_first_token = time.perf_counter() - start_time
+                if event.content_delta and self._cli_console:
+                    self._cli_console.update_stream(step, event.content_delta)
+                if event.tool_call:
+                    if can_start_early and self._tool_caller.is_read_only(event.tool_call):
+                        self._started_tool_calls[event.tool_call.call_id] = (
+                            self._tool_caller.start_tool_call(event.tool_call)
+                        )
+                    else:
+                        can_start_early = False
+                if event.response:
+                    llm_response = event.response
+        except BaseException:
+            self._cancel_started_tool_calls()
+            raise
+
+        if llm_response is None:
+            raise RuntimeError("LLM stream ended without a response")
+        return llm_response
+
+    def _cancel_started_tool_calls(self) -> None:
+        """Cancel early-started tool calls whose results are no longer needed."""
+        for task in self._started_tool_calls.values():
+            _ = task.cancel()
+        self._started_tool_calls.clear()
+
     def _finalize_step(
         self, step: "AgentStep", messages: list["LLMMessage"], execution: "AgentExecution"
     ) -> None:
+        recording_start_time = time.perf_counter()
+        console_time = step.timing.console
         step.state = AgentStepState.COMPLETED
         self._record_handler(step, messages)
         self._update_cli_console(step, execution)
         execution.steps.append(step)
+        # A failed step is retried on resume, so only successful steps move the checkpoint.
+        if execution.agent_state != AgentState.ERROR:
+            self._save_checkpoint(step, messages, execution)
+        # Console updates are timed on their own
+        step.timing.recording = (
+            time.perf_counter() - recording_start_time - (step.timing.console - console_time)
+        )
+
+    def _record_step_timing(self, step: AgentStep, step_start_time: float) -> None:
+        """Complete the step timing once the step, including its recording, is done."""
+        step.timing.total = time.perf_counter() - step_start_time
+        if self.trajectory_recorder:
+            self.trajectory_recorder.update_step_timing(step.step_number, step.timing.to_dict())
+
+    def _save_checkpoint(
+        self, step: AgentStep, messages: list[LLMMessage], execution: AgentExecution
+    ) -> None:
+        if not self._checkpoint_file:
+            return
+        tool_sessions: dict[str, dict[str, object]] = {}
+        for tool in self._tools:
+            metadata = tool.get_session_metadata()
+            if metadata is not None:
+                tool_sessions[tool.name] = metadata
+        checkpoint = AgentCheckpoint(
+            task=self._task,
+            task_args=self._task_args,
+            step_number=step.step_number,
+            agent_state=execution.agent_state.value,
+            history=self._llm_client.history,
+            pending_messages=messages,
+            total_tokens=execution.total_tokens,
+            provider=self._model_config.model_provider.provider,
+            model=self._model_config.model,
+            trajectory_file=self._trajectory_recorder.get_trajectory_path()
+            if self._trajectory_recorder
+            else None,
+            tool_sessions=tool_sessions,
+        )
+        try:
+            checkpoint.save(self._checkpoint_file)
+        except OSError as e:
+            print(f"Warning: Failed to save checkpoint to {self._checkpoint_file}: {e}")
 
     def reflect_on_result(self, tool_results: list[ToolResult]) -> str | None:
         """Reflect on tool execution result. Override for custom reflection logic."""
@@ -235,7 +365,10 @@ class BaseAgent(ABC):
         self, step: AgentStep | None = None, agent_execution: AgentExecution | None = None
     ) -> None:
         if self.cli_console:
+            console_start_time = time.perf_counter()
             self.cli_console.update_status(step, agent_execution)
+            if step:
+                step.timing.console += time.perf_counter() - console_start_time
 
     def _update_llm_usage(self, llm_response: LLMResponse, execution: AgentExecution):
         if not llm_response.usage:
@@ -249,6 +382,7 @@ class BaseAgent(ABC):
 
     def _record_handler(self, step: AgentStep, messages: list[LLMMessage]) -> None:
         if self.trajectory_recorder:
+            result_cache = self._tool_caller.result_cache
             self.trajectory_recorder.record_agent_step(
                 step_number=step.step_number,
                 state=step.state.value,
@@ -258,6 +392,9 @@ class BaseAgent(ABC):
                 tool_results=step.tool_results,
                 reflection=step.reflection,
                 error=step.error,
+                time_to_first_token=step.time_to_first_token,
+                tool_cache_stats=result_cache.stats.to_dict() if result_cache else None,
+                llm_usage=step.llm_usage,
             )
 
     async def _tool_call_handler(
@@ -266,6 +403,7 @@ class BaseAgent(ABC):
         messages: list[LLMMessage] = []
         # 要求具体行动证明，必要有产出
         if not tool_calls or len(tool_calls) <= 0:
+            self._cancel_started_tool_calls()
             messages = [
                 LLMMessage(
                     role="user",
@@ -278,10 +416,15 @@ class BaseAgent(ABC):
         step.tool_calls = tool_calls
         self._update_cli_console(step)
 
+        tools_start_time = time.perf_counter()
         if self._model_config.parallel_tool_calls:
-            tool_results = await self._tool_caller.parallel_tool_call(tool_calls)
+            tool_results = await self._tool_caller.parallel_tool_call(
+                tool_calls, self._started_tool_calls
+            )
         else:
             tool_results = await self._tool_caller.sequential_tool_call(tool_calls)
+        step.timing.tools = time.perf_counter() - tools_start_time
+        self._cancel_started_tool_calls()
         step.tool_results = tool_results
         self._update_cli_console(step)
         for tool_result in tool_results:
@@ -289,7 +432,9 @@ class BaseAgent(ABC):
             message = LLMMessage(role="user", tool_result=tool_result)
             messages.append(message)
 
+        reflection_start_time = time.perf_counter()
         reflection = self.reflect_on_result(tool_results)
+        step.timing.reflection = time.perf_counter() - reflection_start_time
         if reflection:
             step.state = AgentStepState.REFLECTING
             step.reflection = reflection
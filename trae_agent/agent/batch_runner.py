@@ -0,0 +1,247 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""Run many agent tasks concurrently on a single event loop."""
+
+import asyncio
+import json
+import os
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from trae_agent.agent.agent import Agent, AgentType
+from trae_agent.agent.agent_basics import AgentState
+from trae_agent.tools.bash_tool import BashTool
+from trae_agent.utils.config import Config
+from trae_agent.utils.llm_clients.http_client import closing_http_pools
+
+
+@dataclass
+class BatchTask:
+    """A single task of a batch, read from one line of the tasks file."""
+
+    task_id: str
+    task: str
+    working_dir: str
+    must_patch: bool = False
+    base_commit: str | None = None
+
+
+@dataclass
+class BatchTaskResult:
+    """The outcome of one batch task."""
+
+    task_id: str
+    success: bool
+    steps: int
+    execution_time: float
+    trajectory_file: str
+    patch_file: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+    error: str | None = None
+
+
+@dataclass
+class BatchSummary:
+    """Throughput and failures of a whole batch."""
+
+    total: int
+    concurrency: int
+    wall_time: float
+    results: list[BatchTaskResult] = field(default_factory=list)
+
+    @property
+    def succeeded(self) -> int:
+        return sum(1 for result in self.results if result.success)
+
+    @property
+    def failed(self) -> int:
+        return self.total - self.succeeded
+
+    @property
+    def tasks_per_hour(self) -> float:
+        return self.total * 3600 / self.wall_time if self.wall_time > 0 else 0.0
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "total": self.total,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "concurrency": self.concurrency,
+            "wall_time": self.wall_time,
+            "tasks_per_hour": self.tasks_per_hour,
+            "total_input_tokens": sum(result.input_tokens for result in self.results),
+            "total_output_tokens": sum(result.output_tokens for result in self.results),
+            "failures": [
+                {"task_id": result.task_id, "error": result.error}
+                for result in self.results
+                if not result.success
+            ],
+            "results": [asdict(result) for result in self.results],
+        }
+
+
+def is_safe_task_id(task_id: str) -> bool:
+    """Whether the task id can name files in the output directory.
+
+    Ids name the trajectory and patch files of their task, so they must be a single,
+    non-empty path component: no separators and no `.` or `..`.
+    """
+    return task_id not in ("", ".", "..") and not any(c in task_id for c in "/\\\0")
+
+
+def load_batch_tasks(tasks_file: str) -> list[BatchTask]:
+    """Load tasks from a JSONL file.
+
+    Each line is an object with a `task` and an absolute `working_dir`, and optionally
+    an `id`, `must_patch` and `base_commit`. Tasks without an id are named by line number.
+    """
+    tasks: list[BatchTask] = []
+    seen_ids: set[str] = set()
+    with open(tasks_file, "r") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{tasks_file}:{line_number}: invalid JSON: {e}") from e
+            if not isinstance(entry, dict):
+                raise ValueError(f"{tasks_file}:{line_number}: expected a JSON object")
+            if not entry.get("task") or not entry.get("working_dir"):
+                raise ValueError(
+                    f"{tasks_file}:{line_number}: `task` and `working_dir` are required"
+                )
+            if not Path(entry["working_dir"]).is_absolute():
+                raise ValueError(
+                    f"{tasks_file}:{line_number}: working_dir must be an absolute path: {entry['working_dir']}"
+                )
+
+            task_id = str(entry.get("id", f"task_{line_number}"))
+            if not is_safe_task_id(task_id):
+                raise ValueError(
+                    f"{tasks_file}:{line_number}: task id must be a plain file name: {task_id!r}"
+                )
+            if task_id in seen_ids:
+                raise ValueError(f"{tasks_file}:{line_number}: duplicate task id: {task_id}")
+            seen_ids.add(task_id)
+
+            tasks.append(
+                BatchTask(
+                    task_id=task_id,
+                    task=str(entry["task"]),
+                    working_dir=str(entry["working_dir"]),
+                    must_patch=bool(entry.get("must_patch", False)),
+                    base_commit=entry.get("base_commit"),
+                )
+            )
+    return tasks
+
+
+class BatchRunner:
+    """Runs batch tasks with up to `concurrency` agents in flight at once.
+
+    Every task gets its own agent, bash session, trajectory file and patch file, while
+    the LLM clients of all agents share one HTTP connection pool.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        output_dir: str,
+        concurrency: int = 4,
+        agent_type: AgentType | str = AgentType.TraeAgent,
+        on_task_done: Callable[[BatchTaskResult], None] | None = None,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.config: Config = config
+        self.output_dir: str = output_dir
+        self.concurrency: int = concurrency
+        self.agent_type: AgentType | str = agent_type
+        self._on_task_done: Callable[[BatchTaskResult], None] | None = on_task_done
+
+    @property
+    def summary_file(self) -> str:
+        return os.path.join(self.output_dir, "summary.json")
+
+    async def run(self, tasks: list[BatchTask]) -> BatchSummary:
+        """Run all tasks and write the summary file."""
+        for task in tasks:
+            if not is_safe_task_id(task.task_id):
+                raise ValueError(f"task id must be a plain file name: {task.task_id!r}")
+        os.makedirs(self.output_dir, exist_ok=True)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        start_time = time.time()
+        async with closing_http_pools():
+            results = await asyncio.gather(*(self._run_task(task, semaphore) for task in tasks))
+        summary = BatchSummary(
+            total=len(tasks),
+            concurrency=self.concurrency,
+            wall_time=time.time() - start_time,
+            results=list(results),
+        )
+
+        with open(self.summary_file, "w", encoding="utf-8") as f:
+            json.dump(summary.to_dict(), f, indent=2, ensure_ascii=False)
+        return summary
+
+    async def _run_task(self, task: BatchTask, semaphore: asyncio.Semaphore) -> BatchTaskResult:
+        async with semaphore:
+            trajectory_file = os.path.join(self.output_dir, f"{task.task_id}.json")
+            patch_file = os.path.join(self.output_dir, f"{task.task_id}.patch")
+            task_args = {
+                "project_path": task.working_dir,
+                "issue": task.task,
+                "must_patch": "true" if task.must_patch else "false",
+                "patch_path": patch_file,
+            }
+            if task.base_commit:
+                task_args["base_commit"] = task.base_commit
+
+            start_time = time.time()
+            agent: Agent | None = None
+            try:
+                agent = Agent(self.agent_type, self.config, trajectory_file)
+                execution = await agent.run(task.task, task_args)
+                result = BatchTaskResult(
+                    task_id=task.task_id,
+                    success=execution.success,
+                    steps=len(execution.steps),
+                    execution_time=execution.execution_time,
+                    trajectory_file=trajectory_file,
+                    patch_file=patch_file,
+                    input_tokens=execution.total_tokens.input_tokens
+                    if execution.total_tokens
+                    else 0,
+                    output_tokens=execution.total_tokens.output_tokens
+                    if execution.total_tokens
+                    else 0,
+                    error=execution.final_result
+                    if execution.agent_state == AgentState.ERROR
+                    else None,
+                )
+            except Exception as e:
+                result = BatchTaskResult(
+                    task_id=task.task_id,
+                    success=False,
+                    steps=0,
+                    execution_time=time.time() - start_time,
+                    trajectory_file=trajectory_file,
+                    patch_file=patch_file,
+                    error=f"{type(e).__name__}: {e}",
+                )
+            finally:
+                if agent is not None:
+                    # Bash sessions outlive the task otherwise, one shell per finished task.
+                    for tool in agent.agent.tools:
+                        if isinstance(tool, BashTool):
+                            await tool.aclose()
+
+        if self._on_task_done:
+            self._on_task_done(result)
+        return result
@@ -0,0 +1,110 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""Step-level checkpoints that let an interrupted agent run continue where it stopped."""
+
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from trae_agent.tools.base import ToolCall, ToolResult
+from trae_agent.utils.llm_clients.llm_basics import LLMMessage, LLMUsage
+
+CHECKPOINT_VERSION = 1
+
+
+def serialize_message(message: LLMMessage) -> dict[str, Any]:
+    """Serialize an LLM message, dropping empty fields."""
+    return {key: value for key, value in asdict(message).items() if value is not None}
+
+
+def deserialize_message(data: dict[str, Any]) -> LLMMessage:
+    """Rebuild an LLM message written by `serialize_message`."""
+    return LLMMessage(
+        role=data["role"],
+        content=data.get("content"),
+        tool_call=ToolCall(**data["tool_call"]) if data.get("tool_call") else None,
+        tool_result=ToolResult(**data["tool_result"]) if data.get("tool_result") else None,
+    )
+
+
+@dataclass
+class AgentCheckpoint:
+    """The state of a run after its last completed step.
+
+    `history` is the provider-neutral conversation the LLM client holds, ending with the
+    last LLM response, and `pending_messages` are the messages the next step will send,
+    so resuming never repeats a completed LLM call.
+    """
+
+    task: str
+    task_args: dict[str, str]
+    step_number: int
+    agent_state: str
+    history: list[LLMMessage]
+    pending_messages: list[LLMMessage]
+    total_tokens: LLMUsage | None = None
+    provider: str = ""
+    model: str = ""
+    trajectory_file: str | None = None
+    tool_sessions: dict[str, dict[str, object]] = field(default_factory=dict)
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "version": CHECKPOINT_VERSION,
+            "task": self.task,
+            "task_args": self.task_args,
+            "step_number": self.step_number,
+            "agent_state": self.agent_state,
+            "history": [serialize_message(message) for message in self.history],
+            "pending_messages": [serialize_message(message) for message in self.pending_messages],
+            "total_tokens": asdict(self.total_tokens) if self.total_tokens else None,
+            "provider": self.provider,
+            "model": self.model,
+            "trajectory_file": self.trajectory_file,
+            "tool_sessions": self.tool_sessions,
+            "created_at": self.created_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "AgentCheckpoint":
+        if data.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version: {data.get('version')}")
+        return cls(
+            task=data["task"],
+            task_args=data["task_args"],
+            step_number=data["step_number"],
+            agent_state=data["agent_state"],
+            history=[deserialize_message(message) for message in data["history"]],
+            pending_messages=[deserialize_message(message) for message in data["pending_messages"]],
+            total_tokens=LLMUsage(**data["total_tokens"]) if data.get("total_tokens") else None,
+            provider=data.get("provider", ""),
+            model=data.get("model", ""),
+            trajectory_file=data.get("trajectory_file"),
+            tool_sessions=data.get("tool_sessions", {}),
+            created_at=data.get("created_at", ""),
+        )
+
+    def save(self, path: str | Path) -> None:
+        """Write the checkpoint, replacing the previous one atomically."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(path.name + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "AgentCheckpoint":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+def default_checkpoint_path(trajectory_file: str) -> str:
+    """Return the checkpoint path that accompanies a trajectory file."""
+    trajectory_path = Path(trajectory_file)
+    return str(trajectory_path.with_name(trajectory_path.stem + ".checkpoint.json"))
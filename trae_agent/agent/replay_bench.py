@@ -0,0 +1,207 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""Replay of a recorded trajectory, to measure the agent's own overhead per step.
+
+The LLM responses of the trajectory are fed back through `BaseAgent.execute_task`, which
+runs the real tools against a scratch copy of the project and does its usual history
+handling, trajectory and checkpoint writes and console updates. With no time spent
+waiting for a model, whatever a step takes beyond its tools is framework overhead.
+"""
+
+import io
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass, replace
+
+from rich.console import Console
+
+from trae_agent.agent.agent_basics import AgentExecution, AgentStep, LatencyStats
+from trae_agent.agent.trae_agent import TraeAgent
+from trae_agent.tools.bash_tool import BashTool
+from trae_agent.utils.cli.cli_console import ConsoleMode
+from trae_agent.utils.cli.simple_console import SimpleCLIConsole
+from trae_agent.utils.config import TraeAgentConfig
+from trae_agent.utils.llm_clients.llm_basics import LLMResponse
+from trae_agent.utils.llm_clients.replay_client import ReplayClient, load_recorded_responses
+from trae_agent.utils.trajectory_recorder import TrajectoryRecorder
+
+
+@dataclass
+class StepOverhead:
+    """Where the time of a replayed step went, in seconds."""
+
+    step_number: int
+    tools: float
+    history: float  # LLM client bookkeeping and parsing of the messages for the provider
+    recording: float  # trajectory and checkpoint writes
+    console: float
+    other: float
+
+    @property
+    def overhead(self) -> float:
+        """Time not spent running tools."""
+        return self.history + self.recording + self.console + self.other
+
+    @classmethod
+    def from_step(cls, step: AgentStep) -> "StepOverhead":
+        timing = step.timing
+        return cls(
+            step_number=step.step_number,
+            tools=timing.tools,
+            history=timing.llm,
+            recording=timing.recording,
+            console=timing.console,
+            other=max(
+                timing.total - timing.tools - timing.llm - timing.recording - timing.console, 0.0
+            ),
+        )
+
+    def to_dict(self) -> dict[str, float]:
+        return {
+            "step_number": self.step_number,
+            "tools": self.tools,
+            "history": self.history,
+            "recording": self.recording,
+            "console": self.console,
+            "other": self.other,
+            "overhead": self.overhead,
+        }
+
+
+@dataclass
+class ReplayReport:
+    """Per-step overhead of a trajectory replay."""
+
+    trajectory_file: str
+    recorded_steps: int
+    steps: list[StepOverhead]
+    completed: bool
+    parse_time: float  # seconds spent in the provider's message parsing, part of `history`
+
+    def overhead_stats(self) -> LatencyStats:
+        return LatencyStats.from_samples([step.overhead for step in self.steps])
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "trajectory_file": self.trajectory_file,
+            "recorded_steps": self.recorded_steps,
+            "replayed_steps": len(self.steps),
+            "completed": self.completed,
+            "parse_time": self.parse_time,
+            "overhead": self.overhead_stats().to_dict(),
+            "steps": [step.to_dict() for step in self.steps],
+        }
+
+
+def _rebase_arguments(value: object, recorded_path: str, project_path: str) -> object:
+    """Point the paths in tool call arguments at the scratch copy of the project."""
+    if isinstance(value, str):
+        return value.replace(recorded_path, project_path)
+    if isinstance(value, dict):
+        return {
+            key: _rebase_arguments(item, recorded_path, project_path)
+            for key, item in value.items()  # pyright: ignore[reportUnknownVariableType]
+        }
+    if isinstance(value, list):
+        return [_rebase_arguments(item, recorded_path, project_path) for item in value]  # pyright: ignore[reportUnknownVariableType]
+    return value
+
+
+def _rebase_responses(
+    responses: list[LLMResponse], recorded_path: str, project_path: str
+) -> list[LLMResponse]:
+    return [
+        replace(
+            response,
+            tool_calls=[
+                replace(
+                    tool_call,
+                    arguments=_rebase_arguments(tool_call.arguments, recorded_path, project_path),  # pyright: ignore[reportArgumentType]
+                )
+                for tool_call in response.tool_calls
+            ]
+            if response.tool_calls
+            else None,
+        )
+        for response in responses
+    ]
+
+
+def _create_console() -> SimpleCLIConsole:
+    """A console that renders every step as in a real run, into a discarded buffer."""
+    cli_console = SimpleCLIConsole(ConsoleMode.RUN)
+    cli_console.console = Console(file=io.StringIO(), force_terminal=True, width=120)
+    return cli_console
+
+
+async def replay_trajectory(
+    trajectory_file: str,
+    config: TraeAgentConfig,
+    project_path: str | None = None,
+    recorded_project_path: str | None = None,
+    render_console: bool = True,
+) -> ReplayReport:
+    """Replay the trajectory with the agent of the config and report its overhead per step.
+
+    Args:
+        trajectory_file: Trajectory written by `TrajectoryRecorder`
+        config: Agent configuration; its model's provider only parses the messages
+        project_path: Checkout to copy and run the tools in; an empty directory if not given
+        recorded_project_path: Project path of the recorded run, which the tool call arguments
+            refer to; defaults to project_path
+        render_console: Render every step with the simple console, as `trae-cli run` does
+    """
+    with open(trajectory_file, encoding="utf-8") as f:
+        trajectory = json.load(f)
+    responses = load_recorded_responses(trajectory)
+
+    with tempfile.TemporaryDirectory(prefix="trae-replay-") as scratch_dir:
+        scratch_project = os.path.join(scratch_dir, "project")
+        if project_path:
+            _ = shutil.copytree(project_path, scratch_project, symlinks=True)
+        else:
+            os.makedirs(scratch_project)
+        recorded_project_path = recorded_project_path or project_path
+        if recorded_project_path:
+            responses = _rebase_responses(
+                responses, os.path.abspath(recorded_project_path), scratch_project
+            )
+
+        # The replay must reach every recorded response, and nothing else may answer it.
+        model_config = replace(
+            config.model,
+            fallback_models=[],
+            hedge_percentile=None,
+            response_cache=None,
+            rate_limit=None,
+        )
+        agent = TraeAgent(replace(config, model=model_config, max_steps=max(len(responses), 1)))
+        replay_client = ReplayClient(model_config, responses, agent.llm_client.client)
+        agent.llm_client.client = replay_client
+        agent.set_trajectory_recorder(
+            TrajectoryRecorder(os.path.join(scratch_dir, "trajectory.json"))
+        )
+        agent.set_checkpoint_file(os.path.join(scratch_dir, "checkpoint.json"))
+        if render_console:
+            agent.set_cli_console(_create_console())
+
+        task = trajectory.get("task") or ""
+        agent.new_task(task, {"project_path": scratch_project, "issue": task})
+        try:
+            execution: AgentExecution = await agent.execute_task()
+        finally:
+            # The bash session would otherwise keep running in the deleted scratch directory.
+            for tool in agent.tools:
+                if isinstance(tool, BashTool):
+                    await tool.aclose()
+
+    return ReplayReport(
+        trajectory_file=trajectory_file,
+        recorded_steps=len(responses),
+        steps=[StepOverhead.from_step(step) for step in execution.steps],
+        completed=execution.success,
+        parse_time=replay_client.parse_time,
+    )
@@ -14,7 +14,11 @@ from trae_agent.agent.base_agent import BaseAgent
 from trae_agent.prompt.agent_prompt import TRAE_AGENT_SYSTEM_PROMPT
 from trae_agent.tools import tools_registry
 from trae_agent.tools.base import Tool, ToolExecutor, ToolResult
+from trae_agent.tools.bash_tool import BashTool
+from trae_agent.tools.tool_cache import ToolResultCache
+from trae_agent.tools.worker_pool import get_tool_worker_pool
 from trae_agent.utils.config import MCPServerConfig, TraeAgentConfig
+from trae_agent.utils.llm_clients.key_pool import collect_endpoint_usage
 from trae_agent.utils.llm_clients.llm_basics import LLMMessage, LLMResponse
 from trae_agent.utils.mcp_client import MCPClient
 
@@ -108,7 +112,11 @@ class TraeAgent(BaseAgent):
             self._tools: list[Tool] = [
                 tools_registry[tool_name](model_provider=provider) for tool_name in tool_names
             ]
-        self._tool_caller: ToolExecutor = ToolExecutor(self._tools)
+        self._tool_caller: ToolExecutor = ToolExecutor(
+            self._tools,
+            ToolResultCache(),
+            get_tool_worker_pool(self._tool_workers.pool, self._tool_workers.max_workers),
+        )
 
         self._initial_messages: list[LLMMessage] = []
         self._initial_messages.append(LLMMessage(role="system", content=self.get_system_prompt()))
@@ -119,7 +127,13 @@ class TraeAgent(BaseAgent):
         if "project_path" not in extra_args:
             raise AgentError("Project path is required")
 
+        self._task_args = dict(extra_args)
         self.project_path = extra_args.get("project_path", "")
+        for tool in self._tools:
+            if isinstance(tool, BashTool):
+                tool.set_working_dir(
+                    self.project_path if os.path.isdir(self.project_path) else None
+                )
         # user_message += f"[Project root path]:\n{self.project_path}\n\n"
         user_message += f"[项目根目录]:\n{self.project_path}\n\n"
 
@@ -145,12 +159,17 @@ class TraeAgent(BaseAgent):
     @override
     async def execute_task(self) -> AgentExecution:
         """Execute the task and finalize trajectory recording."""
-        execution = await super().execute_task()
+        # Only this task's requests, as other agents of the process may share the pools.
+        with collect_endpoint_usage() as endpoint_usage:
+            execution = await super().execute_task()
 
         # Finalize trajectory recording if recorder is available
         if self._trajectory_recorder:
             self._trajectory_recorder.finalize_recording(
-                success=execution.success, final_result=execution.final_result
+                success=execution.success,
+                final_result=execution.final_result,
+                latency_summary=execution.latency_summary(),
+                endpoint_usage=endpoint_usage.stats(),
             )
 
         if self.patch_path is not None:
@@ -169,21 +188,21 @@ class TraeAgent(BaseAgent):
 
     def get_git_diff(self) -> str:
         """Get the git diff of the project."""
-        pwd = os.getcwd()
         if not os.path.isdir(self.project_path):
             return ""
-        os.chdir(self.project_path)
+        # Run git in the project directory rather than chdir-ing, so that
+        # agents sharing a process do not race on the working directory.
         try:
             if not self.base_commit:
-                stdout = subprocess.check_output(["git", "--no-pager", "diff"]).decode()
+                stdout = subprocess.check_output(
+                    ["git", "--no-pager", "diff"], cwd=self.project_path
+                ).decode()
             else:
                 stdout = subprocess.check_output(
-                    ["git", "--no-pager", "diff", self.base_commit, "HEAD"]
+                    ["git", "--no-pager", "diff", self.base_commit, "HEAD"], cwd=self.project_path
                 ).decode()
         except (subprocess.CalledProcessError, FileNotFoundError):
             stdout = ""
-        finally:
-            os.chdir(pwd)
         return stdout
 
     # Copyright (c) 2024 paul-gauthier
@@ -4,6 +4,7 @@
 """Command Line Interface for Trae Agent."""
 
 import asyncio
+import json
 import os
 import sys
 import traceback
@@ -16,8 +17,18 @@ from rich.panel import Panel
 from rich.table import Table
 
 from trae_agent.agent import Agent
+from trae_agent.agent.agent_basics import AgentState
+from trae_agent.agent.batch_runner import BatchRunner, BatchTaskResult, load_batch_tasks
+from trae_agent.agent.checkpoint import AgentCheckpoint
+from trae_agent.agent.replay_bench import replay_trajectory
 from trae_agent.utils.cli import CLIConsole, ConsoleFactory, ConsoleMode, ConsoleType
 from trae_agent.utils.config import Config, TraeAgentConfig
+from trae_agent.utils.llm_clients.mock_server import (
+    DEFAULT_PORT,
+    LatencyModel,
+    MockLLMServer,
+    MockScript,
+)
 
 # Load environment variables
 _ = load_dotenv()
@@ -86,10 +97,16 @@ def cli():
     help="Type of agent to use (trae_agent)",
     default="trae_agent",
 )
+@click.option(
+    "--resume",
+    "resume_path",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Continue an interrupted run from its checkpoint file",
+)
 def run(
     task: str | None,
     file_path: str | None,
-    patch_path: str,
+    patch_path: str | None,
     provider: str | None = None,
     model: str | None = None,
     model_base_url: str | None = None,
@@ -101,6 +118,7 @@ def run(
     trajectory_file: str | None = None,
     console_type: str | None = "simple",
     agent_type: str | None = "trae_agent",
+    resume_path: str | None = None,
 ):
     """
     Run is the main function of tace. it runs a task using Trae Agent.
@@ -108,6 +126,8 @@ def run(
         tasks: the task that you want your agent to solve. This is required to be in the input
         model: the model expected to be use
         working_dir: the working directory of the agent. This should be set either in cli or in the config file
+        resume_path: a checkpoint written by an earlier run; its task, working directory,
+            trajectory and patch path are reused unless given explicitly
 
     Return:
         None (it is expected to be ended after calling the run function)
@@ -116,7 +136,28 @@ def run(
     # Apply backward compatibility for config file
     config_file = resolve_config_file(config_file)
 
-    if file_path:
+    checkpoint: AgentCheckpoint | None = None
+    if resume_path:
+        if task or file_path:
+            console.print("[red]Error: Cannot use a task together with --resume.[/red]")
+            sys.exit(1)
+        try:
+            checkpoint = AgentCheckpoint.load(resume_path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            console.print(f"[red]Error: Invalid checkpoint file {resume_path}: {e}[/red]")
+            sys.exit(1)
+        if checkpoint.agent_state == AgentState.COMPLETED.value:
+            console.print(f"[green]The run in {resume_path} has already completed.[/green]")
+            return
+        task = checkpoint.task
+        working_dir = working_dir or checkpoint.task_args.get("project_path")
+        patch_path = patch_path or checkpoint.task_args.get("patch_path")
+        must_patch = must_patch or checkpoint.task_args.get("must_patch") == "true"
+        trajectory_file = trajectory_file or checkpoint.trajectory_file
+        console.print(
+            f"[blue]Resuming from step {checkpoint.step_number} of checkpoint {resume_path}[/blue]"
+        )
+    elif file_path:
         if task:
             console.print(
                 "[red]Error: Cannot use both a task string and the --file argument.[/red]"
@@ -164,7 +205,7 @@ def run(
     if selected_console_type == ConsoleType.RICH and hasattr(cli_console, "set_initial_task"):
         cli_console.set_initial_task(task)
 
-    agent = Agent(agent_type, config, trajectory_file, cli_console)
+    agent = Agent(agent_type, config, trajectory_file, cli_console, checkpoint_file=resume_path)
 
     # Change working directory if specified
     if working_dir:
@@ -191,19 +232,26 @@ def run(
             "must_patch": "true" if must_patch else "false",
             "patch_path": patch_path,
         }
+        if checkpoint and "base_commit" in checkpoint.task_args:
+            task_args["base_commit"] = checkpoint.task_args["base_commit"]
 
         # Set up agent context for rich console if applicable
         if selected_console_type == ConsoleType.RICH and hasattr(cli_console, "set_agent_context"):
             cli_console.set_agent_context(agent, config.trae_agent, config_file, trajectory_file)
 
         # Agent will handle starting the appropriate console
-        _ = asyncio.run(agent.run(task, task_args))
+        execution = asyncio.run(agent.run(task, task_args, checkpoint=checkpoint))
 
         console.print(f"\n[green]Trajectory saved to: {agent.trajectory_file}[/green]")
+        if execution.agent_state == AgentState.ERROR:
+            console.print(
+                f"[blue]Resume with: trae-cli run --resume {agent.checkpoint_file}[/blue]"
+            )
 
     except KeyboardInterrupt:
         console.print("\n[yellow]Task execution interrupted by user[/yellow]")
         console.print(f"[blue]Partial trajectory saved to: {agent.trajectory_file}[/blue]")
+        console.print(f"[blue]Resume with: trae-cli run --resume {agent.checkpoint_file}[/blue]")
         sys.exit(1)
     except Exception as e:
         console.print(f"\n[red]Unexpected error: {e}[/red]")
@@ -212,6 +260,117 @@ def run(
         sys.exit(1)
 
 
+@cli.command()
+@click.argument("tasks_file", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--concurrency",
+    "-n",
+    default=4,
+    type=click.IntRange(min=1),
+    help="Number of agents run at once",
+)
+@click.option(
+    "--output-dir",
+    "-o",
+    default="batch_results",
+    help="Directory for trajectories, patches and the summary",
+)
+@click.option("--provider", "-p", help="LLM provider to use")
+@click.option("--model", "-m", help="Specific model to use")
+@click.option("--model-base-url", help="Base URL for the model API")
+@click.option("--api-key", "-k", help="API key (or set via environment variable)")
+@click.option("--max-steps", help="Maximum number of execution steps", type=int)
+@click.option(
+    "--config-file",
+    help="Path to configuration file",
+    default="trae_config.yaml",
+    envvar="TRAE_CONFIG_FILE",
+)
+@click.option(
+    "--agent-type",
+    "-at",
+    type=click.Choice(["trae_agent"], case_sensitive=False),
+    help="Type of agent to use (trae_agent)",
+    default="trae_agent",
+)
+def batch(
+    tasks_file: str,
+    concurrency: int = 4,
+    output_dir: str = "batch_results",
+    provider: str | None = None,
+    model: str | None = None,
+    model_base_url: str | None = None,
+    api_key: str | None = None,
+    max_steps: int | None = None,
+    config_file: str = "trae_config.yaml",
+    agent_type: str = "trae_agent",
+):
+    """
+    Run every task of a JSONL file, with up to --concurrency agents at once in this process.
+
+    Each line is an object with a `task` and an absolute `working_dir`, and optionally an
+    `id`, `must_patch` and `base_commit`. Trajectories and patches are written to the output
+    directory as <id>.json and <id>.patch, together with a summary.json.
+    """
+    config_file = resolve_config_file(config_file)
+
+    try:
+        tasks = load_batch_tasks(tasks_file)
+    except ValueError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        sys.exit(1)
+    if not tasks:
+        console.print(f"[yellow]No tasks found in {tasks_file}[/yellow]")
+        return
+
+    config = Config.create(
+        config_file=config_file,
+    ).resolve_config_values(
+        provider=provider,
+        model=model,
+        model_base_url=model_base_url,
+        api_key=api_key,
+        max_steps=max_steps,
+    )
+
+    def print_task_result(result: BatchTaskResult):
+        status = "[green]✅ succeeded[/green]" if result.success else "[red]❌ failed[/red]"
+        message = (
+            f"{result.task_id}: {status} in {result.execution_time:.1f}s ({result.steps} steps)"
+        )
+        if result.error:
+            message += f" - {result.error}"
+        console.print(message)
+
+    console.print(
+        f"[blue]Running {len(tasks)} tasks with concurrency {concurrency}, "
+        f"writing results to {output_dir}[/blue]"
+    )
+    runner = BatchRunner(
+        config,
+        output_dir,
+        concurrency=concurrency,
+        agent_type=agent_type,
+        on_task_done=print_task_result,
+    )
+    try:
+        summary = asyncio.run(runner.run(tasks))
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Batch interrupted by user[/yellow]")
+        sys.exit(1)
+
+    summary_table = Table(title="Batch Summary", show_header=False)
+    summary_table.add_column("Metric", style="cyan")
+    summary_table.add_column("Value", style="green")
+    summary_table.add_row("Tasks", str(summary.total))
+    summary_table.add_row("Succeeded", str(summary.succeeded))
+    summary_table.add_row("Failed", str(summary.failed))
+    summary_table.add_row("Wall Time", f"{summary.wall_time:.2f}s")
+    summary_table.add_row("Throughput", f"{summary.tasks_per_hour:.1f} tasks/hour")
+    console.print(summary_table)
+    console.print(f"[green]Summary saved to: {runner.summary_file}[/green]")
+
+
 @cli.command()
 @click.option("--provider", "-p", help="LLM provider to use")
 @click.option("--model", "-m", help="Specific model to use")
@@ -498,6 +657,184 @@ Using default settings and environment variables.""",
     console.print(provider_table)
 
 
+@cli.command("mock-server")
+@click.option("--host", default="127.0.0.1", help="Address to listen on")
+@click.option("--port", default=DEFAULT_PORT, type=int, help="Port to listen on")
+@click.option(
+    "--script",
+    type=click.Path(exists=True, dir_okay=False),
+    help="JSON list of turns to reply with, each with `content` and `tool_calls`",
+)
+@click.option(
+    "--steps",
+    default=5,
+    type=click.IntRange(min=1),
+    help="Length of the synthesized bash-then-task_done script, without --script",
+)
+@click.option(
+    "--latency",
+    default="fixed:0",
+    help="Latency distribution: fixed:S, uniform:LOW,HIGH or lognormal:MEDIAN,SIGMA",
+)
+@click.option(
+    "--rate-limit-rate",
+    default=0.0,
+    type=click.FloatRange(0, 1),
+    help="Share of requests answered with 429",
+)
+@click.option(
+    "--error-rate", default=0.0, type=click.FloatRange(0, 1), help="Share answered with 500"
+)
+@click.option("--retry-after", default=1.0, type=float, help="Retry-After of the 429 answers")
+@click.option("--seed", type=int, help="Seed of the latency and error draws")
+def mock_server(
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_PORT,
+    script: str | None = None,
+    steps: int = 5,
+    latency: str = "fixed:0",
+    rate_limit_rate: float = 0.0,
+    error_rate: float = 0.0,
+    retry_after: float = 1.0,
+    seed: int | None = None,
+):
+    """
+    Serve scripted OpenAI- and Anthropic-compatible responses for load tests.
+
+    Point a model at it with the `mock` provider (OpenAI chat completions at
+    http://127.0.0.1:8765/v1 by default), or with the `anthropic` provider and this
+    server's address as base_url.
+    """
+    try:
+        latency_model = LatencyModel.parse(latency)
+    except ValueError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        sys.exit(1)
+
+    server = MockLLMServer(
+        script=MockScript.load(script) if script else MockScript.synthesize(steps),
+        latency=latency_model,
+        rate_limit_rate=rate_limit_rate,
+        error_rate=error_rate,
+        retry_after=retry_after,
+        host=host,
+        port=port,
+        seed=seed,
+    )
+    console.print(f"[blue]Mock LLM server listening on {server.base_url}[/blue]")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        stats = server.stats
+        console.print(
+            f"\n[yellow]Served {stats.requests} requests "
+            f"({stats.rate_limited} rate limited, {stats.server_errors} errors)[/yellow]"
+        )
+
+
+@cli.group()
+def bench():
+    """Benchmarks of the agent framework."""
+    pass
+
+
+@bench.command("replay")
+@click.argument("trajectory_file", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--project",
+    "project_path",
+    type=click.Path(exists=True, file_okay=False),
+    help="Checkout to copy and run the tools in; an empty directory if not given",
+)
+@click.option(
+    "--recorded-path",
+    help="Project path of the recorded run, if not --project; its paths in tool calls are "
+    "rewritten to the scratch copy",
+)
+@click.option(
+    "--config-file",
+    help="Path to configuration file",
+    default="trae_config.yaml",
+    envvar="TRAE_CONFIG_FILE",
+)
+@click.option("--no-console", is_flag=True, help="Do not render the steps to a console")
+@click.option(
+    "--max-overhead",
+    type=float,
+    help="Fail when the p95 per-step overhead exceeds this many milliseconds",
+)
+@click.option("--output", "-o", help="Write the report to this JSON file")
+def bench_replay(
+    trajectory_file: str,
+    project_path: str | None = None,
+    recorded_path: str | None = None,
+    config_file: str = "trae_config.yaml",
+    no_console: bool = False,
+    max_overhead: float | None = None,
+    output: str | None = None,
+):
+    """
+    Replay a trajectory and report the agent's overhead per step.
+
+    The recorded LLM responses are fed back to the agent, which runs the real tools against
+    a scratch copy of the project. The time a step takes beyond its tools is split into
+    history handling, trajectory and checkpoint writes, console rendering and the rest.
+    """
+    config_file = resolve_config_file(config_file)
+    config = Config.create(config_file=config_file)
+    if config.trae_agent is None:
+        console.print("[red]Error: trae_agent configuration is required.[/red]")
+        sys.exit(1)
+
+    report = asyncio.run(
+        replay_trajectory(
+            trajectory_file,
+            config.trae_agent,
+            project_path=os.path.abspath(project_path) if project_path else None,
+            recorded_project_path=recorded_path,
+            render_console=not no_console,
+        )
+    )
+
+    steps_table = Table(title=f"Replay of {trajectory_file} (ms)")
+    for column in ("Step", "Tools", "History", "Recording", "Console", "Other", "Overhead"):
+        steps_table.add_column(column, justify="right")
+    for step in report.steps:
+        steps_table.add_row(
+            str(step.step_number),
+            *(
+                f"{seconds * 1000:.1f}"
+                for seconds in (
+                    step.tools,
+                    step.history,
+                    step.recording,
+                    step.console,
+                    step.other,
+                    step.overhead,
+                )
+            ),
+        )
+    console.print(steps_table)
+
+    stats = report.overhead_stats()
+    console.print(
+        f"Replayed {len(report.steps)} of {report.recorded_steps} steps "
+        f"({'completed' if report.completed else 'not completed'}). Overhead per step: "
+        f"p50 {stats.p50 * 1000:.1f}ms, p95 {stats.p95 * 1000:.1f}ms, "
+        f"total {stats.total * 1000:.1f}ms"
+    )
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report.to_dict(), f, indent=2)
+        console.print(f"[green]Report saved to: {output}[/green]")
+    if max_overhead is not None and stats.p95 * 1000 > max_overhead:
+        console.print(
+            f"[red]p95 overhead per step of {stats.p95 * 1000:.1f}ms exceeds "
+            f"{max_overhead:.1f}ms[/red]"
+        )
+        sys.exit(1)
+
+
 @cli.command()
 def tools():
     """Show available tools and their descriptions."""
@@ -4,10 +4,16 @@
 """Base classes for tools and tool calling."""
 
 import asyncio
+import os
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import Executor
 from dataclasses import dataclass, field
 from functools import cached_property
-from typing import TypeAlias, override
+from typing import TYPE_CHECKING, TypeAlias, override
+
+if TYPE_CHECKING:
+    from trae_agent.tools.tool_cache import ToolResultCache
 
 ParamSchemaValue: TypeAlias = str | list[str] | bool | dict[str, object]
 Property: TypeAlias = dict[str, ParamSchemaValue]
@@ -40,6 +46,42 @@ class ToolResult:
     result: str | None = None
     error: str | None = None
     id: str | None = None  # OpenAI-specific field
+    duration: float | None = None  # seconds spent executing the call
+
+
+def paths_overlap(path: str, other: str) -> bool:
+    """Whether one normalized path is the other or lies inside it."""
+    return path == other or path.startswith(other + os.sep) or other.startswith(path + os.sep)
+
+
+@dataclass(frozen=True)
+class ResourceFootprint:
+    """The resources a tool call reads and writes, used to decide which calls may overlap.
+
+    Two calls conflict if either writes a path the other reads or writes, if they share
+    an exclusive session, or if either may write anything at all.
+    """
+
+    reads: frozenset[str] = frozenset()
+    writes: frozenset[str] = frozenset()
+    sessions: frozenset[str] = frozenset()  # exclusive resources, such as a shell session
+    reads_all: bool = False
+    writes_all: bool = False
+
+    def conflicts_with(self, other: "ResourceFootprint") -> bool:
+        if self.writes_all or other.writes_all:
+            return True
+        if self.sessions & other.sessions:
+            return True
+        if (self.reads_all and other.writes) or (other.reads_all and self.writes):
+            return True
+        return _any_overlap(self.writes, other.reads | other.writes) or _any_overlap(
+            other.writes, self.reads
+        )
+
+
+def _any_overlap(paths: frozenset[str], others: frozenset[str]) -> bool:
+    return any(paths_overlap(path, other) for path in paths for other in others)
 
 
 ToolCallArguments = dict[str, str | int | float | dict[str, object] | list[object] | None]
@@ -117,6 +159,44 @@ class Tool(ABC):
         """Execute the tool with given parameters."""
         pass
 
+    def is_read_only(self, arguments: ToolCallArguments) -> bool:  # pyright: ignore[reportUnusedParameter]
+        """Whether a call with these arguments leaves the environment unchanged.
+
+        Read-only calls may be started early and run alongside other calls. Tools are assumed
+        to have side effects unless they say otherwise.
+        """
+        return False
+
+    def get_accessed_paths(self, arguments: ToolCallArguments) -> list[str] | None:  # pyright: ignore[reportUnusedParameter]
+        """The files or directories a call with these arguments reads or writes.
+
+        None means unknown: results of such calls are never cached, and if the call has
+        side effects it invalidates every cached result.
+        """
+        return None
+
+    def get_resource_footprint(self, arguments: ToolCallArguments) -> ResourceFootprint:
+        """The resources a call with these arguments uses, for scheduling parallel calls.
+
+        Derived from `is_read_only` and `get_accessed_paths` by default. Calls without
+        known paths are assumed to read, or write, everything.
+        """
+        paths = self.get_accessed_paths(arguments)
+        read_only = self.is_read_only(arguments)
+        if paths is None:
+            return ResourceFootprint(reads_all=read_only, writes_all=not read_only)
+        normalized = frozenset(os.path.normpath(path) for path in paths)
+        if read_only:
+            return ResourceFootprint(reads=normalized)
+        return ResourceFootprint(writes=normalized)
+
+    def get_session_metadata(self) -> dict[str, object] | None:
+        """Describe the session state this tool keeps between calls, for checkpoints.
+
+        Session state such as a running shell cannot be restored, so this is informational.
+        """
+        return None
+
     def json_definition(self) -> dict[str, object]:
         return {
             "name": self.name,
@@ -175,12 +255,41 @@ class Tool(ABC):
         return schema
 
 
+class BlockingTool(Tool):
+    """A tool whose work is synchronous: file I/O, parsing or database queries.
+
+    Such work blocks the event loop when run inline, so `ToolExecutor` runs
+    `execute_blocking` on its worker pool when it has one. With a process pool the tool
+    and its arguments are pickled for every call.
+    """
+
+    @abstractmethod
+    def execute_blocking(self, arguments: ToolCallArguments) -> ToolExecResult:
+        """Execute the tool with given parameters, blocking until it is done."""
+        pass
+
+    @override
+    async def execute(self, arguments: ToolCallArguments) -> ToolExecResult:
+        return self.execute_blocking(arguments)
+
+
 class ToolExecutor:
     """Tool executor that manages tool execution."""
 
-    def __init__(self, tools: list[Tool]):
+    def __init__(
+        self,
+        tools: list[Tool],
+        result_cache: "ToolResultCache | None" = None,
+        worker_pool: Executor | None = None,
+    ):
         self._tools = tools
         self._tool_map: dict[str, Tool] | None = None
+        self._result_cache = result_cache
+        self._worker_pool = worker_pool
+
+    @property
+    def result_cache(self) -> "ToolResultCache | None":
+        return self._result_cache
 
     def _normalize_name(self, name: str) -> str:
         """Normalize tool name by making it lowercase and removing underscores."""
@@ -205,29 +314,119 @@ class ToolExecutor:
             )
 
         tool = self.tools[normalized_name]
-
+        start_time = time.perf_counter()
+        if self._result_cache is not None:
+            tool_exec_result = await self._execute_with_cache(tool, tool_call, self._result_cache)
+        else:
+            tool_exec_result = await self._execute(tool, tool_call)
+        tool_result = self._to_tool_result(tool_call, tool_exec_result)
+        tool_result.duration = time.perf_counter() - start_time
+        return tool_result
+
+    async def _execute(self, tool: Tool, tool_call: ToolCall) -> ToolExecResult:
         try:
-            tool_exec_result = await tool.execute(tool_call.arguments)
-            return ToolResult(
-                name=tool_call.name,
-                success=tool_exec_result.error_code == 0,
-                result=tool_exec_result.output,
-                error=tool_exec_result.error,
-                call_id=tool_call.call_id,
-                id=tool_call.id,
-            )
+            if self._worker_pool is not None and isinstance(tool, BlockingTool):
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    self._worker_pool, tool.execute_blocking, tool_call.arguments
+                )
+            return await tool.execute(tool_call.arguments)
         except Exception as e:
-            return ToolResult(
-                name=tool_call.name,
-                success=False,
-                error=f"Error executing tool '{tool_call.name}': {str(e)}",
-                call_id=tool_call.call_id,
-                id=tool_call.id,
+            return ToolExecResult(
+                error=f"Error executing tool '{tool_call.name}': {str(e)}", error_code=-1
             )
 
-    async def parallel_tool_call(self, tool_calls: list[ToolCall]) -> list[ToolResult]:
-        """Execute tool calls in parallel"""
-        return await asyncio.gather(*[self.execute_tool_call(call) for call in tool_calls])
+    async def _execute_with_cache(
+        self, tool: Tool, tool_call: ToolCall, cache: "ToolResultCache"
+    ) -> ToolExecResult:
+        """Serve read-only calls from the cache, and invalidate it after other calls."""
+        paths = tool.get_accessed_paths(tool_call.arguments)
+        if paths is not None:
+            paths = cache.normalize_paths(paths)
+
+        if not tool.is_read_only(tool_call.arguments):
+            try:
+                return await self._execute(tool, tool_call)
+            finally:
+                cache.invalidate(paths)
+
+        if paths is None:
+            return await self._execute(tool, tool_call)
+
+        key = cache.make_key(tool.name, tool_call.arguments)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+        states = cache.snapshot(paths)
+        tool_exec_result = await self._execute(tool, tool_call)
+        if tool_exec_result.error_code == 0:
+            cache.put(key, paths, states, tool_exec_result)
+        return tool_exec_result
+
+    def _to_tool_result(self, tool_call: ToolCall, tool_exec_result: ToolExecResult) -> ToolResult:
+        return ToolResult(
+            name=tool_call.name,
+            success=tool_exec_result.error_code == 0,
+            result=tool_exec_result.output,
+            error=tool_exec_result.error,
+            call_id=tool_call.call_id,
+            id=tool_call.id,
+        )
+
+    def is_read_only(self, tool_call: ToolCall) -> bool:
+        """Whether a tool call leaves the environment unchanged. Unknown tools are not."""
+        tool = self.tools.get(self._normalize_name(tool_call.name))
+        return tool is not None and tool.is_read_only(tool_call.arguments)
+
+    def start_tool_call(self, tool_call: ToolCall) -> asyncio.Task[ToolResult]:
+        """Start executing a tool call in the background."""
+        return asyncio.create_task(self.execute_tool_call(tool_call))
+
+    def get_resource_footprint(self, tool_call: ToolCall) -> ResourceFootprint:
+        """The resources a tool call uses. Unknown tools are assumed to use everything."""
+        tool = self.tools.get(self._normalize_name(tool_call.name))
+        if tool is None:
+            return ResourceFootprint(writes_all=True)
+        return tool.get_resource_footprint(tool_call.arguments)
+
+    async def parallel_tool_call(
+        self,
+        tool_calls: list[ToolCall],
+        started: dict[str, asyncio.Task[ToolResult]] | None = None,
+    ) -> list[ToolResult]:
+        """Execute tool calls in parallel where their resource footprints allow it.
+
+        Each call waits for the earlier calls it conflicts with, so conflicting calls run in
+        the order they were made while independent ones overlap. Results are returned in
+        the original order. Calls already in `started` are awaited, not rerun.
+        """
+        started = started or {}
+        footprints = [self.get_resource_footprint(call) for call in tool_calls]
+        tasks: list[asyncio.Task[ToolResult]] = []
+        for index, call in enumerate(tool_calls):
+            if call.call_id in started:
+                tasks.append(started[call.call_id])
+                continue
+            blockers = [
+                tasks[earlier]
+                for earlier in range(index)
+                if footprints[index].conflicts_with(footprints[earlier])
+            ]
+            tasks.append(asyncio.create_task(self._execute_after(blockers, call)))
+        try:
+            return list(await asyncio.gather(*tasks))
+        except BaseException:
+            for task in tasks:
+                _ = task.cancel()
+            raise
+
+    async def _execute_after(
+        self, blockers: list[asyncio.Task[ToolResult]], tool_call: ToolCall
+    ) -> ToolResult:
+        if blockers:
+            _ = await asyncio.wait(blockers)
+        return await self.execute_tool_call(tool_call)
 
     async def sequential_tool_call(self, tool_calls: list[ToolCall]) -> list[ToolResult]:
         """Execute tool calls in sequential"""
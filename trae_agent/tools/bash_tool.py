@@ -10,10 +10,18 @@
 # This modified file is released under the same license.
 
 import asyncio
+import contextlib
 import os
 from typing import override
 
-from trae_agent.tools.base import Tool, ToolCallArguments, ToolError, ToolExecResult, ToolParameter
+from trae_agent.tools.base import (
+    ResourceFootprint,
+    Tool,
+    ToolCallArguments,
+    ToolError,
+    ToolExecResult,
+    ToolParameter,
+)
 
 
 class _BashSession:
@@ -27,9 +35,10 @@ class _BashSession:
     _timeout: float = 120.0  # seconds
     _sentinel: str = ",,,,bash-command-exit-__ERROR_CODE__-banner,,,,"  # `__ERROR_CODE__` will be replaced by `$?` or `!errorlevel!` later
 
-    def __init__(self) -> None:
+    def __init__(self, cwd: str | None = None) -> None:
         self._started = False
         self._timed_out = False
+        self._cwd = cwd
         self._process: asyncio.subprocess.Process | None = None
 
     async def start(self) -> None:
@@ -46,6 +55,7 @@ class _BashSession:
                 stdin=asyncio.subprocess.PIPE,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
+                cwd=self._cwd,
                 preexec_fn=os.setsid,
             )
         else:
@@ -56,6 +66,7 @@ class _BashSession:
                 stdin=asyncio.subprocess.PIPE,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
+                cwd=self._cwd,
             )
 
         self._started = True
@@ -70,6 +81,16 @@ class _BashSession:
             return
         self._process.terminate()
 
+    async def stop_and_wait(self) -> None:
+        """Terminate the bash shell and wait for it to exit."""
+        self.stop()
+        if self._process is None:
+            return
+        # The shell only acts on the signal once it stops waiting for input.
+        if self._process.stdin:
+            self._process.stdin.close()
+        _ = await self._process.wait()
+
     async def run(self, command: str) -> ToolExecResult:
         """Execute a command in the bash shell."""
         if not self._started or self._process is None:
@@ -154,6 +175,34 @@ class BashTool(Tool):
     def __init__(self, model_provider: str | None = None):
         super().__init__(model_provider)
         self._session: _BashSession | None = None
+        self._working_dir: str | None = None
+
+    def set_working_dir(self, working_dir: str | None) -> None:
+        """Set the directory new bash sessions start in."""
+        self._working_dir = working_dir
+
+    @override
+    def get_resource_footprint(self, arguments: ToolCallArguments) -> ResourceFootprint:
+        # Commands can touch any file and all run in the one shell, one at a time.
+        return ResourceFootprint(writes_all=True, sessions=frozenset({"bash_session"}))
+
+    @override
+    def get_session_metadata(self) -> dict[str, object] | None:
+        return {"working_dir": self._working_dir, "session_started": self._session is not None}
+
+    def close(self) -> None:
+        """Terminate the bash session, if one was started."""
+        if self._session is not None:
+            with contextlib.suppress(ToolError):
+                self._session.stop()
+            self._session = None
+
+    async def aclose(self) -> None:
+        """Terminate the bash session, if one was started, and wait for the shell to exit."""
+        if self._session is not None:
+            with contextlib.suppress(ToolError):
+                await self._session.stop_and_wait()
+            self._session = None
 
     @override
     def get_model_provider(self) -> str | None:
@@ -200,14 +249,14 @@ class BashTool(Tool):
         if arguments.get("restart"):
             if self._session:
                 self._session.stop()
-            self._session = _BashSession()
+            self._session = _BashSession(self._working_dir)
             await self._session.start()
 
             return ToolExecResult(output="tool has been restarted.")
 
         if self._session is None:
             try:
-                self._session = _BashSession()
+                self._session = _BashSession(self._working_dir)
                 await self._session.start()
             except Exception as e:
                 return ToolExecResult(error=f"Error starting bash session: {e}", error_code=-1)
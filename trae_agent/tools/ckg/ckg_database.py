@@ -5,6 +5,7 @@ import hashlib
 import json
 import sqlite3
 import subprocess
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Literal
@@ -184,12 +185,17 @@ class CKGDatabase:
             with open(CKG_STORAGE_INFO_FILE, "w") as f:
                 json.dump(ckg_storage_info, f)
 
+        # Connections may be closed by another thread than the one that opened them, since
+        # the tool executor runs queries on its worker threads.
+        self._database_path: Path = database_path
+        self._thread_local: threading.local = threading.local()
+        self._query_connections: list[sqlite3.Connection] = []
         if database_path.exists():
             # reuse existing database
-            self._db_connection = sqlite3.connect(database_path)
+            self._db_connection = sqlite3.connect(database_path, check_same_thread=False)
         else:
             # create new database with tables and build the CKG
-            self._db_connection = sqlite3.connect(database_path)
+            self._db_connection = sqlite3.connect(database_path, check_same_thread=False)
             for sql in SQL_LIST.values():
                 self._db_connection.execute(sql)
             self._db_connection.commit()
@@ -197,6 +203,21 @@ class CKGDatabase:
 
     def __del__(self):
         self._db_connection.close()
+        for connection in self._query_connections:
+            connection.close()
+
+    def _query_connection(self) -> sqlite3.Connection:
+        """Return the connection queries from the calling thread use.
+
+        A sqlite connection must not be used by two threads at once, so every worker thread
+        queries through its own connection.
+        """
+        connection: sqlite3.Connection | None = getattr(self._thread_local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self._database_path, check_same_thread=False)
+            self._thread_local.connection = connection
+            self._query_connections.append(connection)
+        return connection
 
     def update(self):
         """Update the CKG database."""
@@ -657,7 +678,8 @@ class CKGDatabase:
         Returns:
             a list of function entries
         """
-        records = self._db_connection.execute(
+        connection = self._query_connection()
+        records = connection.execute(
             """SELECT name, file_path, body, start_line, end_line, parent_function, parent_class FROM functions WHERE name = ?""",
             (identifier,),
         ).fetchall()
@@ -702,7 +724,8 @@ class CKGDatabase:
         Returns:
             a list of class entries
         """
-        records = self._db_connection.execute(
+        connection = self._query_connection()
+        records = connection.execute(
             """SELECT name, file_path, body, fields, methods, start_line, end_line FROM classes WHERE name = ?""",
             (identifier,),
         ).fetchall()
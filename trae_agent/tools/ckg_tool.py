@@ -1,17 +1,18 @@
 # Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import threading
 from pathlib import Path
 from typing import override
 
-from trae_agent.tools.base import Tool, ToolCallArguments, ToolExecResult, ToolParameter
+from trae_agent.tools.base import BlockingTool, ToolCallArguments, ToolExecResult, ToolParameter
 from trae_agent.tools.ckg.ckg_database import CKGDatabase
 from trae_agent.tools.run import MAX_RESPONSE_LEN
 
 CKGToolCommands = ["search_function", "search_class", "search_class_method"]
 
 
-class CKGTool(Tool):
+class CKGTool(BlockingTool):
     """Tool to construct and query the code knowledge graph of a codebase."""
 
     def __init__(self, model_provider: str | None = None) -> None:
@@ -25,6 +26,20 @@ class CKGTool(Tool):
         #     }
         # }
         self._ckg_databases: dict[Path, CKGDatabase] = {}
+        # Calls may run on worker threads; only one of them builds a missing database.
+        self._ckg_databases_lock: threading.Lock = threading.Lock()
+
+    def __getstate__(self) -> dict[str, object]:
+        # Database connections and locks cannot be sent to worker processes, which reopen
+        # the databases stored on disk instead.
+        state = self.__dict__.copy()
+        state["_ckg_databases"] = {}
+        del state["_ckg_databases_lock"]
+        return state
+
+    def __setstate__(self, state: dict[str, object]) -> None:
+        self.__dict__.update(state)
+        self._ckg_databases_lock = threading.Lock()
 
     @override
     def get_model_provider(self) -> str | None:
@@ -78,7 +93,16 @@ class CKGTool(Tool):
         ]
 
     @override
-    async def execute(self, arguments: ToolCallArguments) -> ToolExecResult:
+    def is_read_only(self, arguments: ToolCallArguments) -> bool:
+        # Building the code knowledge graph only writes to the CKG cache, not the project.
+        return True
+
+    @override
+    def get_accessed_paths(self, arguments: ToolCallArguments) -> list[str] | None:
+        return [str(arguments["path"])] if arguments.get("path") else None
+
+    @override
+    def execute_blocking(self, arguments: ToolCallArguments) -> ToolExecResult:
         command = str(arguments.get("command")) if "command" in arguments else None
         if command is None:
             return ToolExecResult(
@@ -111,10 +135,11 @@ class CKGTool(Tool):
                 error_code=-1,
             )
 
-        ckg_database = self._ckg_databases.get(codebase_path)
-        if ckg_database is None:
-            ckg_database = CKGDatabase(codebase_path)
-            self._ckg_databases[codebase_path] = ckg_database
+        with self._ckg_databases_lock:
+            ckg_database = self._ckg_databases.get(codebase_path)
+            if ckg_database is None:
+                ckg_database = CKGDatabase(codebase_path)
+                self._ckg_databases[codebase_path] = ckg_database
 
         match command:
             case "search_function":
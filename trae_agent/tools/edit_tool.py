@@ -12,8 +12,14 @@
 from pathlib import Path
 from typing import override
 
-from trae_agent.tools.base import Tool, ToolCallArguments, ToolError, ToolExecResult, ToolParameter
-from trae_agent.tools.run import maybe_truncate, run
+from trae_agent.tools.base import (
+    BlockingTool,
+    ToolCallArguments,
+    ToolError,
+    ToolExecResult,
+    ToolParameter,
+)
+from trae_agent.tools.run import maybe_truncate, run, run_sync
 
 EditToolSubCommands = [
     "view",
@@ -24,7 +30,7 @@ EditToolSubCommands = [
 SNIPPET_LINES: int = 4
 
 
-class TextEditorTool(Tool):
+class TextEditorTool(BlockingTool):
     """Tool to replace a string in a file."""
 
     def __init__(self, model_provider: str | None = None) -> None:
@@ -98,7 +104,7 @@ Notes for using the `str_replace` command:
         ]
 
     @override
-    async def execute(self, arguments: ToolCallArguments) -> ToolExecResult:
+    def execute_blocking(self, arguments: ToolCallArguments) -> ToolExecResult:
         """Execute the str_replace_editor tool."""
         command = str(arguments["command"]) if "command" in arguments else None
         if command is None:
@@ -116,7 +122,7 @@ Notes for using the `str_replace` command:
             self.validate_path(command, _path)
             match command:
                 case "view":
-                    return await self._view_handler(arguments, _path)
+                    return self._view_handler(arguments, _path)
                 case "create":
                     return self._create_handler(arguments, _path)
                 case "str_replace":
@@ -131,6 +137,24 @@ Notes for using the `str_replace` command:
         except ToolError as e:
             return ToolExecResult(error=str(e), error_code=-1)
 
+    @override
+    async def execute(self, arguments: ToolCallArguments) -> ToolExecResult:
+        """Execute the tool on the event loop, listing directories without blocking it."""
+        path = arguments.get("path")
+        if arguments.get("command") == "view" and not arguments.get("view_range") and path:
+            _path = Path(str(path))
+            if _path.is_absolute() and _path.is_dir():
+                return self._directory_view(_path, *await run(self._list_directory_command(_path)))
+        return self.execute_blocking(arguments)
+
+    @override
+    def is_read_only(self, arguments: ToolCallArguments) -> bool:
+        return arguments.get("command") == "view"
+
+    @override
+    def get_accessed_paths(self, arguments: ToolCallArguments) -> list[str] | None:
+        return [str(arguments["path"])] if arguments.get("path") else None
+
     def validate_path(self, command: str, path: Path):
         """Validate the path for the str_replace_editor tool."""
         if not path.is_absolute():
@@ -151,7 +175,17 @@ Notes for using the `str_replace` command:
                 f"The path {path} is a directory and only the `view` command can be used on directories"
             )
 
-    async def _view(self, path: Path, view_range: list[int] | None = None) -> ToolExecResult:
+    @staticmethod
+    def _list_directory_command(path: Path) -> str:
+        return rf"find {path} -maxdepth 2 -not -path '*/\.*'"
+
+    @staticmethod
+    def _directory_view(path: Path, return_code: int, stdout: str, stderr: str) -> ToolExecResult:
+        if not stderr:
+            stdout = f"Here's the files and directories up to 2 levels deep in {path}, excluding hidden items:\n{stdout}\n"
+        return ToolExecResult(error_code=return_code, output=stdout, error=stderr)
+
+    def _view(self, path: Path, view_range: list[int] | None = None) -> ToolExecResult:
         """Implement the view command"""
         if path.is_dir():
             if view_range:
@@ -159,10 +193,7 @@ Notes for using the `str_replace` command:
                     "The `view_range` parameter is not allowed when `path` points to a directory."
                 )
 
-            return_code, stdout, stderr = await run(rf"find {path} -maxdepth 2 -not -path '*/\.*'")
-            if not stderr:
-                stdout = f"Here's the files and directories up to 2 levels deep in {path}, excluding hidden items:\n{stdout}\n"
-            return ToolExecResult(error_code=return_code, output=stdout, error=stderr)
+            return self._directory_view(path, *run_sync(self._list_directory_command(path)))
 
         file_content = self.read_file(path)
         init_line = 1
@@ -307,17 +338,17 @@ Notes for using the `str_replace` command:
             f"Here's the result of running `cat -n` on {file_descriptor}:\n" + file_content + "\n"
         )
 
-    async def _view_handler(self, arguments: ToolCallArguments, _path: Path) -> ToolExecResult:
+    def _view_handler(self, arguments: ToolCallArguments, _path: Path) -> ToolExecResult:
         view_range = arguments.get("view_range", None)
         if view_range is None:
-            return await self._view(_path, None)
+            return self._view(_path, None)
         if not (isinstance(view_range, list) and all(isinstance(i, int) for i in view_range)):
             return ToolExecResult(
                 error="Parameter `view_range` should be a list of integers.",
                 error_code=-1,
             )
         view_range_int: list[int] = [i for i in view_range if isinstance(i, int)]
-        return await self._view(_path, view_range_int)
+        return self._view(_path, view_range_int)
 
     def _create_handler(self, arguments: ToolCallArguments, _path: Path) -> ToolExecResult:
         file_text = arguments.get("file_text", None)
@@ -11,10 +11,16 @@ from jsonpath_ng import Fields, Index
 from jsonpath_ng import parse as jsonpath_parse
 from jsonpath_ng.exceptions import JSONPathError
 
-from trae_agent.tools.base import Tool, ToolCallArguments, ToolError, ToolExecResult, ToolParameter
+from trae_agent.tools.base import (
+    BlockingTool,
+    ToolCallArguments,
+    ToolError,
+    ToolExecResult,
+    ToolParameter,
+)
 
 
-class JSONEditTool(Tool):
+class JSONEditTool(BlockingTool):
     """Tool for editing JSON files using JSONPath expressions."""
 
     def __init__(self, model_provider: str | None = None) -> None:
@@ -90,7 +96,7 @@ JSONPath syntax supported:
         ]
 
     @override
-    async def execute(self, arguments: ToolCallArguments) -> ToolExecResult:
+    def execute_blocking(self, arguments: ToolCallArguments) -> ToolExecResult:
         """Execute the JSON edit operation."""
         try:
             operation = str(arguments.get("operation", "")).lower()
@@ -120,7 +126,7 @@ JSONPath syntax supported:
                 )
 
             if operation == "view":
-                return await self._view_json(file_path, json_path_arg, pretty_print_arg)
+                return self._view_json(file_path, json_path_arg, pretty_print_arg)
 
             if not isinstance(json_path_arg, str):
                 return ToolExecResult(
@@ -135,16 +141,12 @@ JSONPath syntax supported:
                         error_code=-1,
                     )
                 if operation == "set":
-                    return await self._set_json_value(
-                        file_path, json_path_arg, value, pretty_print_arg
-                    )
+                    return self._set_json_value(file_path, json_path_arg, value, pretty_print_arg)
                 else:  # operation == "add"
-                    return await self._add_json_value(
-                        file_path, json_path_arg, value, pretty_print_arg
-                    )
+                    return self._add_json_value(file_path, json_path_arg, value, pretty_print_arg)
 
             if operation == "remove":
-                return await self._remove_json_value(file_path, json_path_arg, pretty_print_arg)
+                return self._remove_json_value(file_path, json_path_arg, pretty_print_arg)
 
             return ToolExecResult(
                 error=f"Unknown operation: {operation}. Supported operations: view, set, add, remove",
@@ -154,7 +156,15 @@ JSONPath syntax supported:
         except Exception as e:
             return ToolExecResult(error=f"JSON edit tool error: {str(e)}", error_code=-1)
 
-    async def _load_json_file(self, file_path: Path) -> dict | list:
+    @override
+    def is_read_only(self, arguments: ToolCallArguments) -> bool:
+        return str(arguments.get("operation", "")).lower() == "view"
+
+    @override
+    def get_accessed_paths(self, arguments: ToolCallArguments) -> list[str] | None:
+        return [str(arguments["file_path"])] if arguments.get("file_path") else None
+
+    def _load_json_file(self, file_path: Path) -> dict | list:
         """Load and parse JSON file."""
         if not file_path.exists():
             raise ToolError(f"File does not exist: {file_path}")
@@ -170,7 +180,7 @@ JSONPath syntax supported:
         except Exception as e:
             raise ToolError(f"Error reading file {file_path}: {str(e)}") from e
 
-    async def _save_json_file(
+    def _save_json_file(
         self, file_path: Path, data: dict | list, pretty_print: bool = True
     ) -> None:
         """Save JSON data to file."""
@@ -192,11 +202,11 @@ JSONPath syntax supported:
         except Exception as e:
             raise ToolError(f"Error parsing JSONPath '{json_path_str}': {str(e)}") from e
 
-    async def _view_json(
+    def _view_json(
         self, file_path: Path, json_path_str: str | None, pretty_print: bool
     ) -> ToolExecResult:
         """View JSON file content or specific paths."""
-        data = await self._load_json_file(file_path)
+        data = self._load_json_file(file_path)
 
         if json_path_str:
             jsonpath_expr = self._parse_jsonpath(json_path_str)
@@ -223,11 +233,11 @@ JSONPath syntax supported:
 
             return ToolExecResult(output=f"JSON content of {file_path}:\n{output}")
 
-    async def _set_json_value(
+    def _set_json_value(
         self, file_path: Path, json_path_str: str, value, pretty_print: bool
     ) -> ToolExecResult:
         """Set value at specified JSONPath."""
-        data = await self._load_json_file(file_path)
+        data = self._load_json_file(file_path)
         jsonpath_expr = self._parse_jsonpath(json_path_str)
 
         matches = jsonpath_expr.find(data)
@@ -237,18 +247,18 @@ JSONPath syntax supported:
             )
 
         updated_data = jsonpath_expr.update(data, value)
-        await self._save_json_file(file_path, updated_data, pretty_print)
+        self._save_json_file(file_path, updated_data, pretty_print)
 
         match_count = len(matches)
         return ToolExecResult(
             output=f"Successfully updated {match_count} location(s) at JSONPath '{json_path_str}' with value: {json.dumps(value)}"
         )
 
-    async def _add_json_value(
+    def _add_json_value(
         self, file_path: Path, json_path_str: str, value, pretty_print: bool
     ) -> ToolExecResult:
         """Add value at specified JSONPath."""
-        data = await self._load_json_file(file_path)
+        data = self._load_json_file(file_path)
         jsonpath_expr = self._parse_jsonpath(json_path_str)
 
         parent_path = jsonpath_expr.left
@@ -282,14 +292,14 @@ JSONPath syntax supported:
                     error_code=-1,
                 )
 
-        await self._save_json_file(file_path, data, pretty_print)
+        self._save_json_file(file_path, data, pretty_print)
         return ToolExecResult(output=f"Successfully added value at JSONPath '{json_path_str}'")
 
-    async def _remove_json_value(
+    def _remove_json_value(
         self, file_path: Path, json_path_str: str, pretty_print: bool
     ) -> ToolExecResult:
         """Remove value at specified JSONPath."""
-        data = await self._load_json_file(file_path)
+        data = self._load_json_file(file_path)
         jsonpath_expr = self._parse_jsonpath(json_path_str)
 
         matches = jsonpath_expr.find(data)
@@ -323,7 +333,7 @@ JSONPath syntax supported:
                 except (KeyError, IndexError):
                     pass
 
-        await self._save_json_file(file_path, data, pretty_print)
+        self._save_json_file(file_path, data, pretty_print)
         return ToolExecResult(
             output=f"Successfully removed {match_count} element(s) at JSONPath '{json_path_str}'"
         )
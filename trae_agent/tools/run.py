@@ -9,10 +9,11 @@
 #
 # This modified file is released under the same license.
 
-"""Utility to run shell commands asynchronously with a timeout."""
+"""Utilities to run shell commands with a timeout."""
 
 import asyncio
 import contextlib
+import subprocess
 
 TRUNCATED_MESSAGE: str = "<response clipped><NOTE>To save on context only part of this file has been shown to you. You should retry this tool after you have searched inside the file with `grep -n` in order to find the line numbers of what you are looking for.</NOTE>"
 MAX_RESPONSE_LEN: int = 16000
@@ -48,3 +49,20 @@ async def run(
         with contextlib.suppress(ProcessLookupError):
             process.kill()
         raise TimeoutError(f"Command '{cmd}' timed out after {timeout} seconds") from exc
+
+
+def run_sync(
+    cmd: str,
+    timeout: float | None = 120.0,  # seconds
+    truncate_after: int | None = MAX_RESPONSE_LEN,
+):
+    """Run a shell command with a timeout, blocking until it finishes."""
+    try:
+        process = subprocess.run(cmd, shell=True, capture_output=True, timeout=timeout)
+    except subprocess.TimeoutExpired as exc:
+        raise TimeoutError(f"Command '{cmd}' timed out after {timeout} seconds") from exc
+    return (
+        process.returncode,
+        maybe_truncate(process.stdout.decode(), truncate_after=truncate_after),
+        maybe_truncate(process.stderr.decode(), truncate_after=truncate_after),
+    )
@@ -16,7 +16,13 @@ import json
 from dataclasses import dataclass
 from typing import override
 
-from trae_agent.tools.base import Tool, ToolCallArguments, ToolExecResult, ToolParameter
+from trae_agent.tools.base import (
+    ResourceFootprint,
+    Tool,
+    ToolCallArguments,
+    ToolExecResult,
+    ToolParameter,
+)
 
 
 @dataclass
@@ -381,6 +387,16 @@ You should:
 │ {thought_data.thought.ljust(border_length - 2)} │
 └{border}┘"""
 
+    @override
+    def get_accessed_paths(self, arguments: ToolCallArguments) -> list[str] | None:
+        # Thoughts are kept in memory and never touch the filesystem.
+        return []
+
+    @override
+    def get_resource_footprint(self, arguments: ToolCallArguments) -> ResourceFootprint:
+        # Thoughts are numbered in the order they are recorded.
+        return ResourceFootprint(sessions=frozenset({"sequential_thinking"}))
+
     @override
     async def execute(self, arguments: ToolCallArguments) -> ToolExecResult:
         """Execute the sequential thinking tool."""
@@ -28,6 +28,10 @@ class TaskDoneTool(Tool):
     def get_parameters(self) -> list[ToolParameter]:
         return []
 
+    @override
+    def get_accessed_paths(self, arguments: ToolCallArguments) -> list[str] | None:
+        return []
+
     @override
     async def execute(self, arguments: ToolCallArguments) -> ToolExecResult:
         return ToolExecResult(output="Task done.")
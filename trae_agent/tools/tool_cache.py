@@ -0,0 +1,119 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""Cache for the results of read-only tool calls, validated against file state."""
+
+import json
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from trae_agent.tools.base import ToolCallArguments, ToolExecResult, paths_overlap
+
+# (mtime in ns, size, inode) of a path, or None if it does not exist
+PathState = tuple[int, int, int] | None
+
+
+@dataclass
+class ToolCacheStats:
+    """Counters describing how effective the cache has been."""
+
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def to_dict(self) -> dict[str, float]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": self.hit_rate,
+        }
+
+
+@dataclass
+class _CacheEntry:
+    paths: list[str]
+    states: list[PathState]
+    result: ToolExecResult
+
+
+def _path_state(path: str) -> PathState:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+class ToolResultCache:
+    """LRU cache of read-only tool results.
+
+    An entry is only served while every path it was computed from still has the same
+    mtime, size and inode, and entries are dropped when a tool call writes to an
+    overlapping path.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self.stats: ToolCacheStats = ToolCacheStats()
+
+    @staticmethod
+    def make_key(tool_name: str, arguments: ToolCallArguments) -> str:
+        # Unset optional arguments are sent as null by some providers, so drop them.
+        normalized = {key: value for key, value in arguments.items() if value is not None}
+        return tool_name + ":" + json.dumps(normalized, sort_keys=True, default=str)
+
+    @staticmethod
+    def normalize_paths(paths: list[str]) -> list[str]:
+        return [os.path.normpath(path) for path in paths]
+
+    def snapshot(self, paths: list[str]) -> list[PathState]:
+        """Capture the state of the paths a result is about to be computed from."""
+        return [_path_state(path) for path in paths]
+
+    def get(self, key: str) -> ToolExecResult | None:
+        entry = self._entries.get(key)
+        if entry is not None and self.snapshot(entry.paths) != entry.states:
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return entry.result
+
+    def put(
+        self, key: str, paths: list[str], states: list[PathState], result: ToolExecResult
+    ) -> None:
+        # The files changed while the result was computed, so it may already be stale.
+        if self.snapshot(paths) != states:
+            return
+        self._entries[key] = _CacheEntry(paths=paths, states=states, result=result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            _ = self._entries.popitem(last=False)
+
+    def invalidate(self, paths: list[str] | None) -> None:
+        """Drop entries computed from any of the paths, or every entry if paths is None."""
+        if paths is None:
+            stale = list(self._entries)
+        else:
+            stale = [
+                key
+                for key, entry in self._entries.items()
+                if any(paths_overlap(path, other) for path in paths for other in entry.paths)
+            ]
+        for key in stale:
+            del self._entries[key]
+        self.stats.invalidations += len(stale)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,49 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""Process-wide worker pools that blocking tools run on."""
+
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+WORKER_POOL_KINDS = ["thread", "process", "none"]
+
+_pools: dict[tuple[str, int | None], Executor] = {}
+_pools_lock = threading.Lock()
+
+
+def get_tool_worker_pool(kind: str = "thread", max_workers: int | None = None) -> Executor | None:
+    """Return the shared pool of this kind and size, creating it on first use.
+
+    Agents running in the same process share pools, so a batch of agents does not start
+    a pool per task. Returns None for kind "none", which runs blocking tools inline.
+    """
+    if kind not in WORKER_POOL_KINDS:
+        raise ValueError(
+            f"Unknown tool worker pool: {kind}. Supported pools: {', '.join(WORKER_POOL_KINDS)}"
+        )
+    if kind == "none":
+        return None
+
+    with _pools_lock:
+        pool = _pools.get((kind, max_workers))
+        if pool is None:
+            if kind == "thread":
+                pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="trae-tool")
+            else:
+                # Forking a process that runs an event loop and worker threads is unsafe.
+                pool = ProcessPoolExecutor(
+                    max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            _pools[(kind, max_workers)] = pool
+        return pool
+
+
+def shutdown_tool_worker_pools() -> None:
+    """Shut down every shared pool, waiting for running calls to finish."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True)
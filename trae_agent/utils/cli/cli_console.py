@@ -45,6 +45,7 @@ class ConsoleStep:
 
     agent_step: AgentStep
     agent_step_printed: bool = False
+    streamed_text: str = ""
     lake_view_panel_generator: asyncio.Task[Panel | None] | None = None
 
 
@@ -82,6 +83,16 @@ class CLIConsole(ABC):
         """
         pass
 
+    @abstractmethod
+    def update_stream(self, agent_step: AgentStep, delta: str):
+        """Render a piece of LLM output as it is streamed.
+
+        Args:
+            agent_step: The step the output belongs to
+            delta: The newly generated text
+        """
+        pass
+
     @abstractmethod
     def print_task_details(self, details: dict[str, str]):
         """Print initial task configuration details."""
@@ -142,6 +153,9 @@ def generate_agent_step_table(agent_step: AgentStep) -> Table:
     if agent_step.llm_response and agent_step.llm_response.content:
         table.add_row("LLM Response", f"💬 {agent_step.llm_response.content}")
 
+    if agent_step.time_to_first_token is not None:
+        table.add_row("First Token", f"⏱️ {agent_step.time_to_first_token:.2f}s")
+
     # Add tool calls row
     if agent_step.tool_calls:
         tool_names = [f"[cyan]{call.name}[/cyan]" for call in agent_step.tool_calls]
@@ -168,4 +182,11 @@ def generate_agent_step_table(agent_step: AgentStep) -> Table:
     if agent_step.error:
         table.add_row("Error", f"❌ {agent_step.error}")
 
+    # Add timing row
+    if agent_step.timing.llm or agent_step.timing.tools:
+        timing = f"⏱️ LLM {agent_step.timing.llm:.2f}s"
+        if agent_step.tool_calls:
+            timing += f" | Tools {agent_step.timing.tools:.2f}s"
+        table.add_row("Timing", timing)
+
     return table
@@ -77,6 +77,13 @@ class RichConsoleApp(App[None]):
         background: $background 50%;
     }
 
+    #stream_display {
+        height: auto;
+        max-height: 10;
+        padding: 0 1;
+        color: $text-muted;
+    }
+
     RichLog {
         scrollbar-size: 1 1;
         scrollbar-size-horizontal: 1;
@@ -104,6 +111,7 @@ class RichConsoleApp(App[None]):
         super().__init__()
         self.console_impl: "RichCLIConsole" = console_impl
         self.execution_log: RichLog | None = None
+        self.stream_display: Static | None = None
         self.task_input: Input | None = None
         self.task_display: Static | None = None
         self.token_display: TokenDisplay | None = None
@@ -118,6 +126,7 @@ class RichConsoleApp(App[None]):
         # Top container for agent execution
         with Container(id="execution_container"):
             yield RichLog(id="execution_log", wrap=True, markup=True)
+            yield Static("", id="stream_display")
 
         # Bottom container for input/task display
         with Container(id="input_container"):
@@ -138,6 +147,7 @@ class RichConsoleApp(App[None]):
         self.title = "Trae Agent CLI"
 
         self.execution_log = self.query_one("#execution_log", RichLog)
+        self.stream_display = self.query_one("#stream_display", Static)
         self.token_display = self.query_one("#token_display", TokenDisplay)
         self.task_display = self.query_one("#task_display", Static)
 
@@ -275,6 +285,16 @@ class RichConsoleApp(App[None]):
             _ = self.execution_log.write(
                 Panel(step_content, title=f"Step {agent_step.step_number}", border_style=color)
             )
+        if self.stream_display:
+            _ = self.stream_display.update("")
+
+    def show_stream(self, agent_step: AgentStep, text: str):
+        """Show the LLM output streamed so far for the current step."""
+        if self.stream_display:
+            # Only the tail is kept on screen; the full text is logged with the step.
+            _ = self.stream_display.update(
+                Text(f"💬 Step {agent_step.step_number}: {text[-2000:]}", style="dim")
+            )
 
     async def action_quit(self) -> None:
         """Quit the application."""
@@ -341,6 +361,17 @@ class RichCLIConsole(CLIConsole):
             if self.app and self.app.token_display:
                 self.app.token_display.update_tokens(agent_execution)
 
+    @override
+    def update_stream(self, agent_step: AgentStep, delta: str):
+        """Show streamed LLM output below the execution log as it arrives."""
+        if agent_step.step_number not in self.console_step_history:
+            self.console_step_history[agent_step.step_number] = ConsoleStep(agent_step)
+
+        console_step = self.console_step_history[agent_step.step_number]
+        console_step.streamed_text += delta
+        if self.app:
+            self.app.show_stream(agent_step, console_step.streamed_text)
+
     @override
     def print_task_details(self, details: dict[str, str]):
         """Print initial task configuration details."""
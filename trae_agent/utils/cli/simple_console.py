@@ -51,6 +51,9 @@ class SimpleCLIConsole(CLIConsole):
                 agent_step.state in [AgentStepState.COMPLETED, AgentStepState.ERROR]
                 and not self.console_step_history[agent_step.step_number].agent_step_printed
             ):
+                if self.console_step_history[agent_step.step_number].streamed_text:
+                    # End the line of streamed output before printing the step table
+                    self.console.print()
                 self._print_step_update(agent_step, agent_execution)
                 self.console_step_history[agent_step.step_number].agent_step_printed = True
 
@@ -69,6 +72,18 @@ class SimpleCLIConsole(CLIConsole):
 
         self.agent_execution = agent_execution
 
+    @override
+    def update_stream(self, agent_step: AgentStep, delta: str):
+        """Print streamed LLM output as it arrives."""
+        if agent_step.step_number not in self.console_step_history:
+            self.console_step_history[agent_step.step_number] = ConsoleStep(agent_step)
+
+        console_step = self.console_step_history[agent_step.step_number]
+        if not console_step.streamed_text:
+            self.console.print(f"[blue]💬 Step {agent_step.step_number}:[/blue] ", end="")
+        console_step.streamed_text += delta
+        self.console.print(delta, end="", markup=False, highlight=False, soft_wrap=True)
+
     @override
     async def start(self):
         """Start the console - wait for completion and then print summary."""
@@ -94,10 +109,10 @@ class SimpleCLIConsole(CLIConsole):
         table = generate_agent_step_table(agent_step)
 
         if agent_step.llm_usage:
-            table.add_row(
-                "Token Usage",
-                f"Input: {agent_step.llm_usage.input_tokens} Output: {agent_step.llm_usage.output_tokens}",
-            )
+            usage = f"Input: {agent_step.llm_usage.input_tokens} Output: {agent_step.llm_usage.output_tokens}"
+            if agent_step.llm_usage.cache_read_input_tokens:
+                usage += f" Cache hit: {agent_step.llm_usage.cache_hit_ratio:.0%}"
+            table.add_row("Token Usage", usage)
 
         if agent_execution and agent_execution.total_tokens:
             table.add_row(
@@ -151,9 +166,42 @@ class SimpleCLIConsole(CLIConsole):
             table.add_row("Total Tokens", str(total_tokens))
             table.add_row("Input Tokens", str(self.agent_execution.total_tokens.input_tokens))
             table.add_row("Output Tokens", str(self.agent_execution.total_tokens.output_tokens))
+            if self.agent_execution.total_tokens.cache_read_input_tokens:
+                table.add_row(
+                    "Prompt Cache Hit",
+                    f"{self.agent_execution.total_tokens.cache_hit_ratio:.0%}",
+                )
+
+        llm_latency = self.agent_execution.llm_latency()
+        if llm_latency.count:
+            table.add_row("LLM Latency", f"p50 {llm_latency.p50:.2f}s | p95 {llm_latency.p95:.2f}s")
+        retries, retry_wait = self.agent_execution.llm_retries()
+        if retries:
+            table.add_row("LLM Retries", f"{retries} ({retry_wait:.1f}s waiting)")
+        hedges_fired, hedges_won = self.agent_execution.llm_hedges()
+        if hedges_fired:
+            table.add_row("LLM Hedges", f"{hedges_fired} fired, {hedges_won} won")
 
         self.console.print(table)
 
+        tool_latencies = self.agent_execution.tool_latencies()
+        if tool_latencies:
+            latency_table = Table(title="Tool Latency", width=60)
+            latency_table.add_column("Tool", style="cyan")
+            latency_table.add_column("Calls", justify="right")
+            latency_table.add_column("p50", justify="right")
+            latency_table.add_column("p95", justify="right")
+            latency_table.add_column("Errors", justify="right")
+            for name, stats in tool_latencies.items():
+                latency_table.add_row(
+                    name,
+                    str(stats.count),
+                    f"{stats.p50:.2f}s",
+                    f"{stats.p95:.2f}s",
+                    f"{stats.error_rate:.0%}",
+                )
+            self.console.print(latency_table)
+
         # Display final result
         if self.agent_execution.final_result:
             self.console.print(
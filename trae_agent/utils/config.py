@@ -6,6 +6,7 @@ from dataclasses import dataclass, field
 
 import yaml
 
+from trae_agent.tools.worker_pool import WORKER_POOL_KINDS
 from trae_agent.utils.legacy_config import LegacyConfig
 
 
@@ -13,6 +14,30 @@ class ConfigError(Exception):
     pass
 
 
+@dataclass
+class ApiEndpoint:
+    """
+    An additional API key of a model provider, and the base URL to use it with if it is not
+    the provider's.
+    """
+
+    api_key: str
+    base_url: str | None = None
+
+
+@dataclass
+class HttpPoolConfig:
+    """
+    Connection pool limits of a model provider. The defaults mirror those of the OpenAI and
+    Anthropic SDKs.
+    """
+
+    max_connections: int = 1000
+    max_keepalive_connections: int = 100
+    keepalive_expiry: float = 5.0  # seconds an idle connection is kept open
+    http2: bool = False  # needs the h2 package
+
+
 @dataclass
 class ModelProvider:
     """
@@ -24,6 +49,37 @@ class ModelProvider:
     provider: str
     base_url: str | None = None
     api_version: str | None = None
+    # More keys and base URLs that requests are spread across, e.g. to raise rate limits
+    endpoints: list[ApiEndpoint] | None = None
+    # Limits of the HTTP connection pool shared by all clients of this provider
+    http_pool: HttpPoolConfig | None = None
+
+
+@dataclass
+class ResponseCacheConfig:
+    """
+    On-disk cache of LLM responses, for development and CI runs. mode is "record" to answer
+    from the cache and store misses, "replay" to fail on misses instead of calling the
+    model, or "passthrough" to bypass the cache.
+    """
+
+    path: str
+    mode: str = "record"
+    max_size_mb: float = 256.0
+
+
+@dataclass
+class RateLimitConfig:
+    """
+    Quota of a model and API key, per minute. Limits left out are taken from the provider's
+    rate limit headers once it has answered. tokens_per_minute counts input and output
+    tokens together, as OpenAI does.
+    """
+
+    requests_per_minute: int | None = None
+    tokens_per_minute: int | None = None
+    input_tokens_per_minute: int | None = None
+    output_tokens_per_minute: int | None = None
 
 
 @dataclass
@@ -43,6 +99,22 @@ class ModelConfig:
     supports_tool_calling: bool = True
     candidate_count: int | None = None  # Gemini specific field
     stop_sequences: list[str] | None = None
+    stream: bool = False
+    prompt_caching: bool = False  # Anthropic specific field
+    response_chaining: bool = False  # OpenAI Responses API specific field
+    # Models to switch to, in order, when this one keeps failing. Given by name in the config.
+    fallback_models: list["ModelConfig"] = field(default_factory=list)
+    # Send a duplicate of async calls slower than this latency percentile of recent calls
+    hedge_percentile: float | None = None
+    response_cache: ResponseCacheConfig | None = None
+    # Tokens the model accepts for prompt and output together. When set, max_tokens is
+    # lowered to what the estimated prompt leaves, and oversized prompts are compacted or
+    # rejected before they are sent.
+    context_window: int | None = None
+    # Quota shared by every client of the process that uses this model and key, and the
+    # quota of each key of an endpoint pool. Requests wait their turn for it instead of
+    # running into rate limits.
+    rate_limit: RateLimitConfig | None = None
 
     def resolve_config_values(
         self,
@@ -123,6 +195,33 @@ class MCPServerConfig:
     description: str | None = None
 
 
+@dataclass
+class ContextCompactionConfig:
+    """
+    Context compaction configuration. Once the estimated prompt size exceeds token_budget,
+    the output of older tool calls is elided from the conversation history until it is
+    back under target_ratio of the budget. The headroom lets the following turns reuse the
+    compacted history, and the provider's prompt cache, instead of compacting again.
+    """
+
+    token_budget: int
+    keep_recent_tool_results: int = 4
+    preview_chars: int = 200
+    target_ratio: float = 0.75
+
+
+@dataclass
+class ToolWorkersConfig:
+    """
+    Worker pool configuration. Blocking tools such as the file editor and the CKG run on
+    this pool so that parallel tool calls overlap. pool is "thread", "process" or "none"
+    to run them on the event loop.
+    """
+
+    pool: str = "thread"
+    max_workers: int | None = None
+
+
 @dataclass
 class AgentConfig:
     """
@@ -134,6 +233,8 @@ class AgentConfig:
     max_steps: int
     model: ModelConfig
     tools: list[str]
+    context_compaction: ContextCompactionConfig | None = None
+    tool_workers: ToolWorkersConfig = field(default_factory=ToolWorkersConfig)
 
 
 @dataclass
@@ -215,6 +316,17 @@ class Config:
             config_model_providers: dict[str, ModelProvider] = {}
             for model_provider_name, model_provider_config in model_providers.items():
                 config_model_providers[model_provider_name] = ModelProvider(**model_provider_config)
+                endpoints = config_model_providers[model_provider_name].endpoints
+                if endpoints is not None:
+                    config_model_providers[model_provider_name].endpoints = [
+                        ApiEndpoint(**endpoint) if isinstance(endpoint, dict) else endpoint
+                        for endpoint in endpoints
+                    ]
+                http_pool = config_model_providers[model_provider_name].http_pool
+                if isinstance(http_pool, dict):
+                    config_model_providers[model_provider_name].http_pool = HttpPoolConfig(
+                        **http_pool
+                    )
             config.model_providers = config_model_providers
         else:
             raise ConfigError("No model providers provided")
@@ -230,6 +342,28 @@ class Config:
                 config_models[model_name].model_provider = config_model_providers[
                     model_config["model_provider"]
                 ]
+                response_cache = model_config.get("response_cache")
+                if isinstance(response_cache, dict):
+                    config_models[model_name].response_cache = ResponseCacheConfig(**response_cache)
+                    if response_cache.get("mode", "record") not in (
+                        "record",
+                        "replay",
+                        "passthrough",
+                    ):
+                        raise ConfigError(
+                            f"Invalid response cache mode {response_cache['mode']} for {model_name}"
+                        )
+                rate_limit = model_config.get("rate_limit")
+                if isinstance(rate_limit, dict):
+                    config_models[model_name].rate_limit = RateLimitConfig(**rate_limit)
+            for model_name, model_config in config_models.items():
+                fallback_names: list[str] = model_config.fallback_models  # pyright: ignore[reportAssignmentType]
+                for fallback_name in fallback_names:
+                    if fallback_name not in config_models or fallback_name == model_name:
+                        raise ConfigError(
+                            f"Invalid fallback model {fallback_name} for {model_name}"
+                        )
+                model_config.fallback_models = [config_models[name] for name in fallback_names]
             config.models = config_models
         else:
             raise ConfigError("No models provided")
@@ -271,6 +405,18 @@ class Config:
                             allow_mcp_servers=allow_mcp_servers,
                         )
                         trae_agent_config.model = agent_model
+                        if isinstance(trae_agent_config.context_compaction, dict):
+                            trae_agent_config.context_compaction = ContextCompactionConfig(
+                                **trae_agent_config.context_compaction
+                            )
+                        if isinstance(trae_agent_config.tool_workers, dict):
+                            trae_agent_config.tool_workers = ToolWorkersConfig(
+                                **trae_agent_config.tool_workers
+                            )
+                        if trae_agent_config.tool_workers.pool not in WORKER_POOL_KINDS:
+                            raise ConfigError(
+                                f"Unknown tool worker pool: {trae_agent_config.tool_workers.pool}"
+                            )
                         if trae_agent_config.enable_lakeview and config.lakeview is None:
                             raise ConfigError("Lakeview is enabled but no lakeview config provided")
                         config.trae_agent = trae_agent_config
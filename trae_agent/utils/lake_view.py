@@ -106,7 +106,7 @@ class LakeView:
         ]
 
         self.model_config.temperature = 0.1
-        llm_response = self.lakeview_llm_client.chat(
+        llm_response = await self.lakeview_llm_client.achat(
             model_config=self.model_config,
             messages=llm_messages,
             reuse_history=False,
@@ -119,7 +119,7 @@ class LakeView:
             "</task>" not in content or "<details>" not in content or "</details>" not in content
         ):
             retry += 1
-            llm_response = self.lakeview_llm_client.chat(
+            llm_response = await self.lakeview_llm_client.achat(
                 model_config=self.model_config,
                 messages=llm_messages,
                 reuse_history=False,
@@ -157,7 +157,7 @@ class LakeView:
 
         retry = 0
         while retry < 10:
-            llm_response = self.lakeview_llm_client.chat(
+            llm_response = await self.lakeview_llm_client.achat(
                 model_config=self.model_config,
                 messages=llm_messages,
                 reuse_history=False,
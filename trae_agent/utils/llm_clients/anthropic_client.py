@@ -3,8 +3,8 @@
 
 """Anthropic API client wrapper with tool integration."""
 
-import json
-from typing import override
+from collections.abc import AsyncIterator
+from typing import Any, override
 
 import anthropic
 from anthropic.types.tool_union_param import TextEditor20250429
@@ -12,8 +12,53 @@ from anthropic.types.tool_union_param import TextEditor20250429
 from trae_agent.tools.base import Tool, ToolCall, ToolResult
 from trae_agent.utils.config import ModelConfig
 from trae_agent.utils.llm_clients.base_client import BaseLLMClient
-from trae_agent.utils.llm_clients.llm_basics import LLMMessage, LLMResponse, LLMUsage
-from trae_agent.utils.llm_clients.retry_utils import retry_with
+from trae_agent.utils.llm_clients.http_client import get_async_http_client, get_http_client
+from trae_agent.utils.llm_clients.llm_basics import (
+    LLMMessage,
+    LLMResponse,
+    LLMStreamEvent,
+    LLMUsage,
+)
+from trae_agent.utils.llm_clients.message_history import MessageHistory
+from trae_agent.utils.llm_clients.retry_utils import (
+    async_retry_stream,
+    async_retry_with,
+    retry_with,
+)
+
+CACHE_CONTROL = anthropic.types.CacheControlEphemeralParam(type="ephemeral")
+
+
+def _with_cache_control(message: anthropic.types.MessageParam) -> anthropic.types.MessageParam:
+    """Return a copy of the message with a cache breakpoint on its last content block."""
+    content = message["content"]
+    if isinstance(content, str):
+        blocks: list[Any] = [anthropic.types.TextBlockParam(type="text", text=content)]
+    else:
+        blocks = [block if isinstance(block, dict) else block.to_dict() for block in content]
+    blocks[-1] = {**blocks[-1], "cache_control": CACHE_CONTROL}
+    return anthropic.types.MessageParam(role=message["role"], content=blocks)
+
+
+def _content_blocks(message: anthropic.types.MessageParam) -> list[Any]:
+    """The content of a message as a list of blocks."""
+    content = message["content"]
+    if isinstance(content, str):
+        return [anthropic.types.TextBlockParam(type="text", text=content)]
+    return list(content)
+
+
+def _tool_schema(tool: Tool) -> anthropic.types.ToolUnionParam:
+    """Anthropic schema of a tool, using the built-in tools for editing and bash."""
+    if tool.name == "str_replace_based_edit_tool":
+        return TextEditor20250429(name="str_replace_based_edit_tool", type="text_editor_20250429")
+    if tool.name == "bash":
+        return anthropic.types.ToolBash20250124Param(name="bash", type="bash_20250124")
+    return anthropic.types.ToolParam(
+        name=tool.name,
+        description=tool.description,
+        input_schema=tool.get_input_schema(),
+    )
 
 
 class AnthropicClient(BaseLLMClient):
@@ -23,15 +68,90 @@ class AnthropicClient(BaseLLMClient):
         super().__init__(model_config)
 
         self.client: anthropic.Anthropic = anthropic.Anthropic(
-            api_key=self.api_key, base_url=self.base_url
+            api_key=self.api_key,
+            base_url=self.base_url,
+            http_client=get_http_client("anthropic", self.base_url),
+            max_retries=0,
         )
-        self.message_history: list[anthropic.types.MessageParam] = []
+        self.async_client: anthropic.AsyncAnthropic = anthropic.AsyncAnthropic(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            http_client=get_async_http_client("anthropic", self.base_url),
+            max_retries=0,
+        )
+        self.message_history: MessageHistory[anthropic.types.MessageParam] = MessageHistory()
         self.system_message: str | anthropic.NotGiven = anthropic.NOT_GIVEN
+        # Index of the message that carried the rolling cache breakpoint of the last request
+        self._last_cache_breakpoint: int | None = None
 
     @override
     def set_chat_history(self, messages: list[LLMMessage]) -> None:
         """Set the chat history."""
-        self.message_history = self.parse_messages(messages)
+        self.message_history.reset(self.parse_messages(messages))
+        self._last_cache_breakpoint = None
+
+    def _create_request_kwargs(
+        self,
+        model_config: ModelConfig,
+        tool_schemas: list[anthropic.types.ToolUnionParam] | anthropic.NotGiven,
+    ) -> dict[str, Any]:
+        """Build the keyword arguments shared by the sync and async Messages API calls."""
+        system: str | list[anthropic.types.TextBlockParam] | anthropic.NotGiven = (
+            self.system_message
+        )
+        messages = self.message_history.to_list()
+        if model_config.prompt_caching:
+            system, tool_schemas, messages = self._add_cache_breakpoints(tool_schemas)
+        return {
+            "model": model_config.model,
+            "messages": messages,
+            "max_tokens": model_config.max_tokens,
+            "system": system,
+            "tools": tool_schemas,
+            "temperature": model_config.temperature,
+            "top_p": model_config.top_p,
+            "top_k": model_config.top_k,
+        }
+
+    def _add_cache_breakpoints(
+        self,
+        tool_schemas: list[anthropic.types.ToolUnionParam] | anthropic.NotGiven,
+    ) -> tuple[
+        str | list[anthropic.types.TextBlockParam] | anthropic.NotGiven,
+        list[anthropic.types.ToolUnionParam] | anthropic.NotGiven,
+        list[anthropic.types.MessageParam],
+    ]:
+        """Mark the system prompt, the tools and the end of the history as cacheable.
+
+        The breakpoint on the last message rolls forward every turn. The message that
+        carried it in the previous request keeps one too, so that request's cache entry is
+        found however many blocks were added since. Breakpoints are set on copies, so the
+        history never accumulates more than the four the API allows.
+        """
+        system: str | list[anthropic.types.TextBlockParam] | anthropic.NotGiven = (
+            self.system_message
+        )
+        if isinstance(system, str):
+            system = [
+                anthropic.types.TextBlockParam(
+                    type="text", text=system, cache_control=CACHE_CONTROL
+                )
+            ]
+        if isinstance(tool_schemas, list) and tool_schemas:
+            tool_schemas = tool_schemas[:-1] + [
+                {**tool_schemas[-1], "cache_control": CACHE_CONTROL}  # pyright: ignore[reportAssignmentType]
+            ]
+
+        messages = list(self.message_history)
+        last_index = len(messages) - 1
+        breakpoints = {last_index}
+        if self._last_cache_breakpoint is not None and self._last_cache_breakpoint < last_index:
+            breakpoints.add(self._last_cache_breakpoint)
+        for index in breakpoints:
+            if index >= 0:
+                messages[index] = _with_cache_control(messages[index])
+        self._last_cache_breakpoint = last_index if last_index >= 0 else None
+        return system, tool_schemas, messages
 
     def _create_anthropic_response(
         self,
@@ -40,77 +160,158 @@ class AnthropicClient(BaseLLMClient):
     ) -> anthropic.types.Message:
         """Create a response using Anthropic API. This method will be decorated with retry logic."""
         return self.client.messages.create(
-            model=model_config.model,
-            messages=self.message_history,
-            max_tokens=model_config.max_tokens,
-            system=self.system_message,
-            tools=tool_schemas,
-            temperature=model_config.temperature,
-            top_p=model_config.top_p,
-            top_k=model_config.top_k,
+            **self._create_request_kwargs(model_config, tool_schemas)
         )
 
-    @override
-    def chat(
+    async def _acreate_anthropic_response(
         self,
-        messages: list[LLMMessage],
         model_config: ModelConfig,
-        tools: list[Tool] | None = None,
-        reuse_history: bool = True,
-    ) -> LLMResponse:
-        """Send chat messages to Anthropic with optional tool support."""
+        tool_schemas: list[anthropic.types.ToolUnionParam] | anthropic.NotGiven,
+    ) -> anthropic.types.Message:
+        """Async variant of `_create_anthropic_response`."""
+        async with self.pooled_client(self.async_client) as client:
+            return await client.messages.create(
+                **self._create_request_kwargs(model_config, tool_schemas)
+            )
+
+    async def _astream_anthropic_response(
+        self,
+        model_config: ModelConfig,
+        tool_schemas: list[anthropic.types.ToolUnionParam] | anthropic.NotGiven,
+    ) -> AsyncIterator[LLMStreamEvent | anthropic.types.Message]:
+        """Stream a message, yielding deltas and finally the complete message."""
+        async with (
+            self.pooled_client(self.async_client) as client,
+            client.messages.stream(
+                **self._create_request_kwargs(model_config, tool_schemas)
+            ) as stream,
+        ):
+            async for event in stream:
+                if event.type == "text":
+                    yield LLMStreamEvent(content_delta=event.text)
+                elif event.type == "content_block_stop" and event.content_block.type == "tool_use":
+                    yield LLMStreamEvent(
+                        tool_call=ToolCall(
+                            call_id=event.content_block.id,
+                            name=event.content_block.name,
+                            arguments=event.content_block.input,  # pyright: ignore[reportArgumentType]
+                        )
+                    )
+            yield await stream.get_final_message()
+
+    def _prepare_request(
+        self,
+        messages: list[LLMMessage],
+        tools: list[Tool] | None,
+        reuse_history: bool,
+    ) -> list[anthropic.types.ToolUnionParam] | anthropic.NotGiven:
+        """Append the new messages to the history and build the tool schemas."""
         # Convert messages to Anthropic format
         anthropic_messages: list[anthropic.types.MessageParam] = self.parse_messages(messages)
 
-        self.message_history = (
-            self.message_history + anthropic_messages if reuse_history else anthropic_messages
-        )
+        if reuse_history:
+            self.message_history.extend(anthropic_messages)
+        else:
+            self.message_history.reset(anthropic_messages)
+            self._last_cache_breakpoint = None
 
         # Add tools if provided
         tool_schemas: list[anthropic.types.ToolUnionParam] | anthropic.NotGiven = (
             anthropic.NOT_GIVEN
         )
         if tools:
-            tool_schemas = []
-            for tool in tools:
-                if tool.name == "str_replace_based_edit_tool":
-                    tool_schemas.append(
-                        TextEditor20250429(
-                            name="str_replace_based_edit_tool",
-                            type="text_editor_20250429",
-                        )
-                    )
-                elif tool.name == "bash":
-                    tool_schemas.append(
-                        anthropic.types.ToolBash20250124Param(name="bash", type="bash_20250124")
-                    )
-                else:
-                    tool_schemas.append(
-                        anthropic.types.ToolParam(
-                            name=tool.name,
-                            description=tool.description,
-                            input_schema=tool.get_input_schema(),
-                        )
-                    )
+            tool_schemas = self.compile_tool_schemas(tools, _tool_schema)
+        return tool_schemas
+
+    @override
+    def chat(
+        self,
+        messages: list[LLMMessage],
+        model_config: ModelConfig,
+        tools: list[Tool] | None = None,
+        reuse_history: bool = True,
+    ) -> LLMResponse:
+        """Send chat messages to Anthropic with optional tool support."""
+        tool_schemas = self._prepare_request(messages, tools, reuse_history)
 
         # Apply retry decorator to the API call
         retry_decorator = retry_with(
             func=self._create_anthropic_response,
             provider_name="Anthropic",
             max_retries=model_config.max_retries,
+            circuit_breaker=self.circuit_breaker,
         )
         response = retry_decorator(model_config, tool_schemas)
 
+        return self._process_response(response, messages, model_config, tools)
+
+    @override
+    async def achat(
+        self,
+        messages: list[LLMMessage],
+        model_config: ModelConfig,
+        tools: list[Tool] | None = None,
+        reuse_history: bool = True,
+    ) -> LLMResponse:
+        """Send chat messages to Anthropic through the async SDK client."""
+        tool_schemas = self._prepare_request(messages, tools, reuse_history)
+
+        retry_decorator = async_retry_with(
+            func=self._acreate_anthropic_response,
+            provider_name="Anthropic",
+            max_retries=model_config.max_retries,
+            circuit_breaker=self.circuit_breaker,
+        )
+        response = await retry_decorator(model_config, tool_schemas)
+
+        return self._process_response(response, messages, model_config, tools)
+
+    @override
+    async def astream(
+        self,
+        messages: list[LLMMessage],
+        model_config: ModelConfig,
+        tools: list[Tool] | None = None,
+        reuse_history: bool = True,
+    ) -> AsyncIterator[LLMStreamEvent]:
+        """Stream chat messages to Anthropic through the async SDK client."""
+        tool_schemas = self._prepare_request(messages, tools, reuse_history)
+
+        retry_decorator = async_retry_stream(
+            func=self._astream_anthropic_response,
+            provider_name="Anthropic",
+            max_retries=model_config.max_retries,
+            circuit_breaker=self.circuit_breaker,
+        )
+        response: anthropic.types.Message | None = None
+        async for item in retry_decorator(model_config, tool_schemas):
+            if isinstance(item, LLMStreamEvent):
+                yield item
+            else:
+                response = item
+        assert response is not None
+
+        yield LLMStreamEvent(
+            response=self._process_response(response, messages, model_config, tools)
+        )
+
+    def _process_response(
+        self,
+        response: anthropic.types.Message,
+        messages: list[LLMMessage],
+        model_config: ModelConfig,
+        tools: list[Tool] | None,
+    ) -> LLMResponse:
+        """Convert an API response to an LLMResponse and append it to the history."""
         # Handle tool calls in response
         content = ""
         tool_calls: list[ToolCall] = []
+        blocks: list[anthropic.types.TextBlock | anthropic.types.ToolUseBlock] = []
 
         for content_block in response.content:
             if content_block.type == "text":
                 content += content_block.text
-                self.message_history.append(
-                    anthropic.types.MessageParam(role="assistant", content=content_block.text)
-                )
+                blocks.append(content_block)
             elif content_block.type == "tool_use":
                 tool_calls.append(
                     ToolCall(
@@ -119,9 +320,11 @@ class AnthropicClient(BaseLLMClient):
                         arguments=content_block.input,  # pyright: ignore[reportArgumentType]
                     )
                 )
-                self.message_history.append(
-                    anthropic.types.MessageParam(role="assistant", content=[content_block])
-                )
+                blocks.append(content_block)
+        if blocks:
+            self.message_history.append(
+                anthropic.types.MessageParam(role="assistant", content=blocks)
+            )
 
         usage = None
         if response.usage:
@@ -153,47 +356,55 @@ class AnthropicClient(BaseLLMClient):
         return llm_response
 
     def parse_messages(self, messages: list[LLMMessage]) -> list[anthropic.types.MessageParam]:
-        """Parse the messages to Anthropic format."""
+        """Parse the messages to Anthropic format, with one assistant message per turn."""
         anthropic_messages: list[anthropic.types.MessageParam] = []
         for msg in messages:
             if msg.role == "system":
                 self.system_message = msg.content if msg.content else anthropic.NOT_GIVEN
-            elif msg.tool_result:
-                anthropic_messages.append(
-                    anthropic.types.MessageParam(
-                        role="user",
-                        content=[self.parse_tool_call_result(msg.tool_result)],
-                    )
-                )
-            elif msg.tool_call:
-                anthropic_messages.append(
-                    anthropic.types.MessageParam(
-                        role="assistant", content=[self.parse_tool_call(msg.tool_call)]
-                    )
+                continue
+            parsed = self.encode_message(msg, self._parse_message)
+            if (
+                parsed["role"] == "assistant"
+                and anthropic_messages
+                and anthropic_messages[-1]["role"] == "assistant"
+            ):
+                # The text and tool calls of a turn are separate messages in the history.
+                anthropic_messages[-1] = anthropic.types.MessageParam(
+                    role="assistant",
+                    content=[*_content_blocks(anthropic_messages[-1]), *_content_blocks(parsed)],
                 )
             else:
-                if msg.role == "user":
-                    role = "user"
-                elif msg.role == "assistant":
-                    role = "assistant"
-                else:
-                    raise ValueError(f"Invalid message role: {msg.role}")
-
-                if not msg.content:
-                    raise ValueError("Message content is required")
-
-                anthropic_messages.append(
-                    anthropic.types.MessageParam(role=role, content=msg.content)
-                )
+                anthropic_messages.append(parsed)
         return anthropic_messages
 
+    def _parse_message(self, msg: LLMMessage) -> anthropic.types.MessageParam:
+        if msg.tool_result:
+            return anthropic.types.MessageParam(
+                role="user", content=[self.parse_tool_call_result(msg.tool_result)]
+            )
+        if msg.tool_call:
+            return anthropic.types.MessageParam(
+                role="assistant", content=[self.parse_tool_call(msg.tool_call)]
+            )
+        if msg.role == "user":
+            role = "user"
+        elif msg.role == "assistant":
+            role = "assistant"
+        else:
+            raise ValueError(f"Invalid message role: {msg.role}")
+
+        if not msg.content:
+            raise ValueError("Message content is required")
+
+        return anthropic.types.MessageParam(role=role, content=msg.content)
+
     def parse_tool_call(self, tool_call: ToolCall) -> anthropic.types.ToolUseBlockParam:
         """Parse the tool call from the LLM response."""
         return anthropic.types.ToolUseBlockParam(
             type="tool_use",
             id=tool_call.call_id,
             name=tool_call.name,
-            input=json.dumps(tool_call.arguments),
+            input=tool_call.arguments,
         )
 
     def parse_tool_call_result(
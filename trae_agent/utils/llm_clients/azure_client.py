@@ -6,6 +6,7 @@
 import openai
 
 from trae_agent.utils.config import ModelConfig
+from trae_agent.utils.llm_clients.http_client import get_async_http_client, get_http_client
 from trae_agent.utils.llm_clients.openai_compatible_base import (
     OpenAICompatibleClient,
     ProviderConfig,
@@ -26,6 +27,23 @@ class AzureProvider(ProviderConfig):
             azure_endpoint=base_url,
             api_version=api_version,
             api_key=api_key,
+            http_client=get_http_client("azure", base_url),
+            max_retries=0,
+        )
+
+    def create_async_client(
+        self, api_key: str, base_url: str | None, api_version: str | None
+    ) -> openai.AsyncOpenAI:
+        """Create async Azure OpenAI client."""
+        if not base_url:
+            raise ValueError("base_url is required for AzureClient")
+
+        return openai.AsyncAzureOpenAI(
+            azure_endpoint=base_url,
+            api_version=api_version,
+            api_key=api_key,
+            http_client=get_async_http_client("azure", base_url),
+            max_retries=0,
         )
 
     def get_service_name(self) -> str:
@@ -2,13 +2,30 @@
 # SPDX-License-Identifier: MIT
 
 
+import asyncio
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from typing import Any, TypeVar
 
 from trae_agent.tools.base import Tool
 from trae_agent.utils.config import ModelConfig
-from trae_agent.utils.llm_clients.llm_basics import LLMMessage, LLMResponse
+from trae_agent.utils.llm_clients.conversation import EncodingCache
+from trae_agent.utils.llm_clients.http_client import configure_http_pool, get_async_http_client
+from trae_agent.utils.llm_clients.key_pool import Endpoint, EndpointPool, get_endpoint_pool
+from trae_agent.utils.llm_clients.llm_basics import (
+    LLMMessage,
+    LLMResponse,
+    LLMStreamEvent,
+    LLMUsage,
+)
+from trae_agent.utils.llm_clients.rate_limiter import acquire_endpoint_quota, rate_limited
+from trae_agent.utils.llm_clients.retry_utils import CircuitBreaker, get_circuit_breaker
 from trae_agent.utils.trajectory_recorder import TrajectoryRecorder
 
+T = TypeVar("T")
+C = TypeVar("C")
+
 
 class BaseLLMClient(ABC):
     """Base class for LLM clients."""
@@ -17,12 +34,96 @@ class BaseLLMClient(ABC):
         self.api_key: str = model_config.model_provider.api_key
         self.base_url: str | None = model_config.model_provider.base_url
         self.api_version: str | None = model_config.model_provider.api_version
+        self.provider_name: str = model_config.model_provider.provider
+        if model_config.model_provider.http_pool is not None:
+            configure_http_pool(
+                self.provider_name, self.base_url, model_config.model_provider.http_pool
+            )
         self.trajectory_recorder: TrajectoryRecorder | None = None  # TrajectoryRecorder instance
+        # The tools the schemas were last compiled for, and the compiled schemas
+        self._compiled_tools: tuple[Tool, ...] = ()
+        self._compiled_tool_schemas: tuple[Any, ...] = ()
+        # Keys and base URLs that async requests are spread across, if more than one
+        self.endpoint_pool: EndpointPool | None = get_endpoint_pool(model_config.model_provider)
+        self._endpoint_clients: dict[Endpoint, Any] = {}
+        self._last_endpoint: Endpoint | None = None
+        # Backoff state shared by the clients of the same base URL and key, or pool of keys
+        self.circuit_breaker: CircuitBreaker = get_circuit_breaker(
+            self.provider_name, self.base_url, self.api_key, pooled=self.endpoint_pool is not None
+        )
+        # Provider encodings of the messages, shared with the other clients of the conversation
+        self.encoding_cache: EncodingCache = EncodingCache()
 
     def set_trajectory_recorder(self, recorder: TrajectoryRecorder | None) -> None:
         """Set the trajectory recorder for this client."""
         self.trajectory_recorder = recorder
 
+    def compile_tool_schemas(self, tools: list[Tool], compile_tool: Callable[[Tool], T]) -> list[T]:
+        """Return the provider schemas of the tools, compiling them only when the tools change.
+
+        Agents pass the same tools on every turn, and only add to them after MCP discovery,
+        so the schemas are kept until a different set of tool objects is passed. The cached
+        schemas are shared between requests and must not be modified.
+        """
+        if len(tools) != len(self._compiled_tools) or any(
+            tool is not compiled for tool, compiled in zip(tools, self._compiled_tools, strict=True)
+        ):
+            self._compiled_tool_schemas = tuple(compile_tool(tool) for tool in tools)
+            self._compiled_tools = tuple(tools)
+        return list(self._compiled_tool_schemas)
+
+    def encode_message(self, message: LLMMessage, encode: Callable[[LLMMessage], T]) -> T:
+        """Return the provider encoding of a message, converting it only the first time.
+
+        Clients with the same encoder share the encodings, which must not be modified.
+        """
+        return self.encoding_cache.encode(type(self).__name__, message, encode)
+
+    @asynccontextmanager
+    async def pooled_client(self, sdk_client: C) -> AsyncIterator[C]:
+        """Yield the async SDK client to send a request with.
+
+        Without an endpoint pool this is the given client. Otherwise it is a copy of it for
+        the endpoint the pool picks, once the rate limiter of the endpoint's key lets the
+        request through. Its responses update the endpoint's quota and the key's limiter.
+        """
+        if self.endpoint_pool is None:
+            yield sdk_client
+            return
+
+        endpoint = self.endpoint_pool.acquire()
+        self._last_endpoint = endpoint
+        client = self._endpoint_clients.get(endpoint)
+        if client is None:
+            options: dict[str, Any] = {"api_key": endpoint.api_key}
+            if endpoint.base_url and endpoint.base_url != self.base_url:
+                options["base_url"] = endpoint.base_url
+            http_client = get_async_http_client(
+                self.provider_name,
+                endpoint.base_url,
+                response_hooks=[endpoint.observe_response],
+            )
+            client = sdk_client.with_options(**options, http_client=http_client)  # pyright: ignore[reportAttributeAccessIssue, reportUnknownMemberType]
+            self._endpoint_clients[endpoint] = client
+        try:
+            limiter = await acquire_endpoint_quota(endpoint.api_key)
+            with rate_limited(limiter):
+                yield client
+        except Exception as e:
+            self.endpoint_pool.release(endpoint, e)
+            raise
+        except BaseException:
+            self.endpoint_pool.release(endpoint)
+            raise
+        else:
+            self.endpoint_pool.release(endpoint)
+
+    def record_endpoint_usage(self, usage: LLMUsage | None) -> None:
+        """Count the tokens of the last response against the endpoint that served it."""
+        if self.endpoint_pool is not None and self._last_endpoint is not None and usage:
+            self.endpoint_pool.record_usage(self._last_endpoint, usage)
+        self._last_endpoint = None
+
     @abstractmethod
     def set_chat_history(self, messages: list[LLMMessage]) -> None:
         """Set the chat history."""
@@ -39,6 +140,40 @@ class BaseLLMClient(ABC):
         """Send chat messages to the LLM."""
         pass
 
+    async def achat(
+        self,
+        messages: list[LLMMessage],
+        model_config: ModelConfig,
+        tools: list[Tool] | None = None,
+        reuse_history: bool = True,
+    ) -> LLMResponse:
+        """Send chat messages to the LLM without blocking the event loop.
+
+        Clients backed by an async SDK override this. The default runs the blocking `chat`
+        in a worker thread so that other coroutines keep running in the meantime.
+        """
+        return await asyncio.to_thread(self.chat, messages, model_config, tools, reuse_history)
+
+    async def astream(
+        self,
+        messages: list[LLMMessage],
+        model_config: ModelConfig,
+        tools: list[Tool] | None = None,
+        reuse_history: bool = True,
+    ) -> AsyncIterator[LLMStreamEvent]:
+        """Send chat messages to the LLM and stream the response as it is generated.
+
+        Yields text deltas and tool calls as soon as they are complete, followed by the final
+        response. Clients whose API supports streaming override this. The default sends a
+        regular request and replays the complete response as a stream.
+        """
+        response = await self.achat(messages, model_config, tools, reuse_history)
+        if response.content:
+            yield LLMStreamEvent(content_delta=response.content)
+        for tool_call in response.tool_calls or []:
+            yield LLMStreamEvent(tool_call=tool_call)
+        yield LLMStreamEvent(response=response)
+
     def supports_tool_calling(self, model_config: ModelConfig) -> bool:
         """Check if the current model supports tool calling."""
         return model_config.supports_tool_calling
@@ -0,0 +1,224 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""Context compaction for long-running conversations."""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field, replace
+
+from trae_agent.tools.base import ToolCall, ToolResult
+from trae_agent.utils.config import ContextCompactionConfig
+from trae_agent.utils.llm_clients.llm_basics import LLMMessage
+from trae_agent.utils.llm_clients.token_estimator import (
+    MESSAGE_OVERHEAD_TOKENS,
+    MessageCharsCache,
+    message_chars,
+)
+
+# Rough number of characters per token, used when no better estimate is available.
+CHARS_PER_TOKEN = 4
+
+ELIDED_ARGUMENT_MIN_CHARS = 512
+
+# Start of the placeholder of an elided tool result, which marks it as elided already.
+ELIDED_OUTPUT_PREFIX = "[Output elided to save context: "
+
+
+def estimate_message_tokens(message: LLMMessage, sizes: MessageCharsCache | None = None) -> int:
+    """Estimate the number of prompt tokens a message takes up."""
+    chars = sizes.chars(message) if sizes is not None else message_chars(message)
+    return chars // CHARS_PER_TOKEN + MESSAGE_OVERHEAD_TOKENS
+
+
+def estimate_tokens(messages: list[LLMMessage], sizes: MessageCharsCache | None = None) -> int:
+    """Estimate the number of prompt tokens for a list of messages."""
+    return sum(estimate_message_tokens(message, sizes) for message in messages)
+
+
+@dataclass
+class ElidedItem:
+    """A piece of the conversation that was removed during compaction."""
+
+    index: int
+    kind: str  # "tool_result" or "tool_call_arguments"
+    tool_name: str
+    call_id: str
+    elided_chars: int
+
+
+@dataclass
+class CompactionResult:
+    """The outcome of compacting a conversation history."""
+
+    messages: list[LLMMessage]
+    tokens_before: int
+    tokens_after: int
+    elided: list[ElidedItem] = field(default_factory=list)
+
+
+class ContextCompactor(ABC):
+    """Base class for strategies that shrink the conversation history sent to the LLM."""
+
+    @abstractmethod
+    def compact(
+        self,
+        history: list[LLMMessage],
+        incoming: list[LLMMessage],
+        token_budget: int | None = None,
+        sizes: MessageCharsCache | None = None,
+    ) -> CompactionResult | None:
+        """Compact the history before the incoming messages are sent.
+
+        Args:
+            history: Messages already part of the conversation.
+            incoming: Messages about to be appended; these are never compacted.
+            token_budget: Budget to compact to instead of the configured one, e.g. when the
+                prompt would not fit in the model's context window.
+            sizes: Character counts of the messages, kept across turns by the conversation.
+
+        Returns:
+            The compacted history, or None if no compaction was needed.
+        """
+        pass
+
+
+class ToolOutputElisionCompactor(ContextCompactor):
+    """Elide the output and large arguments of old tool calls once over the token budget.
+
+    Once over, elision goes on until the prompt is under the target ratio of the budget. The
+    system prompt and the first user message (the task) are always kept, as are the most
+    recent tool results. The structure of the conversation is preserved so that every tool
+    call still has a matching result, which providers require.
+    """
+
+    def __init__(self, config: ContextCompactionConfig):
+        self.token_budget: int = config.token_budget
+        self.keep_recent_tool_results: int = config.keep_recent_tool_results
+        self.preview_chars: int = config.preview_chars
+        self.target_ratio: float = config.target_ratio
+
+    def compact(
+        self,
+        history: list[LLMMessage],
+        incoming: list[LLMMessage],
+        token_budget: int | None = None,
+        sizes: MessageCharsCache | None = None,
+    ) -> CompactionResult | None:
+        token_budget = self.token_budget if token_budget is None else token_budget
+        token_counts = [estimate_message_tokens(message, sizes) for message in history]
+        incoming_tokens = estimate_tokens(incoming, sizes)
+        tokens_before = sum(token_counts) + incoming_tokens
+        if tokens_before <= token_budget:
+            return None
+        # Free more than the overflow, so that the next turns fit without compacting again.
+        target = int(token_budget * self.target_ratio)
+
+        pinned = self._pinned_count(history)
+        result_indices = [
+            i for i in range(pinned, len(history)) if history[i].tool_result is not None
+        ]
+        if self.keep_recent_tool_results > 0:
+            result_indices = result_indices[: -self.keep_recent_tool_results]
+        protected_from = result_indices[-1] + 1 if result_indices else pinned
+
+        compacted = list(history)
+        elided: list[ElidedItem] = []
+        total = tokens_before
+
+        for index in result_indices:
+            if total <= target:
+                break
+            message = compacted[index]
+            assert message.tool_result is not None
+            new_result, chars = self._elide_tool_result(message.tool_result)
+            if chars == 0:
+                continue
+            compacted[index] = replace(message, tool_result=new_result)
+            elided.append(
+                ElidedItem(
+                    index=index,
+                    kind="tool_result",
+                    tool_name=message.tool_result.name,
+                    call_id=message.tool_result.call_id,
+                    elided_chars=chars,
+                )
+            )
+            new_count = estimate_message_tokens(compacted[index], sizes)
+            total -= token_counts[index] - new_count
+            token_counts[index] = new_count
+
+        for index in range(pinned, protected_from):
+            if total <= target:
+                break
+            message = compacted[index]
+            if message.tool_call is None:
+                continue
+            new_call, chars = self._elide_tool_call_arguments(message.tool_call)
+            if chars == 0:
+                continue
+            compacted[index] = replace(message, tool_call=new_call)
+            elided.append(
+                ElidedItem(
+                    index=index,
+                    kind="tool_call_arguments",
+                    tool_name=message.tool_call.name,
+                    call_id=message.tool_call.call_id,
+                    elided_chars=chars,
+                )
+            )
+            new_count = estimate_message_tokens(compacted[index], sizes)
+            total -= token_counts[index] - new_count
+            token_counts[index] = new_count
+
+        if not elided:
+            return None
+
+        return CompactionResult(
+            messages=compacted,
+            tokens_before=tokens_before,
+            tokens_after=total,
+            elided=elided,
+        )
+
+    def _pinned_count(self, history: list[LLMMessage]) -> int:
+        """Number of leading messages (system prompt and task) that are never compacted."""
+        for index, message in enumerate(history):
+            if message.role == "user" and message.tool_result is None:
+                return index + 1
+        return 0
+
+    def _elide_tool_result(self, tool_result: ToolResult) -> tuple[ToolResult, int]:
+        result = tool_result.result or ""
+        error = tool_result.error or ""
+        original_chars = len(result) + len(error)
+        if original_chars <= self.preview_chars or (result or error).startswith(
+            ELIDED_OUTPUT_PREFIX
+        ):
+            return tool_result, 0
+
+        preview = (result or error)[: self.preview_chars]
+        placeholder = (
+            f"{ELIDED_OUTPUT_PREFIX}{original_chars} characters from "
+            f"`{tool_result.name}`. Run the tool again if you need the full output.]\n"
+            f"Preview:\n{preview}"
+        )
+        if len(placeholder) >= original_chars:
+            # Outputs just over the preview length would only grow.
+            return tool_result, 0
+        if result:
+            new_result = replace(tool_result, result=placeholder, error=None)
+        else:
+            new_result = replace(tool_result, error=placeholder)
+        return new_result, original_chars - len(placeholder)
+
+    def _elide_tool_call_arguments(self, tool_call: ToolCall) -> tuple[ToolCall, int]:
+        arguments = dict(tool_call.arguments)
+        elided_chars = 0
+        for key, value in tool_call.arguments.items():
+            if isinstance(value, str) and len(value) > ELIDED_ARGUMENT_MIN_CHARS:
+                placeholder = f"[{len(value)} characters elided to save context]"
+                arguments[key] = placeholder
+                elided_chars += len(value) - len(placeholder)
+        if elided_chars == 0:
+            return tool_call, 0
+        return replace(tool_call, arguments=arguments), elided_chars
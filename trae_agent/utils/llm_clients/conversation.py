@@ -0,0 +1,137 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""Provider-neutral conversation store, and the provider encodings of its messages.
+
+The conversation is kept once, as `LLMMessage`s, by `LLMClient`. The provider clients build
+their own message history from it, but each message is converted to a provider's format only
+once: the encodings are memoized per encoder, and shared by the forks of the conversation,
+so rebuilding a provider history after a fork, a compaction or a failover only looks them up.
+The character counts behind the prompt size estimates are memoized the same way.
+Messages are never modified once they are in a conversation; compaction replaces them with
+new ones.
+"""
+
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from typing import Any, TypeVar, overload, override
+
+from trae_agent.utils.llm_clients.llm_basics import LLMMessage
+from trae_agent.utils.llm_clients.token_estimator import MessageCharsCache
+
+T = TypeVar("T")
+
+
+class EncodingCache:
+    """Provider encodings of messages, computed once per message and encoder.
+
+    Encodings are shared by every history built from them and must not be modified.
+    """
+
+    def __init__(self):
+        # Encoder name -> message id -> (message, encoding). The message is kept so that
+        # its id is not reused while the encoding is cached.
+        self._encodings: dict[str, dict[int, tuple[LLMMessage, Any]]] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._encodings.values())
+
+    def encode(self, encoder: str, message: LLMMessage, encode: Callable[[LLMMessage], T]) -> T:
+        """Return the encoding of the message by the encoder, computing it on first use."""
+        entries = self._encodings.setdefault(encoder, {})
+        entry = entries.get(id(message))
+        if entry is not None and entry[0] is message:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        encoded = encode(message)
+        entries[id(message)] = (message, encoded)
+        return encoded
+
+    def retain(self, messages: Iterable[LLMMessage]) -> None:
+        """Drop the encodings of messages other than the given ones, e.g. after compaction."""
+        live = {id(message) for message in messages}
+        for encoder, entries in self._encodings.items():
+            self._encodings[encoder] = {key: entry for key, entry in entries.items() if key in live}
+
+
+class Conversation(Sequence[LLMMessage]):
+    """Messages of a conversation, which forks share until they diverge.
+
+    Forking is O(1): the fork shares the message list and remembers its length. The list is
+    only appended to, in place, by whichever conversation reaches its end first; the other
+    copies its part of the list before its own first append.
+    """
+
+    def __init__(
+        self,
+        messages: Iterable[LLMMessage] = (),
+        encodings: EncodingCache | None = None,
+        sizes: MessageCharsCache | None = None,
+    ):
+        self._items: list[LLMMessage] = list(messages)
+        self._length: int = len(self._items)
+        self.encodings: EncodingCache = encodings if encodings is not None else EncodingCache()
+        self.sizes: MessageCharsCache = sizes if sizes is not None else MessageCharsCache()
+
+    @override
+    def __len__(self) -> int:
+        return self._length
+
+    @overload
+    def __getitem__(self, index: int) -> LLMMessage: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[LLMMessage]: ...
+
+    @override
+    def __getitem__(self, index: int | slice) -> LLMMessage | list[LLMMessage]:
+        if isinstance(index, slice):
+            return self._items[slice(*index.indices(self._length))]
+        return self._items[range(self._length)[index]]
+
+    @override
+    def __iter__(self) -> Iterator[LLMMessage]:
+        for i in range(self._length):
+            yield self._items[i]
+
+    def _own_tail(self) -> None:
+        if len(self._items) != self._length:
+            # A fork appended to the shared list first.
+            self._items = self._items[: self._length]
+
+    def append(self, message: LLMMessage) -> None:
+        self._own_tail()
+        self._items.append(message)
+        self._length += 1
+
+    def extend(self, messages: Iterable[LLMMessage]) -> None:
+        self._own_tail()
+        self._items.extend(messages)
+        self._length = len(self._items)
+
+    def replace(self, messages: Iterable[LLMMessage]) -> "Conversation":
+        """Return a conversation of the given messages, sharing the encodings of this one."""
+        return Conversation(messages, self.encodings, self.sizes)
+
+    def fork(self) -> "Conversation":
+        """Return a conversation that starts as this one and continues independently."""
+        fork = Conversation(encodings=self.encodings, sizes=self.sizes)
+        fork._items = self._items
+        fork._length = self._length
+        return fork
+
+    def drop_stale_caches(self) -> None:
+        """Drop the encodings and counts of messages that left the conversation."""
+        self.encodings.retain(self)
+        self.sizes.retain(self)
+
+    def to_list(self) -> list[LLMMessage]:
+        """Return the messages as a list, without copying them unless a fork has appended.
+
+        The list may be the conversation's own and must not be modified.
+        """
+        if len(self._items) == self._length:
+            return self._items
+        return self._items[: self._length]
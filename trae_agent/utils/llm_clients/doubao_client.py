@@ -6,6 +6,7 @@
 import openai
 
 from trae_agent.utils.config import ModelConfig
+from trae_agent.utils.llm_clients.http_client import get_async_http_client, get_http_client
 from trae_agent.utils.llm_clients.openai_compatible_base import (
     OpenAICompatibleClient,
     ProviderConfig,
@@ -19,7 +20,23 @@ class DoubaoProvider(ProviderConfig):
         self, api_key: str, base_url: str | None, api_version: str | None
     ) -> openai.OpenAI:
         """Create OpenAI client with Doubao base URL."""
-        return openai.OpenAI(base_url=base_url, api_key=api_key)
+        return openai.OpenAI(
+            base_url=base_url,
+            api_key=api_key,
+            http_client=get_http_client("doubao", base_url),
+            max_retries=0,
+        )
+
+    def create_async_client(
+        self, api_key: str, base_url: str | None, api_version: str | None
+    ) -> openai.AsyncOpenAI:
+        """Create async OpenAI client with Doubao base URL."""
+        return openai.AsyncOpenAI(
+            base_url=base_url,
+            api_key=api_key,
+            http_client=get_async_http_client("doubao", base_url),
+            max_retries=0,
+        )
 
     def get_service_name(self) -> str:
         """Get the service name for retry logging."""
@@ -6,6 +6,7 @@
 import json
 import traceback
 import uuid
+from collections.abc import AsyncIterator
 from typing import override
 
 from google import genai
@@ -14,8 +15,18 @@ from google.genai import types
 from trae_agent.tools.base import Tool, ToolCall, ToolResult
 from trae_agent.utils.config import ModelConfig
 from trae_agent.utils.llm_clients.base_client import BaseLLMClient
-from trae_agent.utils.llm_clients.llm_basics import LLMMessage, LLMResponse, LLMUsage
-from trae_agent.utils.llm_clients.retry_utils import retry_with
+from trae_agent.utils.llm_clients.llm_basics import (
+    LLMMessage,
+    LLMResponse,
+    LLMStreamEvent,
+    LLMUsage,
+)
+from trae_agent.utils.llm_clients.message_history import HistorySnapshot, MessageHistory
+from trae_agent.utils.llm_clients.retry_utils import (
+    async_retry_stream,
+    async_retry_with,
+    retry_with,
+)
 
 
 class GoogleClient(BaseLLMClient):
@@ -25,13 +36,14 @@ class GoogleClient(BaseLLMClient):
         super().__init__(model_config)
 
         self.client = genai.Client(api_key=self.api_key)
-        self.message_history: list[types.Content] = []
+        self.message_history: MessageHistory[types.Content] = MessageHistory()
         self.system_instruction: str | None = None
 
     @override
     def set_chat_history(self, messages: list[LLMMessage]) -> None:
         """Set the chat history."""
-        self.message_history, self.system_instruction = self.parse_messages(messages)
+        history, self.system_instruction = self.parse_messages(messages)
+        self.message_history.reset(history)
 
     def _create_google_response(
         self,
@@ -46,23 +58,86 @@ class GoogleClient(BaseLLMClient):
             config=generation_config,
         )
 
-    @override
-    def chat(
+    async def _acreate_google_response(
+        self,
+        model_config: ModelConfig,
+        current_chat_contents: list[types.Content],
+        generation_config: types.GenerateContentConfig,
+    ) -> types.GenerateContentResponse:
+        """Async variant of `_create_google_response`."""
+        return await self.client.aio.models.generate_content(  # pyright: ignore[reportUnknownMemberType]
+            model=model_config.model,
+            contents=current_chat_contents,
+            config=generation_config,
+        )
+
+    async def _astream_google_response(
+        self,
+        model_config: ModelConfig,
+        current_chat_contents: list[types.Content],
+        generation_config: types.GenerateContentConfig,
+    ) -> AsyncIterator[LLMStreamEvent | types.GenerateContentResponse]:
+        """Stream a response, yielding deltas and finally the merged response."""
+        parts: list[types.Part] = []
+        last_chunk: types.GenerateContentResponse | None = None
+        async for chunk in await self.client.aio.models.generate_content_stream(  # pyright: ignore[reportUnknownMemberType]
+            model=model_config.model,
+            contents=current_chat_contents,
+            config=generation_config,
+        ):
+            last_chunk = chunk
+            if not chunk.candidates or not chunk.candidates[0].content:
+                continue
+            for part in chunk.candidates[0].content.parts or []:
+                if part.text:
+                    yield LLMStreamEvent(content_delta=part.text)
+                    # Merge consecutive text deltas back into a single part.
+                    if parts and parts[-1].text and not parts[-1].thought:
+                        parts[-1] = types.Part(text=parts[-1].text + part.text)
+                        continue
+                elif part.function_call:
+                    # Gemini sends function calls whole. Give them an id now so that the call
+                    # yielded here matches the one in the final response.
+                    part.function_call.id = part.function_call.id or str(uuid.uuid4())
+                    yield LLMStreamEvent(tool_call=_parse_function_call(part.function_call))
+                parts.append(part)
+
+        candidate = (
+            last_chunk.candidates[0] if last_chunk and last_chunk.candidates else types.Candidate()
+        )
+        yield types.GenerateContentResponse(
+            candidates=[
+                types.Candidate(
+                    content=types.Content(role="model", parts=parts) if parts else None,
+                    finish_reason=candidate.finish_reason,
+                )
+            ],
+            usage_metadata=last_chunk.usage_metadata if last_chunk else None,
+        )
+
+    def _prepare_request(
         self,
         messages: list[LLMMessage],
         model_config: ModelConfig,
-        tools: list[Tool] | None = None,
-        reuse_history: bool = True,
-    ) -> LLMResponse:
-        """Send chat messages to Gemini with optional tool support."""
+        tools: list[Tool] | None,
+        reuse_history: bool,
+    ) -> tuple[
+        list[types.Content], types.GenerateContentConfig, HistorySnapshot[types.Content], str | None
+    ]:
+        """Append the new messages to the history and build the generation config.
+
+        Also returns a snapshot of the history before the turn, which is restored if the
+        request fails.
+        """
         newly_parsed_messages, system_instruction_from_message = self.parse_messages(messages)
 
         current_system_instruction = system_instruction_from_message or self.system_instruction
 
+        previous_history = self.message_history.snapshot()
         if reuse_history:
-            current_chat_contents = self.message_history + newly_parsed_messages
+            self.message_history.extend(newly_parsed_messages)
         else:
-            current_chat_contents = newly_parsed_messages
+            self.message_history.reset(newly_parsed_messages)
 
         # Set up generation config
         generation_config = types.GenerateContentConfig(
@@ -77,28 +152,145 @@ class GoogleClient(BaseLLMClient):
 
         # Add tools if provided
         if tools:
-            tool_schemas = [
-                types.Tool(
+            generation_config.tools = self.compile_tool_schemas(
+                tools,
+                lambda tool: types.Tool(
                     function_declarations=[
                         types.FunctionDeclaration(
-                            name=tool.get_name(),
-                            description=tool.get_description(),
+                            name=tool.name,
+                            description=tool.description,
                             parameters=tool.get_input_schema(),  # pyright: ignore[reportArgumentType]
                         )
                     ]
-                )
-                for tool in tools
-            ]
-            generation_config.tools = tool_schemas
+                ),
+            )
+
+        return (
+            self.message_history.to_list(),
+            generation_config,
+            previous_history,
+            current_system_instruction,
+        )
+
+    @override
+    def chat(
+        self,
+        messages: list[LLMMessage],
+        model_config: ModelConfig,
+        tools: list[Tool] | None = None,
+        reuse_history: bool = True,
+    ) -> LLMResponse:
+        """Send chat messages to Gemini with optional tool support."""
+        current_chat_contents, generation_config, previous_history, system_instruction = (
+            self._prepare_request(messages, model_config, tools, reuse_history)
+        )
 
         # Apply retry decorator to the API call
         retry_decorator = retry_with(
             func=self._create_google_response,
             provider_name="Google Gemini",
             max_retries=model_config.max_retries,
+            circuit_breaker=self.circuit_breaker,
+        )
+        try:
+            response = retry_decorator(model_config, current_chat_contents, generation_config)
+        except BaseException:
+            self.message_history.restore(previous_history)
+            raise
+
+        return self._process_response(
+            response,
+            messages,
+            model_config,
+            tools,
+            system_instruction,
         )
-        response = retry_decorator(model_config, current_chat_contents, generation_config)
 
+    @override
+    async def achat(
+        self,
+        messages: list[LLMMessage],
+        model_config: ModelConfig,
+        tools: list[Tool] | None = None,
+        reuse_history: bool = True,
+    ) -> LLMResponse:
+        """Send chat messages to Gemini through the async SDK client."""
+        current_chat_contents, generation_config, previous_history, system_instruction = (
+            self._prepare_request(messages, model_config, tools, reuse_history)
+        )
+
+        retry_decorator = async_retry_with(
+            func=self._acreate_google_response,
+            provider_name="Google Gemini",
+            max_retries=model_config.max_retries,
+            circuit_breaker=self.circuit_breaker,
+        )
+        try:
+            response = await retry_decorator(model_config, current_chat_contents, generation_config)
+        except BaseException:
+            self.message_history.restore(previous_history)
+            raise
+
+        return self._process_response(
+            response,
+            messages,
+            model_config,
+            tools,
+            system_instruction,
+        )
+
+    @override
+    async def astream(
+        self,
+        messages: list[LLMMessage],
+        model_config: ModelConfig,
+        tools: list[Tool] | None = None,
+        reuse_history: bool = True,
+    ) -> AsyncIterator[LLMStreamEvent]:
+        """Stream chat messages to Gemini through the async SDK client."""
+        current_chat_contents, generation_config, previous_history, system_instruction = (
+            self._prepare_request(messages, model_config, tools, reuse_history)
+        )
+
+        retry_decorator = async_retry_stream(
+            func=self._astream_google_response,
+            provider_name="Google Gemini",
+            max_retries=model_config.max_retries,
+            circuit_breaker=self.circuit_breaker,
+        )
+        response: types.GenerateContentResponse | None = None
+        try:
+            async for item in retry_decorator(
+                model_config, current_chat_contents, generation_config
+            ):
+                if isinstance(item, LLMStreamEvent):
+                    yield item
+                else:
+                    response = item
+        except BaseException:
+            self.message_history.restore(previous_history)
+            raise
+        assert response is not None
+
+        yield LLMStreamEvent(
+            response=self._process_response(
+                response,
+                messages,
+                model_config,
+                tools,
+                system_instruction,
+            )
+        )
+
+    def _process_response(
+        self,
+        response: types.GenerateContentResponse,
+        messages: list[LLMMessage],
+        model_config: ModelConfig,
+        tools: list[Tool] | None,
+        current_system_instruction: str | None,
+    ) -> LLMResponse:
+        """Convert an API response to an LLMResponse and update the history."""
         content = ""
         tool_calls: list[ToolCall] = []
         assistant_response_content = None
@@ -111,25 +303,10 @@ class GoogleClient(BaseLLMClient):
                     if part.text:
                         content += part.text
                     elif part.function_call:
-                        tool_calls.append(
-                            ToolCall(
-                                call_id=str(uuid.uuid4()),
-                                name=part.function_call.name or "tool",
-                                arguments=dict(part.function_call.args)
-                                if part.function_call.args
-                                else {},
-                            )
-                        )
-
-        if reuse_history:
-            new_history = self.message_history + newly_parsed_messages
-        else:
-            new_history = newly_parsed_messages
+                        tool_calls.append(_parse_function_call(part.function_call))
 
         if assistant_response_content:
-            new_history.append(assistant_response_content)
-
-        self.message_history = new_history
+            self.message_history.append(assistant_response_content)
 
         if current_system_instruction:
             self.system_instruction = current_system_instruction
@@ -176,26 +353,19 @@ class GoogleClient(BaseLLMClient):
         for msg in messages:
             if msg.role == "system":
                 system_instruction = msg.content
-                continue
-            elif msg.tool_result:
-                gemini_messages.append(
-                    types.Content(
-                        role="tool",
-                        parts=[self.parse_tool_call_result(msg.tool_result)],
-                    )
-                )
-            elif msg.tool_call:
-                gemini_messages.append(
-                    types.Content(role="model", parts=[self.parse_tool_call(msg.tool_call)])
-                )
             else:
-                role = "user" if msg.role == "user" else "model"
-                gemini_messages.append(
-                    types.Content(role=role, parts=[types.Part(text=msg.content or "")])
-                )
+                gemini_messages.append(self.encode_message(msg, self._parse_message))
 
         return gemini_messages, system_instruction
 
+    def _parse_message(self, msg: LLMMessage) -> types.Content:
+        if msg.tool_result:
+            return types.Content(role="tool", parts=[self.parse_tool_call_result(msg.tool_result)])
+        if msg.tool_call:
+            return types.Content(role="model", parts=[self.parse_tool_call(msg.tool_call)])
+        role = "user" if msg.role == "user" else "model"
+        return types.Content(role=role, parts=[types.Part(text=msg.content or "")])
+
     def parse_tool_call(self, tool_call: ToolCall) -> types.Part:
         """Parse a ToolCall into a Gemini FunctionCall Part for history."""
         return types.Part.from_function_call(name=tool_call.name, args=tool_call.arguments)
@@ -227,3 +397,12 @@ class GoogleClient(BaseLLMClient):
                 "ToolResult must have a 'name' attribute matching the function that was called."
             )
         return types.Part.from_function_response(name=tool_result.name, response=result_content)
+
+
+def _parse_function_call(function_call: types.FunctionCall) -> ToolCall:
+    """Convert a Gemini function call to a ToolCall."""
+    return ToolCall(
+        call_id=function_call.id or str(uuid.uuid4()),
+        name=function_call.name or "tool",
+        arguments=dict(function_call.args) if function_call.args else {},
+    )
@@ -0,0 +1,56 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""Latency tracking for hedged LLM requests.
+
+A hedged call sends a duplicate request when the first one has not answered within a
+latency percentile of recent calls, and takes whichever answers first. Latencies are
+shared by every agent of the process calling the same model, so that the percentile is
+known early and reflects the provider's current state.
+"""
+
+import math
+import threading
+from collections import deque
+
+
+class LatencyTracker:
+    """Latencies of the recent calls to a model, and the hedges sent for them."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples: int = min_samples
+        self.hedges_fired: int = 0
+        self.hedges_won: int = 0
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock: threading.Lock = threading.Lock()
+
+    def record(self, latency: float) -> None:
+        with self._lock:
+            self._samples.append(latency)
+
+    def record_hedge(self, won: bool) -> None:
+        with self._lock:
+            self.hedges_fired += 1
+            self.hedges_won += won
+
+    def hedge_delay(self, percentile: float) -> float | None:
+        """Seconds to wait for a call before hedging it, or None while samples are few."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        rank = max(math.ceil(percentile / 100 * len(ordered)), 1)
+        return ordered[rank - 1]
+
+
+_trackers: dict[tuple[str, str], LatencyTracker] = {}
+_trackers_lock = threading.Lock()
+
+
+def get_latency_tracker(provider: str, model: str) -> LatencyTracker:
+    """Return the process-wide latency tracker of the model."""
+    with _trackers_lock:
+        tracker = _trackers.get((provider, model))
+        if tracker is None:
+            tracker = _trackers[(provider, model)] = LatencyTracker()
+        return tracker
@@ -0,0 +1,188 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""Shared HTTP connection pools for the provider SDK clients.
+
+Every SDK client of a provider and base URL sends through the same pool, so that agents,
+Lakeview and the clients of a batch reuse each other's connections instead of opening
+their own. Sync clients share one pool per process. Async connections are bound to the
+event loop that opened them, so async clients share one pool per event loop; the client
+handed to the SDKs forwards each request to the pool of the loop it is sent from. Every
+response is shown to the rate limiter of the call that sent it.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import threading
+import weakref
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import Any
+
+import httpx
+
+from trae_agent.utils.config import HttpPoolConfig
+from trae_agent.utils.llm_clients.rate_limiter import observe_rate_limits
+
+logger = logging.getLogger(__name__)
+
+# Mirror the default timeout of the OpenAI and Anthropic SDKs.
+DEFAULT_TIMEOUT = httpx.Timeout(timeout=600.0, connect=5.0)
+
+PoolKey = tuple[str, str | None]
+
+_lock = threading.Lock()
+_pool_configs: dict[PoolKey, HttpPoolConfig] = {}
+_requests: dict[PoolKey, int] = {}
+_sync_clients: dict[PoolKey, httpx.Client] = {}
+_async_clients: dict[PoolKey, httpx.AsyncClient] = {}
+_loop_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[PoolKey, httpx.AsyncClient]]" = weakref.WeakKeyDictionary()
+
+
+def configure_http_pool(provider: str, base_url: str | None, config: HttpPoolConfig) -> None:
+    """Set the limits of the pool of a provider and base URL, before it is first used."""
+    with _lock:
+        _pool_configs[(provider, base_url)] = config
+
+
+def _pool_options(key: PoolKey) -> dict[str, Any]:
+    config = _pool_configs.get(key, HttpPoolConfig())
+    http2 = config.http2
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP/2 needs the h2 package (pip install 'httpx[http2]'); using HTTP/1.1.")
+        http2 = False
+    return {
+        "limits": httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry,
+        ),
+        "timeout": DEFAULT_TIMEOUT,
+        "follow_redirects": True,
+        "http2": http2,
+    }
+
+
+def _count_request(key: PoolKey) -> None:
+    with _lock:
+        _requests[key] = _requests.get(key, 0) + 1
+
+
+def get_http_client(provider: str, base_url: str | None) -> httpx.Client:
+    """Return the process-wide sync client of the provider and base URL."""
+    key = (provider, base_url)
+    with _lock:
+        client = _sync_clients.get(key)
+    if client is None:
+        client = httpx.Client(
+            **_pool_options(key),
+            event_hooks={
+                "request": [lambda _: _count_request(key)],
+                "response": [observe_rate_limits],
+            },
+        )
+        with _lock:
+            client = _sync_clients.setdefault(key, client)
+    return client
+
+
+def get_loop_http_pool(provider: str, base_url: str | None) -> httpx.AsyncClient:
+    """Return the connection pool of the provider and base URL for the running event loop."""
+    loop = asyncio.get_running_loop()
+    key = (provider, base_url)
+    with _lock:
+        pools = _loop_pools.setdefault(loop, {})
+        pool = pools.get(key)
+        if pool is None:
+            pool = pools[key] = httpx.AsyncClient(**_pool_options(key))
+        return pool
+
+
+class _SharedAsyncClient(httpx.AsyncClient):
+    """Async client that sends through the shared pool of the running event loop."""
+
+    def __init__(
+        self,
+        key: PoolKey,
+        response_hooks: list[Callable[[httpx.Response], Awaitable[None]]] | None = None,
+    ):
+        # Requests are built here but never sent by this client's own transport.
+        super().__init__(transport=httpx.AsyncBaseTransport(), trust_env=False)
+        self._key: PoolKey = key
+        self._response_hooks: list[Callable[[httpx.Response], Awaitable[None]]] = (
+            response_hooks or []
+        )
+
+    async def send(self, request: httpx.Request, **kwargs: Any) -> httpx.Response:
+        _count_request(self._key)
+        response = await get_loop_http_pool(*self._key).send(request, **kwargs)
+        observe_rate_limits(response)
+        for hook in self._response_hooks:
+            await hook(response)
+        return response
+
+
+def get_async_http_client(
+    provider: str,
+    base_url: str | None,
+    response_hooks: list[Callable[[httpx.Response], Awaitable[None]]] | None = None,
+) -> httpx.AsyncClient:
+    """Return an async client for the SDKs that sends through the shared pools.
+
+    Clients with response hooks are created for the caller; the others are shared.
+    """
+    key = (provider, base_url)
+    if response_hooks:
+        return _SharedAsyncClient(key, response_hooks)
+    with _lock:
+        client = _async_clients.get(key)
+        if client is None:
+            client = _async_clients[key] = _SharedAsyncClient(key)
+        return client
+
+
+@asynccontextmanager
+async def closing_http_pools() -> AsyncIterator[None]:
+    """Close the async connection pools opened in the running event loop on exit."""
+    loop = asyncio.get_running_loop()
+    try:
+        yield
+    finally:
+        with _lock:
+            pools = _loop_pools.pop(loop, {})
+        for pool in pools.values():
+            await pool.aclose()
+
+
+def _connection_counts(client: httpx.Client | httpx.AsyncClient) -> tuple[int, int]:
+    """Open and idle connections of a client's pool."""
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    connections = getattr(pool, "connections", [])
+    return len(connections), sum(connection.is_idle() for connection in connections)
+
+
+def http_pool_stats() -> dict[str, dict[str, object]]:
+    """Requests sent and connections held by each shared pool."""
+    with _lock:
+        keys = set(_requests) | set(_sync_clients)
+        for pools in _loop_pools.values():
+            keys |= set(pools)
+        clients: dict[PoolKey, list[httpx.Client | httpx.AsyncClient]] = {key: [] for key in keys}
+        for key, client in _sync_clients.items():
+            clients[key].append(client)
+        for pools in _loop_pools.values():
+            for key, pool in pools.items():
+                clients[key].append(pool)
+        requests = dict(_requests)
+
+    stats: dict[str, dict[str, object]] = {}
+    for key, key_clients in sorted(clients.items(), key=lambda item: str(item[0])):
+        counts = [_connection_counts(client) for client in key_clients]
+        provider, base_url = key
+        stats[f"{provider}@{base_url}" if base_url else provider] = {
+            "requests": requests.get(key, 0),
+            "connections": sum(open_count for open_count, _ in counts),
+            "idle_connections": sum(idle for _, idle in counts),
+        }
+    return stats
@@ -0,0 +1,243 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""Pools of API keys and base URLs that requests to a provider are spread across."""
+
+import math
+import threading
+import time
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager, suppress
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+import httpx
+
+from trae_agent.utils.config import ModelProvider
+from trae_agent.utils.llm_clients.llm_basics import LLMUsage
+from trae_agent.utils.llm_clients.retry_utils import ErrorKind, classify_error, server_retry_delay
+
+# Remaining request and token quota, as reported by OpenAI (and Azure) and by Anthropic.
+REMAINING_REQUESTS_HEADERS = (
+    "x-ratelimit-remaining-requests",
+    "anthropic-ratelimit-requests-remaining",
+)
+REMAINING_TOKENS_HEADERS = ("x-ratelimit-remaining-tokens", "anthropic-ratelimit-tokens-remaining")
+
+
+def _header_int(headers: Mapping[str, str], names: tuple[str, ...]) -> int | None:
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            try:
+                return int(float(value))
+            except ValueError:
+                continue
+    return None
+
+
+@dataclass(eq=False)
+class Endpoint:
+    """An API key and base URL of a pool, with its load, quota and usage."""
+
+    api_key: str
+    base_url: str | None
+    outstanding: int = 0
+    requests: int = 0
+    rate_limited: int = 0
+    errors: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    remaining_requests: int | None = None
+    remaining_tokens: int | None = None
+    drained_until: float = 0.0
+
+    @property
+    def label(self) -> str:
+        """The endpoint with its key masked, for reports."""
+        key = f"...{self.api_key[-4:]}" if len(self.api_key) > 8 else "..."
+        return f"{key}@{self.base_url}" if self.base_url else key
+
+    def observe_headers(self, headers: Mapping[str, str]) -> None:
+        """Update the remaining quota from the rate limit headers of a response."""
+        remaining_requests = _header_int(headers, REMAINING_REQUESTS_HEADERS)
+        if remaining_requests is not None:
+            self.remaining_requests = remaining_requests
+        remaining_tokens = _header_int(headers, REMAINING_TOKENS_HEADERS)
+        if remaining_tokens is not None:
+            self.remaining_tokens = remaining_tokens
+
+    async def observe_response(self, response: httpx.Response) -> None:
+        """httpx response hook of the endpoint's connection pool."""
+        self.observe_headers(response.headers)
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "endpoint": self.label,
+            "requests": self.requests,
+            "rate_limited": self.rate_limited,
+            "errors": self.errors,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "remaining_requests": self.remaining_requests,
+            "remaining_tokens": self.remaining_tokens,
+        }
+
+
+class EndpointUsage:
+    """Usage of pooled endpoints by the requests made in a `collect_endpoint_usage` context,
+    e.g. by one agent task, as opposed to the process-wide counters of the pools."""
+
+    def __init__(self):
+        self._counters: dict[Endpoint, tuple[str, Endpoint]] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def counters(self, provider: str, endpoint: Endpoint) -> Endpoint:
+        """The counters of the pool endpoint in this usage."""
+        with self._lock:
+            entry = self._counters.get(endpoint)
+            if entry is None:
+                counters = Endpoint(api_key=endpoint.api_key, base_url=endpoint.base_url)
+                entry = self._counters[endpoint] = (provider, counters)
+            return entry[1]
+
+    def stats(self) -> dict[str, list[dict[str, object]]]:
+        """Usage of each endpoint, by provider, with the quota it has left."""
+        stats: dict[str, list[dict[str, object]]] = {}
+        with self._lock:
+            for endpoint, (provider, counters) in self._counters.items():
+                entry = counters.to_dict()
+                entry["remaining_requests"] = endpoint.remaining_requests
+                entry["remaining_tokens"] = endpoint.remaining_tokens
+                stats.setdefault(provider, []).append(entry)
+        return stats
+
+
+_endpoint_usage: ContextVar[EndpointUsage | None] = ContextVar("endpoint_usage", default=None)
+
+
+@contextmanager
+def collect_endpoint_usage() -> Iterator[EndpointUsage]:
+    """Count the use of pooled endpoints by the requests made in this context."""
+    usage = EndpointUsage()
+    token = _endpoint_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        with suppress(ValueError):
+            _endpoint_usage.reset(token)
+
+
+class EndpointPool:
+    """Spreads requests across endpoints by outstanding requests and remaining quota.
+
+    An endpoint that answers with a rate limit is drained: it gets no new requests until
+    the server's Retry-After, or `drain_seconds`, has passed, unless every endpoint is
+    drained.
+    """
+
+    def __init__(
+        self,
+        endpoints: list[tuple[str, str | None]],
+        drain_seconds: float = 30.0,
+        provider: str = "",
+    ):
+        self.endpoints: list[Endpoint] = [
+            Endpoint(api_key=api_key, base_url=base_url) for api_key, base_url in endpoints
+        ]
+        self.drain_seconds: float = drain_seconds
+        self.provider: str = provider
+        self._next: int = 0
+        self._lock: threading.Lock = threading.Lock()
+
+    def acquire(self) -> Endpoint:
+        """Pick the endpoint for a request and count it as outstanding."""
+        with self._lock:
+            now = time.monotonic()
+            # Start the search at a rotating position, so that ties are spread evenly.
+            count = len(self.endpoints)
+            candidates = [self.endpoints[(self._next + i) % count] for i in range(count)]
+            self._next = (self._next + 1) % count
+            available = [endpoint for endpoint in candidates if endpoint.drained_until <= now]
+            if available:
+                endpoint = min(
+                    available,
+                    key=lambda endpoint: (
+                        endpoint.outstanding,
+                        -(
+                            endpoint.remaining_tokens
+                            if endpoint.remaining_tokens is not None
+                            else math.inf
+                        ),
+                        -(
+                            endpoint.remaining_requests
+                            if endpoint.remaining_requests is not None
+                            else math.inf
+                        ),
+                    ),
+                )
+            else:
+                endpoint = min(candidates, key=lambda endpoint: endpoint.drained_until)
+            endpoint.outstanding += 1
+            for counters in self._counters(endpoint):
+                counters.requests += 1
+            return endpoint
+
+    def _counters(self, endpoint: Endpoint) -> list[Endpoint]:
+        """The endpoint, and its counters in the usage being collected, if any."""
+        usage = _endpoint_usage.get()
+        if usage is None:
+            return [endpoint]
+        return [endpoint, usage.counters(self.provider, endpoint)]
+
+    def release(self, endpoint: Endpoint, error: BaseException | None = None) -> None:
+        """Mark the request as finished, draining the endpoint if it was rate limited."""
+        with self._lock:
+            endpoint.outstanding -= 1
+            if error is None:
+                return
+            rate_limited = classify_error(error) is ErrorKind.RATE_LIMITED
+            for counters in self._counters(endpoint):
+                counters.errors += 1
+                counters.rate_limited += 1 if rate_limited else 0
+            headers = getattr(getattr(error, "response", None), "headers", None)
+            if isinstance(headers, httpx.Headers):
+                endpoint.observe_headers(headers)
+            if rate_limited:
+                drain_for = server_retry_delay(error) or self.drain_seconds
+                endpoint.drained_until = max(endpoint.drained_until, time.monotonic() + drain_for)
+
+    def record_usage(self, endpoint: Endpoint, usage: LLMUsage) -> None:
+        with self._lock:
+            for counters in self._counters(endpoint):
+                counters.input_tokens += usage.input_tokens
+                counters.output_tokens += usage.output_tokens
+
+    def stats(self) -> list[dict[str, object]]:
+        """Usage of each endpoint, for throughput reports."""
+        with self._lock:
+            return [endpoint.to_dict() for endpoint in self.endpoints]
+
+
+_pools: dict[tuple[str, tuple[tuple[str, str | None], ...]], EndpointPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_endpoint_pool(model_provider: ModelProvider) -> EndpointPool | None:
+    """Return the process-wide pool of the provider's endpoints, or None without a pool.
+
+    Agents using the same keys share a pool, so that they see each other's load.
+    """
+    if not model_provider.endpoints:
+        return None
+    endpoints = ((model_provider.api_key, model_provider.base_url),) + tuple(
+        (endpoint.api_key, endpoint.base_url or model_provider.base_url)
+        for endpoint in model_provider.endpoints
+    )
+    with _pools_lock:
+        pool = _pools.get((model_provider.provider, endpoints))
+        if pool is None:
+            pool = _pools[(model_provider.provider, endpoints)] = EndpointPool(
+                list(endpoints), provider=model_provider.provider
+            )
+        return pool
@@ -37,6 +37,18 @@ class LLMUsage:
             reasoning_tokens=self.reasoning_tokens + other.reasoning_tokens,
         )
 
+    @property
+    def cache_hit_ratio(self) -> float:
+        """Share of the prompt that was read from the prompt cache.
+
+        Follows the Anthropic convention, where `input_tokens` excludes the tokens read
+        from or written to the cache.
+        """
+        prompt_tokens = (
+            self.input_tokens + self.cache_creation_input_tokens + self.cache_read_input_tokens
+        )
+        return self.cache_read_input_tokens / prompt_tokens if prompt_tokens else 0.0
+
     def __str__(self) -> str:
         return f"LLMUsage(input_tokens={self.input_tokens}, output_tokens={self.output_tokens}, cache_creation_input_tokens={self.cache_creation_input_tokens}, cache_read_input_tokens={self.cache_read_input_tokens}, reasoning_tokens={self.reasoning_tokens})"
 
@@ -50,3 +62,24 @@ class LLMResponse:
     model: str | None = None
     finish_reason: str | None = None
     tool_calls: list[ToolCall] | None = None
+    request_bytes: int | None = None  # size of the conversation input that was uploaded
+    provider: str | None = None  # provider that served the response
+    retries: int = 0  # API calls retried before this response was received
+    retry_wait: float = 0.0  # seconds spent waiting before retries
+    hedged: bool = False  # a duplicate request was sent because this call was slow
+    hedge_won: bool = False  # the duplicate request answered first
+    cached: bool = False  # answered from the response cache without calling the model
+    estimated_input_tokens: int | None = None  # prompt size estimated before sending
+
+
+@dataclass
+class LLMStreamEvent:
+    """An incremental update from a streamed LLM response.
+
+    Exactly one field is set: a text delta, a tool call whose arguments are complete, or the
+    final response, which is always the last event of a stream.
+    """
+
+    content_delta: str | None = None
+    tool_call: ToolCall | None = None
+    response: LLMResponse | None = None
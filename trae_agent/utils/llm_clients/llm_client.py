@@ -3,14 +3,53 @@
 
 """LLM Client wrapper for OpenAI, Anthropic, Azure, and OpenRouter APIs."""
 
+import asyncio
+import copy
+import logging
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager
+from dataclasses import replace
 from enum import Enum
+from functools import partial
 
 from trae_agent.tools.base import Tool
 from trae_agent.utils.config import ModelConfig
 from trae_agent.utils.llm_clients.base_client import BaseLLMClient
-from trae_agent.utils.llm_clients.llm_basics import LLMMessage, LLMResponse
+from trae_agent.utils.llm_clients.context_compactor import ContextCompactor, estimate_tokens
+from trae_agent.utils.llm_clients.conversation import Conversation
+from trae_agent.utils.llm_clients.hedging import get_latency_tracker
+from trae_agent.utils.llm_clients.llm_basics import (
+    LLMMessage,
+    LLMResponse,
+    LLMStreamEvent,
+    LLMUsage,
+)
+from trae_agent.utils.llm_clients.rate_limiter import (
+    RateLimiter,
+    endpoint_quota,
+    get_rate_limiter,
+    rate_limited,
+)
+from trae_agent.utils.llm_clients.response_cache import cache_key, get_response_cache
+from trae_agent.utils.llm_clients.retry_utils import (
+    RetryStats,
+    before_each_retry,
+    collect_retry_stats,
+)
+from trae_agent.utils.llm_clients.token_estimator import (
+    ContextWindowExceeded,
+    TokenEstimator,
+    get_token_estimator,
+    prompt_tokens,
+)
 from trae_agent.utils.trajectory_recorder import TrajectoryRecorder
 
+logger = logging.getLogger(__name__)
+
+# Output tokens a request must have room for in the context window to be worth sending.
+MIN_OUTPUT_TOKENS = 1024
+
 
 class LLMProvider(Enum):
     """Supported LLM providers."""
@@ -22,53 +61,149 @@ class LLMProvider(Enum):
     OPENROUTER = "openrouter"
     DOUBAO = "doubao"
     GOOGLE = "google"
+    MOCK = "mock"
 
 
-class LLMClient:
-    """Main LLM client that supports multiple providers."""
+def create_provider_client(model_config: ModelConfig) -> BaseLLMClient:
+    """Create the client of the model's provider."""
+    match LLMProvider(model_config.model_provider.provider):
+        case LLMProvider.OPENAI:
+            from .openai_client import OpenAIClient
 
-    def __init__(self, model_config: ModelConfig):
-        self.provider: LLMProvider = LLMProvider(model_config.model_provider.provider)
-        self.model_config: ModelConfig = model_config
+            return OpenAIClient(model_config)
+        case LLMProvider.ANTHROPIC:
+            from .anthropic_client import AnthropicClient
+
+            return AnthropicClient(model_config)
+        case LLMProvider.AZURE:
+            from .azure_client import AzureClient
+
+            return AzureClient(model_config)
+        case LLMProvider.OPENROUTER:
+            from .openrouter_client import OpenRouterClient
+
+            return OpenRouterClient(model_config)
+        case LLMProvider.DOUBAO:
+            from .doubao_client import DoubaoClient
+
+            return DoubaoClient(model_config)
+        case LLMProvider.OLLAMA:
+            from .ollama_client import OllamaClient
+
+            return OllamaClient(model_config)
+        case LLMProvider.GOOGLE:
+            from .google_client import GoogleClient
 
-        match self.provider:
-            case LLMProvider.OPENAI:
-                from .openai_client import OpenAIClient
+            return GoogleClient(model_config)
+        case LLMProvider.MOCK:
+            from .mock_client import MockClient
 
-                self.client: BaseLLMClient = OpenAIClient(model_config)
-            case LLMProvider.ANTHROPIC:
-                from .anthropic_client import AnthropicClient
+            return MockClient(model_config)
 
-                self.client = AnthropicClient(model_config)
-            case LLMProvider.AZURE:
-                from .azure_client import AzureClient
 
-                self.client = AzureClient(model_config)
-            case LLMProvider.OPENROUTER:
-                from .openrouter_client import OpenRouterClient
+def _settle_reservation(reservation: tuple[RateLimiter, int], usage: LLMUsage) -> None:
+    """Correct a rate limiter reservation with the tokens the request used."""
+    limiter, reserved_input_tokens = reservation
+    # Tokens read from Anthropic's prompt cache do not count towards its input quota.
+    limiter.settle(
+        reserved_input_tokens,
+        usage.input_tokens + usage.cache_creation_input_tokens,
+        usage.output_tokens,
+    )
 
-                self.client = OpenRouterClient(model_config)
-            case LLMProvider.DOUBAO:
-                from .doubao_client import DoubaoClient
 
-                self.client = DoubaoClient(model_config)
-            case LLMProvider.OLLAMA:
-                from .ollama_client import OllamaClient
+class LLMClient:
+    """Main LLM client that supports multiple providers.
+
+    When the model has fallback models, a call that still fails after its retries is sent
+    to the next model of the chain, which serves the rest of the conversation.
+
+    When the model has a response cache, requests it has seen are answered from it.
 
-                self.client = OllamaClient(model_config)
-            case LLMProvider.GOOGLE:
-                from .google_client import GoogleClient
+    When the model has a hedge percentile, an async call that takes longer than that
+    percentile of recent calls is duplicated on a second client, which goes to another key
+    of the provider's endpoint pool if it has one. The first response wins.
 
-                self.client = GoogleClient(model_config)
+    When the model has a context window, the prompt size is estimated before each call.
+    max_tokens is lowered to the room the prompt leaves, and a prompt that leaves too
+    little is compacted, or rejected with ContextWindowExceeded, instead of being sent.
+
+    Every request to the provider first waits for the rate limiter of its model and key,
+    which is shared by all clients of the process.
+
+    The conversation is kept once, provider-neutral, and the provider clients build their
+    history from it with memoized message encodings, so that forking it, compacting it and
+    failing over to another provider do not convert the messages again.
+    """
+
+    def __init__(self, model_config: ModelConfig):
+        self.provider: LLMProvider = LLMProvider(model_config.model_provider.provider)
+        self.model_config: ModelConfig = model_config
+        # Provider-neutral conversation, which the provider history is rebuilt from after
+        # forks, compaction and failover
+        self._history: Conversation = Conversation()
+        self._context_compactor: ContextCompactor | None = None
+        self._trajectory_recorder: TrajectoryRecorder | None = None
+        self._model_chain: list[ModelConfig] = [model_config, *model_config.fallback_models]
+        self._active_model: int = 0
+        self.client: BaseLLMClient = self._create_client(model_config)
+        # Sends the duplicate requests of hedged calls; its history is rebuilt for each one.
+        self._hedge_client: BaseLLMClient | None = None
+        # Set when a turn was answered from the response cache without the provider client.
+        self._provider_history_stale: bool = False
+        # Pre-flight estimate of the current request, and the output limit it leaves
+        self._estimator: TokenEstimator | None = None
+        self._estimated_input_tokens: int | None = None
+        self._max_tokens: int | None = None
+        # Rate limiter of the request in flight, and the input tokens reserved from it
+        self._reservation: tuple[RateLimiter, int] | None = None
+        # Reservation of the duplicate request of a hedged call, once it is let through
+        self._hedge_reservation: tuple[RateLimiter, int] | None = None
 
     def set_trajectory_recorder(self, recorder: TrajectoryRecorder | None) -> None:
         """Set the trajectory recorder for the underlying client."""
+        self._trajectory_recorder = recorder
         self.client.set_trajectory_recorder(recorder)
+        if self._hedge_client:
+            self._hedge_client.set_trajectory_recorder(recorder)
+
+    def set_context_compactor(self, compactor: ContextCompactor | None) -> None:
+        """Set the compactor used to keep the conversation history within its token budget."""
+        self._context_compactor = compactor
+
+    @property
+    def history(self) -> list[LLMMessage]:
+        """Get the provider-neutral conversation history."""
+        return self._history.to_list()
 
     def set_chat_history(self, messages: list[LLMMessage]) -> None:
         """Set the chat history."""
+        self._history = self._history.replace(messages)
+        self._history.drop_stale_caches()
         self.client.set_chat_history(messages)
 
+    def fork(self) -> "LLMClient":
+        """Return a client that continues a copy of the conversation independently.
+
+        The fork shares the messages and their encodings with this client, and records to
+        the same trajectory. Its provider history is built on its first call.
+        """
+        fork = copy.copy(self)
+        fork._history = self._history.fork()
+        fork.client = self._create_client(self._model_chain[self._active_model])
+        fork.client.set_trajectory_recorder(self._trajectory_recorder)
+        fork._hedge_client = None
+        fork._provider_history_stale = True
+        fork._reservation = None
+        fork._hedge_reservation = None
+        return fork
+
+    def _create_client(self, model_config: ModelConfig) -> BaseLLMClient:
+        """Create a provider client that shares the conversation's message encodings."""
+        client = create_provider_client(model_config)
+        client.encoding_cache = self._history.encodings
+        return client
+
     def chat(
         self,
         messages: list[LLMMessage],
@@ -77,7 +212,471 @@ class LLMClient:
         reuse_history: bool = True,
     ) -> LLMResponse:
         """Send chat messages to the LLM."""
-        return self.client.chat(messages, model_config, tools, reuse_history)
+        self._before_chat(messages, reuse_history, model_config, tools)
+        with collect_retry_stats() as retry_stats:
+            key, response = self._lookup_cache(model_config, tools)
+            if response is None:
+                self._sync_provider_history(messages, reuse_history)
+                while True:
+                    active_config = self._active_model_config(model_config)
+                    limiter = self._acquire_quota(active_config, retry_stats)
+                    try:
+                        with self._quota_context(active_config, limiter, retry_stats):
+                            response = self.client.chat(
+                                messages, active_config, tools, reuse_history
+                            )
+                        break
+                    except Exception as e:
+                        self._cancel_reservation()
+                        if not self._fail_over(e, messages, reuse_history):
+                            raise
+                self._store_in_cache(key, model_config, response)
+        self._after_chat(response, retry_stats)
+        return response
+
+    async def achat(
+        self,
+        messages: list[LLMMessage],
+        model_config: ModelConfig,
+        tools: list[Tool] | None = None,
+        reuse_history: bool = True,
+    ) -> LLMResponse:
+        """Send chat messages to the LLM without blocking the event loop."""
+        self._before_chat(messages, reuse_history, model_config, tools)
+        with collect_retry_stats() as retry_stats:
+            key, response = self._lookup_cache(model_config, tools)
+            if response is None:
+                self._sync_provider_history(messages, reuse_history)
+                while True:
+                    active_config = self._active_model_config(model_config)
+                    limiter = await self._aacquire_quota(active_config, retry_stats)
+                    try:
+                        with self._quota_context(active_config, limiter, retry_stats):
+                            response = await self._achat_hedged(
+                                messages, active_config, tools, reuse_history
+                            )
+                        break
+                    except Exception as e:
+                        self._cancel_reservation()
+                        if not self._fail_over(e, messages, reuse_history):
+                            raise
+                self._store_in_cache(key, model_config, response)
+        self._after_chat(response, retry_stats)
+        return response
+
+    async def astream(
+        self,
+        messages: list[LLMMessage],
+        model_config: ModelConfig,
+        tools: list[Tool] | None = None,
+        reuse_history: bool = True,
+    ) -> AsyncIterator[LLMStreamEvent]:
+        """Send chat messages to the LLM and stream the response as it is generated."""
+        self._before_chat(messages, reuse_history, model_config, tools)
+        with collect_retry_stats() as retry_stats:
+            key, response = self._lookup_cache(model_config, tools)
+            if response is not None:
+                # Replay the cached response as the events a live stream would have produced.
+                if response.content:
+                    yield LLMStreamEvent(content_delta=response.content)
+                for tool_call in response.tool_calls or []:
+                    yield LLMStreamEvent(tool_call=tool_call)
+                self._after_chat(response, retry_stats)
+                yield LLMStreamEvent(response=response)
+                return
+
+            self._sync_provider_history(messages, reuse_history)
+            while True:
+                started = False
+                active_config = self._active_model_config(model_config)
+                limiter = await self._aacquire_quota(active_config, retry_stats)
+                try:
+                    with self._quota_context(active_config, limiter, retry_stats):
+                        async for event in self.client.astream(
+                            messages, active_config, tools, reuse_history
+                        ):
+                            started = True
+                            if event.response:
+                                self._store_in_cache(key, model_config, event.response)
+                                self._after_chat(event.response, retry_stats)
+                            yield event
+                    return
+                except Exception as e:
+                    # Events already yielded cannot be taken back.
+                    if started:
+                        raise
+                    self._cancel_reservation()
+                    if not self._fail_over(e, messages, reuse_history):
+                        raise
+
+    async def _achat_hedged(
+        self,
+        messages: list[LLMMessage],
+        model_config: ModelConfig,
+        tools: list[Tool] | None,
+        reuse_history: bool,
+    ) -> LLMResponse:
+        """Call the active client, duplicating the call if it is slower than usual."""
+        if model_config.hedge_percentile is None:
+            return await self.client.achat(messages, model_config, tools, reuse_history)
+
+        tracker = get_latency_tracker(model_config.model_provider.provider, model_config.model)
+        started = time.monotonic()
+        primary = asyncio.ensure_future(
+            self.client.achat(messages, model_config, tools, reuse_history)
+        )
+        hedge: asyncio.Future[LLMResponse] | None = None
+        winner: asyncio.Future[LLMResponse] | None = None
+        self._hedge_reservation = None
+        try:
+            done, _ = await asyncio.wait(
+                {primary}, timeout=tracker.hedge_delay(model_config.hedge_percentile)
+            )
+            if done:
+                response = primary.result()
+                tracker.record(time.monotonic() - started)
+                return response
+
+            hedge_client = self._prepare_hedge_client(messages, model_config, reuse_history)
+            hedge = asyncio.ensure_future(
+                self._achat_hedge(hedge_client, messages, model_config, tools, reuse_history)
+            )
+            pending: set[asyncio.Future[LLMResponse]] = {primary, hedge}
+            while winner is None and pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Prefer the primary when both answered, as its history is already in place.
+                winner = next(
+                    (task for task in (primary, hedge) if task in done and not task.exception()),
+                    None,
+                )
+        finally:
+            for task in (primary, hedge):
+                if task is not None and task is not winner:
+                    _ = task.cancel()
+            self._settle_hedge(primary, hedge, winner)
+
+        tracker.record_hedge(won=winner is hedge)
+        if winner is None:
+            return primary.result()  # both failed: raise the primary's error
+        _ = await asyncio.gather(*pending, return_exceptions=True)
+        tracker.record(time.monotonic() - started)
+        if winner is hedge:
+            # The hedge client holds the conversation now; the other one is rebuilt on reuse.
+            self.client, self._hedge_client = hedge_client, self.client
+        response = winner.result()
+        response.hedged = True
+        response.hedge_won = winner is hedge
+        return response
+
+    async def _achat_hedge(
+        self,
+        hedge_client: BaseLLMClient,
+        messages: list[LLMMessage],
+        model_config: ModelConfig,
+        tools: list[Tool] | None,
+        reuse_history: bool,
+    ) -> LLMResponse:
+        """Send the duplicate request of a hedged call once the rate limiter lets it through."""
+        if model_config.model_provider.endpoints:
+            hook = partial(self._aacquire_endpoint_quota, model_config, None, True)
+            with endpoint_quota(hook):
+                return await hedge_client.achat(messages, model_config, tools, reuse_history)
+        limiter = get_rate_limiter(model_config)
+        input_tokens = self._estimated_input_tokens or 0
+        _ = await limiter.aacquire(input_tokens)
+        self._hedge_reservation = (limiter, input_tokens)
+        return await hedge_client.achat(messages, model_config, tools, reuse_history)
+
+    def _settle_hedge(
+        self,
+        primary: asyncio.Future[LLMResponse],
+        hedge: asyncio.Future[LLMResponse] | None,
+        winner: asyncio.Future[LLMResponse] | None,
+    ) -> None:
+        """Settle the reservation of the request that did not answer a hedged call, or give
+        it back if it had no answer. The answer's own reservation is left to `_after_chat`."""
+        hedge_reservation, self._hedge_reservation = self._hedge_reservation, None
+        if hedge is None or hedge_reservation is None:
+            return
+        if winner is hedge:
+            # The answer is the hedge's, so the primary's reservation is the one left over.
+            loser, reservation = primary, self._reservation
+            self._reservation = hedge_reservation
+        else:
+            loser, reservation = hedge, hedge_reservation
+        if reservation is None:
+            return
+        usage = None
+        if loser.done() and not loser.cancelled() and loser.exception() is None:
+            usage = loser.result().usage
+        if usage:
+            _settle_reservation(reservation, usage)
+        else:
+            reservation[0].cancel(reservation[1])
+
+    def _acquire_quota(self, model_config: ModelConfig, retry_stats: RetryStats) -> RateLimiter:
+        """Wait for the rate limiter of the model, counting the wait with the retries'."""
+        limiter = get_rate_limiter(model_config)
+        input_tokens = self._estimated_input_tokens or 0
+        retry_stats.wait += limiter.acquire(input_tokens)
+        self._reservation = (limiter, input_tokens)
+        return limiter
+
+    async def _aacquire_quota(
+        self, model_config: ModelConfig, retry_stats: RetryStats
+    ) -> RateLimiter | None:
+        """Wait for the rate limiter of the model without blocking the event loop.
+
+        With a pool of keys, the quota is only taken once the pool has picked a key, and
+        there is no limiter to return.
+        """
+        if model_config.model_provider.endpoints:
+            return None
+        limiter = get_rate_limiter(model_config)
+        input_tokens = self._estimated_input_tokens or 0
+        retry_stats.wait += await limiter.aacquire(input_tokens)
+        self._reservation = (limiter, input_tokens)
+        return limiter
+
+    async def _aacquire_endpoint_quota(
+        self,
+        model_config: ModelConfig,
+        retry_stats: RetryStats | None,
+        hedge: bool,
+        api_key: str,
+    ) -> RateLimiter:
+        """Endpoint pool hook: wait for the limiter of the key a request is sent with.
+
+        The hook runs for each attempt of the request, so a retry gives back the input tokens
+        of the attempt that failed and takes a new request from the quota of its own key.
+        """
+        reservation = self._hedge_reservation if hedge else self._reservation
+        if reservation is not None:
+            reservation[0].cancel(reservation[1], sent=True)
+        if hedge:
+            self._hedge_reservation = None
+        else:
+            self._reservation = None
+        limiter = get_rate_limiter(model_config, api_key)
+        input_tokens = self._estimated_input_tokens or 0
+        wait = await limiter.aacquire(input_tokens)
+        if retry_stats is not None:
+            retry_stats.wait += wait
+        if hedge:
+            self._hedge_reservation = (limiter, input_tokens)
+        else:
+            self._reservation = (limiter, input_tokens)
+        return limiter
+
+    @contextmanager
+    def _quota_context(
+        self, model_config: ModelConfig, limiter: RateLimiter | None, retry_stats: RetryStats
+    ) -> Iterator[None]:
+        """Let the requests of a call update its rate limiter and take quota for their
+        retries, or, without a limiter, take it from the limiter of their pooled key."""
+        if limiter is None:
+            hook = partial(self._aacquire_endpoint_quota, model_config, retry_stats, False)
+            with endpoint_quota(hook):
+                yield
+        else:
+            with rate_limited(limiter), before_each_retry(self._requeue_quota):
+                yield
+
+    def _requeue_quota(self) -> float:
+        """Retry hook of the provider clients: take another request from the quota of the
+        call, whose reserved tokens carry over. Return the seconds to wait for it."""
+        if self._reservation is None:
+            return 0.0
+        return self._reservation[0].reserve(0)
+
+    def _cancel_reservation(self) -> None:
+        """Give back the input tokens reserved for a request that failed."""
+        if self._reservation is not None:
+            limiter, input_tokens = self._reservation
+            limiter.cancel(input_tokens, sent=True)
+            self._reservation = None
+
+    def _prepare_hedge_client(
+        self, messages: list[LLMMessage], model_config: ModelConfig, reuse_history: bool
+    ) -> BaseLLMClient:
+        """Return the client for a duplicate request, with the conversation before it."""
+        if self._hedge_client is None:
+            self._hedge_client = self._create_client(model_config)
+            self._hedge_client.set_trajectory_recorder(self._trajectory_recorder)
+        if reuse_history:
+            # The outgoing messages are sent with the call.
+            self._hedge_client.set_chat_history(self._history[: len(self._history) - len(messages)])
+        return self._hedge_client
+
+    def _lookup_cache(
+        self, model_config: ModelConfig, tools: list[Tool] | None
+    ) -> tuple[str | None, LLMResponse | None]:
+        """Return the cache key of the request, if the model has a cache, and its hit."""
+        # Keyed on the configured max_tokens: the cap left by the pre-flight estimate
+        # varies with the estimate's calibration, so replays would miss.
+        model_config = self._active_model_config(model_config, capped=False)
+        if model_config.response_cache is None:
+            return None, None
+        key = cache_key(self._history.to_list(), tools, model_config)
+        response = get_response_cache(model_config.response_cache).get(key)
+        if response is not None:
+            # The provider client did not see this turn; catch it up before its next call.
+            self._provider_history_stale = True
+        return key, response
+
+    def _store_in_cache(
+        self, key: str | None, model_config: ModelConfig, response: LLMResponse
+    ) -> None:
+        cache_config = self._active_model_config(model_config).response_cache
+        if key is not None and cache_config is not None:
+            get_response_cache(cache_config).put(key, response)
+
+    def _sync_provider_history(self, messages: list[LLMMessage], reuse_history: bool) -> None:
+        """Rebuild the provider history if turns were answered from the response cache."""
+        if self._provider_history_stale and reuse_history:
+            # The outgoing messages are sent with the call.
+            self.client.set_chat_history(self._history[: len(self._history) - len(messages)])
+        self._provider_history_stale = False
+
+    def _active_model_config(self, model_config: ModelConfig, capped: bool = True) -> ModelConfig:
+        """The model config to call with: the caller's, until the client has failed over.
+
+        If capped, its max_tokens is capped to the room the pre-flight estimate left for
+        the output.
+        """
+        if self._active_model != 0:
+            model_config = self._model_chain[self._active_model]
+        if capped and self._max_tokens is not None and self._max_tokens < model_config.max_tokens:
+            model_config = replace(model_config, max_tokens=self._max_tokens)
+        return model_config
+
+    def _fail_over(self, error: Exception, messages: list[LLMMessage], reuse_history: bool) -> bool:
+        """Switch to the next model of the fallback chain. Return False if there is none."""
+        if self._active_model + 1 >= len(self._model_chain):
+            return False
+        failed = self._model_chain[self._active_model]
+        self._active_model += 1
+        fallback = self._model_chain[self._active_model]
+
+        self.provider = LLMProvider(fallback.model_provider.provider)
+        self.client = self._create_client(fallback)
+        self.client.set_trajectory_recorder(self._trajectory_recorder)
+        self._hedge_client = None
+        if reuse_history:
+            # Translate the conversation so far; the outgoing messages are sent with the call.
+            self.client.set_chat_history(self._history[: len(self._history) - len(messages)])
+        if self._trajectory_recorder:
+            self._trajectory_recorder.record_provider_failover(
+                from_provider=failed.model_provider.provider,
+                from_model=failed.model,
+                to_provider=fallback.model_provider.provider,
+                to_model=fallback.model,
+                error=f"{type(error).__name__}: {error}",
+            )
+        return True
+
+    def _before_chat(
+        self,
+        messages: list[LLMMessage],
+        reuse_history: bool,
+        model_config: ModelConfig,
+        tools: list[Tool] | None,
+    ) -> None:
+        """Compact the existing history if needed, add the outgoing messages to it and check
+        that the request fits the context window."""
+        self._reservation = None
+        if not reuse_history:
+            self._history = self._history.replace(messages)
+            self._history.drop_stale_caches()
+        else:
+            if self._context_compactor and self._history:
+                _ = self._compact(self._history.to_list(), messages)
+            self._history.extend(messages)
+        self._preflight(messages, reuse_history, model_config, tools)
+
+    def _compact(
+        self, history: list[LLMMessage], incoming: list[LLMMessage], token_budget: int | None = None
+    ) -> bool:
+        """Replace the history with its compacted version. Return False if nothing changed."""
+        assert self._context_compactor is not None
+        result = self._context_compactor.compact(
+            history, incoming, token_budget, self._history.sizes
+        )
+        if result is None:
+            return False
+        self._history = self._history.replace(result.messages)
+        self._history.drop_stale_caches()
+        self.client.set_chat_history(self._history.to_list())
+        self._provider_history_stale = False
+        if self._trajectory_recorder:
+            self._trajectory_recorder.record_context_compaction(
+                tokens_before=result.tokens_before,
+                tokens_after=result.tokens_after,
+                elided=result.elided,
+            )
+        return True
+
+    def _preflight(
+        self,
+        messages: list[LLMMessage],
+        reuse_history: bool,
+        model_config: ModelConfig,
+        tools: list[Tool] | None,
+    ) -> None:
+        """Estimate the prompt, and make it fit the model's context window if it has one."""
+        self._max_tokens = None
+        model_config = self._active_model_config(model_config)
+        self._estimator = get_token_estimator(
+            model_config.model_provider.provider, model_config.model
+        )
+        estimate = self._estimator.estimate(self._history.to_list(), tools, self._history.sizes)
+        window = model_config.context_window
+        if window is not None:
+            min_output = min(model_config.max_tokens, MIN_OUTPUT_TOKENS)
+            history = self._history[: len(self._history) - len(messages)]
+            if window - estimate < min_output and reuse_history and self._context_compactor:
+                # Make room for the full output. The compactor counts tokens its own way.
+                scale = estimate_tokens(self._history.to_list(), self._history.sizes) / max(
+                    estimate, 1
+                )
+                budget = int((window - model_config.max_tokens) * scale)
+                if history and self._compact(history, messages, max(budget, 0)):
+                    self._history.extend(messages)
+                    estimate = self._estimator.estimate(
+                        self._history.to_list(), tools, self._history.sizes
+                    )
+            if window - estimate < min_output:
+                raise ContextWindowExceeded(
+                    f"The prompt of about {estimate} tokens leaves less than {min_output} "
+                    f"output tokens in the {window}-token context window of {model_config.model}"
+                )
+            self._max_tokens = min(model_config.max_tokens, window - estimate)
+        self._estimated_input_tokens = estimate
+
+    def _after_chat(self, response: LLMResponse, retry_stats: RetryStats) -> None:
+        """Add the assistant's reply to the history and note who served it and its retries."""
+        response.provider = self.provider.value
+        response.retries = retry_stats.retries
+        response.retry_wait = retry_stats.wait
+        response.estimated_input_tokens = self._estimated_input_tokens
+        if response.usage and not response.cached and self._estimated_input_tokens:
+            actual = prompt_tokens(response.usage, self.provider.value)
+            logger.info(
+                "Prompt of %s: estimated %d tokens, provider counted %d",
+                response.model or self.provider.value,
+                self._estimated_input_tokens,
+                actual,
+            )
+            if self._estimator is not None:
+                self._estimator.calibrate(self._estimated_input_tokens, actual)
+        if self._reservation is not None and response.usage and not response.cached:
+            _settle_reservation(self._reservation, response.usage)
+        self._reservation = None
+        self.client.record_endpoint_usage(response.usage)
+        if response.content:
+            self._history.append(LLMMessage(role="assistant", content=response.content))
+        for tool_call in response.tool_calls or []:
+            self._history.append(LLMMessage(role="assistant", tool_call=tool_call))
 
     def supports_tool_calling(self, model_config: ModelConfig) -> bool:
         """Check if the current client supports tool calling."""
@@ -0,0 +1,101 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""Append-only message history shared by the provider clients."""
+
+from collections.abc import Iterable, Iterator, Sequence
+from typing import TypeVar, overload, override
+
+T = TypeVar("T")
+
+
+class HistorySnapshot(Sequence[T]):
+    """Read-only view of a history as it was when the snapshot was taken.
+
+    Taking a snapshot is O(1): it shares the history's list, which is only ever appended
+    to, and remembers how long the list was.
+    """
+
+    def __init__(self, items: list[T], length: int):
+        self._items: list[T] = items
+        self._length: int = length
+
+    @override
+    def __len__(self) -> int:
+        return self._length
+
+    @overload
+    def __getitem__(self, index: int) -> T: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[T]: ...
+
+    @override
+    def __getitem__(self, index: int | slice) -> T | list[T]:
+        if isinstance(index, slice):
+            return [self._items[i] for i in range(self._length)[index]]
+        return self._items[range(self._length)[index]]
+
+    @override
+    def __iter__(self) -> Iterator[T]:
+        for i in range(self._length):
+            yield self._items[i]
+
+
+class MessageHistory(Sequence[T]):
+    """Provider-format messages of a conversation.
+
+    New turns are appended in place instead of building a new list, so the cost of a turn
+    does not grow with the length of the conversation. Replacing the history with `reset`
+    starts a new list, which leaves earlier snapshots and requests untouched.
+    """
+
+    def __init__(self, items: Iterable[T] = ()):
+        self._items: list[T] = list(items)
+
+    @override
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @overload
+    def __getitem__(self, index: int) -> T: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[T]: ...
+
+    @override
+    def __getitem__(self, index: int | slice) -> T | list[T]:
+        return self._items[index]
+
+    @override
+    def __iter__(self) -> Iterator[T]:
+        return iter(self._items)
+
+    def append(self, item: T) -> None:
+        self._items.append(item)
+
+    def extend(self, items: Iterable[T]) -> None:
+        self._items.extend(items)
+
+    def reset(self, items: Iterable[T] = ()) -> None:
+        """Replace the history with the given messages."""
+        self._items = list(items)
+
+    def snapshot(self) -> HistorySnapshot[T]:
+        """Return a view of the history as it is now."""
+        return HistorySnapshot(self._items, len(self._items))
+
+    def restore(self, snapshot: HistorySnapshot[T]) -> None:
+        """Go back to a snapshot, e.g. to drop the messages of a failed turn.
+
+        Snapshots taken after this one no longer describe the history.
+        """
+        self._items = snapshot._items  # pyright: ignore[reportPrivateUsage]
+        del self._items[len(snapshot) :]
+
+    def to_list(self) -> list[T]:
+        """Return the messages as a list for the provider SDKs, without copying them.
+
+        The list is the history itself and must not be modified.
+        """
+        return self._items
@@ -0,0 +1,67 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""Client of the local mock LLM server, for load and scaling tests."""
+
+import openai
+
+from trae_agent.utils.config import ModelConfig
+from trae_agent.utils.llm_clients.http_client import get_async_http_client, get_http_client
+from trae_agent.utils.llm_clients.mock_server import DEFAULT_PORT
+from trae_agent.utils.llm_clients.openai_compatible_base import (
+    OpenAICompatibleClient,
+    ProviderConfig,
+)
+
+DEFAULT_BASE_URL = f"http://127.0.0.1:{DEFAULT_PORT}/v1"
+
+
+class MockProvider(ProviderConfig):
+    """Mock provider configuration, talking to `trae-cli mock-server`."""
+
+    def create_client(
+        self, api_key: str, base_url: str | None, api_version: str | None
+    ) -> openai.OpenAI:
+        """Create OpenAI client with the mock server's base URL."""
+        base_url = base_url or DEFAULT_BASE_URL
+        return openai.OpenAI(
+            base_url=base_url,
+            api_key=api_key,
+            http_client=get_http_client("mock", base_url),
+            max_retries=0,
+        )
+
+    def create_async_client(
+        self, api_key: str, base_url: str | None, api_version: str | None
+    ) -> openai.AsyncOpenAI:
+        """Create async OpenAI client with the mock server's base URL."""
+        base_url = base_url or DEFAULT_BASE_URL
+        return openai.AsyncOpenAI(
+            base_url=base_url,
+            api_key=api_key,
+            http_client=get_async_http_client("mock", base_url),
+            max_retries=0,
+        )
+
+    def get_service_name(self) -> str:
+        """Get the service name for retry logging."""
+        return "Mock"
+
+    def get_provider_name(self) -> str:
+        """Get the provider name for trajectory recording."""
+        return "mock"
+
+    def get_extra_headers(self) -> dict[str, str]:
+        """Get mock-specific headers (none needed)."""
+        return {}
+
+    def supports_tool_calling(self, model_name: str) -> bool:
+        """Check if the model supports tool calling."""
+        return True
+
+
+class MockClient(OpenAICompatibleClient):
+    """Client of the mock LLM server, which speaks the OpenAI chat completions API."""
+
+    def __init__(self, model_config: ModelConfig):
+        super().__init__(model_config, MockProvider())
@@ -0,0 +1,327 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""Local stand-in for the OpenAI and Anthropic APIs, for load and scaling tests.
+
+The server answers OpenAI chat completions (POST /v1/chat/completions) and Anthropic
+messages (POST /v1/messages) with the turns of a script, after a latency drawn from a
+configurable distribution, and fails a share of the requests with 429 or 500 errors.
+It keeps no session state: the turn of a conversation is the number of assistant
+turns it already has, so any number of agents can share the server. Streaming is
+not supported.
+
+Usage: trae-cli mock-server [--port 8765] [--script turns.json] [--latency lognormal:1,0.5]
+"""
+
+import json
+import logging
+import math
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+
+
+@dataclass
+class MockToolCall:
+    name: str
+    arguments: dict[str, object] = field(default_factory=dict)
+
+
+@dataclass
+class MockTurn:
+    """One scripted assistant reply."""
+
+    content: str = ""
+    tool_calls: list[MockToolCall] = field(default_factory=list)
+
+
+@dataclass
+class MockScript:
+    """The replies of a conversation, in order. The last one repeats once they run out."""
+
+    turns: list[MockTurn]
+
+    @classmethod
+    def synthesize(cls, steps: int = 5) -> "MockScript":
+        """A run of bash calls ending with task_done, as the Trae agent expects."""
+        turns = [
+            MockTurn(
+                content=f"Step {step}: inspecting the repository.",
+                tool_calls=[MockToolCall("bash", {"command": f"echo step {step}"})],
+            )
+            for step in range(1, steps)
+        ]
+        turns.append(MockTurn(content="The task is done.", tool_calls=[MockToolCall("task_done")]))
+        return cls(turns)
+
+    @classmethod
+    def load(cls, path: str) -> "MockScript":
+        """Load a JSON list of turns, each with a `content` and a list of `tool_calls`."""
+        with open(path) as f:
+            data = json.load(f)
+        return cls(
+            [
+                MockTurn(
+                    content=turn.get("content", ""),
+                    tool_calls=[
+                        MockToolCall(call["name"], call.get("arguments", {}))
+                        for call in turn.get("tool_calls", [])
+                    ],
+                )
+                for turn in data
+            ]
+        )
+
+    def turn(self, index: int) -> MockTurn:
+        return self.turns[min(index, len(self.turns) - 1)]
+
+
+@dataclass
+class LatencyModel:
+    """Distribution of the response latency, in seconds.
+
+    Given as "fixed:SECONDS", "uniform:LOW,HIGH" or "lognormal:MEDIAN,SIGMA".
+    """
+
+    kind: str = "fixed"
+    params: tuple[float, ...] = (0.0,)
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        kind, _, values = spec.partition(":")
+        params = tuple(float(value) for value in values.split(",")) if values else ()
+        expected = {"fixed": 1, "uniform": 2, "lognormal": 2}
+        if expected.get(kind) != len(params):
+            raise ValueError(
+                f"Invalid latency {spec!r}: use fixed:S, uniform:LOW,HIGH or lognormal:MEDIAN,SIGMA"
+            )
+        return cls(kind, params)
+
+    def sample(self, rng: random.Random) -> float:
+        match self.kind:
+            case "uniform":
+                return rng.uniform(*self.params)
+            case "lognormal":
+                median, sigma = self.params
+                return rng.lognormvariate(math.log(median), sigma)
+            case _:
+                return self.params[0]
+
+
+@dataclass
+class MockServerStats:
+    requests: int = 0
+    rate_limited: int = 0
+    server_errors: int = 0
+
+
+class MockLLMServer:
+    """Threaded HTTP server answering with the scripted turns."""
+
+    def __init__(
+        self,
+        script: MockScript | None = None,
+        latency: LatencyModel | None = None,
+        rate_limit_rate: float = 0.0,
+        error_rate: float = 0.0,
+        retry_after: float = 1.0,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_PORT,
+        seed: int | None = None,
+    ):
+        self.script: MockScript = script or MockScript.synthesize()
+        self.latency: LatencyModel = latency or LatencyModel()
+        self.rate_limit_rate: float = rate_limit_rate
+        self.error_rate: float = error_rate
+        self.retry_after: float = retry_after
+        self.stats: MockServerStats = MockServerStats()
+        self._rng: random.Random = random.Random(seed)
+        self._lock: threading.Lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._server: ThreadingHTTPServer = ThreadingHTTPServer((host, port), _handler(self))
+        self._server.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> None:
+        """Serve from a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def serve_forever(self) -> None:
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def _draw(self) -> tuple[float, int | None]:
+        """Return the latency of a request, and the error status to fail it with, if any."""
+        with self._lock:
+            self.stats.requests += 1
+            latency = self.latency.sample(self._rng)
+            roll = self._rng.random()
+            if roll < self.rate_limit_rate:
+                self.stats.rate_limited += 1
+                return latency, 429
+            if roll < self.rate_limit_rate + self.error_rate:
+                self.stats.server_errors += 1
+                return latency, 500
+            return latency, None
+
+
+def _turn_index(messages: list[dict[str, object]]) -> int:
+    """Number of assistant turns so far; clients may split a turn into several messages."""
+    roles = [message.get("role") for message in messages]
+    return sum(
+        role == "assistant" and (i == 0 or roles[i - 1] != "assistant")
+        for i, role in enumerate(roles)
+    )
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(len(text) // 4, 1)
+
+
+def _openai_completion(turn: MockTurn, model: str, index: int, prompt: str) -> dict[str, object]:
+    tool_calls = [
+        {
+            "id": f"call_{index}_{i}",
+            "type": "function",
+            "function": {"name": call.name, "arguments": json.dumps(call.arguments)},
+        }
+        for i, call in enumerate(turn.tool_calls)
+    ]
+    message: dict[str, object] = {"role": "assistant", "content": turn.content or None}
+    if tool_calls:
+        message["tool_calls"] = tool_calls
+    completion_tokens = _estimate_tokens(turn.content + json.dumps(tool_calls))
+    prompt_tokens = _estimate_tokens(prompt)
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": message,
+                "finish_reason": "tool_calls" if tool_calls else "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def _anthropic_message(turn: MockTurn, model: str, index: int, prompt: str) -> dict[str, object]:
+    content: list[dict[str, object]] = []
+    if turn.content:
+        content.append({"type": "text", "text": turn.content})
+    for i, call in enumerate(turn.tool_calls):
+        content.append(
+            {
+                "type": "tool_use",
+                "id": f"toolu_{index}_{i}",
+                "name": call.name,
+                "input": call.arguments,
+            }
+        )
+    return {
+        "id": f"msg_{uuid.uuid4().hex}",
+        "type": "message",
+        "role": "assistant",
+        "model": model,
+        "content": content,
+        "stop_reason": "tool_use" if turn.tool_calls else "end_turn",
+        "stop_sequence": None,
+        "usage": {
+            "input_tokens": _estimate_tokens(prompt),
+            "output_tokens": _estimate_tokens(json.dumps(content)),
+        },
+    }
+
+
+def _handler(server: MockLLMServer) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            path = self.path.split("?")[0].rstrip("/")
+            anthropic = path.endswith("/messages")
+            if not (anthropic or path.endswith("/chat/completions")):
+                self._send_json(404, self._error("not_found_error", f"Unknown path {self.path}"))
+                return
+            try:
+                request = json.loads(body)
+            except json.JSONDecodeError:
+                self._send_json(400, self._error("invalid_request_error", "Invalid JSON"))
+                return
+            if request.get("stream"):
+                self._send_json(
+                    400, self._error("invalid_request_error", "Streaming is not supported")
+                )
+                return
+
+            latency, status = server._draw()  # pyright: ignore[reportPrivateUsage]
+            time.sleep(latency)
+            if status == 429:
+                self._send_json(
+                    429,
+                    self._error("rate_limit_error", "Rate limited by the mock server", anthropic),
+                    {"retry-after": str(server.retry_after)},
+                )
+                return
+            if status is not None:
+                self._send_json(status, self._error("api_error", "Mock server error", anthropic))
+                return
+
+            index = _turn_index(request.get("messages", []))
+            turn = server.script.turn(index)
+            model = str(request.get("model", "mock"))
+            prompt = body.decode(errors="replace")
+            if anthropic:
+                self._send_json(200, _anthropic_message(turn, model, index, prompt))
+            else:
+                self._send_json(200, _openai_completion(turn, model, index, prompt))
+
+        def _error(self, kind: str, message: str, anthropic: bool = False) -> dict[str, object]:
+            if anthropic:
+                return {"type": "error", "error": {"type": kind, "message": message}}
+            return {"error": {"type": kind, "message": message, "code": None}}
+
+        def _send_json(
+            self, status: int, payload: dict[str, object], headers: dict[str, str] | None = None
+        ) -> None:
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            _ = self.wfile.write(data)
+
+        def log_message(self, format: str, *args: object) -> None:
+            logger.debug(format, *args)
+
+    return Handler
@@ -7,8 +7,9 @@ Ollama API client wrapper with tool integration
 
 import json
 import uuid
-from typing import override
+from typing import Any, override
 
+import ollama
 import openai
 from ollama import chat as ollama_chat  # pyright: ignore[reportUnknownVariableType]
 from openai.types.responses import (
@@ -19,8 +20,10 @@ from openai.types.responses import (
 from trae_agent.tools.base import Tool, ToolCall, ToolResult
 from trae_agent.utils.config import ModelConfig
 from trae_agent.utils.llm_clients.base_client import BaseLLMClient
+from trae_agent.utils.llm_clients.http_client import get_http_client
 from trae_agent.utils.llm_clients.llm_basics import LLMMessage, LLMResponse
-from trae_agent.utils.llm_clients.retry_utils import retry_with
+from trae_agent.utils.llm_clients.message_history import MessageHistory
+from trae_agent.utils.llm_clients.retry_utils import async_retry_with, retry_with
 
 
 class OllamaClient(BaseLLMClient):
@@ -33,20 +36,24 @@ class OllamaClient(BaseLLMClient):
             base_url=model_config.model_provider.base_url
             if model_config.model_provider.base_url
             else "http://localhost:11434/v1",
+            http_client=get_http_client("ollama", self.base_url),
+            max_retries=0,
         )
 
-        self.message_history: list[dict] = []
+        self.async_client: ollama.AsyncClient = ollama.AsyncClient()
+
+        self.message_history: MessageHistory[dict] = MessageHistory()
 
     @override
     def set_chat_history(self, messages: list[LLMMessage]) -> None:
-        self.message_history = self.parse_messages(messages)
+        self.message_history.reset(self.parse_messages(messages))
 
-    def _create_ollama_response(
+    def _create_request_kwargs(
         self,
         model_config: ModelConfig,
         tool_schemas: list[FunctionToolParam] | None,
-    ):
-        """Create a response using Ollama API. This method will be decorated with retry logic."""
+    ) -> dict[str, Any]:
+        """Build the keyword arguments shared by the sync and async Ollama chat calls."""
         tools_param = None
         if tool_schemas:
             tools_param = [
@@ -60,51 +67,111 @@ class OllamaClient(BaseLLMClient):
                 }
                 for tool in tool_schemas
             ]
-        return ollama_chat(
-            messages=self.message_history,
-            model=model_config.model,
-            tools=tools_param,
+        return {
+            "messages": self.message_history.to_list(),
+            "model": model_config.model,
+            "tools": tools_param,
+        }
+
+    def _create_ollama_response(
+        self,
+        model_config: ModelConfig,
+        tool_schemas: list[FunctionToolParam] | None,
+    ):
+        """Create a response using Ollama API. This method will be decorated with retry logic."""
+        return ollama_chat(**self._create_request_kwargs(model_config, tool_schemas))
+
+    async def _acreate_ollama_response(
+        self,
+        model_config: ModelConfig,
+        tool_schemas: list[FunctionToolParam] | None,
+    ):
+        """Async variant of `_create_ollama_response`."""
+        return await self.async_client.chat(
+            **self._create_request_kwargs(model_config, tool_schemas)
         )
 
-    @override
-    def chat(
+    def _prepare_request(
         self,
         messages: list[LLMMessage],
-        model_config: ModelConfig,
-        tools: list[Tool] | None = None,
-        reuse_history: bool = True,
-    ) -> LLMResponse:
-        """
-        A rewritten version of ollama chan
-        """
+        tools: list[Tool] | None,
+        reuse_history: bool,
+    ) -> list[FunctionToolParam] | None:
+        """Append the new messages to the history and build the tool schemas."""
         msgs: ResponseInputParam = self.parse_messages(messages)
 
         tool_schemas = None
         if tools:
-            tool_schemas = [
-                FunctionToolParam(
+            tool_schemas = self.compile_tool_schemas(
+                tools,
+                lambda tool: FunctionToolParam(
                     name=tool.name,
                     description=tool.description,
                     parameters=tool.get_input_schema(),
                     strict=True,
                     type="function",
-                )
-                for tool in tools
-            ]
+                ),
+            )
 
         if reuse_history:
-            self.message_history = self.message_history + msgs
+            self.message_history.extend(msgs)
         else:
-            self.message_history = msgs
+            self.message_history.reset(msgs)
+        return tool_schemas
+
+    @override
+    def chat(
+        self,
+        messages: list[LLMMessage],
+        model_config: ModelConfig,
+        tools: list[Tool] | None = None,
+        reuse_history: bool = True,
+    ) -> LLMResponse:
+        """
+        A rewritten version of ollama chan
+        """
+        tool_schemas = self._prepare_request(messages, tools, reuse_history)
 
         # Apply retry decorator to the API call
         retry_decorator = retry_with(
             func=self._create_ollama_response,
             provider_name="Ollama",
             max_retries=model_config.max_retries,
+            circuit_breaker=self.circuit_breaker,
         )
         response = retry_decorator(model_config, tool_schemas)
 
+        return self._process_response(response, messages, model_config, tools)
+
+    @override
+    async def achat(
+        self,
+        messages: list[LLMMessage],
+        model_config: ModelConfig,
+        tools: list[Tool] | None = None,
+        reuse_history: bool = True,
+    ) -> LLMResponse:
+        """Send chat messages to Ollama through the async client."""
+        tool_schemas = self._prepare_request(messages, tools, reuse_history)
+
+        retry_decorator = async_retry_with(
+            func=self._acreate_ollama_response,
+            provider_name="Ollama",
+            max_retries=model_config.max_retries,
+            circuit_breaker=self.circuit_breaker,
+        )
+        response = await retry_decorator(model_config, tool_schemas)
+
+        return self._process_response(response, messages, model_config, tools)
+
+    def _process_response(
+        self,
+        response: Any,
+        messages: list[LLMMessage],
+        model_config: ModelConfig,
+        tools: list[Tool] | None,
+    ) -> LLMResponse:
+        """Convert an Ollama response to an LLMResponse."""
         content = ""
         tool_calls: list[ToolCall] = []
 
@@ -4,14 +4,17 @@
 """OpenAI API client wrapper with tool integration."""
 
 import json
-from typing import override
+from collections.abc import AsyncIterator
+from typing import Any, override
 
 import openai
 from openai.types.responses import (
     EasyInputMessageParam,
     FunctionToolParam,
     Response,
+    ResponseFunctionToolCall,
     ResponseFunctionToolCallParam,
+    ResponseInputItemParam,
     ResponseInputParam,
     ToolParam,
 )
@@ -20,8 +23,19 @@ from openai.types.responses.response_input_param import FunctionCallOutput
 from trae_agent.tools.base import Tool, ToolCall, ToolResult
 from trae_agent.utils.config import ModelConfig
 from trae_agent.utils.llm_clients.base_client import BaseLLMClient
-from trae_agent.utils.llm_clients.llm_basics import LLMMessage, LLMResponse, LLMUsage
-from trae_agent.utils.llm_clients.retry_utils import retry_with
+from trae_agent.utils.llm_clients.http_client import get_async_http_client, get_http_client
+from trae_agent.utils.llm_clients.llm_basics import (
+    LLMMessage,
+    LLMResponse,
+    LLMStreamEvent,
+    LLMUsage,
+)
+from trae_agent.utils.llm_clients.message_history import MessageHistory
+from trae_agent.utils.llm_clients.retry_utils import (
+    async_retry_stream,
+    async_retry_with,
+    retry_with,
+)
 
 
 class OpenAIClient(BaseLLMClient):
@@ -30,85 +44,289 @@ class OpenAIClient(BaseLLMClient):
     def __init__(self, model_config: ModelConfig):
         super().__init__(model_config)
 
-        self.client: openai.OpenAI = openai.OpenAI(api_key=self.api_key, base_url=self.base_url)
-        self.message_history: ResponseInputParam = []
+        self.client: openai.OpenAI = openai.OpenAI(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            http_client=get_http_client("openai", self.base_url),
+            max_retries=0,
+        )
+        self.async_client: openai.AsyncOpenAI = openai.AsyncOpenAI(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            http_client=get_async_http_client("openai", self.base_url),
+            max_retries=0,
+        )
+        self.message_history: MessageHistory[ResponseInputItemParam] = MessageHistory()
+        # With response chaining, the server already holds the conversation up to the last
+        # response, which covers the first `_chained_length` items of the history.
+        self._previous_response_id: str | None = None
+        self._chained_length: int = 0
+        # Size of the input uploaded by the last request
+        self._request_bytes: int = 0
+        # Item id -> (item, JSON size) for the items of the last request. The item is kept
+        # so that its id is not reused while the size is cached.
+        self._item_bytes: dict[int, tuple[ResponseInputItemParam, int]] = {}
 
     @override
     def set_chat_history(self, messages: list[LLMMessage]) -> None:
         """Set the chat history."""
-        self.message_history = self.parse_messages(messages)
+        self.message_history.reset(self.parse_messages(messages))
+        self._reset_chain()
 
-    def _create_openai_response(
+    def _reset_chain(self) -> None:
+        """Send the full history with the next request instead of continuing a response."""
+        self._previous_response_id = None
+        self._chained_length = 0
+
+    def _request_input(self, model_config: ModelConfig) -> tuple[ResponseInputParam, str | None]:
+        """Return the input of the next request and the response it continues, if any."""
+        if model_config.response_chaining and self._previous_response_id:
+            return self.message_history[self._chained_length :], self._previous_response_id
+        return self.message_history.to_list(), None
+
+    def _input_bytes(self, api_call_input: ResponseInputParam) -> int:
+        """Return the JSON size of the input, serializing only items new since the last request."""
+        item_bytes: dict[int, tuple[ResponseInputItemParam, int]] = {}
+        total = 0
+        for item in api_call_input:
+            entry = self._item_bytes.get(id(item))
+            if entry is None or entry[0] is not item:
+                entry = (item, len(json.dumps(item, default=str).encode()))
+            item_bytes[id(item)] = entry
+            total += entry[1]
+        self._item_bytes = item_bytes
+        # The brackets of the list and the ", " between its items
+        return total + 2 + 2 * max(len(api_call_input) - 1, 0)
+
+    def _create_request_kwargs(
         self,
         api_call_input: ResponseInputParam,
+        previous_response_id: str | None,
         model_config: ModelConfig,
         tool_schemas: list[ToolParam] | None,
-    ) -> Response:
-        """Create a response using OpenAI API. This method will be decorated with retry logic."""
-        return self.client.responses.create(
-            input=api_call_input,
-            model=model_config.model,
-            tools=tool_schemas if tool_schemas else openai.NOT_GIVEN,
-            temperature=model_config.temperature
+    ) -> dict[str, Any]:
+        """Build the keyword arguments shared by the sync and async Responses API calls."""
+        self._request_bytes = self._input_bytes(api_call_input)
+        return {
+            "input": api_call_input,
+            "previous_response_id": previous_response_id or openai.NOT_GIVEN,
+            # Responses can only be continued if the server stores them.
+            "store": True if model_config.response_chaining else openai.NOT_GIVEN,
+            "model": model_config.model,
+            "tools": tool_schemas if tool_schemas else openai.NOT_GIVEN,
+            "temperature": model_config.temperature
             if "o3" not in model_config.model
             and "o4-mini" not in model_config.model
             and "gpt-5" not in model_config.model
             else openai.NOT_GIVEN,
-            top_p=model_config.top_p,
-            max_output_tokens=model_config.max_tokens,
-        )
+            "top_p": model_config.top_p,
+            "max_output_tokens": model_config.max_tokens,
+        }
 
-    @override
-    def chat(
+    def _create_openai_response(
         self,
-        messages: list[LLMMessage],
         model_config: ModelConfig,
-        tools: list[Tool] | None = None,
-        reuse_history: bool = True,
-    ) -> LLMResponse:
-        """Send chat messages to OpenAI with optional tool support."""
+        tool_schemas: list[ToolParam] | None,
+    ) -> Response:
+        """Create a response using OpenAI API. This method will be decorated with retry logic."""
+        api_call_input, previous_response_id = self._request_input(model_config)
+        try:
+            return self.client.responses.create(
+                **self._create_request_kwargs(
+                    api_call_input, previous_response_id, model_config, tool_schemas
+                )
+            )
+        except (openai.BadRequestError, openai.NotFoundError) as e:
+            if previous_response_id is None or not _rejects_previous_response(e):
+                raise
+            self._reset_chain()
+            return self.client.responses.create(
+                **self._create_request_kwargs(
+                    self.message_history.to_list(), None, model_config, tool_schemas
+                )
+            )
+
+    async def _acreate_openai_response(
+        self,
+        model_config: ModelConfig,
+        tool_schemas: list[ToolParam] | None,
+    ) -> Response:
+        """Async variant of `_create_openai_response`."""
+        api_call_input, previous_response_id = self._request_input(model_config)
+        async with self.pooled_client(self.async_client) as client:
+            try:
+                return await client.responses.create(
+                    **self._create_request_kwargs(
+                        api_call_input, previous_response_id, model_config, tool_schemas
+                    )
+                )
+            except (openai.BadRequestError, openai.NotFoundError) as e:
+                if previous_response_id is None or not _rejects_previous_response(e):
+                    raise
+                self._reset_chain()
+                return await client.responses.create(
+                    **self._create_request_kwargs(
+                        self.message_history.to_list(), None, model_config, tool_schemas
+                    )
+                )
+
+    async def _astream_openai_response(
+        self,
+        model_config: ModelConfig,
+        tool_schemas: list[ToolParam] | None,
+    ) -> AsyncIterator[LLMStreamEvent | Response]:
+        """Stream a response, yielding deltas and finally the complete response."""
+        api_call_input, previous_response_id = self._request_input(model_config)
+        async with self.pooled_client(self.async_client) as client:
+            try:
+                stream = await client.responses.create(
+                    **self._create_request_kwargs(
+                        api_call_input, previous_response_id, model_config, tool_schemas
+                    ),
+                    stream=True,
+                )
+            except (openai.BadRequestError, openai.NotFoundError) as e:
+                if previous_response_id is None or not _rejects_previous_response(e):
+                    raise
+                self._reset_chain()
+                stream = await client.responses.create(
+                    **self._create_request_kwargs(
+                        self.message_history.to_list(), None, model_config, tool_schemas
+                    ),
+                    stream=True,
+                )
+            async for event in stream:
+                match event.type:
+                    case "response.output_text.delta":
+                        yield LLMStreamEvent(content_delta=event.delta)
+                    case "response.output_item.done" if event.item.type == "function_call":
+                        yield LLMStreamEvent(tool_call=_parse_function_call(event.item))
+                    case "response.completed" | "response.incomplete":
+                        yield event.response
+                        return
+                    case "response.failed":
+                        error = event.response.error
+                        raise RuntimeError(error.message if error else "OpenAI response failed")
+                    case "error":
+                        raise RuntimeError(event.message)
+                    case _:
+                        pass
+        raise RuntimeError("OpenAI response stream ended before the response was completed")
+
+    def _prepare_request(
+        self,
+        messages: list[LLMMessage],
+        tools: list[Tool] | None,
+        reuse_history: bool,
+    ) -> list[ToolParam] | None:
+        """Append the new messages to the history and build the tool schemas."""
         openai_messages: ResponseInputParam = self.parse_messages(messages)
 
         tool_schemas = None
         if tools:
-            tool_schemas = [
-                FunctionToolParam(
+            tool_schemas = self.compile_tool_schemas(
+                tools,
+                lambda tool: FunctionToolParam(
                     name=tool.name,
                     description=tool.description,
                     parameters=tool.get_input_schema(),
                     strict=True,
                     type="function",
-                )
-                for tool in tools
-            ]
+                ),
+            )
 
-        api_call_input: ResponseInputParam = []
         if reuse_history:
-            api_call_input.extend(self.message_history)
-        api_call_input.extend(openai_messages)
+            self.message_history.extend(openai_messages)
+        else:
+            self.message_history.reset(openai_messages)
+            self._reset_chain()
+        return tool_schemas
+
+    @override
+    def chat(
+        self,
+        messages: list[LLMMessage],
+        model_config: ModelConfig,
+        tools: list[Tool] | None = None,
+        reuse_history: bool = True,
+    ) -> LLMResponse:
+        """Send chat messages to OpenAI with optional tool support."""
+        tool_schemas = self._prepare_request(messages, tools, reuse_history)
 
         # Apply retry decorator to the API call
         retry_decorator = retry_with(
             func=self._create_openai_response,
             provider_name="OpenAI",
             max_retries=model_config.max_retries,
+            circuit_breaker=self.circuit_breaker,
         )
-        response = retry_decorator(api_call_input, model_config, tool_schemas)
+        response = retry_decorator(model_config, tool_schemas)
 
+        return self._process_response(response, messages, model_config, tools)
+
+    @override
+    async def achat(
+        self,
+        messages: list[LLMMessage],
+        model_config: ModelConfig,
+        tools: list[Tool] | None = None,
+        reuse_history: bool = True,
+    ) -> LLMResponse:
+        """Send chat messages to OpenAI through the async SDK client."""
+        tool_schemas = self._prepare_request(messages, tools, reuse_history)
+
+        retry_decorator = async_retry_with(
+            func=self._acreate_openai_response,
+            provider_name="OpenAI",
+            max_retries=model_config.max_retries,
+            circuit_breaker=self.circuit_breaker,
+        )
+        response = await retry_decorator(model_config, tool_schemas)
+
+        return self._process_response(response, messages, model_config, tools)
+
+    @override
+    async def astream(
+        self,
+        messages: list[LLMMessage],
+        model_config: ModelConfig,
+        tools: list[Tool] | None = None,
+        reuse_history: bool = True,
+    ) -> AsyncIterator[LLMStreamEvent]:
+        """Stream chat messages to OpenAI through the async SDK client."""
+        tool_schemas = self._prepare_request(messages, tools, reuse_history)
+
+        retry_decorator = async_retry_stream(
+            func=self._astream_openai_response,
+            provider_name="OpenAI",
+            max_retries=model_config.max_retries,
+            circuit_breaker=self.circuit_breaker,
+        )
+        response: Response | None = None
+        async for item in retry_decorator(model_config, tool_schemas):
+            if isinstance(item, LLMStreamEvent):
+                yield item
+            else:
+                response = item
+        assert response is not None
+
+        yield LLMStreamEvent(
+            response=self._process_response(response, messages, model_config, tools)
+        )
+
+    def _process_response(
+        self,
+        response: Response,
+        messages: list[LLMMessage],
+        model_config: ModelConfig,
+        tools: list[Tool] | None,
+    ) -> LLMResponse:
+        """Convert an API response to an LLMResponse and append it to the history."""
         content = ""
         tool_calls: list[ToolCall] = []
         for output_block in response.output:
             if output_block.type == "function_call":
-                tool_calls.append(
-                    ToolCall(
-                        call_id=output_block.call_id,
-                        name=output_block.name,
-                        arguments=json.loads(output_block.arguments)
-                        if output_block.arguments
-                        else {},
-                        id=output_block.id,
-                    )
-                )
+                tool_calls.append(_parse_function_call(output_block))
                 tool_call_param = ResponseFunctionToolCallParam(
                     arguments=output_block.arguments,
                     call_id=output_block.call_id,
@@ -132,6 +350,10 @@ class OpenAIClient(BaseLLMClient):
                 EasyInputMessageParam(content=content, role="assistant", type="message")
             )
 
+        if model_config.response_chaining:
+            self._previous_response_id = response.id
+            self._chained_length = len(self.message_history)
+
         usage = None
         if response.usage:
             usage = LLMUsage(
@@ -147,6 +369,7 @@ class OpenAIClient(BaseLLMClient):
             model=response.model,
             finish_reason=response.status,
             tool_calls=tool_calls if len(tool_calls) > 0 else None,
+            request_bytes=self._request_bytes,
         )
 
         # Record trajectory if recorder is available
@@ -163,24 +386,22 @@ class OpenAIClient(BaseLLMClient):
 
     def parse_messages(self, messages: list[LLMMessage]) -> ResponseInputParam:
         """Parse the messages to OpenAI format."""
-        openai_messages: ResponseInputParam = []
-        for msg in messages:
-            if msg.tool_result:
-                openai_messages.append(self.parse_tool_call_result(msg.tool_result))
-            elif msg.tool_call:
-                openai_messages.append(self.parse_tool_call(msg.tool_call))
-            else:
-                if not msg.content:
-                    raise ValueError("Message content is required")
-                if msg.role == "system":
-                    openai_messages.append({"role": "system", "content": msg.content})
-                elif msg.role == "user":
-                    openai_messages.append({"role": "user", "content": msg.content})
-                elif msg.role == "assistant":
-                    openai_messages.append({"role": "assistant", "content": msg.content})
-                else:
-                    raise ValueError(f"Invalid message role: {msg.role}")
-        return openai_messages
+        return [self.encode_message(msg, self._parse_message) for msg in messages]
+
+    def _parse_message(self, msg: LLMMessage) -> ResponseInputItemParam:
+        if msg.tool_result:
+            return self.parse_tool_call_result(msg.tool_result)
+        if msg.tool_call:
+            return self.parse_tool_call(msg.tool_call)
+        if not msg.content:
+            raise ValueError("Message content is required")
+        if msg.role == "system":
+            return {"role": "system", "content": msg.content}
+        if msg.role == "user":
+            return {"role": "user", "content": msg.content}
+        if msg.role == "assistant":
+            return {"role": "assistant", "content": msg.content}
+        raise ValueError(f"Invalid message role: {msg.role}")
 
     def parse_tool_call(self, tool_call: ToolCall) -> ResponseFunctionToolCallParam:
         """Parse the tool call from the LLM response."""
@@ -205,3 +426,22 @@ class OpenAIClient(BaseLLMClient):
             call_id=tool_call_result.call_id,
             output=result_content,
         )
+
+
+def _rejects_previous_response(error: openai.APIStatusError) -> bool:
+    """Whether the server refused to continue from the given previous response.
+
+    Stored responses expire, and are unknown to servers that do not store them at all.
+    """
+    message = str(error).lower()
+    return "previous_response" in message or "previous response" in message
+
+
+def _parse_function_call(function_call: ResponseFunctionToolCall) -> ToolCall:
+    """Convert a function call output item to a ToolCall."""
+    return ToolCall(
+        call_id=function_call.call_id,
+        name=function_call.name,
+        arguments=json.loads(function_call.arguments) if function_call.arguments else {},
+        id=function_call.id,
+    )
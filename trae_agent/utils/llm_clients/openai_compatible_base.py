@@ -5,13 +5,13 @@
 
 import json
 from abc import ABC, abstractmethod
-from typing import override
+from collections.abc import AsyncIterator
+from typing import Any, override
 
 import openai
 from openai.types.chat import (
     ChatCompletion,
     ChatCompletionAssistantMessageParam,
-    ChatCompletionFunctionMessageParam,
     ChatCompletionMessageParam,
     ChatCompletionMessageToolCallParam,
     ChatCompletionSystemMessageParam,
@@ -24,11 +24,21 @@ from openai.types.chat.chat_completion_tool_message_param import (
 )
 from openai.types.shared_params.function_definition import FunctionDefinition
 
-from trae_agent.tools.base import Tool, ToolCall
+from trae_agent.tools.base import Tool, ToolCall, ToolResult
 from trae_agent.utils.config import ModelConfig
 from trae_agent.utils.llm_clients.base_client import BaseLLMClient
-from trae_agent.utils.llm_clients.llm_basics import LLMMessage, LLMResponse, LLMUsage
-from trae_agent.utils.llm_clients.retry_utils import retry_with
+from trae_agent.utils.llm_clients.llm_basics import (
+    LLMMessage,
+    LLMResponse,
+    LLMStreamEvent,
+    LLMUsage,
+)
+from trae_agent.utils.llm_clients.message_history import MessageHistory
+from trae_agent.utils.llm_clients.retry_utils import (
+    async_retry_stream,
+    async_retry_with,
+    retry_with,
+)
 
 
 class ProviderConfig(ABC):
@@ -38,7 +48,17 @@ class ProviderConfig(ABC):
     def create_client(
         self, api_key: str, base_url: str | None, api_version: str | None
     ) -> openai.OpenAI:
-        """Create the OpenAI client instance."""
+        """Create the OpenAI client instance, without retries of its own (max_retries=0).
+
+        Retries are left to `retry_utils`, which counts them and shares their backoff.
+        """
+        pass
+
+    @abstractmethod
+    def create_async_client(
+        self, api_key: str, base_url: str | None, api_version: str | None
+    ) -> openai.AsyncOpenAI:
+        """Create the async OpenAI client instance, also with max_retries=0."""
         pass
 
     @abstractmethod
@@ -69,63 +89,182 @@ class OpenAICompatibleClient(BaseLLMClient):
         super().__init__(model_config)
         self.provider_config = provider_config
         self.client = provider_config.create_client(self.api_key, self.base_url, self.api_version)
-        self.message_history: list[ChatCompletionMessageParam] = []
+        self.async_client = provider_config.create_async_client(
+            self.api_key, self.base_url, self.api_version
+        )
+        self.message_history: MessageHistory[ChatCompletionMessageParam] = MessageHistory()
 
     @override
     def set_chat_history(self, messages: list[LLMMessage]) -> None:
         """Set the chat history."""
-        self.message_history = self.parse_messages(messages)
+        self.message_history.reset(self.parse_messages(messages))
 
-    def _create_response(
+    def _create_request_kwargs(
         self,
         model_config: ModelConfig,
         tool_schemas: list[ChatCompletionToolParam] | None,
         extra_headers: dict[str, str] | None = None,
-    ) -> ChatCompletion:
-        """Create a response using the provider's API. This method will be decorated with retry logic."""
-        return self.client.chat.completions.create(
-            model=model_config.model,
-            messages=self.message_history,
-            tools=tool_schemas if tool_schemas else openai.NOT_GIVEN,
-            temperature=model_config.temperature
+    ) -> dict[str, Any]:
+        """Build the keyword arguments shared by the sync and async chat completion calls."""
+        return {
+            "model": model_config.model,
+            "messages": self.message_history.to_list(),
+            "tools": tool_schemas if tool_schemas else openai.NOT_GIVEN,
+            "temperature": model_config.temperature
             if "o3" not in model_config.model
             and "o4-mini" not in model_config.model
             and "gpt-5" not in model_config.model
             else openai.NOT_GIVEN,
-            top_p=model_config.top_p,
-            max_tokens=model_config.max_tokens,
-            extra_headers=extra_headers if extra_headers else None,
-            n=1,
+            "top_p": model_config.top_p,
+            "max_tokens": model_config.max_tokens,
+            "extra_headers": extra_headers if extra_headers else None,
+            "n": 1,
+        }
+
+    def _create_response(
+        self,
+        model_config: ModelConfig,
+        tool_schemas: list[ChatCompletionToolParam] | None,
+        extra_headers: dict[str, str] | None = None,
+    ) -> ChatCompletion:
+        """Create a response using the provider's API. This method will be decorated with retry logic."""
+        return self.client.chat.completions.create(
+            **self._create_request_kwargs(model_config, tool_schemas, extra_headers)
         )
 
-    @override
-    def chat(
+    async def _acreate_response(
         self,
-        messages: list[LLMMessage],
         model_config: ModelConfig,
-        tools: list[Tool] | None = None,
-        reuse_history: bool = True,
-    ) -> LLMResponse:
-        """Send chat messages with optional tool support."""
+        tool_schemas: list[ChatCompletionToolParam] | None,
+        extra_headers: dict[str, str] | None = None,
+    ) -> ChatCompletion:
+        """Async variant of `_create_response`."""
+        async with self.pooled_client(self.async_client) as client:
+            return await client.chat.completions.create(
+                **self._create_request_kwargs(model_config, tool_schemas, extra_headers)
+            )
+
+    async def _astream_response(
+        self,
+        model_config: ModelConfig,
+        tool_schemas: list[ChatCompletionToolParam] | None,
+        extra_headers: dict[str, str] | None = None,
+    ) -> AsyncIterator[LLMStreamEvent | ChatCompletion]:
+        """Stream a chat completion, yielding deltas and finally the assembled completion."""
+        async with self.pooled_client(self.async_client) as client:
+            stream = await client.chat.completions.create(
+                **self._create_request_kwargs(model_config, tool_schemas, extra_headers),
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+
+            completion: dict[str, Any] = {"id": "", "created": 0, "model": model_config.model}
+            content_parts: list[str] = []
+            finish_reason: str | None = None
+            usage = None
+            tool_calls: dict[int, dict[str, str]] = {}
+            open_index: int | None = None
+
+            async for chunk in stream:
+                completion.update(id=chunk.id, created=chunk.created, model=chunk.model)
+                if chunk.usage:
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+
+                choice = chunk.choices[0]
+                if choice.delta.content:
+                    content_parts.append(choice.delta.content)
+                    yield LLMStreamEvent(content_delta=choice.delta.content)
+
+                for tool_call_delta in choice.delta.tool_calls or []:
+                    index = tool_call_delta.index
+                    if index != open_index:
+                        # Tool calls are streamed one after another, so once the next one starts
+                        # the arguments of the previous one are complete.
+                        if open_index is not None:
+                            yield LLMStreamEvent(tool_call=_to_tool_call(tool_calls[open_index]))
+                        tool_calls.setdefault(index, {"id": "", "name": "", "arguments": ""})
+                        open_index = index
+                    entry = tool_calls[index]
+                    if tool_call_delta.id:
+                        entry["id"] = tool_call_delta.id
+                    if tool_call_delta.function:
+                        entry["name"] += tool_call_delta.function.name or ""
+                        entry["arguments"] += tool_call_delta.function.arguments or ""
+
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+
+        if open_index is not None:
+            yield LLMStreamEvent(tool_call=_to_tool_call(tool_calls[open_index]))
+
+        yield ChatCompletion.construct(
+            **completion,
+            object="chat.completion",
+            choices=[
+                {
+                    "index": 0,
+                    "finish_reason": finish_reason or "stop",
+                    "message": {
+                        "role": "assistant",
+                        "content": "".join(content_parts) or None,
+                        "tool_calls": [
+                            {
+                                "id": entry["id"],
+                                "type": "function",
+                                "function": {
+                                    "name": entry["name"],
+                                    "arguments": entry["arguments"],
+                                },
+                            }
+                            for _, entry in sorted(tool_calls.items())
+                        ]
+                        or None,
+                    },
+                }
+            ],
+            usage=usage,
+        )
+
+    def _prepare_request(
+        self,
+        messages: list[LLMMessage],
+        tools: list[Tool] | None,
+        reuse_history: bool,
+    ) -> list[ChatCompletionToolParam] | None:
+        """Append the new messages to the history and build the tool schemas."""
         parsed_messages = self.parse_messages(messages)
         if reuse_history:
-            self.message_history = self.message_history + parsed_messages
+            self.message_history.extend(parsed_messages)
         else:
-            self.message_history = parsed_messages
+            self.message_history.reset(parsed_messages)
 
         tool_schemas = None
         if tools:
-            tool_schemas = [
-                ChatCompletionToolParam(
+            tool_schemas = self.compile_tool_schemas(
+                tools,
+                lambda tool: ChatCompletionToolParam(
                     function=FunctionDefinition(
-                        name=tool.get_name(),
-                        description=tool.get_description(),
+                        name=tool.name,
+                        description=tool.description,
                         parameters=tool.get_input_schema(),
                     ),
                     type="function",
-                )
-                for tool in tools
-            ]
+                ),
+            )
+        return tool_schemas
+
+    @override
+    def chat(
+        self,
+        messages: list[LLMMessage],
+        model_config: ModelConfig,
+        tools: list[Tool] | None = None,
+        reuse_history: bool = True,
+    ) -> LLMResponse:
+        """Send chat messages with optional tool support."""
+        tool_schemas = self._prepare_request(messages, tools, reuse_history)
 
         # Get provider-specific extra headers
         extra_headers = self.provider_config.get_extra_headers()
@@ -135,9 +274,74 @@ class OpenAICompatibleClient(BaseLLMClient):
             func=self._create_response,
             provider_name=self.provider_config.get_service_name(),
             max_retries=model_config.max_retries,
+            circuit_breaker=self.circuit_breaker,
         )
         response = retry_decorator(model_config, tool_schemas, extra_headers)
 
+        return self._process_response(response, messages, model_config, tools)
+
+    @override
+    async def achat(
+        self,
+        messages: list[LLMMessage],
+        model_config: ModelConfig,
+        tools: list[Tool] | None = None,
+        reuse_history: bool = True,
+    ) -> LLMResponse:
+        """Send chat messages through the provider's async SDK client."""
+        tool_schemas = self._prepare_request(messages, tools, reuse_history)
+
+        extra_headers = self.provider_config.get_extra_headers()
+
+        retry_decorator = async_retry_with(
+            func=self._acreate_response,
+            provider_name=self.provider_config.get_service_name(),
+            max_retries=model_config.max_retries,
+            circuit_breaker=self.circuit_breaker,
+        )
+        response = await retry_decorator(model_config, tool_schemas, extra_headers)
+
+        return self._process_response(response, messages, model_config, tools)
+
+    @override
+    async def astream(
+        self,
+        messages: list[LLMMessage],
+        model_config: ModelConfig,
+        tools: list[Tool] | None = None,
+        reuse_history: bool = True,
+    ) -> AsyncIterator[LLMStreamEvent]:
+        """Stream chat messages through the provider's async SDK client."""
+        tool_schemas = self._prepare_request(messages, tools, reuse_history)
+
+        extra_headers = self.provider_config.get_extra_headers()
+
+        retry_decorator = async_retry_stream(
+            func=self._astream_response,
+            provider_name=self.provider_config.get_service_name(),
+            max_retries=model_config.max_retries,
+            circuit_breaker=self.circuit_breaker,
+        )
+        response: ChatCompletion | None = None
+        async for item in retry_decorator(model_config, tool_schemas, extra_headers):
+            if isinstance(item, LLMStreamEvent):
+                yield item
+            else:
+                response = item
+        assert response is not None
+
+        yield LLMStreamEvent(
+            response=self._process_response(response, messages, model_config, tools)
+        )
+
+    def _process_response(
+        self,
+        response: ChatCompletion,
+        messages: list[LLMMessage],
+        model_config: ModelConfig,
+        tools: list[Tool] | None,
+    ) -> LLMResponse:
+        """Convert an API response to an LLMResponse and append it to the history."""
         choice = response.choices[0]
 
         tool_calls: list[ToolCall] | None = None
@@ -210,69 +414,86 @@ class OpenAICompatibleClient(BaseLLMClient):
         """Parse LLM messages to OpenAI format."""
         openai_messages: list[ChatCompletionMessageParam] = []
         for msg in messages:
-            match msg:
-                case msg if msg.tool_call is not None:
-                    _msg_tool_call_handler(openai_messages, msg)
-                case msg if msg.tool_result is not None:
-                    _msg_tool_result_handler(openai_messages, msg)
-                case _:
-                    _msg_role_handler(openai_messages, msg)
+            parsed = self.encode_message(msg, _parse_message)
+            # Tool calls belong to the assistant turn that issued them, so merge them into the
+            # preceding assistant message when there is one. The merge is a new message, as
+            # the encodings are shared.
+            if msg.tool_call and openai_messages and openai_messages[-1]["role"] == "assistant":
+                previous = openai_messages[-1]
+                openai_messages[-1] = {  # pyright: ignore[reportAttributeAccessIssue]
+                    **previous,
+                    "tool_calls": [*previous.get("tool_calls", []), *parsed.get("tool_calls", [])],  # pyright: ignore[reportAttributeAccessIssue]
+                }
+            else:
+                openai_messages.append(parsed)
 
         return openai_messages
 
 
-def _msg_tool_call_handler(messages: list[ChatCompletionMessageParam], msg: LLMMessage) -> None:
-    if msg.tool_call:
-        messages.append(
-            ChatCompletionFunctionMessageParam(
-                content=json.dumps(
-                    {
-                        "name": msg.tool_call.name,
-                        "arguments": msg.tool_call.arguments,
-                    }
+def _to_tool_call(entry: dict[str, str]) -> ToolCall:
+    """Build a tool call from the fields assembled out of streamed deltas."""
+    return ToolCall(
+        name=entry["name"],
+        call_id=entry["id"],
+        arguments=json.loads(entry["arguments"]) if entry["arguments"] else {},
+    )
+
+
+def _parse_message(msg: LLMMessage) -> ChatCompletionMessageParam:
+    match msg:
+        case msg if msg.tool_call is not None:
+            return _parse_tool_call(msg.tool_call)
+        case msg if msg.tool_result is not None:
+            return _parse_tool_result(msg.tool_result)
+        case _:
+            return _parse_role_message(msg)
+
+
+def _parse_tool_call(tool_call: ToolCall) -> ChatCompletionAssistantMessageParam:
+    return ChatCompletionAssistantMessageParam(
+        role="assistant",
+        content=None,
+        tool_calls=[
+            ChatCompletionMessageToolCallParam(
+                id=tool_call.call_id,
+                function=Function(
+                    name=tool_call.name,
+                    arguments=json.dumps(tool_call.arguments),
                 ),
-                role="function",
-                name=msg.tool_call.name,
-            )
-        )
-
-
-def _msg_tool_result_handler(messages: list[ChatCompletionMessageParam], msg: LLMMessage) -> None:
-    if msg.tool_result:
-        result: str = ""
-        if msg.tool_result.result:
-            result = result + msg.tool_result.result + "\n"
-        if msg.tool_result.error:
-            result += "Tool call failed with error:\n"
-            result += msg.tool_result.error
-        result = result.strip()
-        messages.append(
-            ChatCompletionToolMessageParam(
-                content=result,
-                role="tool",
-                tool_call_id=msg.tool_result.call_id,
+                type="function",
             )
-        )
-
-
-def _msg_role_handler(messages: list[ChatCompletionMessageParam], msg: LLMMessage) -> None:
-    if msg.role:
-        match msg.role:
-            case "system":
-                if not msg.content:
-                    raise ValueError("System message content is required")
-                messages.append(
-                    ChatCompletionSystemMessageParam(content=msg.content, role="system")
-                )
-            case "user":
-                if not msg.content:
-                    raise ValueError("User message content is required")
-                messages.append(ChatCompletionUserMessageParam(content=msg.content, role="user"))
-            case "assistant":
-                if not msg.content:
-                    raise ValueError("Assistant message content is required")
-                messages.append(
-                    ChatCompletionAssistantMessageParam(content=msg.content, role="assistant")
-                )
-            case _:
-                raise ValueError(f"Invalid message role: {msg.role}")
+        ],
+    )
+
+
+def _parse_tool_result(tool_result: ToolResult) -> ChatCompletionToolMessageParam:
+    result: str = ""
+    if tool_result.result:
+        result = result + tool_result.result + "\n"
+    if tool_result.error:
+        result += "Tool call failed with error:\n"
+        result += tool_result.error
+    result = result.strip()
+    return ChatCompletionToolMessageParam(
+        content=result,
+        role="tool",
+        tool_call_id=tool_result.call_id,
+    )
+
+
+def _parse_role_message(msg: LLMMessage) -> ChatCompletionMessageParam:
+    match msg.role:
+        case "system":
+            if not msg.content:
+                raise ValueError("System message content is required")
+            return ChatCompletionSystemMessageParam(content=msg.content, role="system")
+        case "user":
+            if not msg.content:
+                raise ValueError("User message content is required")
+            return ChatCompletionUserMessageParam(content=msg.content, role="user")
+        case "assistant":
+            if not msg.content:
+                raise ValueError("Assistant message content is required")
+            return ChatCompletionAssistantMessageParam(content=msg.content, role="assistant")
+        case _:
+            raise ValueError(f"Invalid message role: {msg.role}")
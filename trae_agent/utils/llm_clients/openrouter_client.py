@@ -8,6 +8,7 @@ import os
 import openai
 
 from trae_agent.utils.config import ModelConfig
+from trae_agent.utils.llm_clients.http_client import get_async_http_client, get_http_client
 from trae_agent.utils.llm_clients.openai_compatible_base import (
     OpenAICompatibleClient,
     ProviderConfig,
@@ -21,7 +22,23 @@ class OpenRouterProvider(ProviderConfig):
         self, api_key: str, base_url: str | None, api_version: str | None
     ) -> openai.OpenAI:
         """Create OpenAI client with OpenRouter base URL."""
-        return openai.OpenAI(api_key=api_key, base_url=base_url)
+        return openai.OpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=get_http_client("openrouter", base_url),
+            max_retries=0,
+        )
+
+    def create_async_client(
+        self, api_key: str, base_url: str | None, api_version: str | None
+    ) -> openai.AsyncOpenAI:
+        """Create async OpenAI client with OpenRouter base URL."""
+        return openai.AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=get_async_http_client("openrouter", base_url),
+            max_retries=0,
+        )
 
     def get_service_name(self) -> str:
         """Get the service name for retry logging."""
@@ -0,0 +1,253 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""Process-wide request and token quota of each model and API key.
+
+Every call reserves one request and its estimated input tokens from token buckets shared by
+all clients of the process that use the same provider, model and key. A call that finds a
+bucket in debt waits until it has refilled, behind the calls that reserved before it, so
+concurrent agents take turns at the quota's pace instead of running into rate limits
+together. The buckets are sized from the model's rate limit config and from the limit and
+remaining quota the provider reports in the headers of its responses. Once a call has
+finished, its reservation is corrected with the input and output tokens it actually used.
+Each retry of a call takes another request, and a call that failed gives its tokens back.
+With a pool of keys, each key has a limiter of its own, which a request waits for once the
+pool has picked its key.
+"""
+
+import asyncio
+import threading
+import time
+from collections.abc import Awaitable, Callable, Iterator, Mapping
+from contextlib import contextmanager, suppress
+from contextvars import ContextVar
+
+import httpx
+
+from trae_agent.utils.config import ModelConfig, RateLimitConfig
+
+# Rate limit headers of each quota, as sent by OpenAI (and Azure) and by Anthropic, with
+# "limit" or "remaining" in place of {}.
+QUOTA_HEADERS: dict[str, tuple[str, ...]] = {
+    "requests": ("x-ratelimit-{}-requests", "anthropic-ratelimit-requests-{}"),
+    "tokens": ("x-ratelimit-{}-tokens", "anthropic-ratelimit-tokens-{}"),
+    "input_tokens": ("anthropic-ratelimit-input-tokens-{}",),
+    "output_tokens": ("anthropic-ratelimit-output-tokens-{}",),
+}
+
+
+def _header_number(headers: Mapping[str, str], names: tuple[str, ...], kind: str) -> int | None:
+    for name in names:
+        value = headers.get(name.format(kind))
+        if value is not None:
+            try:
+                return int(float(value))
+            except ValueError:
+                continue
+    return None
+
+
+class TokenBucket:
+    """A per-minute quota that refills continuously up to its capacity.
+
+    Taking more than is left puts the bucket in debt. The seconds until the debt is paid
+    off are what the taker waits, so whoever takes next waits longer, in order.
+    """
+
+    def __init__(self, per_minute: int, now: float):
+        self.capacity: float = float(per_minute)
+        self.level: float = float(per_minute)
+        self._updated: float = now
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.capacity / 60)
+        self._updated = now
+
+    def take(self, amount: float, now: float) -> float:
+        """Take the amount, or give it back if negative. Return the seconds of debt left."""
+        self.refill(now)
+        self.level = min(self.capacity, self.level - amount)
+        return max(-self.level * 60 / self.capacity, 0.0)
+
+
+class RateLimiter:
+    """Request and token buckets of a model and API key.
+
+    Quotas missing from the config get a bucket once the provider reports them. The
+    remaining quota the provider reports lowers a bucket that is fuller than that, since
+    other processes may share the key, and a rate limit response pauses every caller for
+    the time the provider asked for.
+    """
+
+    def __init__(self, config: RateLimitConfig | None = None):
+        now = time.monotonic()
+        self._buckets: dict[str, TokenBucket] = {}
+        config = config or RateLimitConfig()
+        for name, per_minute in (
+            ("requests", config.requests_per_minute),
+            ("tokens", config.tokens_per_minute),
+            ("input_tokens", config.input_tokens_per_minute),
+            ("output_tokens", config.output_tokens_per_minute),
+        ):
+            if per_minute:
+                self._buckets[name] = TokenBucket(per_minute, now)
+        # Configured capacities are kept, e.g. to leave part of the quota to other users.
+        self._configured: frozenset[str] = frozenset(self._buckets)
+        self._paused_until: float = 0.0
+        self._lock: threading.Lock = threading.Lock()
+
+    def _take(self, amounts: dict[str, float], now: float) -> float:
+        """Take the amounts from the buckets there are. Return the longest debt, in seconds."""
+        delay = 0.0
+        for name, amount in amounts.items():
+            bucket = self._buckets.get(name)
+            if bucket is not None:
+                delay = max(delay, bucket.take(amount, now))
+        return delay
+
+    def reserve(self, input_tokens: int) -> float:
+        """Take a request and its input tokens. Return the seconds to wait before sending it."""
+        with self._lock:
+            now = time.monotonic()
+            # Output tokens are only known afterwards; a request waits out their debt.
+            amounts = {
+                "requests": 1,
+                "tokens": input_tokens,
+                "input_tokens": input_tokens,
+                "output_tokens": 0,
+            }
+            return max(self._take(amounts, now), self._paused_until - now, 0.0)
+
+    def cancel(self, input_tokens: int, sent: bool = False) -> None:
+        """Give back the reservation of a request that was not sent, or the input tokens of
+        one that was sent but failed, which still counts as a request."""
+        with self._lock:
+            amounts = {
+                "requests": 0 if sent else -1,
+                "tokens": -input_tokens,
+                "input_tokens": -input_tokens,
+            }
+            _ = self._take(amounts, time.monotonic())
+
+    def acquire(self, input_tokens: int) -> float:
+        """Wait for the quota of a request. Return the seconds waited."""
+        delay = self.reserve(input_tokens)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def aacquire(self, input_tokens: int) -> float:
+        """Wait for the quota of a request without blocking the event loop."""
+        delay = self.reserve(input_tokens)
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                self.cancel(input_tokens)
+                raise
+        return delay
+
+    def settle(self, reserved_input_tokens: int, input_tokens: int, output_tokens: int) -> None:
+        """Correct the reservation of a finished request with the tokens it used."""
+        correction = input_tokens - reserved_input_tokens
+        amounts = {
+            "tokens": correction + output_tokens,
+            "input_tokens": correction,
+            "output_tokens": output_tokens,
+        }
+        with self._lock:
+            _ = self._take(amounts, time.monotonic())
+
+    def observe_headers(self, headers: Mapping[str, str]) -> None:
+        """Size and level the buckets from the rate limit headers of a response."""
+        with self._lock:
+            now = time.monotonic()
+            for name, names in QUOTA_HEADERS.items():
+                limit = _header_number(headers, names, "limit")
+                remaining = _header_number(headers, names, "remaining")
+                bucket = self._buckets.get(name)
+                if bucket is None:
+                    if not limit:
+                        continue
+                    bucket = self._buckets[name] = TokenBucket(limit, now)
+                elif limit and name not in self._configured:
+                    bucket.capacity = float(limit)
+                if remaining is not None:
+                    bucket.refill(now)
+                    bucket.level = min(bucket.level, float(remaining))
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every request for the given time."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def observe_response(self, response: httpx.Response) -> None:
+        self.observe_headers(response.headers)
+        if response.status_code == 429:
+            with suppress(ValueError):
+                self.pause(float(response.headers.get("retry-after", "")))
+
+
+_limiters: dict[tuple[str, str, str], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(model_config: ModelConfig, api_key: str | None = None) -> RateLimiter:
+    """Return the process-wide limiter of the model and an API key, by default its provider's.
+
+    The first config of a model and key sets its limits. Each key of an endpoint pool has
+    the configured limits, and a limiter of its own.
+    """
+    model_provider = model_config.model_provider
+    key = (model_provider.provider, model_config.model, api_key or model_provider.api_key)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = _limiters[key] = RateLimiter(model_config.rate_limit)
+        return limiter
+
+
+_current_limiter: ContextVar[RateLimiter | None] = ContextVar("rate_limiter", default=None)
+
+
+@contextmanager
+def rate_limited(limiter: RateLimiter | None) -> Iterator[None]:
+    """Let the responses of the requests sent in this context update the limiter."""
+    token = _current_limiter.set(limiter)
+    try:
+        yield
+    finally:
+        # Fails for a stream closed from another context, e.g. when it was garbage collected.
+        with suppress(ValueError):
+            _current_limiter.reset(token)
+
+
+def observe_rate_limits(response: httpx.Response) -> None:
+    """Response hook of the shared connection pools, for the limiter of the current call."""
+    limiter = _current_limiter.get()
+    if limiter is not None:
+        limiter.observe_response(response)
+
+
+# Takes the quota of a request from the limiter of the pooled key it is sent with.
+_endpoint_quota: ContextVar[Callable[[str], Awaitable[RateLimiter]] | None] = ContextVar(
+    "endpoint_quota", default=None
+)
+
+
+@contextmanager
+def endpoint_quota(hook: Callable[[str], Awaitable[RateLimiter]]) -> Iterator[None]:
+    """Let the requests sent in this context through an endpoint pool wait for the quota of
+    the key the pool picks, with the hook, which returns the key's limiter."""
+    token = _endpoint_quota.set(hook)
+    try:
+        yield
+    finally:
+        with suppress(ValueError):
+            _endpoint_quota.reset(token)
+
+
+async def acquire_endpoint_quota(api_key: str) -> RateLimiter | None:
+    """Wait for the quota of a request with the key, if the caller takes quota per key."""
+    hook = _endpoint_quota.get()
+    return await hook(api_key) if hook is not None else None
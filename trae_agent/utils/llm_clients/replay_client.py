@@ -0,0 +1,117 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+# pyright: reportExplicitAny=false
+# pyright: reportAny=false
+
+"""Client answering with the LLM responses recorded in a trajectory, for benchmarks."""
+
+import time
+from collections.abc import Callable
+from typing import Any, override
+
+from trae_agent.tools.base import Tool, ToolCall
+from trae_agent.utils.config import ModelConfig
+from trae_agent.utils.llm_clients.base_client import BaseLLMClient
+from trae_agent.utils.llm_clients.llm_basics import LLMMessage, LLMResponse, LLMUsage
+
+
+class ReplayExhausted(Exception):
+    """The agent asked for more responses than the trajectory recorded."""
+
+
+def load_recorded_responses(trajectory: dict[str, Any]) -> list[LLMResponse]:
+    """The LLM response of each recorded agent step, in order."""
+    responses: list[LLMResponse] = []
+    for step in trajectory.get("agent_steps", []):
+        recorded = step.get("llm_response")
+        if not recorded:
+            continue
+        usage = recorded.get("usage")
+        tool_calls = recorded.get("tool_calls")
+        responses.append(
+            LLMResponse(
+                content=recorded.get("content") or "",
+                usage=LLMUsage(
+                    input_tokens=usage.get("input_tokens") or 0,
+                    output_tokens=usage.get("output_tokens") or 0,
+                )
+                if usage
+                else None,
+                model=recorded.get("model"),
+                finish_reason=recorded.get("finish_reason"),
+                tool_calls=[
+                    ToolCall(
+                        name=call["name"],
+                        call_id=call["call_id"],
+                        arguments=call.get("arguments") or {},
+                        id=call.get("id"),
+                    )
+                    for call in tool_calls
+                ]
+                if tool_calls
+                else None,
+            )
+        )
+    return responses
+
+
+class ReplayClient(BaseLLMClient):
+    """Answers each call with the next recorded response, without any network traffic.
+
+    The messages are still converted by the provider client's `parse_messages`, when it has
+    one, so that the replay pays for the same history parsing as a real run.
+    """
+
+    def __init__(
+        self,
+        model_config: ModelConfig,
+        responses: list[LLMResponse],
+        provider_client: BaseLLMClient | None = None,
+    ):
+        super().__init__(model_config)
+        self.responses: list[LLMResponse] = responses
+        self.calls: int = 0
+        # Seconds spent parsing messages into the provider's format
+        self.parse_time: float = 0.0
+        self._parse_messages: Callable[[list[LLMMessage]], object] | None = getattr(
+            provider_client, "parse_messages", None
+        )
+
+    @override
+    def set_chat_history(self, messages: list[LLMMessage]) -> None:
+        self._parse(messages)
+
+    @override
+    def chat(
+        self,
+        messages: list[LLMMessage],
+        model_config: ModelConfig,
+        tools: list[Tool] | None = None,
+        reuse_history: bool = True,
+    ) -> LLMResponse:
+        """Return the next recorded response."""
+        self._parse(messages)
+        if self.calls >= len(self.responses):
+            raise ReplayExhausted(f"The trajectory has only {len(self.responses)} LLM responses")
+        response = self.responses[self.calls]
+        self.calls += 1
+        return response
+
+    @override
+    async def achat(
+        self,
+        messages: list[LLMMessage],
+        model_config: ModelConfig,
+        tools: list[Tool] | None = None,
+        reuse_history: bool = True,
+    ) -> LLMResponse:
+        """Return the next recorded response, without a worker thread."""
+        return self.chat(messages, model_config, tools, reuse_history)
+
+    def _parse(self, messages: list[LLMMessage]) -> None:
+        if self._parse_messages is None:
+            return
+        start_time = time.perf_counter()
+        _ = self._parse_messages(messages)
+        self.parse_time += time.perf_counter() - start_time
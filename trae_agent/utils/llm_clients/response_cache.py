@@ -0,0 +1,206 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""Content-addressed on-disk cache of LLM responses.
+
+Responses are keyed on a hash of the conversation, the tool schemas and the sampling
+parameters of the model, so a run that sends the same requests again is answered from
+the cache. It is meant for iterating on prompts, tools and consoles, and for running
+test suites and demos offline.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from enum import Enum
+
+from trae_agent.tools.base import Tool, ToolCall
+from trae_agent.utils.config import ModelConfig, ResponseCacheConfig
+from trae_agent.utils.llm_clients.llm_basics import LLMMessage, LLMResponse, LLMUsage
+
+
+class CacheMode(Enum):
+    """How the cache is used."""
+
+    RECORD = "record"  # answer from the cache, call the model on misses and store them
+    REPLAY = "replay"  # answer from the cache, fail on misses
+    PASSTHROUGH = "passthrough"  # always call the model, without storing
+
+
+class ResponseCacheMiss(Exception):
+    """A request missed the cache in replay mode."""
+
+
+def _message_key(message: LLMMessage) -> dict[str, object]:
+    key: dict[str, object] = {"role": message.role, "content": message.content}
+    if message.tool_call:
+        key["tool_call"] = {
+            "call_id": message.tool_call.call_id,
+            "name": message.tool_call.name,
+            "arguments": message.tool_call.arguments,
+        }
+    if message.tool_result:
+        # The tool's duration varies from run to run and is not sent to the model.
+        key["tool_result"] = {
+            "call_id": message.tool_result.call_id,
+            "name": message.tool_result.name,
+            "success": message.tool_result.success,
+            "result": message.tool_result.result,
+            "error": message.tool_result.error,
+        }
+    return key
+
+
+def cache_key(
+    messages: list[LLMMessage], tools: list[Tool] | None, model_config: ModelConfig
+) -> str:
+    """Hash of everything that determines the model's answer to a request."""
+    request = {
+        "messages": [_message_key(message) for message in messages],
+        "tools": [tool.json_definition() for tool in tools or []],
+        "model": {
+            "provider": model_config.model_provider.provider,
+            "model": model_config.model,
+            "max_tokens": model_config.max_tokens,
+            "temperature": model_config.temperature,
+            "top_p": model_config.top_p,
+            "top_k": model_config.top_k,
+            "parallel_tool_calls": model_config.parallel_tool_calls,
+            "stop_sequences": model_config.stop_sequences,
+            "candidate_count": model_config.candidate_count,
+        },
+    }
+    encoded = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def _encode_response(response: LLMResponse) -> str:
+    return json.dumps(
+        {
+            "content": response.content,
+            "usage": response.usage.__dict__ if response.usage else None,
+            "model": response.model,
+            "finish_reason": response.finish_reason,
+            "tool_calls": [tool_call.__dict__ for tool_call in response.tool_calls]
+            if response.tool_calls is not None
+            else None,
+        }
+    )
+
+
+def _decode_response(data: str) -> LLMResponse:
+    fields = json.loads(data)
+    return LLMResponse(
+        content=fields["content"],
+        usage=LLMUsage(**fields["usage"]) if fields["usage"] else None,
+        model=fields["model"],
+        finish_reason=fields["finish_reason"],
+        tool_calls=[ToolCall(**tool_call) for tool_call in fields["tool_calls"]]
+        if fields["tool_calls"] is not None
+        else None,
+        cached=True,
+    )
+
+
+class ResponseCache:
+    """LLM responses stored in a SQLite file, evicting the least recently used ones."""
+
+    def __init__(self, path: str, mode: CacheMode = CacheMode.RECORD, max_bytes: int = 256 << 20):
+        self.path: str = path
+        self.mode: CacheMode = mode
+        self.max_bytes: int = max_bytes
+        self.hits: int = 0
+        self.misses: int = 0
+        self._lock: threading.Lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection: sqlite3.Connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        _ = self._connection.execute("PRAGMA journal_mode=WAL")
+        _ = self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, "
+            "last_used REAL NOT NULL)"
+        )
+        _ = self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)"
+        )
+
+    def get(self, key: str) -> LLMResponse | None:
+        """Return the cached response, or None. Raises ResponseCacheMiss in replay mode."""
+        if self.mode is CacheMode.PASSTHROUGH:
+            return None
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT response FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                _ = self._connection.execute(
+                    "UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key)
+                )
+                self.hits += 1
+            else:
+                self.misses += 1
+        if row is None:
+            if self.mode is CacheMode.REPLAY:
+                raise ResponseCacheMiss(f"No cached response for request {key[:12]} in {self.path}")
+            return None
+        return _decode_response(row[0])
+
+    def put(self, key: str, response: LLMResponse) -> None:
+        """Store a response, evicting the least recently used ones beyond the size limit."""
+        if self.mode is not CacheMode.RECORD:
+            return
+        data = _encode_response(response)
+        with self._lock:
+            _ = self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                (key, data, len(data), time.time()),
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        (total,) = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+        rows = self._connection.execute(
+            "SELECT key, size FROM responses ORDER BY last_used ASC"
+        ).fetchall()
+        evicted: list[tuple[str]] = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        _ = self._connection.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+_caches: dict[str, ResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_response_cache(config: ResponseCacheConfig) -> ResponseCache:
+    """Return the process-wide cache of the file, so that clients share its connection."""
+    path = os.path.abspath(os.path.expanduser(config.path))
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = _caches[path] = ResponseCache(
+                path, CacheMode(config.mode), int(config.max_size_mb * (1 << 20))
+            )
+        return cache
@@ -1,55 +1,442 @@
 # Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+"""Retry policy for LLM API calls.
+
+Errors are classified as rate limits, transient failures or fatal errors. Fatal errors,
+such as authentication failures and malformed requests, are raised at once. The others
+are retried with capped exponential backoff and jitter, waiting at least as long as the
+server asks for. A circuit breaker per provider, base URL and API key, shared by every
+agent of the process, makes concurrent agents back off together when an endpoint keeps
+failing.
+"""
+
+import asyncio
+import logging
 import random
+import re
+import threading
 import time
-import traceback
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import contextmanager, suppress
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from enum import Enum
 from functools import wraps
-from typing import Any, Callable, TypeVar
+from typing import Any, TypeVar
+
+import httpx
 
 T = TypeVar("T")
 
+logger = logging.getLogger(__name__)
+
+# Timeouts, conflicts, rate limits, server errors and Anthropic's "overloaded".
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 425, 429, 500, 502, 503, 504, 529})
+
+
+class ErrorKind(Enum):
+    """How a failed API call should be handled."""
+
+    RATE_LIMITED = "rate_limited"
+    TRANSIENT = "transient"
+    FATAL = "fatal"
+
+
+@dataclass
+class RetryPolicy:
+    """Backoff parameters, in seconds."""
+
+    max_retries: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 60.0
+    max_server_delay: float = 300.0  # longest Retry-After that is honored
+
+    def backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter for the given (zero-based) retry."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+@dataclass
+class RetryStats:
+    """Retries of the API calls made while collecting, and the time spent waiting."""
+
+    retries: int = 0
+    wait: float = 0.0
+
+
+_retry_stats: ContextVar[RetryStats | None] = ContextVar("retry_stats", default=None)
+
+
+@contextmanager
+def collect_retry_stats() -> Iterator[RetryStats]:
+    """Count the retries of the API calls made in this context."""
+    stats = RetryStats()
+    token = _retry_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        # Fails for a stream closed from another context, e.g. when it was garbage collected.
+        with suppress(ValueError):
+            _retry_stats.reset(token)
+
+
+def _record_wait(seconds: float, retry: bool) -> None:
+    stats = _retry_stats.get()
+    if stats is not None:
+        stats.retries += 1 if retry else 0
+        stats.wait += seconds
+
+
+_retry_hook: ContextVar[Callable[[], float] | None] = ContextVar("retry_hook", default=None)
+
+
+@contextmanager
+def before_each_retry(hook: Callable[[], float]) -> Iterator[None]:
+    """Call the hook before each retry of the API calls made in this context.
+
+    The hook returns the seconds the retry has to wait at least, e.g. for rate limit quota.
+    """
+    token = _retry_hook.set(hook)
+    try:
+        yield
+    finally:
+        with suppress(ValueError):
+            _retry_hook.reset(token)
+
+
+def _hook_delay() -> float:
+    hook = _retry_hook.get()
+    return hook() if hook is not None else 0.0
+
+
+class CircuitBreaker:
+    """Shared backoff state of a provider.
+
+    Rate limit hints, and a run of consecutive failures from any caller, open the breaker
+    for a while. Every caller waits for it to close before its next attempt, so agents
+    sharing a provider stop hammering it together.
+    """
+
+    def __init__(
+        self, failure_threshold: int = 5, cooldown: float = 30.0, rate_limits: bool = True
+    ):
+        self.failure_threshold: int = failure_threshold
+        self.cooldown: float = cooldown
+        # Whether rate limit responses open the breaker. Not with an endpoint pool, which
+        # drains the key that was rate limited and sends the retry with another one.
+        self.rate_limits: bool = rate_limits
+        self._consecutive_failures: int = 0
+        self._open_until: float = 0.0
+        self._lock: threading.Lock = threading.Lock()
+
+    def delay(self) -> float:
+        """Seconds to wait before calling the provider."""
+        return max(self._open_until - time.monotonic(), 0.0)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._consecutive_failures = 0
+
+    def record_failure(self, server_delay: float | None = None, rate_limited: bool = False) -> None:
+        if rate_limited and not self.rate_limits:
+            return
+        with self._lock:
+            self._consecutive_failures += 1
+            open_for = server_delay or 0.0
+            if self._consecutive_failures >= self.failure_threshold:
+                open_for = max(open_for, self.cooldown)
+            self._open_until = max(self._open_until, time.monotonic() + open_for)
+
+
+_circuit_breakers: dict[tuple[str, str | None, str | None, bool], CircuitBreaker] = {}
+_circuit_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(
+    provider_name: str,
+    base_url: str | None = None,
+    api_key: str | None = None,
+    pooled: bool = False,
+) -> CircuitBreaker:
+    """Return the process-wide circuit breaker of the provider's base URL and API key.
+
+    The breaker of a client with an endpoint pool is not opened by rate limits.
+    """
+    key = (provider_name, base_url, api_key, pooled)
+    with _circuit_breakers_lock:
+        breaker = _circuit_breakers.get(key)
+        if breaker is None:
+            breaker = _circuit_breakers[key] = CircuitBreaker(rate_limits=not pooled)
+        return breaker
+
+
+def _status_code(error: BaseException) -> int | None:
+    # OpenAI, Anthropic and Ollama errors have `status_code`, Google errors have `code`.
+    for attribute in ("status_code", "code"):
+        value = getattr(error, attribute, None)
+        if isinstance(value, int) and 100 <= value < 600:
+            return value
+    response = getattr(error, "response", None)
+    if isinstance(response, httpx.Response):
+        return response.status_code
+    return None
+
+
+def _headers(error: BaseException) -> httpx.Headers | None:
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    return headers if isinstance(headers, httpx.Headers) else None
+
+
+def classify_error(error: BaseException) -> ErrorKind:
+    """Tell rate limits and transient failures from errors that retrying cannot fix."""
+    headers = _headers(error)
+    should_retry = headers.get("x-should-retry") if headers else None
+    if should_retry == "false":
+        return ErrorKind.FATAL
+
+    status = _status_code(error)
+    if status == 429:
+        # OpenAI reports an exhausted quota, which does not reset soon, as a rate limit.
+        if getattr(error, "code", None) == "insufficient_quota":
+            return ErrorKind.FATAL
+        return ErrorKind.RATE_LIMITED
+    if status is not None:
+        if status in RETRYABLE_STATUS_CODES or should_retry == "true":
+            return ErrorKind.TRANSIENT
+        return ErrorKind.FATAL
+
+    # Connection failures, timeouts and other errors without a status may be transient.
+    return ErrorKind.TRANSIENT
+
+
+def _parse_duration(value: str) -> float | None:
+    """Parse durations like "12s" (Google) or "1m30.5s" and "20ms" (OpenAI)."""
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|s|m|h)", value)
+    if not parts or "".join(number + unit for number, unit in parts) != value.strip():
+        return None
+    scale = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+    return sum(float(number) * scale[unit] for number, unit in parts)
+
+
+def server_retry_delay(error: BaseException) -> float | None:
+    """Seconds the server asked to wait before retrying, if it said."""
+    headers = _headers(error)
+    if headers is not None:
+        if retry_after_ms := headers.get("retry-after-ms"):
+            try:
+                return float(retry_after_ms) / 1000
+            except ValueError:
+                pass
+        if retry_after := headers.get("retry-after"):
+            try:
+                return float(retry_after)
+            except ValueError:
+                try:
+                    retry_at = parsedate_to_datetime(retry_after)
+                    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+                except (TypeError, ValueError):
+                    pass
+        if _status_code(error) == 429:
+            # OpenAI's rate limit headers tell when the request and token limits reset.
+            resets = [
+                _parse_duration(reset)
+                for header in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")
+                if (reset := headers.get(header))
+            ]
+            if delays := [delay for delay in resets if delay is not None]:
+                return min(delays)
+
+    # Google sends a RetryInfo detail in the error body instead.
+    body = getattr(error, "details", None)
+    body_error = body.get("error") if isinstance(body, dict) else None
+    if isinstance(body_error, dict):
+        for detail in body_error.get("details") or []:
+            if isinstance(detail, dict) and str(detail.get("@type", "")).endswith("RetryInfo"):
+                return _parse_duration(str(detail.get("retryDelay", "")))
+    return None
+
+
+def _retry_delay(
+    error: BaseException,
+    attempt: int,
+    policy: RetryPolicy,
+    breaker: CircuitBreaker,
+    provider_name: str,
+) -> float | None:
+    """Return how long to wait before retrying after the error, or None to raise it."""
+    kind = classify_error(error)
+    if kind is ErrorKind.FATAL:
+        return None
+
+    server_delay = server_retry_delay(error)
+    if server_delay is not None:
+        server_delay = min(server_delay, policy.max_server_delay)
+    rate_limited = kind is ErrorKind.RATE_LIMITED
+    breaker.record_failure(server_delay if rate_limited else None, rate_limited)
+    if attempt >= policy.max_retries:
+        return None
+
+    delay = max(policy.backoff(attempt), server_delay or 0.0, breaker.delay())
+    logger.warning(
+        "%s API call failed (%s, %s: %s). Retrying in %.1fs (retry %d of %d).",
+        provider_name,
+        kind.value,
+        type(error).__name__,
+        error,
+        delay,
+        attempt + 1,
+        policy.max_retries,
+    )
+    return delay
+
 
 def retry_with(
     func: Callable[..., T],
     provider_name: str = "OpenAI",
     max_retries: int = 3,
+    policy: RetryPolicy | None = None,
+    circuit_breaker: CircuitBreaker | None = None,
 ) -> Callable[..., T]:
     """
-    Decorator that adds retry logic with randomized backoff.
+    Decorator that retries failed API calls following the retry policy.
 
     Args:
         func: The function to decorate
         provider_name: The name of the model provider being called
         max_retries: Maximum number of retry attempts
+        policy: Backoff parameters, overriding `max_retries` when given
+        circuit_breaker: Breaker of the endpoint called, by default the provider's
 
     Returns:
         Decorated function with retry logic
     """
+    policy = policy or RetryPolicy(max_retries=max_retries)
+    breaker = circuit_breaker or get_circuit_breaker(provider_name)
 
     @wraps(func)
     def wrapper(*args: Any, **kwargs: Any) -> T:
-        last_exception = None
-
-        for attempt in range(max_retries + 1):
+        attempt = 0
+        while True:
+            if (wait := breaker.delay()) > 0:
+                _record_wait(wait, retry=False)
+                time.sleep(wait)
             try:
-                return func(*args, **kwargs)
+                result = func(*args, **kwargs)
             except Exception as e:
-                last_exception = e
+                delay = _retry_delay(e, attempt, policy, breaker, provider_name)
+                if delay is None:
+                    raise
+                delay = max(delay, _hook_delay())
+                _record_wait(delay, retry=True)
+                time.sleep(delay)
+                attempt += 1
+            else:
+                breaker.record_success()
+                return result
+
+    return wrapper
+
+
+def async_retry_with(
+    func: Callable[..., Awaitable[T]],
+    provider_name: str = "OpenAI",
+    max_retries: int = 3,
+    policy: RetryPolicy | None = None,
+    circuit_breaker: CircuitBreaker | None = None,
+) -> Callable[..., Awaitable[T]]:
+    """
+    Async counterpart of `retry_with` that sleeps without blocking the event loop.
+
+    Args:
+        func: The coroutine function to decorate
+        provider_name: The name of the model provider being called
+        max_retries: Maximum number of retry attempts
+        policy: Backoff parameters, overriding `max_retries` when given
+        circuit_breaker: Breaker of the endpoint called, by default the provider's
 
-                if attempt == max_retries:
-                    # Last attempt, re-raise the exception
+    Returns:
+        Decorated coroutine function with retry logic
+    """
+    policy = policy or RetryPolicy(max_retries=max_retries)
+    breaker = circuit_breaker or get_circuit_breaker(provider_name)
+
+    @wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        attempt = 0
+        while True:
+            if (wait := breaker.delay()) > 0:
+                _record_wait(wait, retry=False)
+                await asyncio.sleep(wait)
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as e:
+                delay = _retry_delay(e, attempt, policy, breaker, provider_name)
+                if delay is None:
                     raise
+                delay = max(delay, _hook_delay())
+                _record_wait(delay, retry=True)
+                await asyncio.sleep(delay)
+                attempt += 1
+            else:
+                breaker.record_success()
+                return result
+
+    return wrapper
+
+
+def async_retry_stream(
+    func: Callable[..., AsyncIterator[T]],
+    provider_name: str = "OpenAI",
+    max_retries: int = 3,
+    policy: RetryPolicy | None = None,
+    circuit_breaker: CircuitBreaker | None = None,
+) -> Callable[..., AsyncIterator[T]]:
+    """
+    Retry logic for streaming calls.
 
-                sleep_time = random.randint(3, 30)
-                this_error_message = str(e)
-                print(
-                    f"{provider_name} API call failed: {this_error_message}. Will sleep for {sleep_time} seconds and will retry.\n{traceback.format_exc()}"
-                )
-                # Randomly sleep for 3-30 seconds
-                time.sleep(sleep_time)
+    A stream is only retried if it fails before producing any item; once items have been
+    handed to the caller they cannot be taken back, so later errors are raised as is.
 
-        # This should never be reached, but just in case
-        raise last_exception or Exception("Retry failed for unknown reason")
+    Args:
+        func: The async generator function to decorate
+        provider_name: The name of the model provider being called
+        max_retries: Maximum number of retry attempts
+        policy: Backoff parameters, overriding `max_retries` when given
+        circuit_breaker: Breaker of the endpoint called, by default the provider's
+
+    Returns:
+        Decorated async generator function with retry logic
+    """
+    policy = policy or RetryPolicy(max_retries=max_retries)
+    breaker = circuit_breaker or get_circuit_breaker(provider_name)
+
+    @wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> AsyncIterator[T]:
+        attempt = 0
+        while True:
+            if (wait := breaker.delay()) > 0:
+                _record_wait(wait, retry=False)
+                await asyncio.sleep(wait)
+            started = False
+            try:
+                async for item in func(*args, **kwargs):
+                    if not started:
+                        started = True
+                        breaker.record_success()
+                    yield item
+                return
+            except Exception as e:
+                if started:
+                    raise
+                delay = _retry_delay(e, attempt, policy, breaker, provider_name)
+                if delay is None:
+                    raise
+                delay = max(delay, _hook_delay())
+                _record_wait(delay, retry=True)
+                await asyncio.sleep(delay)
+                attempt += 1
 
     return wrapper
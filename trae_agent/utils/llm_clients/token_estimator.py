@@ -0,0 +1,133 @@
+# Copyright (c) 2025 ByteDance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""Local estimates of the prompt size of a request, before it is sent.
+
+Tokens are estimated from the number of characters of the conversation and the tool
+schemas, at a ratio that starts from a per-provider default and is calibrated against the
+prompt tokens the provider reports for each response.
+"""
+
+import json
+import math
+import threading
+import weakref
+from collections.abc import Iterable
+
+from trae_agent.tools.base import Tool
+from trae_agent.utils.llm_clients.llm_basics import LLMMessage, LLMUsage
+
+# Characters per token of each provider family's tokenizer on code, JSON and English.
+DEFAULT_CHARS_PER_TOKEN: dict[str, float] = {
+    "anthropic": 3.5,
+    "google": 4.0,
+    "openai": 4.0,
+    "azure": 4.0,
+}
+FALLBACK_CHARS_PER_TOKEN = 4.0
+
+# Tokens of role and framing each message carries on top of its text.
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+class ContextWindowExceeded(Exception):
+    """The prompt does not fit in the model's context window, even after compaction."""
+
+
+def message_chars(message: LLMMessage) -> int:
+    """Characters of a message that count towards the prompt."""
+    chars = len(message.content or "")
+    if message.tool_call:
+        chars += len(message.tool_call.name) + len(json.dumps(message.tool_call.arguments))
+    if message.tool_result:
+        chars += len(message.tool_result.result or "") + len(message.tool_result.error or "")
+    return chars
+
+
+class MessageCharsCache:
+    """Characters of messages, counted once per message.
+
+    The history is estimated before every call and again when compacting it, so each
+    message would otherwise be measured, tool call arguments serialized, on every turn.
+    """
+
+    def __init__(self):
+        # Message id -> (message, chars). The message is kept so that its id is not reused
+        # while its count is cached.
+        self._chars: dict[int, tuple[LLMMessage, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._chars)
+
+    def chars(self, message: LLMMessage) -> int:
+        """Return the characters of the message, counting them on first use."""
+        entry = self._chars.get(id(message))
+        if entry is None or entry[0] is not message:
+            entry = self._chars[id(message)] = (message, message_chars(message))
+        return entry[1]
+
+    def retain(self, messages: Iterable[LLMMessage]) -> None:
+        """Drop the counts of messages other than the given ones, e.g. after compaction."""
+        live = {id(message) for message in messages}
+        self._chars = {key: entry for key, entry in self._chars.items() if key in live}
+
+
+def prompt_tokens(usage: LLMUsage, provider: str) -> int:
+    """Prompt tokens the provider counted, including those read from or written to its cache."""
+    if provider == "anthropic":
+        # Anthropic leaves the cached tokens out of `input_tokens`.
+        return (
+            usage.input_tokens + usage.cache_creation_input_tokens + usage.cache_read_input_tokens
+        )
+    return usage.input_tokens
+
+
+class TokenEstimator:
+    """Estimates prompt tokens from characters, calibrated against the provider's counts."""
+
+    def __init__(self, chars_per_token: float = FALLBACK_CHARS_PER_TOKEN, smoothing: float = 0.3):
+        self.chars_per_token: float = chars_per_token
+        self.smoothing: float = smoothing
+        # Agents send the same tools on every turn, so each schema is measured once.
+        self._schema_chars: weakref.WeakKeyDictionary[Tool, int] = weakref.WeakKeyDictionary()
+        self._lock: threading.Lock = threading.Lock()
+
+    def estimate(
+        self,
+        messages: list[LLMMessage],
+        tools: list[Tool] | None = None,
+        sizes: MessageCharsCache | None = None,
+    ) -> int:
+        """Estimated prompt tokens of a request with the messages and tools."""
+        count = sizes.chars if sizes is not None else message_chars
+        chars = sum(count(message) for message in messages)
+        for tool in tools or []:
+            schema_chars = self._schema_chars.get(tool)
+            if schema_chars is None:
+                schema_chars = self._schema_chars[tool] = len(json.dumps(tool.json_definition()))
+            chars += schema_chars
+        return math.ceil(chars / self.chars_per_token) + MESSAGE_OVERHEAD_TOKENS * len(messages)
+
+    def calibrate(self, estimated: int, actual: int) -> None:
+        """Move the ratio towards the one that would have given the actual count."""
+        if estimated <= 0 or actual <= 0:
+            return
+        with self._lock:
+            observed = self.chars_per_token * estimated / actual
+            ratio = (1 - self.smoothing) * self.chars_per_token + self.smoothing * observed
+            self.chars_per_token = min(max(ratio, 1.0), 8.0)
+
+
+_estimators: dict[tuple[str, str], TokenEstimator] = {}
+_estimators_lock = threading.Lock()
+
+
+def get_token_estimator(provider: str, model: str) -> TokenEstimator:
+    """Return the process-wide estimator of the model, so that its calibration is shared."""
+    with _estimators_lock:
+        estimator = _estimators.get((provider, model))
+        if estimator is None:
+            estimator = _estimators[(provider, model)] = TokenEstimator(
+                DEFAULT_CHARS_PER_TOKEN.get(provider, FALLBACK_CHARS_PER_TOKEN)
+            )
+        return estimator
@@ -9,12 +9,14 @@
 """Trajectory recording functionality for Trae Agent."""
 
 import json
+from dataclasses import asdict
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
 from trae_agent.tools.base import ToolCall, ToolResult
-from trae_agent.utils.llm_clients.llm_basics import LLMMessage, LLMResponse
+from trae_agent.utils.llm_clients.context_compactor import ElidedItem
+from trae_agent.utils.llm_clients.llm_basics import LLMMessage, LLMResponse, LLMUsage
 
 
 class TrajectoryRecorder:
@@ -45,11 +47,25 @@ class TrajectoryRecorder:
             "max_steps": 0,
             "llm_interactions": [],
             "agent_steps": [],
+            "context_compactions": [],
+            "provider_failovers": [],
             "success": False,
             "final_result": None,
             "execution_time": 0.0,
         }
         self._start_time: datetime | None = None
+        self._resuming: bool = False
+
+    def resume_recording(self) -> None:
+        """Continue the existing trajectory file on the next `start_recording`.
+
+        Steps and LLM interactions recorded before the run was interrupted are kept.
+        """
+        if not self.trajectory_path.exists():
+            return
+        with open(self.trajectory_path, "r", encoding="utf-8") as f:
+            self.trajectory_data.update(json.load(f))
+        self._resuming = True
 
     def start_recording(self, task: str, provider: str, model: str, max_steps: int) -> None:
         """Start recording a new trajectory.
@@ -60,6 +76,17 @@ class TrajectoryRecorder:
             model: Model name being used
             max_steps: Maximum number of steps allowed
         """
+        if self._resuming:
+            self._resuming = False
+            start_time = self.trajectory_data.get("start_time")
+            self._start_time = datetime.fromisoformat(start_time) if start_time else datetime.now()
+            self.trajectory_data.setdefault("resumed_at", []).append(datetime.now().isoformat())
+            self.trajectory_data.update(
+                {"provider": provider, "model": model, "max_steps": max_steps}
+            )
+            self.save_trajectory()
+            return
+
         self._start_time = datetime.now()
         self.trajectory_data.update(
             {
@@ -70,6 +97,8 @@ class TrajectoryRecorder:
                 "max_steps": max_steps,
                 "llm_interactions": [],
                 "agent_steps": [],
+                "context_compactions": [],
+                "provider_failovers": [],
             }
         )
         self.save_trajectory()
@@ -100,6 +129,7 @@ class TrajectoryRecorder:
                 "content": response.content,
                 "model": response.model,
                 "finish_reason": response.finish_reason,
+                "request_bytes": response.request_bytes,
                 "usage": {
                     "input_tokens": response.usage.input_tokens if response.usage else 0,
                     "output_tokens": response.usage.output_tokens if response.usage else 0,
@@ -137,6 +167,9 @@ class TrajectoryRecorder:
         tool_results: list[ToolResult] | None = None,
         reflection: str | None = None,
         error: str | None = None,
+        time_to_first_token: float | None = None,
+        tool_cache_stats: dict[str, float] | None = None,
+        llm_usage: LLMUsage | None = None,
     ) -> None:
         """Record an agent execution step.
 
@@ -149,6 +182,9 @@ class TrajectoryRecorder:
             tool_results: Results from tool execution
             reflection: Agent reflection on the step
             error: Error message if step failed
+            time_to_first_token: Seconds until the first streamed token, if streaming
+            tool_cache_stats: Cumulative tool result cache counters after this step
+            llm_usage: Token usage of the LLM call of this step
         """
         step_data = {
             "step_number": step_number,
@@ -161,6 +197,14 @@ class TrajectoryRecorder:
                 "content": llm_response.content,
                 "model": llm_response.model,
                 "finish_reason": llm_response.finish_reason,
+                "provider": llm_response.provider,
+                "request_bytes": llm_response.request_bytes,
+                "retries": llm_response.retries,
+                "retry_wait": llm_response.retry_wait,
+                "hedged": llm_response.hedged,
+                "hedge_won": llm_response.hedge_won,
+                "cached": llm_response.cached,
+                "estimated_input_tokens": llm_response.estimated_input_tokens,
                 "usage": {
                     "input_tokens": llm_response.usage.input_tokens if llm_response.usage else None,
                     "output_tokens": llm_response.usage.output_tokens
@@ -183,11 +227,73 @@ class TrajectoryRecorder:
             else None,
             "reflection": reflection,
             "error": error,
+            "time_to_first_token": time_to_first_token,
+            "tool_cache": tool_cache_stats,
+            "llm_usage": asdict(llm_usage) | {"cache_hit_ratio": llm_usage.cache_hit_ratio}
+            if llm_usage
+            else None,
         }
 
         self.trajectory_data["agent_steps"].append(step_data)
+        if tool_cache_stats is not None:
+            self.trajectory_data["tool_cache"] = tool_cache_stats
+        self.save_trajectory()
+
+    def record_context_compaction(
+        self, tokens_before: int, tokens_after: int, elided: list[ElidedItem]
+    ) -> None:
+        """Record a compaction of the conversation history.
+
+        Args:
+            tokens_before: Estimated prompt tokens before compaction
+            tokens_after: Estimated prompt tokens after compaction
+            elided: Tool results and arguments that were elided from the history
+        """
+        compaction = {
+            "timestamp": datetime.now().isoformat(),
+            "step_number": len(self.trajectory_data["agent_steps"]) + 1,
+            "tokens_before": tokens_before,
+            "tokens_after": tokens_after,
+            "elided": [asdict(item) for item in elided],
+        }
+
+        self.trajectory_data["context_compactions"].append(compaction)
         self.save_trajectory()
 
+    def record_provider_failover(
+        self, from_provider: str, from_model: str, to_provider: str, to_model: str, error: str
+    ) -> None:
+        """Record a switch to the next model of the fallback chain.
+
+        Args:
+            from_provider: Provider of the model that failed
+            from_model: Model that failed
+            to_provider: Provider of the model switched to
+            to_model: Model switched to
+            error: The error of the failed call
+        """
+        failover = {
+            "timestamp": datetime.now().isoformat(),
+            "step_number": len(self.trajectory_data["agent_steps"]) + 1,
+            "from": {"provider": from_provider, "model": from_model},
+            "to": {"provider": to_provider, "model": to_model},
+            "error": error,
+        }
+
+        self.trajectory_data["provider_failovers"].append(failover)
+        self.save_trajectory()
+
+    def update_step_timing(self, step_number: int, timing: dict[str, float]) -> None:
+        """Attach the timing breakdown to a recorded step.
+
+        The step's own recording is part of what is timed, so the trajectory is not written
+        again here; the timing is saved with the next step or when recording is finalized.
+        """
+        for step_data in reversed(self.trajectory_data["agent_steps"]):
+            if step_data["step_number"] == step_number:
+                step_data["timing"] = timing
+                break
+
     def update_lakeview(self, step_number: int, lakeview_summary: str):
         for step_data in self.trajectory_data["agent_steps"]:
             if step_data["step_number"] == step_number:
@@ -195,14 +301,26 @@ class TrajectoryRecorder:
                 break
         self.save_trajectory()
 
-    def finalize_recording(self, success: bool, final_result: str | None = None) -> None:
+    def finalize_recording(
+        self,
+        success: bool,
+        final_result: str | None = None,
+        latency_summary: dict[str, object] | None = None,
+        endpoint_usage: dict[str, list[dict[str, object]]] | None = None,
+    ) -> None:
         """Finalize the trajectory recording.
 
         Args:
             success: Whether the task completed successfully
             final_result: Final result or output of the task
+            latency_summary: LLM and per-tool latency aggregated over the execution
+            endpoint_usage: Requests, rate limits and tokens of each pooled API endpoint
         """
         end_time = datetime.now()
+        if latency_summary is not None:
+            self.trajectory_data["latency_summary"] = latency_summary
+        if endpoint_usage:
+            self.trajectory_data["endpoint_usage"] = endpoint_usage
         self.trajectory_data.update(
             {
                 "end_time": end_time.isoformat(),
@@ -258,6 +376,7 @@ class TrajectoryRecorder:
             "result": tool_result.result,
             "error": tool_result.error,
             "id": getattr(tool_result, "id", None),
+            "duration": tool_result.duration,
         }
 
     def get_trajectory_path(self) -> str: